@@ -8,6 +8,7 @@ from datetime import datetime
 from typing import Dict, Any, List
 from memory.db import get_db
 from memory.task_store import get_recent_tasks
+from memory.preference_store import preference_cache
 from brains.ollama_brain import OllamaBrain
 
 BRIEFING_TIME = os.getenv("BRIEFING_TIME", "08:00")
@@ -17,6 +18,12 @@ OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY", "")
 class DailyBriefing:
     def __init__(self):
         self.ollama = OllamaBrain()
+        self.city = WEATHER_CITY
+
+    def on_preference(self, key: str, value: str = None):
+        """Preference cache subscriber."""
+        if key == "weather_city":
+            self.city = value or WEATHER_CITY
 
     async def generate(self) -> Dict[str, Any]:
         """Generate the full daily briefing content."""
@@ -39,7 +46,7 @@ class DailyBriefing:
         return {
             "date": date_str,
             "time": time_str,
-            "city": WEATHER_CITY,
+            "city": self.city,
             "weather": weather,
             "tasks": tasks,
             "greeting": greeting["greeting"],
@@ -51,7 +58,7 @@ class DailyBriefing:
         if not OPENWEATHER_API_KEY:
             return {"temp": "--", "condition": "Unknown (No API Key)", "icon": "❓"}
             
-        url = f"https://api.openweathermap.org/data/2.5/weather?q={WEATHER_CITY}&appid={OPENWEATHER_API_KEY}&units=metric"
+        url = f"https://api.openweathermap.org/data/2.5/weather?q={self.city}&appid={OPENWEATHER_API_KEY}&units=metric"
         try:
             async with httpx.AsyncClient() as client:
                 r = await client.get(url, timeout=5)
@@ -159,3 +166,4 @@ class DailyBriefing:
 
 # Global Instance
 briefing = DailyBriefing()
+preference_cache.subscribe(briefing.on_preference, "weather_city")
@@ -4,10 +4,53 @@ import pyperclip
 import re
 import logging
 import asyncio
-from typing import List, Dict, Any
+import hashlib
+import math
+from collections import Counter
+from typing import List, Dict, Any, Optional
+
+try:
+    from memory.semantic import semantic_memory
+except Exception:
+    semantic_memory = None
+
+try:
+    from memory.preference_store import preference_cache
+except Exception:
+    preference_cache = None
 
 logger = logging.getLogger(__name__)
 
+# Clips are only indexed into memory when this preference is "true" (off by default)
+REMEMBER_PREFERENCE = "clipboard_memory"
+
+# API keys and tokens that announce themselves: OpenAI/Anthropic-style, GitHub, AWS access keys, JWTs
+SECRET_PATTERN = re.compile(
+    r"\b(?:sk-[A-Za-z0-9_-]{16,}|ghp_[A-Za-z0-9]{20,}|AKIA[0-9A-Z]{16}"
+    r"|eyJ[A-Za-z0-9_-]{8,}\.[A-Za-z0-9_-]{8,}\.[A-Za-z0-9_-]{8,})")
+
+
+def _entropy(text: str) -> float:
+    """Shannon entropy in bits per character."""
+    counts = Counter(text)
+    return -sum(n / len(text) * math.log2(n / len(text)) for n in counts.values())
+
+
+def looks_secret(text: str) -> bool:
+    """
+    True for clips that are probably credentials: a known key/token format
+    anywhere in the text, or a single random-looking token (a password or
+    key copied from a password manager) with letters and digits mixed.
+    """
+    text = text.strip()
+    if SECRET_PATTERN.search(text):
+        return True
+    if len(text) < 12 or any(c.isspace() for c in text) or re.match(r"https?://", text):
+        return False
+    kinds = sum(1 for test in (str.islower, str.isupper, str.isdigit) if any(test(c) for c in text))
+    return kinds >= 2 and any(c.isdigit() for c in text) and _entropy(text) >= 3.5
+
+
 class ClipboardMonitor(threading.Thread):
     def __init__(self, push_alert_callback, loop):
         super().__init__()
@@ -17,6 +60,15 @@ class ClipboardMonitor(threading.Thread):
         self.push_alert = push_alert_callback # Async callback
         self.loop = loop # Main event loop
         self.running = True
+        self.remember = False  # REMEMBER_PREFERENCE, followed through the preference cache
+        if preference_cache:
+            preference_cache.subscribe(self.on_preference, REMEMBER_PREFERENCE)
+            self.on_preference(REMEMBER_PREFERENCE, preference_cache.get(REMEMBER_PREFERENCE))
+
+    def on_preference(self, key: str, value: Optional[str] = None):
+        """Preference cache subscriber."""
+        if key == REMEMBER_PREFERENCE:
+            self.remember = (value or "").strip().lower() in ("true", "on", "yes", "1")
 
     def run(self):
         logger.info("Clipboard Monitor started.")
@@ -34,6 +86,7 @@ class ClipboardMonitor(threading.Thread):
                         self.last_content = current_content
                         if current_content.strip():
                             self._analyze_and_suggest(current_content)
+                            self._remember(current_content)
                 except Exception as e:
                     logger.error(f"Clipboard Error: {e}")
             
@@ -54,6 +107,17 @@ class ClipboardMonitor(threading.Thread):
     def stop(self):
         self.running = False
 
+    def _remember(self, text: str):
+        """
+        Index substantial clips in the clipboard memory namespace (same text →
+        same doc). Only when the user opted in, and never anything secret-looking.
+        """
+        text = text.strip()
+        if not self.remember or semantic_memory is None or len(text) <= 20 or looks_secret(text):
+            return
+        doc_id = "clip:" + hashlib.sha1(text.encode("utf-8")).hexdigest()
+        semantic_memory.store_document("clipboard", doc_id, text[:4000])
+
     def _analyze_and_suggest(self, text: str):
         suggestions = []
         text = text.strip()
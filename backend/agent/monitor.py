@@ -78,7 +78,7 @@ class SystemMonitor:
                     "Low Disk Space",
                     "warning",
                     f"Only {free_gb:.1f}GB free on C: drive.",
-                    "Run 'Clean my disk' or empty Recycle Bin."
+                    "Ask 'what is using my disk space?', find duplicate files, or empty Recycle Bin."
                 )
         except Exception:
             pass # Ignore if C: checks fail
@@ -9,8 +9,9 @@ from concurrent.futures import ThreadPoolExecutor
 from typing import AsyncGenerator, List, Dict, Any, Optional, cast
 from dataclasses import dataclass, field
 
-# Thread pool for running blocking (synchronous) tools like Playwright
-# must be 1 to use persistent sync_playwright session safely
+# Thread pool for running blocking (synchronous) tools; desktop automation
+# (typing, clicks) must not interleave, so one worker. Browser tools run on
+# their own loop thread and are awaited without taking this worker.
 _tool_executor = ThreadPoolExecutor(max_workers=1)
 
 # Initialize placeholders
@@ -19,13 +20,17 @@ GeminiBrain = None
 ToolRegistry = None
 route = None
 parse_brain_prefix = None
+memory_namespaces = None
 get_db = None
+get_read_db = None
+db_writer = None
 init_db = None
 create_task = None
 update_task = None
 get_recent_tasks = None
 get_preference = None
 set_preference = None
+preference_cache = None
 semantic_memory = None
 PersonalityEngine = None
 chatbot_engine = None
@@ -35,11 +40,10 @@ try:
     from brains.gemini_brain import GeminiBrain
     from brains.claude_brain import ClaudeBrain
     from tools import ToolRegistry
-    from agent.router import route, parse_brain_prefix
-    from memory.db import get_db, init_db
+    from agent.router import route, parse_brain_prefix, memory_namespaces
+    from memory.db import get_db, get_read_db, db_writer, init_db
     from memory.task_store import create_task, update_task, get_recent_tasks
-    from memory.preference_store import get_preference, set_preference
-    from memory.preference_store import get_preference, set_preference
+    from memory.preference_store import get_preference, set_preference, preference_cache
     from memory.semantic import semantic_memory
     from memory.episodic import episodic_memory
     from agent.personality import PersonalityEngine
@@ -71,6 +75,16 @@ class AgentOrchestrator:
         self.personality = PersonalityEngine() if PersonalityEngine else None
         self._default_brain = "auto"
 
+        # Settings follow the preference cache (loaded at startup, pushed on change)
+        if preference_cache:
+            preference_cache.subscribe(self._on_preference, "default_brain")
+            if self.personality:
+                preference_cache.subscribe(self.personality.on_preference, "personality_tone")
+
+    def _on_preference(self, key: str, value: Optional[str]):
+        if key == "default_brain":
+            self._default_brain = value if value in ("local", "gemini", "auto") else "auto"
+
     def _intercept_known_commands(self, text: str) -> Optional[Dict[str, Any]]:
         """
         Pattern-match well-known commands and return a hardcoded plan.
@@ -424,7 +438,16 @@ class AgentOrchestrator:
             }
 
         # ── Webpage Read/Summarize ────────────────────────────────
-        url_m = re.search(r"(?:read|summarize|summarise|fetch)\s+(?:this )?(?:page|url|website|article|webpage)?\s*(https?://\S+)", t)
+        url_m = re.search(r"(?:read|summarize|summarise|fetch)\s+(?:this |these )?(?:pages?|urls?|websites?|articles?|webpages?)?\s*(https?://\S+)", t)
+        urls = re.findall(r"https?://[^\s,]+", t) if url_m else []
+        if len(urls) > 1:
+            return {
+                "intent": f"Read {len(urls)} webpages",
+                "complexity": 0.5,
+                "steps": [{"tool": "read_webpages", "args": {"urls": urls},
+                           "description": f"Fetch and read {len(urls)} pages at once"}],
+                "response": f"📚 Reading {len(urls)} pages..."
+            }
         if url_m:
             url = url_m.group(1).strip()
             return {
@@ -438,23 +461,31 @@ class AgentOrchestrator:
         return None  # No intercept match
 
 
-    def _get_memory_context(self, text: str) -> str:
+    async def _get_memory_context(self, text: str) -> str:
         """Retrieve relevant memories and format them for the AI."""
         context = ""
         try:
+            # Episodic recents and semantic namespaces (only those this request
+            # could use) are fetched concurrently
+            recents, found = await asyncio.gather(
+                episodic_memory.aget_recent(limit=5),
+                self.memory.aretrieve_many(text, memory_namespaces(text)),
+            )
+
             # 1. Episodic (Recent Context)
-            recents = episodic_memory.get_recent(limit=5)
             if recents:
                 context += "\n[Recent Conversation]:\n"
                 for r in recents:
                     context += f"User: {r['user']}\nEonix: {r['agent']}\n"
             
-            # 2. Semantic (Relevant Facts)
-            memories = self.memory.retrieve_relevant(text, n_results=3)
-            if memories:
-                context += "\n[Relevant Notes]:\n"
-                for m in memories:
-                    context += f"- {m['text']}\n"
+            # 2. Semantic (Relevant Facts, Notes, Clipboard, Web Pages)
+            for namespace, label in (("facts", "Relevant Notes"), ("notes", "Saved Notes"),
+                                     ("clipboard", "Clipboard"), ("web", "Web Pages")):
+                hits = found.get(namespace)
+                if hits:
+                    context += f"\n[{label}]:\n"
+                    for m in hits:
+                        context += f"- {m['text'][:500]}\n"
             
             return context + "\n" if context else ""
         except Exception as e:
@@ -473,9 +504,8 @@ class AgentOrchestrator:
         # 2. Parse brain prefix (@local, @gemini)
         forced_brain, clean_input = parse_brain_prefix(user_input)
 
-        # 3. Get DB session and create task record
-        db = get_db()
-        task = create_task(db, clean_input, "pending")
+        # 3. Create task record (through the single DB writer)
+        task = await db_writer.awrite(lambda db: create_task(db, clean_input, "pending"))
 
         # 4. Route to correct brain
         ollama_ok = self.ollama.is_available() if self.ollama else False
@@ -509,7 +539,7 @@ class AgentOrchestrator:
                 plan_raw = intercepted
             else:
                 # ── MEMORY INJECTION ──
-                memory_context = self._get_memory_context(clean_input)
+                memory_context = await self._get_memory_context(clean_input)
                 augmented_input = memory_context + clean_input
                 
                 if brain == "gemini" and gemini_ok and self.gemini:
@@ -540,7 +570,6 @@ class AgentOrchestrator:
                     # Keep the original plan response as fallback
 
             # Execute each step
-            loop = cast(Any, asyncio.get_event_loop())
             for i, step in enumerate(steps):
                 tool_name = step.get("tool", "")
                 tool_args = step.get("args", {})
@@ -587,12 +616,9 @@ class AgentOrchestrator:
                              args_str = args_str.replace("{{last_result.message}}", getattr(last_res_obj, 'message', ''))
                         tool_args = json.loads(args_str)
 
-                # Run blocking tool in thread pool so we don't block the event loop
+                # Blocking tools run in the tool thread pool, async ones are awaited here
                 if self.tools:
-                    result = await loop.run_in_executor(
-                        _tool_executor,
-                        lambda tn=tool_name, ta=tool_args: self.tools.execute(tn, ta)
-                    )
+                    result = await self.tools.aexecute(tool_name, tool_args, _tool_executor)
                 else:
                     from types import SimpleNamespace
                     result = SimpleNamespace(success=False, message="Tool Registry not available")
@@ -603,7 +629,8 @@ class AgentOrchestrator:
                     "description": description,
                     "result": str(result),
                     "result_obj": result, # Store the full object for interpolation
-                    "success": getattr(result, 'success', False)
+                    "success": getattr(result, 'success', False),
+                    "cached": getattr(result, 'cached', False)
                 }
                 actions.append(action_record)
 
@@ -619,19 +646,18 @@ class AgentOrchestrator:
         duration_ms = int((time.time() - start_time) * 1000)
         success = all(a.get("success", True) for a in actions) if actions else True
 
-        update_task(db, task.id,
+        await db_writer.awrite(lambda db: update_task(db, task.id,
                    brain_used=brain,
                    intent=plan.get("intent", ""),
                    plan=plan.get("steps", []),
                    actions=actions,
                    result=reply,
                    success=success,
-                   duration_ms=duration_ms)
-        db.close()
+                   duration_ms=duration_ms))
 
         # ── AUTO-SAVE EPISODIC MEMORY ──
         if episodic_memory:
-            episodic_memory.save_turn(clean_input, reply, tags=[brain])
+            await episodic_memory.asave_turn(clean_input, reply, tags=[brain])
 
         return AgentResponse(
             reply=reply,
@@ -679,7 +705,7 @@ class AgentOrchestrator:
                 plan = intercepted
             else:
                 # ── MEMORY + MOOD INJECTION ──
-                memory_context = self._get_memory_context(clean_input)
+                memory_context = await self._get_memory_context(clean_input)
                 mood = self.personality.detect_mood(clean_input)
                 tone = self.personality.get_tone_instruction(mood)
                 time_ctx = self.personality.get_time_context()
@@ -718,9 +744,7 @@ class AgentOrchestrator:
                 # Keep the original plan response as fallback
 
         # Execute steps and stream updates
-        db = get_db()
-        task = create_task(db, clean_input, brain)
-        loop = cast(Any, asyncio.get_event_loop())
+        task = await db_writer.awrite(lambda db: create_task(db, clean_input, brain))
 
         for i, step in enumerate(steps):
             tool_name = step.get("tool", "")
@@ -746,12 +770,9 @@ class AgentOrchestrator:
             yield {"type": "action_start", "step": i + 1, "total": len(steps),
                    "tool": tool_name, "description": description, "args": tool_args}
 
-            # Run blocking tool in thread pool so we don't block the event loop
+            # Blocking tools run in the tool thread pool, async ones are awaited here
             if self.tools:
-                result = await loop.run_in_executor(
-                    _tool_executor,
-                    lambda tn=tool_name, ta=tool_args: self.tools.execute(tn, ta)
-                )
+                result = await self.tools.aexecute(tool_name, tool_args, _tool_executor)
             else:
                 from types import SimpleNamespace
                 result = SimpleNamespace(success=False, message="Tool Registry not available")
@@ -762,12 +783,14 @@ class AgentOrchestrator:
                 "description": description,
                 "result": str(result),
                 "result_obj": result,
-                "success": getattr(result, 'success', False)
+                "success": getattr(result, 'success', False),
+                "cached": getattr(result, 'cached', False)
             }
             actions.append(action_record)
 
             yield {"type": "action", "tool": tool_name, "args": tool_args,
                    "result": str(result), "success": result.success,
+                   "cached": getattr(result, 'cached', False),
                    "step": i + 1, "total": len(steps)}
 
             # Small delay between steps for UI readability
@@ -795,22 +818,21 @@ class AgentOrchestrator:
         ]
 
         try:
-            update_task(db, task.id,
+            await db_writer.awrite(lambda db: update_task(db, task.id,
                        brain_used=brain,
                        intent=plan.get("intent", ""),
                        plan=steps,
                        actions=serializable_actions,
                        result=reply,
                        success=success,
-                       duration_ms=duration_ms)
-            db.close()
+                       duration_ms=duration_ms))
         except Exception as db_err:
             print(f"[WARN] update_task error: {db_err}")
 
         # ── AUTO-SAVE EPISODIC MEMORY ──
         if episodic_memory:
             try:
-                episodic_memory.save_turn(clean_input, reply, tags=[brain])
+                await episodic_memory.asave_turn(clean_input, reply, tags=[brain])
             except Exception:
                 pass
 
@@ -863,7 +885,7 @@ class AgentOrchestrator:
                 reply = f"Error getting status: {e}"
 
         elif command == "/memory":
-            db = get_db()
+            db = get_read_db()
             tasks = get_recent_tasks(db, limit=10)
             db.close()
             if not tasks:
@@ -879,13 +901,13 @@ class AgentOrchestrator:
             if args:
                 brain = args[0].lower()
                 if brain in ("local", "ollama"):
-                    self._default_brain = "local"
+                    self.set_default_brain("local")
                     reply = "🧠 Switched to **LOCAL** brain (Ollama/Mistral)"
                 elif brain in ("gemini", "google"):
-                    self._default_brain = "gemini"
+                    self.set_default_brain("gemini")
                     reply = "🧠 Switched to **GEMINI** brain"
                 elif brain == "auto":
-                    self._default_brain = "auto"
+                    self.set_default_brain("auto")
                     reply = "🧠 Switched to **AUTO** brain routing"
                 else:
                     reply = f"Unknown brain: {brain}. Use: local, gemini, auto"
@@ -896,13 +918,7 @@ class AgentOrchestrator:
             reply = "__CLEAR_CHAT__"
 
         elif command == "/preferences":
-            db = get_db()
-            try:
-                from memory.preference_store import get_all_preferences
-                prefs = get_all_preferences(db)
-            except ImportError:
-                prefs = {}
-            db.close()
+            prefs = preference_cache.all() if preference_cache else {}
             if not prefs:
                 reply = "No preferences stored yet."
             else:
@@ -954,6 +970,8 @@ class AgentOrchestrator:
 
     def set_default_brain(self, brain: str):
         self._default_brain = brain
+        if preference_cache:
+            preference_cache.set("default_brain", brain, source="user")
 
 
 # Singleton instance
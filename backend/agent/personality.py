@@ -75,6 +75,12 @@ class PersonalityEngine:
     def __init__(self):
         self.current_mood = "neutral"
         self.mood_history = []
+        self.tone_override = None  # "personality_tone" preference, appended to every tone
+
+    def on_preference(self, key: str, value: str = None):
+        """Preference cache subscriber."""
+        if key == "personality_tone":
+            self.tone_override = value or None
 
     def detect_mood(self, text: str) -> str:
         """Detect user's mood from their message."""
@@ -100,6 +106,8 @@ class PersonalityEngine:
         """Get tone instruction for the AI based on current mood."""
         mood = mood or self.current_mood
         config = self.MOODS.get(mood, self.MOODS["neutral"])
+        if self.tone_override:
+            return f"{config['tone']} {self.tone_override}"
         return config["tone"]
 
     def get_mood_prefix(self, mood: str = None) -> str:
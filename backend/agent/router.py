@@ -2,7 +2,7 @@
 EONIX Router — Decides which AI brain to use for each request.
 """
 import re
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
 COMPLEX_KEYWORDS = [
     "prepare", "organize", "optimize", "set up", "setup",
@@ -77,6 +77,27 @@ def route(user_input: str, forced: Optional[str] = None, ollama_available: bool
     return "local"
 
 
+# Semantic memory namespaces worth searching for a request, and how many hits each
+MEMORY_KEYWORDS = {
+    "notes": ["note", "notes", "wrote down", "jot", "list", "todo", "to-do"],
+    "clipboard": ["clipboard", "copied", "paste", "pasted", "just copied"],
+    "web": ["page", "article", "website", "site", "link", "url", "read earlier", "blog", "docs"],
+}
+
+
+def memory_namespaces(user_input: str) -> Dict[str, int]:
+    """
+    Decide which memory namespaces to search for this input.
+    Returns: {namespace: k}. User facts are always included.
+    """
+    text = user_input.lower()
+    plan = {"facts": 3}
+    for namespace, keywords in MEMORY_KEYWORDS.items():
+        if any(re.search(rf"\b{re.escape(kw)}\b", text) for kw in keywords):
+            plan[namespace] = 2
+    return plan
+
+
 def parse_brain_prefix(user_input: str) -> Tuple[Optional[str], str]:
     """
     Parse @local, @gemini, @claude prefix from input.
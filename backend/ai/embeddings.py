@@ -1,10 +1,31 @@
 """
 Eonix Embeddings & Vector Store
 Manages semantic embeddings via ChromaDB for memory and search.
+
+All embedding goes through `embedding_service`:
+  backend      — pluggable model (Chroma's default ONNX MiniLM, sentence-transformers, hashing)
+  cache        — content-hash LRU in memory, backed by a SQLite file on disk
+  micro-batch  — concurrent requests are coalesced into one forward pass
+  thread pool  — batches run off the caller's thread (ONNX/torch release the GIL)
+
+`ChromaEmbeddingFunction` plugs the service into Chroma collections so
+documents and query texts hit the same cache.
 """
+import os
+import time
 import uuid
+import queue
+import array
+import sqlite3
+import asyncio
+import hashlib
+import threading
+import zlib
+import math
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 try:
     from loguru import logger  # type: ignore[import-untyped]
@@ -14,15 +35,276 @@ except ImportError:  # pragma: no cover
 
 try:
     import chromadb  # type: ignore[import-untyped]
+    from chromadb.utils import embedding_functions  # type: ignore[import-untyped]
     CHROMADB_AVAILABLE = True
 except ImportError:  # pragma: no cover
     CHROMADB_AVAILABLE = False
     logger.warning("ChromaDB not installed. Vector search will be disabled.")
 
+try:
+    from sentence_transformers import SentenceTransformer  # type: ignore[import-untyped]
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+from config import EMBEDDING_BACKEND, EMBEDDING_MODEL, EMBEDDING_CACHE_SIZE, EMBEDDING_CACHE_PATH
+
+Vector = List[float]
+
+
+# ── Backends ──────────────────────────────────────────────────
+class EmbeddingBackend:
+    """A model that turns a batch of texts into vectors."""
+
+    name = "base"
+
+    def embed(self, texts: Sequence[str]) -> List[Vector]:
+        raise NotImplementedError
+
+
+class ChromaDefaultBackend(EmbeddingBackend):
+    """Chroma's bundled ONNX all-MiniLM-L6-v2 — what existing collections were built with."""
+
+    name = "chroma-default"
+
+    def __init__(self) -> None:
+        self._fn = embedding_functions.DefaultEmbeddingFunction()
+
+    def embed(self, texts: Sequence[str]) -> List[Vector]:
+        return [list(map(float, v)) for v in self._fn(list(texts))]
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    def __init__(self, model: str = EMBEDDING_MODEL) -> None:
+        self.name = f"st:{model}"
+        self._model = SentenceTransformer(model)
+
+    def embed(self, texts: Sequence[str]) -> List[Vector]:
+        return self._model.encode(list(texts), batch_size=len(texts), normalize_embeddings=True).tolist()
+
+
+class HashingBackend(EmbeddingBackend):
+    """Dependency-free feature hashing of words and character trigrams. Lexical only."""
+
+    def __init__(self, dim: int = 384) -> None:
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def embed(self, texts: Sequence[str]) -> List[Vector]:
+        out = []
+        for text in texts:
+            vec = [0.0] * self.dim
+            words = text.lower().split()
+            grams = [f"#{w[i:i + 3]}" for w in words for i in range(max(1, len(w) - 2))]
+            for token in words + grams:
+                h = zlib.crc32(token.encode("utf-8"))
+                vec[h % self.dim] += 1.0 if (h >> 16) & 1 else -1.0
+            norm = math.sqrt(sum(x * x for x in vec)) or 1.0
+            out.append([x / norm for x in vec])
+        return out
+
+
+def create_backend(name: str = EMBEDDING_BACKEND) -> EmbeddingBackend:
+    """Resolve a backend by name, falling back to hashing if its library is missing."""
+    if name == "sentence-transformers" and SENTENCE_TRANSFORMERS_AVAILABLE:
+        return SentenceTransformerBackend()
+    if name in ("default", "chroma-default") and CHROMADB_AVAILABLE:
+        return ChromaDefaultBackend()
+    if name != "hashing":
+        logger.warning(f"Embedding backend '{name}' unavailable, using hashing backend.")
+    return HashingBackend()
+
+
+# ── Cache ─────────────────────────────────────────────────────
+class EmbeddingCache:
+    """Content-hash → vector. LRU in memory, every entry also persisted to SQLite."""
+
+    def __init__(self, path: Optional[str] = EMBEDDING_CACHE_PATH, size: int = EMBEDDING_CACHE_SIZE) -> None:
+        self.size = size
+        self._lru: "OrderedDict[str, Vector]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.disk_hits = self.misses = 0
+        self._db: Optional[sqlite3.Connection] = None
+        if path:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)")
+
+    @staticmethod
+    def key(backend: str, text: str) -> str:
+        return hashlib.sha256(f"{backend}\0{text}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, vec: Vector) -> None:
+        self._lru[key] = vec
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.size:
+            self._lru.popitem(last=False)
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Vector]:
+        found: Dict[str, Vector] = {}
+        with self._lock:
+            for k in keys:
+                vec = self._lru.get(k)
+                if vec is not None:
+                    self._lru.move_to_end(k)
+                    found[k] = vec
+            self.hits += len(found)
+            missing = [k for k in dict.fromkeys(keys) if k not in found]
+            if missing and self._db is not None:
+                for i in range(0, len(missing), 500):
+                    chunk = missing[i:i + 500]
+                    rows = self._db.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                    ).fetchall()
+                    for k, blob in rows:
+                        vec = array.array("f", blob).tolist()
+                        self._remember(k, vec)
+                        found[k] = vec
+                        self.disk_hits += 1
+            self.misses += len([k for k in missing if k not in found])
+        return found
+
+    def put_many(self, items: Dict[str, Vector]) -> None:
+        with self._lock:
+            for k, vec in items.items():
+                self._remember(k, vec)
+            if self._db is not None and items:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(k, array.array("f", vec).tobytes()) for k, vec in items.items()],
+                )
+                self._db.commit()
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._lru), "hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses}
+
+
+# ── Batched service ───────────────────────────────────────────
+class EmbeddingService:
+    """Cached, micro-batched embedding shared by every vector store in the app."""
+
+    MAX_BATCH = 32
+    MAX_WAIT = 0.005  # seconds to wait for more requests before running a batch
+
+    def __init__(self, backend: Optional[EmbeddingBackend] = None,
+                 cache: Optional[EmbeddingCache] = None, workers: int = 2) -> None:
+        self._backend = backend
+        self._cache = cache
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="Embed")
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.batches = 0
+        self.embedded = 0
+
+    @property
+    def backend(self) -> EmbeddingBackend:
+        if self._backend is None:
+            self._backend = create_backend()  # model load is deferred to first use
+        return self._backend
+
+    @property
+    def cache(self) -> EmbeddingCache:
+        if self._cache is None:
+            self._cache = EmbeddingCache()
+        return self._cache
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, name="EmbedBatcher", daemon=True)
+                    self._thread.start()
+
+    def _loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.MAX_WAIT
+            while len(batch) < self.MAX_BATCH:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._pool.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch: List[Tuple[str, Future]]) -> None:
+        texts = list(dict.fromkeys(text for text, _ in batch))  # identical texts embed once
+        try:
+            vectors = dict(zip(texts, self.backend.embed(texts)))
+        except Exception as e:
+            for _, fut in batch:
+                fut.set_exception(e)
+            return
+        self.batches += 1
+        self.embedded += len(texts)
+        try:
+            self.cache.put_many({self.cache.key(self.backend.name, t): v for t, v in vectors.items()})
+        except Exception as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+        for text, fut in batch:
+            fut.set_result(vectors[text])
+
+    def submit(self, text: str) -> "Future[Vector]":
+        """Queue one uncached text for the next batch."""
+        self._ensure_started()
+        fut: "Future[Vector]" = Future()
+        self._queue.put((text, fut))
+        return fut
+
+    def _lookup(self, texts: Sequence[str]) -> Tuple[List[str], Dict[str, Vector], Dict[str, Future]]:
+        """Cache keys, cached vectors, and batch futures for the misses (one per distinct text)."""
+        keys = [self.cache.key(self.backend.name, t) for t in texts]
+        cached = self.cache.get_many(keys)
+        pending: Dict[str, Future] = {}
+        for text, key in zip(texts, keys):
+            if key not in cached and text not in pending:
+                pending[text] = self.submit(text)
+        return keys, cached, pending
+
+    def embed_many(self, texts: Sequence[str]) -> List[Vector]:
+        """Vectors for `texts`, from cache where possible; misses join the shared batch queue."""
+        keys, cached, pending = self._lookup(texts)
+        return [cached[k] if k in cached else pending[t].result() for t, k in zip(texts, keys)]
+
+    def embed(self, text: str) -> Vector:
+        return self.embed_many([text])[0]
+
+    async def aembed_many(self, texts: Sequence[str]) -> List[Vector]:
+        keys, cached, pending = self._lookup(texts)
+        resolved = {t: await asyncio.wrap_future(f) for t, f in pending.items()}
+        return [cached[k] if k in cached else resolved[t] for t, k in zip(texts, keys)]
+
+    async def aembed(self, text: str) -> Vector:
+        return (await self.aembed_many([text]))[0]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.backend.name, "batches": self.batches, "embedded": self.embedded,
+                "cache": self.cache.stats()}
+
+
+class ChromaEmbeddingFunction:
+    """Chroma `embedding_function` adapter over an EmbeddingService."""
+
+    def __init__(self, service: "EmbeddingService") -> None:
+        self.service = service
+
+    def __call__(self, input: List[str]) -> List[Vector]:  # Chroma requires the name `input`
+        return self.service.embed_many(input)
+
+
+# Global instance
+embedding_service = EmbeddingService()
+
 
 class EmbeddingManager:
-    def __init__(self, persist_directory: str = "./data/chroma") -> None:
+    def __init__(self, persist_directory: str = "./data/chroma",
+                 service: Optional[EmbeddingService] = None) -> None:
         self.persist_dir = persist_directory
+        self.service = service or embedding_service
         # Typed as Any so Pyright doesn't infer NoneType for every attribute access
         self.collection: Optional[Any] = None
 
@@ -32,6 +314,7 @@ class EmbeddingManager:
                 self.collection = self.client.get_or_create_collection(
                     name="eonix_memory",
                     metadata={"hnsw:space": "cosine"},
+                    embedding_function=ChromaEmbeddingFunction(self.service),
                 )
                 logger.info(f"ChromaDB initialized at {self.persist_dir}")
             except Exception as e:
@@ -40,23 +323,29 @@ class EmbeddingManager:
 
     async def store(self, text: str, metadata: Optional[Dict[str, Any]] = None) -> str:
         """Store a text with its embedding in the vector DB."""
-        if self.collection is None:
-            return ""
+        ids = await self.store_many([text], [metadata or {}])
+        return ids[0] if ids else ""
+
+    async def store_many(self, texts: List[str], metadatas: Optional[List[Dict[str, Any]]] = None) -> List[str]:
+        """Embed a batch in one pass and add it with a single collection call."""
+        if self.collection is None or not texts:
+            return []
 
-        doc_id = str(uuid.uuid4())
+        doc_ids = [str(uuid.uuid4()) for _ in texts]
+        now = datetime.utcnow().isoformat()
         try:
-            self.collection.add(
-                documents=[text],
-                metadatas=[{
-                    **(metadata or {}),
-                    "timestamp": datetime.utcnow().isoformat(),
-                }],
-                ids=[doc_id],
+            embeddings = await self.service.aembed_many(texts)
+            await asyncio.to_thread(
+                self.collection.add,
+                documents=texts,
+                embeddings=embeddings,
+                metadatas=[{**(m or {}), "timestamp": now} for m in (metadatas or [{}] * len(texts))],
+                ids=doc_ids,
             )
-            return doc_id
+            return doc_ids
         except Exception as e:
             logger.error(f"Failed to store embedding: {e}")
-            return ""
+            return []
 
     async def search(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
         """Search for similar documents."""
@@ -64,8 +353,10 @@ class EmbeddingManager:
             return []
 
         try:
-            results: Dict[str, Any] = self.collection.query(
-                query_texts=[query],
+            embedding = await self.service.aembed(query)
+            results: Dict[str, Any] = await asyncio.to_thread(
+                self.collection.query,
+                query_embeddings=[embedding],
                 n_results=n_results,
             )
             items: List[Dict[str, Any]] = []
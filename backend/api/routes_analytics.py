@@ -4,33 +4,78 @@ EONIX Analytics API — App usage stats and productivity metrics.
 from fastapi import APIRouter
 from sqlalchemy import func, desc
 from datetime import datetime, timedelta
-from memory.db import SessionLocal, AppUsage
+from types import SimpleNamespace
+from typing import Optional
+from memory.db import AppUsage, get_read_db, in_db_pool
+from memory.archive import archive_store
 from tools.usage_tracker import classify_app
 
 router = APIRouter()
 
 
 def _db():
-    return SessionLocal()
+    return get_read_db()
+
+
+def _with_archived(rows, start_date: str, end_date: Optional[str] = None, by_date: bool = False) -> list:
+    """Union hot SQLite aggregates with archived months when the range reaches into them."""
+    if not archive_store.covers("app_usage", datetime.strptime(start_date, "%Y-%m-%d")):
+        return list(rows)
+    cold = archive_store.app_usage_totals(start_date, end_date, by_date=by_date)
+    merged = {}
+    for r in list(rows) + [SimpleNamespace(**c) for c in cold]:
+        key = (r.date, r.app_name) if by_date else r.app_name
+        acc = merged.setdefault(key, SimpleNamespace(app_name=r.app_name, date=getattr(r, "date", None),
+                                                     total_secs=0.0, sessions=0))
+        acc.total_secs += r.total_secs or 0
+        acc.sessions += getattr(r, "sessions", 0) or 0
+    return sorted(merged.values(), key=lambda r: r.total_secs, reverse=True)
+
+
+def _app_totals(start_date: str, end_date: Optional[str] = None) -> list:
+    """Seconds and session count per app for a date range (hot + archived). Blocking."""
+    db = _db()
+    try:
+        query = (
+            db.query(
+                AppUsage.app_name,
+                func.sum(AppUsage.duration_seconds).label("total_secs"),
+                func.count(AppUsage.id).label("sessions"),
+            )
+            .filter(AppUsage.date >= start_date)
+        )
+        if end_date:
+            query = query.filter(AppUsage.date <= end_date)
+        rows = query.group_by(AppUsage.app_name).order_by(desc("total_secs")).all()
+    finally:
+        db.close()
+    return _with_archived(rows, start_date, end_date)
+
+
+def _daily_app_totals(start_date: str) -> list:
+    """Seconds per (date, app) since start_date (hot + archived). Blocking."""
+    db = _db()
+    try:
+        rows = (
+            db.query(
+                AppUsage.date,
+                AppUsage.app_name,
+                func.sum(AppUsage.duration_seconds).label("total_secs"),
+            )
+            .filter(AppUsage.date >= start_date)
+            .group_by(AppUsage.date, AppUsage.app_name)
+            .all()
+        )
+    finally:
+        db.close()
+    return _with_archived(rows, start_date, by_date=True)
 
 
 @router.get("/analytics/today")
 async def analytics_today():
     """Today's per-app breakdown with total minutes."""
-    db = _db()
     today = datetime.now().strftime("%Y-%m-%d")
-    rows = (
-        db.query(
-            AppUsage.app_name,
-            func.sum(AppUsage.duration_seconds).label("total_secs"),
-            func.count(AppUsage.id).label("sessions"),
-        )
-        .filter(AppUsage.date == today)
-        .group_by(AppUsage.app_name)
-        .order_by(desc("total_secs"))
-        .all()
-    )
-    db.close()
+    rows = await in_db_pool(_app_totals, today, today)
 
     apps = []
     for r in rows:
@@ -49,19 +94,8 @@ async def analytics_today():
 @router.get("/analytics/weekly")
 async def analytics_weekly():
     """Last 7 days summary with daily totals and productive/distraction split."""
-    db = _db()
     week_ago = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
-    rows = (
-        db.query(
-            AppUsage.date,
-            AppUsage.app_name,
-            func.sum(AppUsage.duration_seconds).label("total_secs"),
-        )
-        .filter(AppUsage.date >= week_ago)
-        .group_by(AppUsage.date, AppUsage.app_name)
-        .all()
-    )
-    db.close()
+    rows = await in_db_pool(_daily_app_totals, week_ago)
 
     days = {}
     for r in rows:
@@ -89,18 +123,8 @@ async def analytics_weekly():
 @router.get("/analytics/focus")
 async def analytics_focus():
     """Productive vs distraction time + score for today."""
-    db = _db()
     today = datetime.now().strftime("%Y-%m-%d")
-    rows = (
-        db.query(
-            AppUsage.app_name,
-            func.sum(AppUsage.duration_seconds).label("total_secs"),
-        )
-        .filter(AppUsage.date == today)
-        .group_by(AppUsage.app_name)
-        .all()
-    )
-    db.close()
+    rows = await in_db_pool(_app_totals, today, today)
 
     productive = 0.0
     distraction = 0.0
@@ -130,21 +154,8 @@ async def analytics_focus():
 @router.get("/analytics/top")
 async def analytics_top():
     """Top 10 most used apps this month."""
-    db = _db()
     month_start = datetime.now().replace(day=1).strftime("%Y-%m-%d")
-    rows = (
-        db.query(
-            AppUsage.app_name,
-            func.sum(AppUsage.duration_seconds).label("total_secs"),
-            func.count(AppUsage.id).label("sessions"),
-        )
-        .filter(AppUsage.date >= month_start)
-        .group_by(AppUsage.app_name)
-        .order_by(desc("total_secs"))
-        .limit(10)
-        .all()
-    )
-    db.close()
+    rows = (await in_db_pool(_app_totals, month_start))[:10]
 
     apps = []
     for r in rows:
@@ -0,0 +1,121 @@
+"""
+EONIX Files API — Streamed reads of large files and duplicate scans (SSE),
+and disk usage drill-down.
+
+These routes hand out local file contents, so they only answer the app
+itself: requests a browser marks as coming from another site are refused,
+and files are only streamed from the index roots or FILES_API_ROOTS.
+"""
+import os
+import json
+from typing import List, Optional
+from urllib.parse import urlparse
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from config import FILE_INDEX_ROOTS, FILES_API_ROOTS
+from tools import file_reader
+from tools.duplicate_finder import find_duplicates
+from tools.disk_usage import disk_usage_index
+from tools.file_index import file_index
+
+LOCAL_HOSTS = ("localhost", "127.0.0.1", "::1")
+
+
+def same_origin(request: Request) -> None:
+    """Refuse cross-site browser requests; the renderer is served locally or from file://."""
+    if request.headers.get("sec-fetch-site") == "cross-site":
+        raise HTTPException(status_code=403, detail="Cross-site requests are not allowed")
+    origin = request.headers.get("origin")
+    if origin and origin != "null" and not origin.startswith("file://") \
+            and urlparse(origin).hostname not in LOCAL_HOSTS:
+        raise HTTPException(status_code=403, detail="Cross-origin requests are not allowed")
+
+
+router = APIRouter(dependencies=[Depends(same_origin)])
+
+
+def _allowed_roots() -> List[str]:
+    return [os.path.normcase(os.path.realpath(os.path.expanduser(r)))
+            for r in [*FILE_INDEX_ROOTS, *FILES_API_ROOTS, *file_index.roots()]]
+
+
+def _readable(path: str) -> bool:
+    """True when `path` (symlinks resolved) lies inside one of the allowed roots."""
+    real = os.path.normcase(os.path.realpath(path))
+    return any(real == root or real.startswith(root.rstrip(os.sep) + os.sep) for root in _allowed_roots())
+
+
+@router.get("/files/stream")
+def stream_file(path: str, offset: int = 0, length: Optional[int] = None, tail: Optional[int] = None,
+                chunk: int = file_reader.STREAM_CHUNK):
+    """
+    Stream a byte range of a file as SSE `chunk` events, between a `start`
+    and a `done` event. `tail=N` starts N lines before the end; a negative
+    offset counts from the end. `chunk` is capped at 1 MB.
+    """
+    path = os.path.abspath(os.path.expandvars(os.path.expanduser(path)))
+    if not _readable(path):
+        raise HTTPException(status_code=403, detail=f"Not inside an allowed folder: {path}")
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail=f"File not found: {path}")
+    size = os.path.getsize(path)
+    if tail is not None:
+        offset = file_reader.tail_offset(path, tail)
+    start = max(0, size + offset if offset < 0 else min(offset, size))
+    end = size if length is None else min(size, start + max(0, length))
+
+    def events():
+        yield f"data: {json.dumps({'type': 'start', 'path': path, 'size': size, 'offset': start})}\n\n"
+        try:
+            for pos, text in file_reader.iter_range(path, start, end - start,
+                                                    min(max(1024, chunk), file_reader.MAX_STREAM_CHUNK)):
+                yield f"data: {json.dumps({'type': 'chunk', 'offset': pos, 'text': text})}\n\n"
+        except Exception as e:
+            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+            return
+        yield f"data: {json.dumps({'type': 'done', 'end': end})}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@router.get("/files/duplicates")
+def stream_duplicates(path: str, min_size: int = 1):
+    """
+    Stream duplicate files below a folder as SSE `group` events, each sent
+    as soon as its contents are confirmed equal, then `done` with the totals.
+    """
+    path = os.path.abspath(os.path.expandvars(os.path.expanduser(path)))
+    if not os.path.isdir(path):
+        raise HTTPException(status_code=404, detail=f"Folder not found: {path}")
+    scan = find_duplicates(path, min_size)
+
+    def events():
+        try:
+            for group in scan:
+                yield f"data: {json.dumps({'type': 'group', **group})}\n\n"
+        except Exception as e:
+            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+            return
+        yield f"data: {json.dumps({'type': 'done', **scan.stats})}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@router.get("/files/usage")
+def disk_usage(path: str = "~", top: int = 20, refresh: bool = False, rescan: bool = True):
+    """
+    Size of a folder with its subdirectories (largest first) and largest
+    files. Rescans incrementally unless `rescan=false`, which answers from
+    the last scan (drilling into a scanned tree).
+    """
+    path = os.path.abspath(os.path.expandvars(os.path.expanduser(path)))
+    if not os.path.isdir(path):
+        raise HTTPException(status_code=404, detail=f"Folder not found: {path}")
+    stats = None
+    if rescan or not disk_usage_index.covers(path):
+        stats = disk_usage_index.scan(path, refresh=refresh)
+    view = disk_usage_index.drill(path, max(1, top))
+    return {**view, "top_files": disk_usage_index.top_files(path, max(1, top)), "stats": stats}
@@ -1,12 +1,20 @@
 """
 EONIX Memory API — Search and manage Episodic and Semantic memory.
 """
-from fastapi import APIRouter, HTTPException, Query
+import os
+import zlib
+import asyncio
+import tempfile
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 
 from memory.episodic import episodic_memory
-from memory.semantic import semantic_memory
+from memory.semantic import semantic_memory, consolidation_job, build_where, NAMESPACES
+from memory.archive import archive_store, archive_job
+from memory.db import get_read_db
+from memory.backup import SECTIONS, export_records, import_records, iter_chunks, open_backup
 
 router = APIRouter()
 
@@ -21,32 +29,48 @@ class UserFactRequest(BaseModel):
 @router.get("/search")
 async def search_memory(q: str = Query(..., min_length=1), limit: int = 5):
     """Search episodic memory (conversations)."""
-    episodic = episodic_memory.search(q, limit=limit)
+    episodic = await episodic_memory.asearch(q, limit=limit)
     return {"episodic": episodic}
 
 @router.get("/recent")
 async def get_recent_episodic(limit: int = 10):
     """Get recent conversation history."""
-    return episodic_memory.get_recent(limit=limit)
+    return await episodic_memory.aget_recent(limit=limit)
 
 @router.get("/semantic/search")
-async def search_semantic(q: str = Query(..., min_length=1), limit: int = 5):
-    """Search semantic memory (facts)."""
-    semantic = semantic_memory.retrieve_relevant(q, n_results=limit)
-    return {"semantic": semantic}
+async def search_semantic(q: str = Query(..., min_length=1), limit: int = 5,
+                          namespace: List[str] = Query(["facts"]),
+                          type: Optional[str] = None, key: Optional[str] = None,
+                          source: Optional[str] = None,
+                          since: Optional[float] = None, until: Optional[float] = None):
+    """Search semantic memory. Filters are applied inside the vector query; times are epoch seconds."""
+    unknown = [ns for ns in namespace if ns not in NAMESPACES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown namespace(s): {', '.join(unknown)}")
+    where = build_where(type=type, key=key, source=source, since=since, until=until)
+    found = await semantic_memory.aretrieve_many(q, {ns: limit for ns in namespace}, where)
+    if namespace == ["facts"]:
+        return {"semantic": found["facts"]}
+    return {"semantic": [hit for ns in namespace for hit in found[ns]], "by_namespace": found}
 
 @router.post("/fact")
 async def add_fact(fact: FactRequest):
     """Manually add a fact to semantic memory."""
-    fid = semantic_memory.store_fact(fact.text, fact.metadata)
+    fid = await asyncio.to_thread(semantic_memory.store_fact, fact.text, fact.metadata)
     if not fid:
         raise HTTPException(status_code=500, detail="Failed to store fact")
     return {"status": "ok", "id": fid}
 
+@router.post("/semantic/consolidate")
+async def consolidate_semantic():
+    """Merge near-duplicate facts now instead of waiting for the background job."""
+    result = await asyncio.to_thread(consolidation_job.run_once)
+    return {"status": "ok", **result}
+
 @router.post("/user_fact")
 async def add_user_fact(fact: UserFactRequest):
     """Add a specific user key-value fact."""
-    fid = semantic_memory.store_user_fact(fact.key, fact.value)
+    fid = await asyncio.to_thread(semantic_memory.store_user_fact, fact.key, fact.value)
     if not fid:
         raise HTTPException(status_code=500, detail="Failed to store user fact")
     return {"status": "ok", "id": fid}
@@ -55,7 +79,7 @@ async def add_user_fact(fact: UserFactRequest):
 async def delete_memory(mem_id: str, type: str = "semantic"):
     """Delete a memory item."""
     if type == "semantic":
-        semantic_memory.delete_fact(mem_id)
+        await asyncio.to_thread(semantic_memory.delete_fact, mem_id)
         return {"status": "deleted"}
     else:
         # Episodic deletion not yet implemented in class, but API placeholder here
@@ -65,6 +89,69 @@ async def delete_memory(mem_id: str, type: str = "semantic"):
 async def get_all_memories(limit: int = 50):
     """Get all memories (debug)."""
     return {
-        "recent_episodic": episodic_memory.get_recent(limit),
-        "semantic_facts": semantic_memory.get_all(limit)
+        "recent_episodic": await episodic_memory.aget_recent(limit),
+        "semantic_facts": await asyncio.to_thread(semantic_memory.get_all, limit)
     }
+
+@router.get("/archive")
+async def archive_status():
+    """Cold-tier segment counts and sizes per table."""
+    return archive_store.stats()
+
+@router.post("/archive/run")
+async def run_archive():
+    """Tier old rows into the archive now instead of waiting for the background job."""
+    moved = await asyncio.to_thread(archive_job.run_once)
+    return {"status": "ok", "moved": moved}
+
+@router.get("/backup/export")
+def export_backup(sections: List[str] = Query(list(SECTIONS)), gzip: bool = False):
+    """Stream a full memory backup as NDJSON (gzip-compressed with ?gzip=true)."""
+    unknown = [s for s in sections if s not in SECTIONS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown section(s): {', '.join(unknown)}")
+
+    def body():
+        db = get_read_db()
+        try:
+            blocks = iter_chunks(export_records(db, sections))
+            if not gzip:
+                yield from blocks
+                return
+            z = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+            for block in blocks:
+                out = z.compress(block)
+                if out:
+                    yield out
+            yield z.flush()
+        finally:
+            db.close()
+
+    name = "eonix-memory.ndjson" + (".gz" if gzip else "")
+    return StreamingResponse(body(), media_type="application/x-ndjson",
+                             headers={"Content-Disposition": f'attachment; filename="{name}"'})
+
+@router.post("/backup/import")
+async def import_backup(request: Request):
+    """Load a backup sent as the raw request body (NDJSON, plain or gzip).
+
+    The upload is spooled to a temp file as it arrives, then imported in
+    chunks off the event loop, so neither step holds the backup in memory.
+    """
+    # delete=False: Windows can't reopen a NamedTemporaryFile while it is open
+    tmp = tempfile.NamedTemporaryFile(prefix="eonix_import_", suffix=".ndjson", delete=False)
+    try:
+        with tmp:
+            async for chunk in request.stream():
+                await asyncio.to_thread(tmp.write, chunk)
+
+        def _run():
+            with open_backup(tmp.name) as f:
+                return import_records(f)
+        try:
+            counts = await asyncio.to_thread(_run)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        os.remove(tmp.name)
+    return {"status": "ok", "imported": counts}
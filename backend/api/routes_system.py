@@ -6,6 +6,7 @@ from agent.orchestrator import orchestrator
 from brains.ollama_brain import OllamaBrain
 from brains.gemini_brain import GeminiBrain
 from tools.system_info import SystemInfo
+from tools.browser_service import pending_actions
 
 router = APIRouter()
 _ollama = OllamaBrain()
@@ -39,6 +40,12 @@ async def system_status():
     }
 
 
+@router.get("/system/browser")
+async def browser_pending():
+    """Browser actions queued or running, per browser service."""
+    return {"pending": pending_actions()}
+
+
 @router.get("/system/brain")
 async def get_brain():
     """Get current default brain."""
@@ -1,74 +1,103 @@
 """
 EONIX Tasks API — Task history and memory endpoints.
 """
-from fastapi import APIRouter, HTTPException
+import json
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
-from memory.db import get_db
-from memory.task_store import get_recent_tasks, get_task_by_id, delete_task, get_task_stats
-from memory.preference_store import get_preference, set_preference, get_all_preferences
+from memory.task_store import (aquery_tasks, aget_task_fields, adelete_task, aget_task_stats,
+                               parse_fields, decode_cursor, TASK_FIELDS)
+from memory.preference_store import aset_preference, aget_all_preferences
 
 router = APIRouter()
 
+EXPORT_PAGE = 500  # rows fetched per read while streaming an export
 
-@router.get("/tasks")
-async def list_tasks(limit: int = 20):
-    """Get recent task history."""
-    db = get_db()
-    tasks = get_recent_tasks(db, limit=limit)
-    db.close()
-    return [
-        {
-            "id": t.id,
-            "user_input": t.user_input,
-            "brain_used": t.brain_used,
-            "intent": t.intent,
-            "result": t.result,
-            "success": t.success,
-            "duration_ms": t.duration_ms,
-            "created_at": t.created_at.isoformat() if t.created_at else None
+
+def _task_query(cursor: Optional[str], fields: Optional[str], brain: Optional[str],
+                success: Optional[bool], intent: Optional[str],
+                since: Optional[str], until: Optional[str]) -> dict:
+    """Validate list/export query params into aquery_tasks kwargs (400 on bad input)."""
+    try:
+        if cursor:
+            decode_cursor(cursor)
+        return {
+            "cursor": cursor,
+            "fields": parse_fields(fields),
+            "brain": brain,
+            "success": success,
+            "intent": intent,
+            "since": datetime.fromisoformat(since) if since else None,
+            "until": datetime.fromisoformat(until) if until else None,
         }
-        for t in tasks
-    ]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/tasks")
+async def list_tasks(response: Response, limit: int = Query(20, ge=1, le=1000),
+                     cursor: Optional[str] = None, fields: Optional[str] = None,
+                     brain: Optional[str] = None, success: Optional[bool] = None,
+                     intent: Optional[str] = None, since: Optional[str] = None,
+                     until: Optional[str] = None):
+    """Get task history, newest first.
+
+    Pass the `X-Next-Cursor` response header back as `cursor` for the next
+    page. `fields` is a comma-separated projection (plan/actions are only
+    loaded when listed).
+    """
+    params = _task_query(cursor, fields, brain, success, intent, since, until)
+    tasks, next_cursor = await aquery_tasks(limit=limit, **params)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return tasks
+
+
+@router.get("/tasks/export")
+async def export_tasks(fields: Optional[str] = None, brain: Optional[str] = None,
+                       success: Optional[bool] = None, intent: Optional[str] = None,
+                       since: Optional[str] = None, until: Optional[str] = None):
+    """Stream every matching task as NDJSON, one page per read."""
+    params = _task_query(None, fields, brain, success, intent, since, until)
+
+    async def lines():
+        cursor = None
+        while True:
+            tasks, cursor = await aquery_tasks(limit=EXPORT_PAGE, **{**params, "cursor": cursor})
+            for task in tasks:
+                yield json.dumps(task, default=str) + "\n"
+            if not cursor:
+                break
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson",
+                             headers={"Content-Disposition": "attachment; filename=tasks.ndjson"})
 
 
 @router.get("/tasks/stats")
 async def task_stats():
     """Get task statistics."""
-    db = get_db()
-    stats = get_task_stats(db)
-    db.close()
-    return stats
+    return await aget_task_stats()
 
 
 @router.get("/tasks/{task_id}")
-async def get_task(task_id: int):
-    """Get a specific task by ID."""
-    db = get_db()
-    task = get_task_by_id(db, task_id)
-    db.close()
+async def get_task(task_id: int, fields: Optional[str] = None):
+    """Get a specific task by ID (all fields unless `fields` is given)."""
+    try:
+        names = parse_fields(fields) if fields else TASK_FIELDS
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    task = await aget_task_fields(task_id, names)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    return {
-        "id": task.id,
-        "user_input": task.user_input,
-        "brain_used": task.brain_used,
-        "intent": task.intent,
-        "plan": task.plan,
-        "actions": task.actions,
-        "result": task.result,
-        "success": task.success,
-        "duration_ms": task.duration_ms,
-        "created_at": task.created_at.isoformat() if task.created_at else None
-    }
+    return task
 
 
 @router.delete("/tasks/{task_id}")
 async def remove_task(task_id: int):
     """Delete a task."""
-    db = get_db()
-    success = delete_task(db, task_id)
-    db.close()
+    success = await adelete_task(task_id)
     if not success:
         raise HTTPException(status_code=404, detail="Task not found")
     return {"message": f"Task {task_id} deleted"}
@@ -82,16 +111,11 @@ class PreferenceRequest(BaseModel):
 @router.get("/memory/preferences")
 async def list_preferences():
     """Get all user preferences."""
-    db = get_db()
-    prefs = get_all_preferences(db)
-    db.close()
-    return prefs
+    return await aget_all_preferences()
 
 
 @router.post("/memory/preferences")
 async def save_preference(req: PreferenceRequest):
     """Set a user preference."""
-    db = get_db()
-    pref = set_preference(db, req.key, req.value, source="user")
-    db.close()
+    pref = await aset_preference(req.key, req.value, source="user")
     return {"key": pref.key, "value": pref.value}
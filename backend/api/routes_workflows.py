@@ -4,7 +4,7 @@ Workflow Routes - API endpoints for managing and running workflows.
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from typing import Dict, Any, List, Optional
-from memory.db import get_db, Workflow
+from memory.db import Workflow, db_writer, run_read, in_db_pool
 from agent.workflow_engine import workflow_engine
 import json
 
@@ -29,18 +29,12 @@ class WorkflowUpdate(BaseModel):
 @router.get("/workflows")
 async def list_workflows():
     """List all workflows."""
-    db = get_db()
-    try:
-        workflows = db.query(Workflow).all()
-        return workflows
-    finally:
-        db.close()
+    return await run_read(lambda db: db.query(Workflow).all())
 
 @router.post("/workflows")
 async def create_workflow(workflow: WorkflowCreate):
     """Create a new workflow."""
-    db = get_db()
-    try:
+    def _create(db):
         new_wf = Workflow(
             name=workflow.name,
             trigger_type=workflow.trigger_type,
@@ -50,92 +44,84 @@ async def create_workflow(workflow: WorkflowCreate):
             active=workflow.active
         )
         db.add(new_wf)
-        db.commit()
-        db.refresh(new_wf)
-        
-        # Reload engine to pick up new triggers (if we had a scheduler integration)
-        workflow_engine.load_workflows()
-        
+        db.flush()
         return new_wf
+
+    try:
+        new_wf = await db_writer.awrite(_create)
     except Exception as e:
-        db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        db.close()
+
+    # Reload engine to pick up new triggers (if we had a scheduler integration)
+    await in_db_pool(workflow_engine.load_workflows)
+    return new_wf
 
 @router.get("/workflows/{workflow_id}")
 async def get_workflow(workflow_id: int):
     """Get a specific workflow."""
-    db = get_db()
-    try:
-        wf = db.query(Workflow).filter(Workflow.id == workflow_id).first()
-        if not wf:
-            raise HTTPException(status_code=404, detail="Workflow not found")
-        return wf
-    finally:
-        db.close()
+    wf = await run_read(lambda db: db.query(Workflow).filter(Workflow.id == workflow_id).first())
+    if not wf:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    return wf
 
 @router.delete("/workflows/{workflow_id}")
 async def delete_workflow(workflow_id: int):
     """Delete a workflow."""
-    db = get_db()
-    try:
+    def _delete(db):
         wf = db.query(Workflow).filter(Workflow.id == workflow_id).first()
         if not wf:
-            raise HTTPException(status_code=404, detail="Workflow not found")
-        
+            return False
         db.delete(wf)
-        db.commit()
-        workflow_engine.load_workflows()
-        return {"status": "success"}
+        return True
+
+    try:
+        found = await db_writer.awrite(_delete)
     except Exception as e:
-        db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        db.close()
+    if not found:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    await in_db_pool(workflow_engine.load_workflows)
+    return {"status": "success"}
 
 @router.put("/workflows/{workflow_id}")
 async def update_workflow(workflow_id: int, workflow: WorkflowUpdate):
     """Update a workflow."""
-    db = get_db()
-    try:
+    def _update(db):
         wf = db.query(Workflow).filter(Workflow.id == workflow_id).first()
         if not wf:
-            raise HTTPException(status_code=404, detail="Workflow not found")
-        
+            return None
+
         if workflow.name is not None: wf.name = workflow.name
         if workflow.trigger_type is not None: wf.trigger_type = workflow.trigger_type
         if workflow.schedule is not None: wf.schedule = workflow.schedule
         if workflow.event_name is not None: wf.event_name = workflow.event_name
         if workflow.workflow_json is not None: wf.workflow_json = workflow.workflow_json
         if workflow.active is not None: wf.active = workflow.active
-        
-        db.commit()
-        db.refresh(wf)
-        workflow_engine.load_workflows()
+        db.flush()
         return wf
+
+    try:
+        wf = await db_writer.awrite(_update)
     except Exception as e:
-        db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        db.close()
+    if not wf:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    await in_db_pool(workflow_engine.load_workflows)
+    return wf
 
 @router.post("/workflows/{workflow_id}/run")
 async def run_workflow(workflow_id: int):
     """Manually trigger a workflow."""
     # We run this as a background task essentially, but for now we await it 
     # to return immediate feedback in this simple version
-    try:
-        await workflow_engine.run_workflow(workflow_id)
-        
-        # update run count
-        db = get_db()
+    def _count_run(db):
         wf = db.query(Workflow).filter(Workflow.id == workflow_id).first()
         if wf:
             wf.run_count += 1
-            db.commit()
-        db.close()
-            
+
+    try:
+        await workflow_engine.run_workflow(workflow_id)
+        await db_writer.awrite(_count_run)
         return {"status": "executed"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,120 @@
+"""
+EONIX content index benchmark.
+
+Builds a synthetic corpus of small text files, then measures a full index
+build (files/sec, MB/sec), a no-change incremental update, an update after
+touching 1% of the files, and query latency. Uses throwaway directories.
+
+    python bench_content_index.py                        # 100k files
+    python bench_content_index.py --files 20000 --workers 8 --queries 500
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import CONTENT_INDEX_WORKERS
+from tools.content_index import ContentIndex
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--files", type=int, default=100000, help="synthetic files to index")
+parser.add_argument("--workers", type=int, default=CONTENT_INDEX_WORKERS, help="extractor processes")
+parser.add_argument("--queries", type=int, default=200, help="queries for the latency run")
+parser.add_argument("--keep", action="store_true", help="keep the corpus and index directories")
+args = parser.parse_args()
+
+WORDS = ["invoice", "meeting", "project", "deadline", "budget", "report", "python", "server", "customer",
+         "quarterly", "revenue", "travel", "receipt", "contract", "design", "review", "backup", "email",
+         "schedule", "release", "chennai", "weather", "music", "folder", "notes", "summary", "draft"]
+EXTENSIONS = [".txt", ".md", ".py", ".log", ".csv", ".json"]
+
+
+def vocabulary(size=20000):
+    """WORDS followed by made-up words; drawn with Zipf weights, like natural text."""
+    rng = random.Random(1)
+    made_up = {"".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 10)))
+               for _ in range(size)}
+    vocab = WORDS + sorted(made_up - set(WORDS))
+    return vocab, [1 / (rank + 1) for rank in range(len(vocab))]
+
+
+VOCAB, WEIGHTS = vocabulary()
+
+
+def make_corpus(root, n):
+    rng = random.Random(42)
+    total = 0
+    for i in range(n):
+        folder = os.path.join(root, f"d{i % 100:02d}", f"s{(i // 100) % 50:02d}")
+        os.makedirs(folder, exist_ok=True)
+        words = rng.choices(VOCAB, WEIGHTS, k=rng.randint(30, 600))
+        lines = [" ".join(words[j:j + 10]) for j in range(0, len(words), 10)]
+        text = "\n".join(lines) + "\n"
+        with open(os.path.join(folder, f"f{i}{rng.choice(EXTENSIONS)}"), "w", encoding="utf-8") as f:
+            f.write(text)
+        total += len(text)
+    return total
+
+
+def timed(fn, *a, **kw):
+    t0 = time.perf_counter()
+    result = fn(*a, **kw)
+    return result, time.perf_counter() - t0
+
+
+def pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main():
+    work = tempfile.mkdtemp(prefix="eonix_content_")
+    corpus = os.path.join(work, "corpus")
+    print(f"\nEONIX content index — {args.files} files, {args.workers} extractor processes")
+    nbytes, made = timed(make_corpus, corpus, args.files)
+    print(f"corpus: {nbytes / 1e6:.1f} MB written in {made:.1f}s")
+
+    index = ContentIndex(os.path.join(work, "content_index.db"), workers=args.workers)
+    full, full_s = timed(index.update, corpus)
+    idle, idle_s = timed(index.update, corpus)
+
+    rng = random.Random(7)
+    for path in rng.sample([os.path.join(d, f) for d, _, fs in os.walk(corpus) for f in fs], max(1, args.files // 100)):
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("appended quarterly update\n")
+    touched, touched_s = timed(index.update, corpus)
+
+    # Common words match a large share of all chunks; rare ones a handful
+    kinds = {
+        "common word": [rng.choice(WORDS[:10]) for _ in range(args.queries)],
+        "two common words": [" ".join(rng.sample(WORDS[:10], 2)) for _ in range(args.queries)],
+        "rare word": [rng.choice(VOCAB[len(VOCAB) // 2:]) for _ in range(args.queries)],
+        "rare + common word": [f"{rng.choice(VOCAB[1000:])} {rng.choice(WORDS)}" for _ in range(args.queries)],
+    }
+    latencies = {}
+    for kind, queries in kinds.items():
+        latencies[kind] = []
+        for q in queries:
+            _, s = timed(index.search, q, limit=10)
+            latencies[kind].append(s * 1000)
+
+    print(f"{'step':<28}{'files':>10}{'seconds':>10}{'files/sec':>12}")
+    print(f"{'full build':<28}{full['changed']:>10}{full_s:>10.2f}{full['changed'] / full_s:>12.0f}"
+          f"   ({nbytes / 1e6 / full_s:.1f} MB/s, {full['chunks']} chunks)")
+    print(f"{'update, nothing changed':<28}{idle['changed']:>10}{idle_s:>10.2f}")
+    print(f"{'update, 1% changed':<28}{touched['changed']:>10}{touched_s:>10.2f}")
+    print(f"\n{'query':<28}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for kind, ms in latencies.items():
+        print(f"{kind:<28}{pct(ms, 0.5):>10.1f}{pct(ms, 0.95):>10.1f}{max(ms):>10.1f}")
+    print(f"index: {index.stats()['files']} files, {os.path.getsize(index.path) / 1e6:.1f} MB")
+    if not args.keep:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+EONIX DB contention benchmark.
+
+Background "monitors" (UsageTracker / SecurityMonitor style inserts) write
+continuously while reader threads hammer /api/tasks and /api/analytics/*.
+Runs against a throwaway database seeded with synthetic history.
+
+    python bench_db_contention.py                 # writes via the single DB writer
+    python bench_db_contention.py --direct        # legacy: one session + commit per row
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--seconds", type=float, default=10)
+parser.add_argument("--writers", type=int, default=2, help="monitor threads inserting rows")
+parser.add_argument("--readers", type=int, default=4, help="threads hitting the API")
+parser.add_argument("--seed-tasks", type=int, default=20000)
+parser.add_argument("--seed-usage", type=int, default=50000)
+parser.add_argument("--direct", action="store_true", help="commit each write on its own session")
+args = parser.parse_args()
+
+# Point the app at a scratch database before anything imports memory.db
+_tmp = tempfile.mkdtemp(prefix="eonix_bench_")
+os.environ["EONIX_DB_PATH"] = os.path.join(_tmp, "bench.db")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from memory.db import init_db, engine, SessionLocal, db_writer, Task, AppUsage, SecurityLog
+from memory.task_store import rebuild_task_stats
+from api.routes_tasks import router as tasks_router
+from api.routes_analytics import router as analytics_router
+
+ENDPOINTS = ["/api/tasks", "/api/tasks/stats", "/api/analytics/today",
+             "/api/analytics/weekly", "/api/analytics/focus", "/api/analytics/top"]
+APPS = ["code", "chrome", "spotify", "notion", "discord", "terminal", "excel", "slack"]
+
+
+def seed():
+    init_db()
+    now = datetime.now()
+    tasks, usage = [], []
+    for i in range(args.seed_tasks):
+        tasks.append({
+            "created_at": now - timedelta(minutes=i), "user_input": f"task {i}",
+            "brain_used": random.choice(["local", "gemini", "claude"]), "intent": "bench",
+            "plan": [{"tool": "noop"}], "actions": [], "result": "ok",
+            "success": random.random() > 0.1, "duration_ms": random.randint(50, 5000),
+        })
+    for i in range(args.seed_usage):
+        start = now - timedelta(minutes=i * 3)
+        usage.append({
+            "app_name": random.choice(APPS), "window_title": "", "start_time": start,
+            "end_time": start + timedelta(minutes=2), "duration_seconds": 120.0,
+            "date": start.strftime("%Y-%m-%d"),
+        })
+    with engine.begin() as conn:
+        conn.execute(Task.__table__.insert(), tasks)
+        conn.execute(AppUsage.__table__.insert(), usage)
+    db = SessionLocal()
+    rebuild_task_stats(db)
+    db.close()
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def main():
+    seed()
+    app = FastAPI()
+    app.include_router(tasks_router, prefix="/api")
+    app.include_router(analytics_router, prefix="/api")
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    latencies = {ep: [] for ep in ENDPOINTS}
+    write_lat, errors = [], []
+
+    def writer(n):
+        while not stop.is_set():
+            now = datetime.now()
+            row = (AppUsage(app_name=random.choice(APPS), window_title="bench", start_time=now,
+                            end_time=now, duration_seconds=30.0, date=now.strftime("%Y-%m-%d"))
+                   if n % 2 == 0 else
+                   SecurityLog(severity="INFO", category="new_process", title="bench",
+                               message="", date=now.strftime("%Y-%m-%d")))
+            t0 = time.perf_counter()
+            try:
+                if args.direct:
+                    db = SessionLocal()
+                    db.add(row)
+                    db.commit()
+                    db.close()
+                else:
+                    db_writer.add(row).result()
+                with lock:
+                    write_lat.append(time.perf_counter() - t0)
+            except Exception as e:
+                with lock:
+                    errors.append(f"write: {e}")
+            time.sleep(0.001)
+
+    def reader():
+        client = TestClient(app)
+        while not stop.is_set():
+            ep = random.choice(ENDPOINTS)
+            t0 = time.perf_counter()
+            try:
+                r = client.get(ep)
+                ok = r.status_code == 200
+            except Exception as e:
+                ok, r = False, e
+            with lock:
+                if ok:
+                    latencies[ep].append(time.perf_counter() - t0)
+                else:
+                    errors.append(f"{ep}: {r}")
+
+    threads = [threading.Thread(target=writer, args=(i,), daemon=True) for i in range(args.writers)]
+    threads += [threading.Thread(target=reader, daemon=True) for _ in range(args.readers)]
+    for t in threads:
+        t.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for t in threads:
+        t.join(timeout=10)
+
+    mode = "direct commits" if args.direct else "single writer"
+    print(f"\nEONIX DB contention — {mode}, {args.writers} writers / {args.readers} readers, {args.seconds:.0f}s")
+    print(f"{'endpoint':<26}{'reqs':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for ep, lat in latencies.items():
+        print(f"{ep:<26}{len(lat):>8}{percentile(lat, 50) * 1000:>10.1f}"
+              f"{percentile(lat, 95) * 1000:>10.1f}{percentile(lat, 99) * 1000:>10.1f}")
+    print(f"{'writes':<26}{len(write_lat):>8}{percentile(write_lat, 50) * 1000:>10.1f}"
+          f"{percentile(write_lat, 95) * 1000:>10.1f}{percentile(write_lat, 99) * 1000:>10.1f}")
+    print(f"writes/sec: {len(write_lat) / args.seconds:.0f}   "
+          f"writer batches: {db_writer.batches} for {db_writer.jobs} jobs   errors: {len(errors)}")
+    for e in errors[:5]:
+        print("  ", e)
+
+
+if __name__ == "__main__":
+    main()
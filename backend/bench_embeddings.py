@@ -0,0 +1,92 @@
+"""
+EONIX embedding throughput benchmark.
+
+Measures raw backend throughput at batch size 1 vs 32, then the shared
+EmbeddingService under concurrent callers (micro-batching) and repeated
+queries (cache hits). Uses a throwaway cache file.
+
+    python bench_embeddings.py                      # backend from EMBEDDING_BACKEND
+    python bench_embeddings.py --backend hashing --n 2000 --concurrency 16
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import EMBEDDING_BACKEND
+from ai.embeddings import EmbeddingCache, EmbeddingService, create_backend
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--backend", default=EMBEDDING_BACKEND)
+parser.add_argument("--n", type=int, default=512, help="distinct texts to embed")
+parser.add_argument("--concurrency", type=int, default=8, help="caller threads for the service run")
+args = parser.parse_args()
+
+WORDS = ["user", "prefers", "dark", "mode", "meeting", "tomorrow", "python", "project", "email",
+         "gmail", "weather", "chennai", "music", "spotify", "folder", "downloads", "report", "deadline"]
+
+
+def corpus(n):
+    rng = random.Random(42)
+    return [f"{i} " + " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 20))) for i in range(n)]
+
+
+def rate(n, seconds):
+    return n / seconds if seconds else float("inf")
+
+
+def bench_backend(backend, texts):
+    backend.embed(texts[:8])  # warm-up: model load / ONNX session init
+    results = {}
+    for size in (1, 32):
+        t0 = time.perf_counter()
+        for i in range(0, len(texts), size):
+            backend.embed(texts[i:i + size])
+        results[size] = rate(len(texts), time.perf_counter() - t0)
+    return results
+
+
+def bench_service(service, texts):
+    chunks = [texts[i::args.concurrency] for i in range(args.concurrency)]
+
+    def worker(chunk):
+        for text in chunk:
+            service.embed(text)  # one text per call, like store_fact / search
+
+    threads = [threading.Thread(target=worker, args=(c,)) for c in chunks]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return rate(len(texts), time.perf_counter() - t0)
+
+
+def main():
+    texts = corpus(args.n)
+    backend = create_backend(args.backend)
+    raw = bench_backend(backend, texts)
+
+    cache_path = os.path.join(tempfile.mkdtemp(prefix="eonix_embed_"), "cache.db")
+    service = EmbeddingService(backend, EmbeddingCache(cache_path, size=args.n * 2))
+    cold = bench_service(service, texts)
+    batches = service.batches
+    warm = bench_service(service, texts)
+
+    print(f"\nEONIX embeddings — backend {backend.name}, {args.n} texts")
+    print(f"{'mode':<36}{'embeds/sec':>12}")
+    print(f"{'backend, batch 1':<36}{raw[1]:>12.0f}")
+    print(f"{'backend, batch 32':<36}{raw[32]:>12.0f}   ({raw[32] / raw[1]:.1f}x)")
+    print(f"{f'service, {args.concurrency} threads, cold':<36}{cold:>12.0f}   "
+          f"({batches} batches, avg {args.n / max(batches, 1):.1f} texts)")
+    print(f"{f'service, {args.concurrency} threads, cached':<36}{warm:>12.0f}")
+    print(f"cache: {service.cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+EONIX tool registry startup benchmark.
+
+Each mode runs in a fresh interpreter and reports wall time and RSS growth
+for importing `tools` and building a ToolRegistry:
+
+    lazy   — registry only; tool modules are imported on first use
+    eager  — registry plus every tool instance, i.e. the old constructor
+
+    python bench_tool_startup.py
+    python bench_tool_startup.py --runs 5
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per mode (median reported)")
+args = parser.parse_args()
+
+BACKEND = os.path.dirname(os.path.abspath(__file__))
+
+PROBE = r"""
+import os, sys, json, time
+import psutil
+sys.path.insert(0, {backend!r})
+proc = psutil.Process()
+rss0 = proc.memory_info().rss
+t0 = time.perf_counter()
+from tools import ToolRegistry, TOOL_FACTORIES
+registry = ToolRegistry()
+errors = {{}}
+if {eager}:
+    for name in TOOL_FACTORIES:
+        try:
+            registry._load(name)
+        except Exception as e:
+            errors[name] = type(e).__name__
+ms = (time.perf_counter() - t0) * 1000
+print(json.dumps({{"ms": ms, "rss_mb": (proc.memory_info().rss - rss0) / 2**20,
+                   "loaded": len(registry.loaded()), "errors": errors}}))
+"""
+
+
+def run(eager):
+    code = PROBE.format(backend=BACKEND, eager=eager)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=BACKEND)
+    for line in reversed(out.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    raise RuntimeError(out.stderr.strip() or "probe produced no result")
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def main():
+    results = {}
+    for mode, eager in (("lazy", False), ("eager", True)):
+        samples = [run(eager) for _ in range(args.runs)]
+        results[mode] = {"ms": median([s["ms"] for s in samples]),
+                         "rss_mb": median([s["rss_mb"] for s in samples]),
+                         "loaded": samples[-1]["loaded"], "errors": samples[-1]["errors"]}
+
+    print(f"\nEONIX tool registry startup — median of {args.runs} fresh interpreters")
+    print(f"{'mode':<8}{'import+init ms':>16}{'RSS +MB':>10}{'tools built':>13}")
+    for mode, r in results.items():
+        print(f"{mode:<8}{r['ms']:>16.0f}{r['rss_mb']:>10.1f}{r['loaded']:>13}")
+    lazy, eager = results["lazy"], results["eager"]
+    print(f"saved: {eager['ms'] - lazy['ms']:.0f} ms, {eager['rss_mb'] - lazy['rss_mb']:.1f} MB")
+    if eager["errors"]:
+        print("not loadable here (missing dependencies): " +
+              ", ".join(f"{k} ({v})" for k, v in eager["errors"].items()))
+
+
+if __name__ == "__main__":
+    main()
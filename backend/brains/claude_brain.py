@@ -3,6 +3,7 @@ EONIX Claude Brain — High-intelligence cloud inference via Anthropic Claude 3.
 Handles complex reasoning, coding, and creative tasks.
 """
 import os
+import asyncio
 import json
 import re
 from typing import Any, Dict, List, Optional
@@ -29,8 +30,12 @@ Available tools:
 - open_maps(location: str)
 - run_command(command: str)
 - create_file(path: str, content: str)
-- read_file(path: str)
+- read_file(path: str, tail: int, start_line: int, end_line: int, offset: int, length: int) [Only path is required; tail=N gives the last N lines of a big log, start_line/end_line a line range, offset/length a byte range]
 - list_directory(path: str)
+- search_files(pattern: str, path: str, mode: str) [Find files by name instantly: "*.pdf", "invoice", or a misspelt name with mode="fuzzy"; omit path to search Desktop, Documents and Downloads]
+- search_file_contents(query: str, path: str) [Find files by what is written inside them; returns the best matching passages with line numbers]
+- find_duplicates(path: str, action: str, min_size: int, auto_confirm: bool) [Find files with identical contents; action="report" (default) lists them, "move" sets the extra copies aside in a Duplicates folder (undo_last_organize reverts), "trash" deletes them to the trash; move and trash only return the plan unless auto_confirm=true (only after the user approved it)]
+- analyze_disk_usage(path: str, top: int) [What is using the disk space: folder total, its largest subfolders and files; call again with a subfolder path to drill down. Omit path for the home folder]
 - open_file(path: str)
 - create_folder(path: str)
 - get_system_info(info_type: str)
@@ -38,13 +43,16 @@ Available tools:
 - save_file()
 - open_application_then_type(app_name: str, text: str, press_enter: bool)
 - send_whatsapp_message(contact: str, message: str)
+- send_whatsapp_batch(messages: list) [Several WhatsApp messages in ONE step: [{"contact": "..", "message": ".."}, ...], or contacts: list + message: str for the same text]
 - open_whatsapp_web()
 - browser_action(action: str, ...) [For ANY complex web task]
+- read_webpages(urls: list, query: str) [Read several pages, or the top results for a query, concurrently into ONE digest — use one step instead of many]
 - read_screen(question: str) [Take screenshot and analyze with AI vision]
 - ocr_screen() [Extract all text visible on screen]
 - find_on_screen(element_description: str) [Find x,y coordinates of UI element]
 - click_element(description: str) [Visually find and click an element]
-- organize_folder(path: str, auto_confirm: bool) [AI file organizer - scans and moves files]
+- organize_folder(path: str, auto_confirm: bool, recursive: bool) [AI file organizer - sorts the loose files at the top of the folder by type and asks AI only about ambiguous documents. recursive=true (only when asked) also files each subfolder whole by its main content type; files inside subfolders are never split up]
+- undo_last_organize() [Move the files of the last organize_folder run back where they were]
 
 Respond ONLY with valid JSON in this exact format:
 {
@@ -130,7 +138,8 @@ class ClaudeBrain:
         try:
             # Convert messages to Anthropic format if needed
             # Assuming messages is list of dicts {role, content}
-            response = client.messages.create(
+            response = await asyncio.to_thread(
+                client.messages.create,
                 model=self.model,
                 max_tokens=1024,
                 messages=messages
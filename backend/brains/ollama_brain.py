@@ -26,8 +26,12 @@ Available tools:
 - open_maps(location: str)
 - run_command(command: str)
 - create_file(path: str, content: str)
-- read_file(path: str)
+- read_file(path: str, tail: int, start_line: int, end_line: int, offset: int, length: int) [Only path is required; tail=N gives the last N lines of a big log, start_line/end_line a line range, offset/length a byte range]
 - list_directory(path: str)
+- search_files(pattern: str, path: str, mode: str) [Find files by name instantly: "*.pdf", "invoice", or a misspelt name with mode="fuzzy"; omit path to search Desktop, Documents and Downloads]
+- search_file_contents(query: str, path: str) [Find files by what is written inside them; returns the best matching passages with line numbers]
+- find_duplicates(path: str, action: str, min_size: int, auto_confirm: bool) [Find files with identical contents; action="report" (default) lists them, "move" sets the extra copies aside in a Duplicates folder, "trash" deletes them to the trash; move and trash only return the plan unless auto_confirm=true (only after the user approved it)]
+- analyze_disk_usage(path: str, top: int) [What is using the disk space: folder total, its largest subfolders and files; call again with a subfolder path to drill down. Omit path for the home folder]
 - open_file(path: str)
 - create_folder(path: str)
 - get_system_info(info_type: str)  [cpu|memory|ram|disk|battery|processes|network|all]
@@ -35,6 +39,7 @@ Available tools:
 - save_file()
 - open_application_then_type(app_name: str, text: str, press_enter: bool)
 - send_whatsapp_message(contact: str, message: str)
+- send_whatsapp_batch(messages: list) [Several WhatsApp messages in ONE step: [{"contact": "..", "message": ".."}, ...], or contacts: list + message: str for the same text]
 - open_whatsapp_web()
 - browser_action(action: str, ...) [For ANY complex web task]
   - action="whatsapp_send", contact="..", message=".."
@@ -42,6 +47,7 @@ Available tools:
   - action="google_search", query=".."
   - action="youtube_search", query=".."
   - action="open_url", url=".."
+- read_webpages(urls: list, query: str) [Read several pages, or the top results for a query, concurrently into ONE digest — use one step instead of many]
 - remember_fact(fact: str) [Store important user info/preferences permanently]
 - read_screen(question: str) [Take screenshot and analyze with AI vision]
 - ocr_screen() [Extract all text visible on screen]
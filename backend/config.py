@@ -28,8 +28,80 @@ settings = Settings()
 
 # ── Database Settings ──────────────────────────────────────────
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_PATH = os.path.join(BASE_DIR, "memory", "eonix.db")
+DB_PATH = os.getenv("EONIX_DB_PATH", os.path.join(BASE_DIR, "memory", "eonix.db"))
+
+# Rows older than this many days are moved out of SQLite into
+# compressed monthly segments under ARCHIVE_DIR (see memory/archive.py)
+ARCHIVE_DIR = os.path.join(BASE_DIR, "data", "archive")
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+
+# ── Embedding Settings ─────────────────────────────────────────
+# Backend for all vector memory: "default" (Chroma's ONNX MiniLM, what existing
+# collections were built with), "sentence-transformers", or "hashing" (no model).
+# Changing it requires re-embedding existing collections.
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "default")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))
+EMBEDDING_CACHE_PATH = os.path.join(BASE_DIR, "data", "embedding_cache.db")
+
+# ── Web Reader Settings ────────────────────────────────────────
+WEB_CACHE_DIR = os.path.join(BASE_DIR, "data", "web_cache")
+WEB_MAX_BYTES = int(os.getenv("WEB_MAX_BYTES", str(2 * 1024 * 1024)))  # per page download budget
+WEB_MAX_CHARS = int(os.getenv("WEB_MAX_CHARS", "3000"))               # readable text returned per page
+WEB_PER_HOST = int(os.getenv("WEB_PER_HOST", "4"))                    # concurrent requests per host (read_webpages)
+WEB_DEADLINE = float(os.getenv("WEB_DEADLINE", "20"))                 # seconds for a whole read_webpages call
+
+# ── File Index Settings ────────────────────────────────────────
+# Folders crawled into the filename index (os.pathsep-separated); default is
+# the user's Desktop, Documents and Downloads
+_HOME = os.path.expanduser("~")
+FILE_INDEX_ROOTS = [p for p in os.getenv("FILE_INDEX_ROOTS", os.pathsep.join(
+    os.path.join(_HOME, d) for d in ("Desktop", "Documents", "Downloads"))).split(os.pathsep) if p]
+FILE_INDEX_ENABLED = os.getenv("FILE_INDEX_ENABLED", "True").lower() == "true"
+FILE_INDEX_PATH = os.getenv("FILE_INDEX_PATH", os.path.join(BASE_DIR, "data", "file_index.db"))
+FILE_INDEX_WORKERS = int(os.getenv("FILE_INDEX_WORKERS", "8"))     # parallel scandir threads
+FILE_INDEX_RESCAN = int(os.getenv("FILE_INDEX_RESCAN", "900"))     # seconds between recrawls without watchdog
+# Folders besides the index roots whose files /api/files/stream may serve (os.pathsep-separated)
+FILES_API_ROOTS = [p for p in os.getenv("FILES_API_ROOTS", "").split(os.pathsep) if p]
+
+# ── Content Index Settings ─────────────────────────────────────
+# Full-text index over the contents of text files under FILE_INDEX_ROOTS
+CONTENT_INDEX_ENABLED = os.getenv("CONTENT_INDEX_ENABLED", "True").lower() == "true"
+CONTENT_INDEX_PATH = os.getenv("CONTENT_INDEX_PATH", os.path.join(BASE_DIR, "data", "content_index.db"))
+CONTENT_INDEX_WORKERS = int(os.getenv("CONTENT_INDEX_WORKERS", str(max(1, min(4, (os.cpu_count() or 2) - 1)))))  # extractor processes
+CONTENT_INDEX_INTERVAL = int(os.getenv("CONTENT_INDEX_INTERVAL", "1800"))   # seconds between incremental updates
+CONTENT_INDEX_MAX_BYTES = int(os.getenv("CONTENT_INDEX_MAX_BYTES", "2000000"))  # larger files are indexed up to this
+
+# ── File Organizer Settings ────────────────────────────────────
+# Files the extension/MIME rules can't place are planned by the brain in
+# chunks of this many files, this many chunks at a time
+ORGANIZE_CHUNK = int(os.getenv("ORGANIZE_CHUNK", "40"))
+ORGANIZE_PARALLEL = int(os.getenv("ORGANIZE_PARALLEL", "4"))
+ORGANIZE_WORKERS = int(os.getenv("ORGANIZE_WORKERS", "8"))  # scan / preview threads
+ORGANIZE_COPY_WORKERS = int(os.getenv("ORGANIZE_COPY_WORKERS", "4"))  # parallel cross-device moves
+# Append-only record of organizer moves, replayed in reverse by undo_last_organize
+ORGANIZE_JOURNAL_PATH = os.getenv("ORGANIZE_JOURNAL_PATH", os.path.join(BASE_DIR, "data", "organize_journal.jsonl"))
+
+# ── Duplicate Finder Settings ──────────────────────────────────
+# Content hashes of scanned files, reused while a file's size and mtime are unchanged
+HASH_CACHE_PATH = os.getenv("HASH_CACHE_PATH", os.path.join(BASE_DIR, "data", "hash_cache.db"))
+DUPLICATE_WORKERS = int(os.getenv("DUPLICATE_WORKERS", str(max(1, min(4, (os.cpu_count() or 2) - 1)))))  # hashing processes
+
+# ── Disk Usage Settings ────────────────────────────────────────
+# Per-directory size totals, reused for directories whose mtime is unchanged
+DISK_USAGE_PATH = os.getenv("DISK_USAGE_PATH", os.path.join(BASE_DIR, "data", "disk_usage.db"))
+DISK_USAGE_WORKERS = int(os.getenv("DISK_USAGE_WORKERS", "8"))  # parallel scandir threads
+
+# ── Browser Settings ───────────────────────────────────────────
+# Warm tabs kept open in the persistent browser context (one per site key);
+# the least recently used one is closed beyond this
+BROWSER_MAX_TABS = int(os.getenv("BROWSER_MAX_TABS", "4"))
+BROWSER_ACTION_TIMEOUT = float(os.getenv("BROWSER_ACTION_TIMEOUT", "60"))  # seconds per browser action
 
 # ── System Settings ────────────────────────────────────────────
 # Set to True to require user confirmation for destructive actions
 REQUIRE_CONFIRMATION = os.getenv("REQUIRE_CONFIRMATION", "False").lower() == "true"
+
+# Tools are built lazily on first use; warm the common ones up in the background
+TOOL_WARMUP = os.getenv("TOOL_WARMUP", "True").lower() == "true"
+TOOL_WARMUP_DELAY = float(os.getenv("TOOL_WARMUP_DELAY", "2"))  # seconds after startup
@@ -27,20 +27,25 @@ except ImportError:
     sys.exit(1)
 
 # 3. Local module imports (guarded)
-init_db = chat_router = system_router = tasks_router = voice_router = memory_router = ws_router = ws_manager = push_alert = None
+init_db = migrate = chat_router = system_router = tasks_router = voice_router = memory_router = ws_router = ws_manager = push_alert = None
 OllamaBrain = GeminiBrain = ClaudeBrain = system_monitor = scheduler = plugin_loader = voice_system = global_orchestrator = None
 briefing_router = workflows_router = briefing = workflow_engine = clipboard_monitor = clipboard_router = None
 ClipboardMonitor = None
 analytics_router = usage_tracker_instance = None
 security_router = security_monitor_bg = None
+files_router = None
+archive_job = preference_cache = consolidation_job = file_index_job = content_index_job = None
 
 try:
     from memory.db import init_db
+    from memory.migrations import migrate
+    from memory.preference_store import preference_cache
     from api.routes_chat import router as chat_router
     from api.routes_system import router as system_router
     from api.routes_tasks import router as tasks_router
     from api.routes_voice import router as voice_router
     from api.routes_memory import router as memory_router
+    from api.routes_files import router as files_router
     from api.routes_ws import router as ws_router, manager as ws_manager, push_alert
     from brains.ollama_brain import OllamaBrain
     from brains.gemini_brain import GeminiBrain
@@ -58,6 +63,10 @@ try:
     from api.routes_clipboard import router as clipboard_router, set_monitor_instance
     from api.routes_analytics import router as analytics_router
     from tools.usage_tracker import usage_tracker as usage_tracker_instance
+    from memory.archive import archive_job
+    from memory.semantic import consolidation_job
+    from tools.file_index import file_index_job
+    from tools.content_index import content_index_job
     import asyncio
 except Exception as e:
     print(f"WARNING: Some local modules failed to load: {e}")
@@ -93,7 +102,10 @@ async def lifespan(app: FastAPI):
     
     try:
         init_db()
-        print("OK: Database initialized")
+        version = migrate() if migrate else 0
+        print(f"OK: Database initialized (schema v{version})")
+        if preference_cache:
+            print(f"OK: Preferences cached ({preference_cache.load()} keys)")
     except Exception as e:
         print(f"ERROR: Database Error: {e}")
 
@@ -121,7 +133,12 @@ async def lifespan(app: FastAPI):
     global orchestrator
     from agent.orchestrator import orchestrator as _orchestrator
     orchestrator = _orchestrator
-    
+
+    # Tools are built on first use; warm the common ones once startup is done
+    from config import TOOL_WARMUP, TOOL_WARMUP_DELAY
+    if TOOL_WARMUP and orchestrator and orchestrator.tools:
+        orchestrator.tools.start_warmup(delay=TOOL_WARMUP_DELAY)
+
     # Start Voice System
     async def broadcast_voice_status(status):
         if ws_manager:
@@ -133,6 +150,12 @@ async def lifespan(app: FastAPI):
         voice_system.start()
         print("OK: Voice System — READY (Listening)")
 
+    # Organizer move / undo progress → UI
+    if ws_manager:
+        from tools.file_mover import file_mover
+        main_loop = asyncio.get_running_loop()
+        file_mover.on_progress(lambda event: asyncio.run_coroutine_threadsafe(ws_manager.broadcast(event), main_loop))
+
     # Start proactive monitor
     if system_monitor:
         system_monitor.on_alert(push_alert)
@@ -148,6 +171,8 @@ async def lifespan(app: FastAPI):
             # Default to 8:00 AM tomorrow
             now = datetime.now()
             briefing_time_str = os.getenv("BRIEFING_TIME", "08:00")
+            if preference_cache:
+                briefing_time_str = preference_cache.get("briefing_time", briefing_time_str)
             h, m = map(int, briefing_time_str.split(":"))
             
             run_at = now.replace(hour=h, minute=m, second=0, microsecond=0)
@@ -194,6 +219,26 @@ async def lifespan(app: FastAPI):
         security_monitor_bg.start()
         print("OK: Security Monitor \u2014 ONLINE")
 
+    # Start archive tiering (moves old rows into compressed monthly segments)
+    if archive_job:
+        asyncio.create_task(archive_job.start())
+        print("OK: Memory Archive \u2014 ONLINE")
+
+    # Start fact consolidation (merges near-duplicate semantic facts)
+    if consolidation_job:
+        asyncio.create_task(consolidation_job.start())
+        print("OK: Fact Consolidation \u2014 ONLINE")
+
+    # Start the filename index (initial crawl, then live updates)
+    if file_index_job:
+        asyncio.create_task(file_index_job.start())
+        print("OK: File Index \u2014 ONLINE")
+
+    # Start the file content index (incremental full-text updates)
+    if content_index_job:
+        asyncio.create_task(content_index_job.start())
+        print("OK: Content Index \u2014 ONLINE")
+
     print("\nEONIX running at: http://127.0.0.1:8000")
     print("="*50 + "\n")
 
@@ -214,6 +259,19 @@ async def lifespan(app: FastAPI):
         security_monitor_bg.stop()
     if clipboard_monitor:
         clipboard_monitor.stop()
+    if archive_job:
+        archive_job.stop()
+    if consolidation_job:
+        consolidation_job.stop()
+    if file_index_job:
+        file_index_job.stop()
+    if content_index_job:
+        content_index_job.stop()
+    try:
+        from memory.db import db_writer
+        db_writer.flush(timeout=5)  # persist rows queued by the monitors above
+    except Exception as e:
+        print(f"WARNING: DB writer flush failed: {e}")
 
 
 # ── App Setup ────────────────────────────────────────────────
@@ -248,6 +306,7 @@ try:
     if tasks_router: app.include_router(tasks_router, prefix="/api", tags=["tasks"])
     if voice_router: app.include_router(voice_router, prefix="/api", tags=["voice"])
     if memory_router: app.include_router(memory_router, prefix="/api", tags=["memory"])
+    if files_router: app.include_router(files_router, prefix="/api", tags=["files"])
     if ws_router: app.include_router(ws_router, tags=["websocket"])
     if briefing_router: app.include_router(briefing_router, prefix="/api", tags=["briefing"])
     if workflows_router: app.include_router(workflows_router, prefix="/api", tags=["workflows"])
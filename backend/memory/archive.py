@@ -0,0 +1,302 @@
+"""
+EONIX Episodic Archive — Tiers old SQLite rows into compressed monthly
+Parquet segments under data/archive and queries them back on demand.
+
+Layout: data/archive/<table>/<YYYY-MM>.parquet (zstd, one file per month).
+"""
+import os
+import json
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, JSON, Boolean, Integer, Float, DateTime
+from sqlalchemy.orm import Session
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+from .db import Task, ConversationModel, AppUsage, SecurityLog, DBWriter, db_writer, get_read_db
+from config import ARCHIVE_DIR, ARCHIVE_AFTER_DAYS
+
+# table name → (model, column the table is tiered/partitioned by)
+ARCHIVED_TABLES: Dict[str, Tuple[Any, str]] = {
+    "tasks":         (Task, "created_at"),
+    "conversations": (ConversationModel, "timestamp"),
+    "app_usage":     (AppUsage, "start_time"),
+    "security_log":  (SecurityLog, "timestamp"),
+}
+
+
+def _month_bounds(month: str) -> Tuple[datetime, datetime]:
+    """'2025-03' → (2025-03-01, 2025-04-01)."""
+    start = datetime.strptime(month, "%Y-%m")
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start, end
+
+
+def _arrow_type(column) -> Any:
+    t = column.type
+    if isinstance(t, JSON):
+        return pa.string()  # JSON blobs are stored as their serialized text
+    if isinstance(t, Boolean):
+        return pa.bool_()
+    if isinstance(t, Integer):
+        return pa.int64()
+    if isinstance(t, Float):
+        return pa.float64()
+    if isinstance(t, DateTime):
+        return pa.timestamp("us")
+    return pa.string()
+
+
+class ArchiveStore:
+    """Cold tier for the episodic tables: monthly, columnar, compressed."""
+
+    def __init__(self, root: str = ARCHIVE_DIR):
+        self.root = root
+
+    # ── Paths & pruning ─────────────────────────────────────────
+    def _segment_path(self, table: str, month: str) -> str:
+        return os.path.join(self.root, table, f"{month}.parquet")
+
+    def months(self, table: str) -> List[str]:
+        """All archived months for a table, oldest first."""
+        folder = os.path.join(self.root, table)
+        if not os.path.isdir(folder):
+            return []
+        return sorted(f[:-len(".parquet")] for f in os.listdir(folder) if f.endswith(".parquet"))
+
+    def segments(self, table: str, start: Optional[datetime] = None,
+                 end: Optional[datetime] = None) -> List[str]:
+        """Segment files overlapping [start, end), oldest first."""
+        paths = []
+        for month in self.months(table):
+            m_start, m_end = _month_bounds(month)
+            if start and m_end <= start:
+                continue
+            if end and m_start >= end:
+                continue
+            paths.append(self._segment_path(table, month))
+        return paths
+
+    def _schema(self, model) -> Any:
+        return pa.schema([(c.name, _arrow_type(c)) for c in model.__table__.columns])
+
+    # ── Tiering ─────────────────────────────────────────────────
+    def _encode(self, model, row) -> Dict[str, Any]:
+        record = {}
+        for c in model.__table__.columns:
+            value = getattr(row, c.key)
+            if isinstance(c.type, JSON) and value is not None:
+                value = json.dumps(value, default=str)
+            record[c.name] = value
+        return record
+
+    def _write_segment(self, table: str, month: str, records: List[Dict[str, Any]]) -> None:
+        """Merge records into the month's segment (atomic replace, idempotent by id)."""
+        model, date_attr = ARCHIVED_TABLES[table]
+        schema = self._schema(model)
+        fresh = pa.Table.from_pylist(records, schema=schema)
+        path = self._segment_path(table, month)
+        if os.path.exists(path):
+            existing = pq.read_table(path, schema=schema)
+            keep = pc.invert(pc.is_in(existing["id"], value_set=fresh["id"]))
+            fresh = pa.concat_tables([existing.filter(keep), fresh])
+        fresh = fresh.sort_by([(date_attr, "ascending"), ("id", "ascending")])
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        pq.write_table(fresh, tmp, compression="zstd")
+        os.replace(tmp, path)
+
+    def archive(self, db: Session, older_than_days: Optional[int] = None,
+                writer: Optional[DBWriter] = None) -> Dict[str, int]:
+        """
+        Move rows older than the cutoff into monthly segments. Returns rows
+        moved per table. `db` is only read from; each month's delete is a job
+        on the single DB writer (`writer`, default db_writer).
+        """
+        writer = writer or db_writer
+        if not HAS_PYARROW:
+            print("WARNING: Archive: pyarrow not installed, skipping tiering.")
+            return {}
+
+        days = ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+        cutoff = datetime.utcnow() - timedelta(days=days)
+        moved: Dict[str, int] = {}
+
+        for table, (model, date_attr) in ARCHIVED_TABLES.items():
+            date_col = getattr(model, date_attr)
+            total = 0
+            # One month per pass: bounded memory, one segment rewrite per month.
+            while True:
+                oldest = db.query(func.min(date_col)).filter(date_col < cutoff).scalar()
+                if oldest is None:
+                    break
+                if isinstance(oldest, str):
+                    oldest = datetime.fromisoformat(oldest)
+                month = oldest.strftime("%Y-%m")
+                m_start, m_end = _month_bounds(month)
+                window_end = min(m_end, cutoff)
+
+                rows = (
+                    db.query(model)
+                    .filter(date_col >= m_start, date_col < window_end)
+                    .order_by(date_col, model.id)
+                    .all()
+                )
+                self._write_segment(table, month, [self._encode(model, r) for r in rows])
+
+                ids = [r.id for r in rows]
+                db.rollback()  # end the read transaction: the delete mustn't wait on it, the next pass must see it
+                db.expunge_all()
+                writer.write(lambda s, model=model, ids=ids: self._delete(s, model, ids))
+                total += len(ids)
+            moved[table] = total
+        return moved
+
+    @staticmethod
+    def _delete(db: Session, model, ids: List[int]) -> None:
+        for i in range(0, len(ids), 500):
+            db.query(model).filter(model.id.in_(ids[i:i + 500])).delete(synchronize_session=False)
+
+    # ── Query layer ─────────────────────────────────────────────
+    def _decode(self, table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        model, _ = ARCHIVED_TABLES[table]
+        json_cols = [c.name for c in model.__table__.columns if isinstance(c.type, JSON)]
+        for row in rows:
+            for name in json_cols:
+                if row.get(name) is not None:
+                    try:
+                        row[name] = json.loads(row[name])
+                    except ValueError:
+                        pass
+        return rows
+
+    def _read(self, table: str, path: str, start: Optional[datetime], end: Optional[datetime],
+              columns: Optional[List[str]] = None) -> Any:
+        _, date_attr = ARCHIVED_TABLES[table]
+        filters = []
+        if start:
+            filters.append((date_attr, ">=", start))
+        if end:
+            filters.append((date_attr, "<", end))
+        return pq.read_table(path, columns=columns, filters=filters or None)
+
+    def scan(self, table: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+             columns: Optional[List[str]] = None, newest_first: bool = False) -> Iterator[Dict[str, Any]]:
+        """Stream archived rows in [start, end), reading only overlapping segments."""
+        if not HAS_PYARROW:
+            return
+        paths = self.segments(table, start, end)
+        for path in (reversed(paths) if newest_first else paths):
+            rows = self._decode(table, self._read(table, path, start, end, columns).to_pylist())
+            yield from (reversed(rows) if newest_first else rows)
+
+    def search(self, table: str, query: str, fields: List[str], limit: int = 10,
+               start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Case-insensitive substring search over archived rows, newest first."""
+        if not HAS_PYARROW or not query:
+            return []
+        results: List[Dict[str, Any]] = []
+        for path in reversed(self.segments(table, start, end)):
+            tbl = self._read(table, path, start, end)
+            mask = None
+            for f in fields:
+                hit = pc.fill_null(pc.match_substring(tbl[f], query, ignore_case=True), False)
+                mask = hit if mask is None else pc.or_(mask, hit)
+            rows = self._decode(table, tbl.filter(mask).to_pylist())
+            for row in reversed(rows):
+                results.append(row)
+                if len(results) >= limit:
+                    return results
+        return results
+
+    def app_usage_totals(self, start_date: str, end_date: Optional[str] = None,
+                         by_date: bool = False) -> List[Dict[str, Any]]:
+        """Archived app usage summed per app (and per day if by_date) for date strings in range."""
+        if not HAS_PYARROW:
+            return []
+        start = datetime.strptime(start_date, "%Y-%m-%d")
+        end = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1) if end_date else None
+        keys = ["date", "app_name"] if by_date else ["app_name"]
+        parts = []
+        for path in self.segments("app_usage", start - timedelta(days=1), end):
+            tbl = pq.read_table(path, columns=["id", "app_name", "duration_seconds", "date"])
+            mask = pc.greater_equal(tbl["date"], start_date)
+            if end_date:
+                mask = pc.and_(mask, pc.less_equal(tbl["date"], end_date))
+            parts.append(tbl.filter(mask))
+        if not parts:
+            return []
+        grouped = pa.concat_tables(parts).group_by(keys).aggregate(
+            [("duration_seconds", "sum"), ("id", "count")]
+        )
+        return [
+            {**{k: r[k] for k in keys},
+             "total_secs": r["duration_seconds_sum"] or 0.0,
+             "sessions": r["id_count"]}
+            for r in grouped.to_pylist()
+        ]
+
+    def covers(self, table: str, since: datetime) -> bool:
+        """True if any archived segment holds data at or after `since`."""
+        return bool(self.segments(table, start=since))
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"enabled": HAS_PYARROW, "after_days": ARCHIVE_AFTER_DAYS, "tables": {}}
+        for table in ARCHIVED_TABLES:
+            months = self.months(table)
+            size = sum(os.path.getsize(self._segment_path(table, m)) for m in months)
+            out["tables"][table] = {"segments": len(months), "bytes": size,
+                                    "oldest": months[0] if months else None,
+                                    "newest": months[-1] if months else None}
+        return out
+
+
+class ArchiveJob:
+    """Background loop that periodically tiers old rows out of SQLite."""
+
+    INTERVAL = 6 * 3600  # seconds
+
+    def __init__(self, store: ArchiveStore):
+        self.store = store
+        self.running = False
+
+    def run_once(self) -> Dict[str, int]:
+        # Freed pages are reused by new rows; no VACUUM, which would need the
+        # whole database to itself while the writer and readers are busy.
+        db = get_read_db()
+        try:
+            moved = self.store.archive(db)
+        finally:
+            db.close()
+        if sum(moved.values()):
+            print(f"OK: Archive: moved {moved} to {self.store.root}")
+        return moved
+
+    async def start(self):
+        self.running = True
+        while self.running:
+            try:
+                await asyncio.to_thread(self.run_once)
+            except Exception as e:
+                print(f"ERROR: Archive job failed: {e}")
+            for _ in range(self.INTERVAL):
+                if not self.running:
+                    break
+                await asyncio.sleep(1)
+
+    def stop(self):
+        self.running = False
+
+
+# Global instances
+archive_store = ArchiveStore()
+archive_job = ArchiveJob(archive_store)
@@ -0,0 +1,359 @@
+"""
+EONIX Memory Backup — Streaming export/import of everything Eonix remembers.
+
+Format: NDJSON, optionally gzip-compressed. One header line, then one record
+per line, then a footer with per-section counts:
+
+    {"kind": "header", "format": "eonix-memory", "version": 1, ...}
+    {"kind": "tasks", "row": {...}}
+    {"kind": "semantic", "namespace": "facts", "id": ..., "text": ..., "metadata": {...}, "embedding": [...]}
+    {"kind": "footer", "counts": {"tasks": 1200, ...}}
+
+Export pages through each table by primary key (archived rows first) and
+through each Chroma collection by offset, so memory stays flat no matter how
+large the history is. Import parses line by line and writes fixed-size chunks:
+bulk INSERT OR IGNORE through the DB writer (re-running an import is safe) and
+one `upsert` per chunk into the vector store.
+
+CLI:
+    python -m memory.backup export eonix-backup.ndjson.gz
+    python -m memory.backup export tasks.ndjson --sections tasks conversations
+    python -m memory.backup import eonix-backup.ndjson.gz
+"""
+import json
+import gzip
+from collections import deque
+from datetime import datetime
+from concurrent.futures import Future
+from typing import Any, Deque, Dict, IO, Iterable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import DateTime, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from .db import Task, ConversationModel, Preference, AppUsage, SecurityLog, DBWriter, db_writer
+from .archive import ArchiveStore, archive_store, ARCHIVED_TABLES
+
+FORMAT = "eonix-memory"
+VERSION = 1
+CHUNK = 1000          # rows per DB page / bulk insert / vector upsert
+MAX_IN_FLIGHT = 2     # import chunks queued on the writer while the next one is parsed
+
+TABLES: Dict[str, Any] = {
+    "tasks":         Task,
+    "conversations": ConversationModel,
+    "preferences":   Preference,
+    "app_usage":     AppUsage,
+    "security_log":  SecurityLog,
+}
+SECTIONS = tuple(TABLES) + ("semantic",)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "tolist"):  # numpy arrays / scalars from Chroma
+        return value.tolist()
+    return str(value)
+
+
+def _line(record: Dict[str, Any]) -> bytes:
+    return (json.dumps(record, default=_json_default, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _get_memory(memory: Any) -> Any:
+    if memory is None:
+        from .semantic import semantic_memory
+        memory = semantic_memory
+    return memory
+
+
+# ── Export ───────────────────────────────────────────────────────
+
+def _table_rows(db: Session, section: str, chunk: int, archive: ArchiveStore) -> Iterator[Dict[str, Any]]:
+    if section in ARCHIVED_TABLES:
+        yield from archive.scan(section)
+    table = TABLES[section].__table__
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(table).where(table.c.id > last_id).order_by(table.c.id).limit(chunk)
+        ).mappings().all()
+        for row in rows:
+            yield dict(row)
+        if len(rows) < chunk:
+            return
+        last_id = rows[-1]["id"]
+
+
+def _semantic_records(memory: Any, chunk: int) -> Iterator[Dict[str, Any]]:
+    from .semantic import NAMESPACES
+    for ns in NAMESPACES:
+        collection = memory.collections.get(ns)
+        if collection is None:
+            for item in list(memory.fallback_stores.get(ns, [])):
+                yield {"namespace": ns, "id": item["id"], "text": item["text"],
+                       "metadata": item.get("metadata") or {}, "embedding": None}
+            continue
+        offset = 0
+        while True:
+            page = collection.get(limit=chunk, offset=offset,
+                                  include=["documents", "metadatas", "embeddings"])
+            ids = page.get("ids") or []
+            docs = page.get("documents") or []
+            metas = page.get("metadatas") or []
+            embeddings = page.get("embeddings")
+            if embeddings is None:
+                embeddings = [None] * len(ids)
+            for i, doc_id in enumerate(ids):
+                vec = embeddings[i]
+                yield {"namespace": ns, "id": doc_id, "text": docs[i] if i < len(docs) else "",
+                       "metadata": (metas[i] if i < len(metas) else None) or {},
+                       "embedding": [round(float(x), 6) for x in vec] if vec is not None else None}
+            if len(ids) < chunk:
+                break
+            offset += chunk
+
+
+def export_records(db: Session, sections: Optional[Sequence[str]] = None, memory: Any = None,
+                   chunk: int = CHUNK, archive: ArchiveStore = archive_store) -> Iterator[bytes]:
+    """Yield the backup as NDJSON lines, one section at a time."""
+    sections = list(sections or SECTIONS)
+    unknown = [s for s in sections if s not in SECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown section(s): {', '.join(unknown)}")
+
+    header: Dict[str, Any] = {"kind": "header", "format": FORMAT, "version": VERSION,
+                              "exported_at": datetime.utcnow().isoformat(), "sections": sections}
+    if "semantic" in sections:
+        memory = _get_memory(memory)
+        if not memory.is_fallback:
+            from ai.embeddings import embedding_service
+            header["embedding_backend"] = embedding_service.backend.name
+    yield _line(header)
+
+    counts: Dict[str, int] = {}
+    for section in sections:
+        n = 0
+        if section == "semantic":
+            for record in _semantic_records(memory, chunk):
+                yield _line({"kind": "semantic", **record})
+                n += 1
+        else:
+            for row in _table_rows(db, section, chunk, archive):
+                yield _line({"kind": section, "row": row})
+                n += 1
+        counts[section] = n
+    yield _line({"kind": "footer", "counts": counts})
+
+
+def iter_chunks(lines: Iterable[bytes], size: int = 1 << 16) -> Iterator[bytes]:
+    """Group lines into ~64 KB blocks for streaming responses and file writes."""
+    buf: List[bytes] = []
+    buffered = 0
+    for line in lines:
+        buf.append(line)
+        buffered += len(line)
+        if buffered >= size:
+            yield b"".join(buf)
+            buf, buffered = [], 0
+    if buf:
+        yield b"".join(buf)
+
+
+# ── Import ───────────────────────────────────────────────────────
+
+def _coerce_row(model: Any, row: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep known columns and turn ISO strings back into datetimes."""
+    out = {}
+    for column in model.__table__.columns:
+        if column.name not in row:
+            continue
+        value = row[column.name]
+        if isinstance(column.type, DateTime) and isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        out[column.name] = value
+    return out
+
+
+class _Importer:
+    def __init__(self, writer: DBWriter, memory: Any, chunk: int, archive: ArchiveStore):
+        self.writer = writer
+        self.memory = memory
+        self.chunk = chunk
+        self.archive = archive
+        self.archived_ids: Dict[str, set] = {}
+        self.rows: Dict[str, List[Dict[str, Any]]] = {name: [] for name in TABLES}
+        self.vectors: Dict[str, List[Dict[str, Any]]] = {}
+        self.in_flight: Deque[Future] = deque()
+        self.counts: Dict[str, int] = {}
+        self.keep_embeddings = True
+
+    def add_row(self, section: str, row: Dict[str, Any]) -> None:
+        if section in ARCHIVED_TABLES:
+            if section not in self.archived_ids:
+                self.archived_ids[section] = {r["id"] for r in self.archive.scan(section, columns=["id"])}
+            if row.get("id") in self.archived_ids[section]:
+                # Already in this install's cold tier: a hot copy would be counted twice
+                self.counts["archived"] = self.counts.get("archived", 0) + 1
+                return
+        buf = self.rows[section]
+        buf.append(_coerce_row(TABLES[section], row))
+        if len(buf) >= self.chunk:
+            self.flush_rows(section)
+
+    def flush_rows(self, section: str) -> None:
+        rows, self.rows[section] = self.rows[section], []
+        if not rows:
+            return
+        stmt = sqlite_insert(TABLES[section].__table__).on_conflict_do_nothing()
+        self.in_flight.append(self.writer.submit(lambda s: s.execute(stmt, rows)))
+        while len(self.in_flight) > MAX_IN_FLIGHT:
+            self.in_flight.popleft().result()
+        self.counts[section] = self.counts.get(section, 0) + len(rows)
+
+    def add_vector(self, record: Dict[str, Any]) -> None:
+        ns = record.get("namespace", "facts")
+        if ns not in self.memory.fallback_stores:
+            return
+        buf = self.vectors.setdefault(ns, [])
+        buf.append(record)
+        if len(buf) >= self.chunk:
+            self.flush_vectors(ns)
+
+    def flush_vectors(self, ns: str) -> None:
+        records, self.vectors[ns] = self.vectors.get(ns, []), []
+        if not records:
+            return
+        collection = self.memory.collections.get(ns)
+        if collection is None:
+            with self.memory._lock:
+                store = self.memory.fallback_stores[ns]
+                fresh = {r["id"] for r in records}
+                store[:] = [m for m in store if m["id"] not in fresh] + [
+                    {"id": r["id"], "text": r["text"], "metadata": r.get("metadata") or {},
+                     "timestamp": (r.get("metadata") or {}).get("created_at")}
+                    for r in records
+                ]
+        else:
+            kwargs: Dict[str, Any] = {
+                "ids": [r["id"] for r in records],
+                "documents": [r["text"] for r in records],
+                "metadatas": [r.get("metadata") or {"source": "import"} for r in records],
+            }
+            # Vectors are only reusable if the whole chunk has them from the same model;
+            # otherwise the collection re-embeds the chunk in one batched call.
+            if self.keep_embeddings and all(r.get("embedding") for r in records):
+                kwargs["embeddings"] = [r["embedding"] for r in records]
+            collection.upsert(**kwargs)
+        self.counts["semantic"] = self.counts.get("semantic", 0) + len(records)
+
+    def finish(self) -> None:
+        for section in TABLES:
+            self.flush_rows(section)
+        for ns in list(self.vectors):
+            self.flush_vectors(ns)
+        while self.in_flight:
+            self.in_flight.popleft().result()
+
+
+def import_records(lines: Iterable[bytes], writer: DBWriter = db_writer, memory: Any = None,
+                   chunk: int = CHUNK, archive: ArchiveStore = archive_store) -> Dict[str, int]:
+    """
+    Load a backup stream. Existing rows (same primary key) are kept, and so
+    are rows already in the archive tier, which are skipped ("archived" in the
+    result). Returns rows read per section.
+    """
+    importer: Optional[_Importer] = None
+    for n, raw in enumerate(lines, 1):
+        if not raw.strip():
+            continue
+        record = json.loads(raw)
+        kind = record.get("kind")
+        if importer is None:
+            if kind != "header" or record.get("format") != FORMAT:
+                raise ValueError("Not an Eonix memory backup (missing header)")
+            if record.get("version", 0) > VERSION:
+                raise ValueError(f"Backup version {record['version']} is newer than supported ({VERSION})")
+            sections = record.get("sections") or []
+            if "semantic" in sections:
+                memory = _get_memory(memory)
+            importer = _Importer(writer, memory, chunk, archive)
+            if "semantic" in sections and not memory.is_fallback:
+                from ai.embeddings import embedding_service
+                importer.keep_embeddings = record.get("embedding_backend") == embedding_service.backend.name
+            continue
+        if kind in TABLES:
+            importer.add_row(kind, record["row"])
+        elif kind == "semantic" and importer.memory is not None:
+            importer.add_vector(record)
+        elif kind != "footer":
+            raise ValueError(f"Line {n}: unknown record kind {kind!r}")
+    if importer is None:
+        raise ValueError("Empty backup")
+    importer.finish()
+
+    if importer.counts.get("tasks"):
+        from .task_store import rebuild_task_stats
+        writer.write(lambda s: rebuild_task_stats(s, archive.scan("tasks")), timeout=None)
+    if importer.counts.get("preferences") and writer is db_writer:
+        from .preference_store import preference_cache
+        preference_cache.load()
+    if importer.counts.get("semantic"):
+        with importer.memory._lock:
+            importer.memory._rebuild_index()
+    return importer.counts
+
+
+# ── Files ────────────────────────────────────────────────────────
+
+def open_backup(path: str) -> IO[bytes]:
+    """Open a backup for reading, transparently gunzipping by magic bytes."""
+    f = open(path, "rb")
+    if f.peek(2)[:2] == b"\x1f\x8b":
+        return gzip.GzipFile(fileobj=f)  # type: ignore[return-value]
+    return f
+
+
+def export_to_file(path: str, sections: Optional[Sequence[str]] = None) -> None:
+    from .db import get_read_db
+    db = get_read_db()
+    try:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "wb") as out:
+            for block in iter_chunks(export_records(db, sections)):
+                out.write(block)
+    finally:
+        db.close()
+
+
+def import_from_file(path: str) -> Dict[str, int]:
+    with open_backup(path) as f:
+        return import_records(f)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m memory.backup", description="Export or import Eonix memory.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    exp = sub.add_parser("export", help="write a backup (.ndjson or .ndjson.gz)")
+    exp.add_argument("path")
+    exp.add_argument("--sections", nargs="+", choices=SECTIONS, default=None)
+    imp = sub.add_parser("import", help="load a backup into this installation")
+    imp.add_argument("path")
+    args = parser.parse_args(argv)
+
+    from .db import init_db
+    from .migrations import migrate
+    init_db()
+    migrate()
+    if args.command == "export":
+        export_to_file(args.path, args.sections)
+        print(f"OK: Memory exported to {args.path}")
+    else:
+        counts = import_from_file(args.path)
+        print(f"OK: Memory imported from {args.path}: " + ", ".join(f"{k}={v}" for k, v in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
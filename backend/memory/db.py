@@ -1,9 +1,24 @@
 """
 EONIX Database Layer — SQLAlchemy ORM models and session management.
+
+All connections run SQLite in WAL mode with a tuned pragma profile. Writes
+go through a single writer thread (`db_writer`) that commits in batches;
+reads use a separate pool of query-only connections (`get_read_db`), which
+under WAL never block on, or get blocked by, the writer.
+
+Async code must not touch sessions directly: use `run_read` / `in_db_pool`
+for reads and `db_writer.awrite` for writes so queries never run on the
+event loop.
 """
 import os
-from sqlalchemy import create_engine, Column, Integer, String, Text, Float, DateTime, Boolean, JSON
-from sqlalchemy.orm import declarative_base, sessionmaker
+import queue
+import asyncio
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple, TypeVar
+from sqlalchemy import create_engine, event, Index, Column, Integer, String, Text, Float, DateTime, Boolean, JSON
+from sqlalchemy.orm import declarative_base, sessionmaker, Session
 from datetime import datetime
 
 # Import DB_PATH safely
@@ -14,8 +29,43 @@ from config import DB_PATH
 # Ensure data directory exists
 os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
 
+# Applied to every pooled connection, reader or writer
+SQLITE_PRAGMAS = {
+    "synchronous": "NORMAL",     # safe under WAL, fsync only at checkpoints
+    "mmap_size": 268435456,      # 256 MB memory-mapped reads
+    "cache_size": -65536,        # 64 MB page cache (negative = KiB)
+    "busy_timeout": 5000,        # ms to wait on a lock instead of failing
+    "temp_store": "MEMORY",
+}
+
 engine = create_engine(f"sqlite:///{DB_PATH}", echo=False, connect_args={"check_same_thread": False})
+read_engine = create_engine(
+    f"sqlite:///{DB_PATH}", echo=False,
+    connect_args={"check_same_thread": False},
+    pool_size=8, max_overflow=8,
+)
+
+
+@event.listens_for(engine, "connect")
+def _configure_writer(dbapi_conn, _record):
+    cur = dbapi_conn.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    for key, value in SQLITE_PRAGMAS.items():
+        cur.execute(f"PRAGMA {key}={value}")
+    cur.close()
+
+
+@event.listens_for(read_engine, "connect")
+def _configure_reader(dbapi_conn, _record):
+    cur = dbapi_conn.cursor()
+    for key, value in SQLITE_PRAGMAS.items():
+        cur.execute(f"PRAGMA {key}={value}")
+    cur.execute("PRAGMA query_only=ON")
+    cur.close()
+
+
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+ReadSessionLocal = sessionmaker(bind=read_engine, autocommit=False, autoflush=False)
 Base = declarative_base()
 
 
@@ -34,6 +84,28 @@ class Task(Base):
     success     = Column(Boolean, default=None)
     duration_ms = Column(Integer)
 
+    __table_args__ = (
+        Index("ix_tasks_created_at", "created_at"),
+        Index("ix_tasks_brain_used", "brain_used", "success"),
+        Index("ix_tasks_success", "success"),
+    )
+
+
+class TaskStat(Base):
+    """Rollup of task outcomes, kept in step with `tasks` by task_store."""
+    __tablename__ = "task_stats"
+
+    dimension = Column(String(10), primary_key=True)   # all, brain, intent, day
+    key       = Column(String(100), primary_key=True)  # e.g. "gemini", "2025-03-14"
+    total     = Column(Integer, default=0)
+    finished  = Column(Integer, default=0)  # success is not NULL
+    succeeded = Column(Integer, default=0)
+    latency   = Column(JSON, nullable=True)  # serialized TDigest of duration_ms
+
+    __table_args__ = (
+        Index("ix_task_stats_dimension_total", "dimension", "total"),
+    )
+
 
 class Preference(Base):
     """User preferences learned or explicitly set."""
@@ -82,6 +154,10 @@ class ConversationModel(Base):
     tags        = Column(JSON)  # e.g. ["planning", "python"]
     embedding_id = Column(String(50), nullable=True) # Link to semantic DB if needed
 
+    __table_args__ = (
+        Index("ix_conversations_timestamp", "timestamp"),
+    )
+
 
 class AppUsage(Base):
     """App usage tracking — one row per active-window session."""
@@ -94,6 +170,14 @@ class AppUsage(Base):
     end_time         = Column(DateTime, nullable=True)
     duration_seconds = Column(Float, default=0)
     date             = Column(String(10), nullable=False)  # YYYY-MM-DD for easy grouping
+
+    __table_args__ = (
+        # Covers every /api/analytics query: filter on date, group on app_name, sum durations
+        Index("ix_app_usage_date_app", "date", "app_name", "duration_seconds"),
+        Index("ix_app_usage_start_time", "start_time"),
+    )
+
+
 class SecurityLog(Base):
     """Security alerts and events."""
     __tablename__ = "security_log"
@@ -109,6 +193,11 @@ class SecurityLog(Base):
     resolved    = Column(Boolean, default=False)
     date        = Column(String(10), nullable=False)
 
+    __table_args__ = (
+        Index("ix_security_log_date_severity", "date", "severity"),
+        Index("ix_security_log_timestamp", "timestamp"),
+    )
+
 
 def init_db():
     """Create all tables."""
@@ -123,3 +212,172 @@ def get_db():
     except Exception:
         db.close()
         raise
+
+
+def get_read_db() -> Session:
+    """Get a read-only session from the reader pool."""
+    return ReadSessionLocal()
+
+
+T = TypeVar("T")
+
+# Blocking reads from async code run here, sized to the reader connection pool
+_read_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="DBRead")
+
+
+async def in_db_pool(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Await a blocking DB call on the read thread pool instead of the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_read_executor, functools.partial(fn, *args, **kwargs))
+
+
+async def run_read(fn: Callable[[Session], T]) -> T:
+    """Await fn(session) on a read-only session from the read thread pool."""
+    def _job():
+        db = get_read_db()
+        try:
+            return fn(db)
+        finally:
+            db.close()
+    return await in_db_pool(_job)
+
+
+# ── Single writer ────────────────────────────────────────────────
+
+class _BatchAborted(Exception):
+    """A job asked for a rollback while sharing a batch with other jobs."""
+
+
+class _BatchSession(Session):
+    """Writer session: a job's commit() only flushes, the writer commits the batch.
+
+    A job calling rollback() aborts the batch; the writer then replays every
+    job on its own so the rollback only affects the job that asked for it.
+    """
+
+    def commit(self):
+        self.flush()
+
+    def rollback(self):
+        raise _BatchAborted()
+
+
+class DBWriter:
+    """Serializes all writes onto one thread and commits queued jobs together.
+
+    A job is `fn(session) -> result`. Results are returned through a Future once
+    the batch holding the job has committed; returned ORM objects are detached
+    with their attributes loaded, so they are safe to read from any thread.
+
+    A job that submits another job runs it inline on its own session: the
+    nested job's future resolves as soon as it has run, and it commits or
+    rolls back together with the job that submitted it.
+    """
+
+    MAX_BATCH = 200
+
+    def __init__(self, bind=None):
+        bind = bind if bind is not None else engine
+        self._batch_session = sessionmaker(bind=bind, class_=_BatchSession, autoflush=False, expire_on_commit=False)
+        self._job_session = sessionmaker(bind=bind, autoflush=False, expire_on_commit=False)
+        self._queue: "queue.Queue[Tuple[Callable[[Session], Any], Future]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._session: Optional[Session] = None  # the writer thread's open session, while a job runs
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.jobs = 0
+
+    def _ensure_started(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if not (self._thread and self._thread.is_alive()):
+                self._thread = threading.Thread(target=self._loop, daemon=True, name="DBWriter")
+                self._thread.start()
+
+    def submit(self, fn: Callable[[Session], Any]) -> Future:
+        """Queue a write job; returns immediately."""
+        fut: Future = Future()
+        if threading.current_thread() is self._thread and self._session is not None:
+            # A job queued another job. A second connection would wait on the
+            # write lock this one holds, so run it in the same transaction.
+            try:
+                fut.set_result(fn(self._session))
+            except Exception as e:
+                fut.set_exception(e)
+                raise
+            return fut
+        self._ensure_started()
+        self._queue.put((fn, fut))
+        return fut
+
+    def write(self, fn: Callable[[Session], Any], timeout: Optional[float] = 30) -> Any:
+        """Queue a write job and block until it has committed."""
+        return self.submit(fn).result(timeout)
+
+    async def awrite(self, fn: Callable[[Session], Any]) -> Any:
+        """Queue a write job and await its commit without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(fn))
+
+    def add(self, obj: Any) -> Future:
+        """Fire-and-forget insert of a new ORM object."""
+        return self.submit(lambda s: s.add(obj))
+
+    def flush(self, timeout: Optional[float] = 30) -> None:
+        """Block until everything queued so far has been written."""
+        self.write(lambda s: None, timeout)
+
+    # ── Writer thread ───────────────────────────────────────────
+    def _loop(self):
+        while True:
+            batch: List[Tuple[Callable[[Session], Any], Future]] = [self._queue.get()]
+            while len(batch) < self.MAX_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        session = self._session = self._batch_session()
+        try:
+            results = [fn(session) for fn, _ in batch]
+            Session.commit(session)
+        except Exception:
+            Session.rollback(session)
+            session.close()
+            self._session = None
+            # Isolate the failure: replay each job in its own transaction
+            for fn, fut in batch:
+                self._run_one(fn, fut)
+            return
+        session.close()
+        self._session = None
+        self.batches += 1
+        self.jobs += len(batch)
+        for (_, fut), result in zip(batch, results):
+            fut.set_result(result)
+
+    def _run_one(self, fn, fut):
+        session = self._session = self._job_session()
+        result, error = None, None
+        try:
+            result = fn(session)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            error = e
+        finally:
+            session.close()
+            self._session = None
+        self.batches += 1
+        self.jobs += 1
+        # Resolved once the session is closed, so done-callbacks that submit more work queue it
+        if error is None:
+            fut.set_result(result)
+        else:
+            fut.set_exception(error)
+
+
+# Global writer
+db_writer = DBWriter()
@@ -0,0 +1,89 @@
+"""
+EONIX Near-Duplicate Index — MinHash signatures with banded LSH.
+
+Used by SemanticMemory to find facts that are textually near-identical to a
+new one without comparing against every stored document. Signatures are
+built from character 4-grams of the normalized text, which is robust for
+the short, templated facts ("User's name is ...") this store holds.
+"""
+import re
+import zlib
+import random
+from typing import Dict, Iterable, Set, Tuple
+
+NUM_PERM = 64
+BANDS = 16           # 16 bands x 4 rows: pairs above ~0.5 Jaccard usually collide
+SHINGLE_SIZE = 4
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+Signature = Tuple[int, ...]
+
+
+def normalize(text: str) -> str:
+    text = re.sub(r"['’]", "", text.lower())  # "user's" and "users" shingle the same
+    return " ".join(re.sub(r"[^\w]+", " ", text).split())
+
+
+def shingles(text: str, k: int = SHINGLE_SIZE) -> Set[str]:
+    norm = normalize(text)
+    if len(norm) <= k:
+        return {norm}
+    return {norm[i:i + k] for i in range(len(norm) - k + 1)}
+
+
+def minhash(text: str) -> Signature:
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles(text)]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def similarity(a: Signature, b: Signature) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+class LSHIndex:
+    """In-memory banded LSH over MinHash signatures, keyed by document id."""
+
+    def __init__(self, bands: int = BANDS):
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self.signatures: Dict[str, Signature] = {}
+        self._buckets: Dict[Tuple[int, Signature], Set[str]] = {}
+
+    def _band_keys(self, sig: Signature) -> Iterable[Tuple[int, Signature]]:
+        for band in range(self.bands):
+            yield band, sig[band * self.rows:(band + 1) * self.rows]
+
+    def add(self, key: str, sig: Signature) -> None:
+        self.remove(key)
+        self.signatures[key] = sig
+        for band_key in self._band_keys(sig):
+            self._buckets.setdefault(band_key, set()).add(key)
+
+    def remove(self, key: str) -> None:
+        sig = self.signatures.pop(key, None)
+        if sig is None:
+            return
+        for band_key in self._band_keys(sig):
+            bucket = self._buckets.get(band_key)
+            if bucket:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def candidates(self, sig: Signature) -> Set[str]:
+        """Ids sharing at least one band with `sig`."""
+        found: Set[str] = set()
+        for band_key in self._band_keys(sig):
+            found |= self._buckets.get(band_key, set())
+        return found
+
+    def clear(self) -> None:
+        self.signatures.clear()
+        self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self.signatures)
@@ -4,37 +4,40 @@ EONIX Episodic Memory — Stores full conversation history in SQLite.
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from sqlalchemy import or_, desc
-from memory.db import get_db, ConversationModel
+from memory.db import get_read_db, db_writer, in_db_pool, ConversationModel
+from memory.archive import archive_store
 
 class EpisodicMemory:
     def __init__(self):
         pass
 
+    @staticmethod
+    def _save_job(user_input: str, agent_reply: str, tags: Optional[List[str]]):
+        """Writer job that inserts one turn and returns its id."""
+        conversation = ConversationModel(
+            user_input=user_input,
+            agent_reply=agent_reply,
+            tags=tags or [],
+            timestamp=datetime.utcnow()
+        )
+
+        def _save(db):
+            db.add(conversation)
+            db.flush()
+            return conversation.id
+        return _save
+
     def save_turn(self, user_input: str, agent_reply: str, tags: Optional[List[str]] = None) -> int:
         """Save a conversation turn (User -> Agent)."""
-        db = get_db()
         try:
-            cleaned_tags = tags or []
-            conversation = ConversationModel(
-                user_input=user_input,
-                agent_reply=agent_reply,
-                tags=cleaned_tags,
-                timestamp=datetime.utcnow()
-            )
-            db.add(conversation)
-            db.commit()
-            db.refresh(conversation)
-            return conversation.id
+            return db_writer.write(self._save_job(user_input, agent_reply, tags))
         except Exception as e:
             print(f"ERROR: Episodic Save Failed: {e}")
-            db.rollback()
             return -1
-        finally:
-            db.close()
 
     def get_recent(self, limit: int = 5) -> List[Dict[str, Any]]:
         """Get the most recent conversation turns."""
-        db = get_db()
+        db = get_read_db()
         try:
             turns = db.query(ConversationModel).order_by(desc(ConversationModel.timestamp)).limit(limit).all()
             # Reverse to return in chronological order (oldest -> newest) for context window
@@ -57,7 +60,7 @@ class EpisodicMemory:
         """Search past conversations by keyword (SQL LIKE)."""
         # Note: comprehensive semantic search on conversations would require embedding every turn.
         # For now, we use SQL text search on user input.
-        db = get_db()
+        db = get_read_db()
         try:
             results = db.query(ConversationModel).filter(
                 or_(
@@ -66,7 +69,7 @@ class EpisodicMemory:
                 )
             ).order_by(desc(ConversationModel.timestamp)).limit(limit).all()
             
-            return [
+            found = [
                 {
                     "id": t.id,
                     "user": t.user_input,
@@ -75,11 +78,41 @@ class EpisodicMemory:
                 }
                 for t in results
             ]
+            # Fill the remainder from archived (cold) months, newest first
+            if len(found) < limit:
+                seen = {f["id"] for f in found}
+                for t in archive_store.search("conversations", query, ["user_input", "agent_reply"], limit=limit):
+                    if t["id"] in seen:
+                        continue
+                    found.append({
+                        "id": t["id"],
+                        "user": t["user_input"],
+                        "agent": t["agent_reply"],
+                        "timestamp": t["timestamp"].isoformat()
+                    })
+                    if len(found) >= limit:
+                        break
+            return found
         except Exception as e:
             print(f"ERROR: Episodic Search Failed: {e}")
             return []
         finally:
             db.close()
 
+    # ── Async API (for routes / the event loop) ─────────────────
+
+    async def asave_turn(self, user_input: str, agent_reply: str, tags: Optional[List[str]] = None) -> int:
+        try:
+            return await db_writer.awrite(self._save_job(user_input, agent_reply, tags))
+        except Exception as e:
+            print(f"ERROR: Episodic Save Failed: {e}")
+            return -1
+
+    async def aget_recent(self, limit: int = 5) -> List[Dict[str, Any]]:
+        return await in_db_pool(self.get_recent, limit)
+
+    async def asearch(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        return await in_db_pool(self.search, query, limit)
+
 # Global instance
 episodic_memory = EpisodicMemory()
@@ -0,0 +1,103 @@
+"""
+EONIX Schema Migrations — Versioned, forward-only upgrades for the memory DB.
+
+`create_all` only creates missing tables, so databases created by older
+builds never pick up new columns or indexes. Each migration here runs once,
+in its own transaction, and is recorded in the `schema_version` table.
+
+Add a migration by appending (version, description, fn) to MIGRATIONS.
+Run manually with: python -m memory.migrations
+"""
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from .db import Base, engine
+
+
+def _create_index(conn: Connection, name: str, table: str, *columns: str) -> None:
+    conn.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})")
+
+
+def add_column(conn: Connection, table: str, column: str, ddl: str) -> None:
+    """ALTER TABLE ... ADD COLUMN, skipped if the column already exists."""
+    existing = {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table})")}
+    if column not in existing:
+        conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+
+
+# ── Migrations ───────────────────────────────────────────────────
+
+def _baseline(conn: Connection) -> None:
+    """Tables as created by Base.metadata.create_all before versioning existed."""
+
+
+def _hot_path_indexes(conn: Connection) -> None:
+    """Indexes for the filters/sorts used by task_store, routes_analytics and security_monitor."""
+    _create_index(conn, "ix_tasks_created_at", "tasks", "created_at")
+    _create_index(conn, "ix_tasks_brain_used", "tasks", "brain_used", "success")
+    _create_index(conn, "ix_tasks_success", "tasks", "success")
+    _create_index(conn, "ix_conversations_timestamp", "conversations", "timestamp")
+    _create_index(conn, "ix_app_usage_date_app", "app_usage", "date", "app_name", "duration_seconds")
+    _create_index(conn, "ix_app_usage_start_time", "app_usage", "start_time")
+    _create_index(conn, "ix_security_log_date_severity", "security_log", "date", "severity")
+    _create_index(conn, "ix_security_log_timestamp", "security_log", "timestamp")
+    conn.exec_driver_sql("ANALYZE")
+
+
+def _task_stats_rollup(conn: Connection) -> None:
+    """Backfill the task_stats rollup from existing (and archived) tasks."""
+    from .archive import archive_store
+    from .task_store import rebuild_task_stats
+    with Session(bind=conn) as db:
+        rebuild_task_stats(db, archive_store.scan("tasks"))
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "baseline schema", _baseline),
+    (2, "hot-path indexes", _hot_path_indexes),
+    (3, "task stats rollup", _task_stats_rollup),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(bind: Engine = engine) -> int:
+    with bind.connect() as conn:
+        has_table = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='schema_version'"
+        ).first()
+        if not has_table:
+            return 0
+        return conn.exec_driver_sql("SELECT COALESCE(MAX(version), 0) FROM schema_version").scalar() or 0
+
+
+def migrate(bind: Engine = engine) -> int:
+    """Create missing tables, then apply every pending migration. Returns the schema version."""
+    Base.metadata.create_all(bind)
+    with bind.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE IF NOT EXISTS schema_version ("
+            "version INTEGER PRIMARY KEY, description TEXT, applied_at TEXT)"
+        )
+
+    version = current_version(bind)
+    for number, description, upgrade in MIGRATIONS:
+        if number <= version:
+            continue
+        with bind.begin() as conn:
+            upgrade(conn)
+            conn.execute(
+                text("INSERT INTO schema_version (version, description, applied_at) VALUES (:v, :d, :t)"),
+                {"v": number, "d": description, "t": datetime.utcnow().isoformat()},
+            )
+        print(f"OK: Migration {number} applied ({description})")
+        version = number
+    return version
+
+
+if __name__ == "__main__":
+    print(f"Schema version: {migrate()}")
@@ -1,10 +1,17 @@
 """
 EONIX Preference Store — User preferences CRUD.
+
+`preference_cache` is the in-process copy everything at runtime should read:
+O(1) lookups, writes applied immediately and persisted through the DB writer,
+and subscribers notified of each change.
 """
-from typing import Dict, Optional
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from datetime import datetime
-from .db import Preference
+from .db import Preference, db_writer, get_read_db
 
 
 def get_preference(db: Session, key: str, default: Optional[str] = None) -> Optional[str]:
@@ -38,3 +45,100 @@ def delete_preference(db: Session, key: str) -> bool:
     db.delete(pref)
     db.commit()
     return True
+
+
+# ── Write-through cache ──────────────────────────────────────────
+
+Subscriber = Callable[[str, Optional[str]], None]  # (key, new value or None if deleted)
+
+
+class PreferenceCache:
+    """Preferences held in a dict, written through to SQLite in the background."""
+
+    def __init__(self):
+        self._values: Dict[str, str] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._subscribers: List[Tuple[Tuple[str, ...], Subscriber]] = []
+
+    def load(self) -> int:
+        """(Re)load from the database, notifying subscribers of every value that changed."""
+        db = get_read_db()
+        try:
+            fresh = get_all_preferences(db)
+        finally:
+            db.close()
+        with self._lock:
+            old, self._values, self._loaded = self._values, fresh, True
+        for key in old.keys() | fresh.keys():
+            if old.get(key) != fresh.get(key):
+                self._notify(key, fresh.get(key))
+        return len(fresh)
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self.load()
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        self._ensure_loaded()
+        return self._values.get(key, default)
+
+    def all(self) -> Dict[str, str]:
+        self._ensure_loaded()
+        return dict(self._values)
+
+    def set(self, key: str, value: str, source: str = "user") -> "Future[Preference]":
+        """Update the cache now; the returned future resolves once the row is committed."""
+        self._ensure_loaded()
+        with self._lock:
+            changed = self._values.get(key) != value
+            self._values[key] = value
+        if changed:
+            self._notify(key, value)
+        return db_writer.submit(lambda db: set_preference(db, key, value, source))
+
+    def delete(self, key: str) -> "Future[bool]":
+        self._ensure_loaded()
+        with self._lock:
+            existed = self._values.pop(key, None) is not None
+        if existed:
+            self._notify(key, None)
+        return db_writer.submit(lambda db: delete_preference(db, key))
+
+    def subscribe(self, callback: Subscriber, *keys: str) -> Callable[[], None]:
+        """Call `callback(key, value)` when any of `keys` (or any key, if none given) changes."""
+        entry = (keys, callback)
+        self._subscribers.append(entry)
+        return lambda: self._subscribers.remove(entry)
+
+    def _notify(self, key: str, value: Optional[str]) -> None:
+        for keys, callback in list(self._subscribers):
+            if keys and key not in keys:
+                continue
+            try:
+                callback(key, value)
+            except Exception as e:
+                print(f"WARNING: Preference subscriber failed for '{key}': {e}")
+
+
+# Global instance
+preference_cache = PreferenceCache()
+
+
+# ── Async API (for routes / the event loop) ──────────────────────
+# Reads are served from the cache; writes resolve once persisted.
+
+async def aget_preference(key: str, default: Optional[str] = None) -> Optional[str]:
+    return preference_cache.get(key, default)
+
+
+async def aset_preference(key: str, value: str, source: str = "user") -> Preference:
+    return await asyncio.wrap_future(preference_cache.set(key, value, source))
+
+
+async def aget_all_preferences() -> Dict[str, str]:
+    return preference_cache.all()
+
+
+async def adelete_preference(key: str) -> bool:
+    return await asyncio.wrap_future(preference_cache.delete(key))
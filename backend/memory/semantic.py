@@ -3,8 +3,14 @@ EONIX Semantic Memory — Long-term storage for facts and concepts using ChromaD
 """
 import uuid
 import os
+import math
 import time
-from typing import Any, Dict, List, Optional
+import asyncio
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .dedup import LSHIndex, minhash, similarity
+from ai.embeddings import ChromaEmbeddingFunction, embedding_service
 
 try:
     import chromadb
@@ -15,16 +21,78 @@ except Exception as e:
     chromadb = None  # type: ignore[assignment]
     CHROMADB_AVAILABLE = False
 
+def _cosine_distance(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return 1.0 - dot / norm if norm else 1.0
+
+
+# namespace → collection. Facts keep the original collection name.
+NAMESPACES: Dict[str, str] = {
+    "facts": "user_knowledge",
+    "notes": "notes",
+    "clipboard": "clipboard",
+    "web": "web_pages",
+}
+
+_RANGE_OPS = {"$gt": float.__gt__, "$gte": float.__ge__, "$lt": float.__lt__, "$lte": float.__le__}
+
+
+def build_where(type: Optional[str] = None, key: Optional[str] = None, source: Optional[str] = None,
+                since: Optional[float] = None, until: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Chroma `where` clause for the common metadata filters (times are epoch seconds on created_at)."""
+    clauses: List[Dict[str, Any]] = []
+    for name, value in (("type", type), ("key", key), ("source", source)):
+        if value is not None:
+            clauses.append({name: value})
+    if since is not None:
+        clauses.append({"created_at": {"$gte": float(since)}})
+    if until is not None:
+        clauses.append({"created_at": {"$lt": float(until)}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def _matches(meta: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate a `where` clause in Python (fallback store only)."""
+    if not where:
+        return True
+    if "$and" in where:
+        return all(_matches(meta, c) for c in where["$and"])
+    for name, cond in where.items():
+        value = meta.get(name)
+        if isinstance(cond, dict):
+            for op, bound in cond.items():
+                if value is None or not _RANGE_OPS[op](float(value), float(bound)):
+                    return False
+        elif value != cond:
+            return False
+    return True
+
+
 class SemanticMemory:
+    # Near-duplicate rules: textually close (MinHash) and semantically close,
+    # or practically the same embedding even if worded differently.
+    DUP_MIN_SIMILARITY = 0.8
+    DUP_MAX_DISTANCE = 0.15
+    DUP_EMBEDDING_ONLY_DISTANCE = 0.05
+
     def __init__(self) -> None:
         # Persistent storage in ./data/chroma
         self.db_path: str = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "chroma")
         os.makedirs(self.db_path, exist_ok=True)
         
         self.client: Any = None
-        self.collection: Any = None
+        self.collection: Any = None  # the "facts" namespace
+        self.collections: Dict[str, Any] = {}
         self.is_fallback: bool = False
-        self.fallback_memory: List[Dict[str, Any]] = []  # Simple list of dicts {text, metadata, id}
+        # Simple lists of dicts {text, metadata, id} per namespace
+        self.fallback_stores: Dict[str, List[Dict[str, Any]]] = {ns: [] for ns in NAMESPACES}
+        self.fallback_memory: List[Dict[str, Any]] = self.fallback_stores["facts"]
+        self.embed: Any = None
+        self.lsh = LSHIndex()  # side index of MinHash signatures, rebuilt from the store on start
+        self._lock = threading.RLock()
 
         if not CHROMADB_AVAILABLE:
             # Avoid UnicodeEncodeError on Windows consoles with non-UTF8 codepages.
@@ -39,11 +107,19 @@ class SemanticMemory:
             else:
                 raise ImportError("chromadb is not available")
             
-            # Initialize Collection
-            self.collection = self.client.get_or_create_collection(
-                name="user_knowledge",
-                metadata={"hnsw:space": "cosine"}
-            )
+            # Collections embed through the shared cached/batched service, so
+            # repeated queries and write-time duplicate checks reuse vectors
+            self.embed = ChromaEmbeddingFunction(embedding_service)
+            self.collections = {
+                ns: self.client.get_or_create_collection(
+                    name=name,
+                    metadata={"hnsw:space": "cosine"},
+                    embedding_function=self.embed,
+                )
+                for ns, name in NAMESPACES.items()
+            }
+            self.collection = self.collections["facts"]
+            self._rebuild_index()
             print(f"OK: SemanticMemory: Connected to ChromaDB at {self.db_path}")
             
         except Exception as e:
@@ -51,48 +127,157 @@ class SemanticMemory:
             self.is_fallback = True
             self.client = None
             self.collection = None
+            self.collections = {}
 
-    def store_fact(self, text: str, metadata: Optional[Dict[str, Any]] = None) -> str:
-        """Store a semantic fact."""
-        fact_id = str(uuid.uuid4())
-        meta = metadata or {}
-        # Ensure metadata values are strings/ints/floats (Chroma requirement)
-        clean_meta: Dict[str, str] = {k: str(v) for k, v in meta.items()}
-        
+    # ── Near-duplicate index ─────────────────────────────────────
+    def _rebuild_index(self, batch: int = 1000) -> None:
+        self.lsh.clear()
         if self.is_fallback or self.collection is None:
-            self.fallback_memory.append({
-                "id": fact_id,
-                "text": text,
-                "metadata": clean_meta,
-                "timestamp": time.time()
-            })
-            return fact_id
+            for m in self.fallback_memory:
+                self.lsh.add(m["id"], minhash(m["text"]))
+            return
+        offset = 0
+        while True:
+            page = self.collection.get(limit=batch, offset=offset, include=["documents"])
+            ids, docs = page.get("ids") or [], page.get("documents") or []
+            for fact_id, doc in zip(ids, docs):
+                self.lsh.add(fact_id, minhash(doc or ""))
+            if len(ids) < batch:
+                break
+            offset += batch
 
-        try:
-            self.collection.add(
-                documents=[text],
-                metadatas=[clean_meta],
-                ids=[fact_id]
-            )
-            return fact_id
-        except Exception as e:
-            print(f"ERROR: store_fact error: {e}")
-            return ""
+    def _find_duplicate(self, text: str, sig: Tuple[int, ...],
+                        embedding: Optional[List[float]]) -> Optional[Dict[str, Any]]:
+        """Closest stored fact that counts as a near-duplicate of `text`, if any."""
+        candidates = {c: similarity(sig, self.lsh.signatures[c]) for c in self.lsh.candidates(sig)}
+        candidates = {c: sim for c, sim in candidates.items() if sim >= self.DUP_MIN_SIMILARITY}
 
-    def retrieve_relevant(self, query: str, n_results: int = 3) -> List[Dict[str, Any]]:
-        """Retrieve most relevant facts for a query."""
         if self.is_fallback or self.collection is None:
-            # Simple fallback: return last N items
-            # (In a real fallback, we might do simple keyword matching)
-            memories: List[Dict[str, Any]] = []
+            if not candidates:
+                return None
+            best = max(candidates, key=candidates.get)
+            return next((m for m in self.fallback_memory if m["id"] == best), None)
+
+        found: Dict[str, Dict[str, Any]] = {}
+        if candidates:
+            got = self.collection.get(ids=list(candidates), include=["embeddings", "metadatas", "documents"])
+            for i, fact_id in enumerate(got.get("ids") or []):
+                dist = _cosine_distance(embedding, got["embeddings"][i])
+                if dist <= self.DUP_MAX_DISTANCE:
+                    found[fact_id] = {"id": fact_id, "text": got["documents"][i],
+                                      "metadata": got["metadatas"][i] or {}, "distance": dist}
+        if self.collection.count():
+            nearest = self.collection.query(query_embeddings=[embedding], n_results=1,
+                                            include=["metadatas", "documents", "distances"])
+            if nearest.get("ids") and nearest["ids"][0]:
+                dist = nearest["distances"][0][0]
+                if dist <= self.DUP_EMBEDDING_ONLY_DISTANCE:
+                    fact_id = nearest["ids"][0][0]
+                    found.setdefault(fact_id, {"id": fact_id, "text": nearest["documents"][0][0],
+                                               "metadata": nearest["metadatas"][0][0] or {},
+                                               "distance": dist})
+        return min(found.values(), key=lambda f: f["distance"]) if found else None
+
+    @staticmethod
+    def _bumped(meta: Dict[str, Any], update: Dict[str, Any], now: float, extra: int = 1) -> Dict[str, Any]:
+        """Metadata for a fact seen again: newest values win, count and recency go up."""
+        merged = {**meta, **update}
+        merged["count"] = int(meta.get("count", 1)) + extra
+        merged["created_at"] = meta.get("created_at", now)
+        merged["last_seen"] = now
+        return merged
+
+    def upsert_fact(self, text: str, metadata: Optional[Dict[str, Any]] = None) -> Tuple[str, bool]:
+        """Store a fact, or refresh a near-duplicate in place. Returns (id, was_duplicate)."""
+        meta = metadata or {}
+        # Ensure metadata values are strings/ints/floats (Chroma requirement)
+        clean_meta: Dict[str, Any] = {k: str(v) for k, v in meta.items()}
+        now = time.time()
+        sig = minhash(text)
+
+        with self._lock:
+            if self.is_fallback or self.collection is None:
+                dup = self._find_duplicate(text, sig, None)
+                if dup:
+                    dup["text"] = text
+                    dup["metadata"] = self._bumped(dup["metadata"], clean_meta, now)
+                    dup["timestamp"] = now
+                    self.lsh.add(dup["id"], sig)
+                    return dup["id"], True
+                fact_id = str(uuid.uuid4())
+                self.fallback_memory.append({
+                    "id": fact_id,
+                    "text": text,
+                    "metadata": {**clean_meta, "count": 1, "created_at": now, "last_seen": now},
+                    "timestamp": now
+                })
+                self.lsh.add(fact_id, sig)
+                return fact_id, False
+
+            try:
+                embedding = list(self.embed([text])[0])
+                dup = self._find_duplicate(text, sig, embedding)
+                if dup:
+                    self.collection.update(
+                        ids=[dup["id"]], documents=[text], embeddings=[embedding],
+                        metadatas=[self._bumped(dup["metadata"], clean_meta, now)],
+                    )
+                    self.lsh.add(dup["id"], sig)
+                    return dup["id"], True
+
+                fact_id = str(uuid.uuid4())
+                self.collection.add(
+                    documents=[text],
+                    embeddings=[embedding],
+                    metadatas=[{**clean_meta, "count": 1, "created_at": now, "last_seen": now}],
+                    ids=[fact_id]
+                )
+                self.lsh.add(fact_id, sig)
+                return fact_id, False
+            except Exception as e:
+                print(f"ERROR: store_fact error: {e}")
+                return "", False
+
+    def store_fact(self, text: str, metadata: Optional[Dict[str, Any]] = None) -> str:
+        """Store a semantic fact (near-duplicates update the existing one)."""
+        return self.upsert_fact(text, metadata)[0]
+
+    # ── Namespaced documents ────────────────────────────────────
+    def store_document(self, namespace: str, doc_id: str, text: str,
+                       metadata: Optional[Dict[str, Any]] = None) -> str:
+        """Insert or replace a document under a stable id (e.g. a URL or note title)."""
+        now = time.time()
+        meta: Dict[str, Any] = {k: str(v) for k, v in (metadata or {}).items()}
+        meta.setdefault("source", namespace)
+        meta["created_at"] = now
+
+        with self._lock:
+            if self.is_fallback or not self.collections:
+                store = self.fallback_stores[namespace]
+                store[:] = [m for m in store if m["id"] != doc_id]
+                store.append({"id": doc_id, "text": text, "metadata": meta, "timestamp": now})
+                return doc_id
+            try:
+                self.collections[namespace].upsert(ids=[doc_id], documents=[text], metadatas=[meta])
+                return doc_id
+            except Exception as e:
+                print(f"ERROR: store_document error ({namespace}): {e}")
+                return ""
+
+    def retrieve(self, query: str, namespace: str = "facts", n_results: int = 3,
+                 where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Nearest documents in one namespace. `where` is applied inside the vector query."""
+        if self.is_fallback or not self.collections:
+            # Simple fallback: keyword match, newest first
+            candidates = [m for m in self.fallback_stores[namespace] if _matches(m.get("metadata", {}), where)]
             query_words = query.split()
-            # Filter by simple keyword match if possible
             matches = [
-                m for m in self.fallback_memory 
+                m for m in candidates
                 if any(w.lower() in str(m.get("text", "")).lower() for w in query_words)
             ]
-            source = matches if matches else self.fallback_memory
-            
+            source = matches if matches else candidates
+
+            memories: List[Dict[str, Any]] = []
             for m in reversed(source):
                 if len(memories) >= n_results:
                     break
@@ -105,14 +290,16 @@ class SemanticMemory:
             return memories
 
         try:
-            if self.collection.count() == 0:
+            collection = self.collections[namespace]
+            if collection.count() == 0:
                 return []
-                
-            results = self.collection.query(
+
+            results = collection.query(
                 query_texts=[query],
-                n_results=n_results
+                n_results=n_results,
+                where=where,
             )
-            
+
             # Format results: list of {"text": ..., "score": ...}
             memories = []
             if results and isinstance(results, dict) and results.get('documents'):
@@ -121,7 +308,7 @@ class SemanticMemory:
                 metas = results.get('metadatas', [[]])[0]
                 ids = results.get('ids', [[]])[0]
                 dists = results.get('distances', [[]])[0]
-                
+
                 for i in range(len(docs)):
                     memories.append({
                         "text": docs[i],
@@ -130,20 +317,97 @@ class SemanticMemory:
                         "distance": dists[i] if dists and i < len(dists) else 0
                     })
             return memories
-            
+
         except Exception as e:
-            print(f"ERROR: retrieve_relevant error: {e}")
+            print(f"ERROR: retrieve error ({namespace}): {e}")
             return []
 
+    def retrieve_relevant(self, query: str, n_results: int = 3) -> List[Dict[str, Any]]:
+        """Retrieve most relevant facts for a query."""
+        return self.retrieve(query, "facts", n_results)
+
+    async def aretrieve_many(self, query: str, plan: Dict[str, int],
+                             where: Optional[Dict[str, Any]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Query several namespaces concurrently; `plan` maps namespace → k."""
+        namespaces = [ns for ns, k in plan.items() if k > 0 and ns in NAMESPACES]
+        results = await asyncio.gather(*(
+            asyncio.to_thread(self.retrieve, query, ns, plan[ns], where) for ns in namespaces
+        ))
+        return dict(zip(namespaces, results))
+
     def delete_fact(self, fact_id: str) -> None:
-        if self.is_fallback or self.collection is None:
-            self.fallback_memory = [m for m in self.fallback_memory if m.get("id") != fact_id]
-            return
+        with self._lock:
+            self.lsh.remove(fact_id)
+            if self.is_fallback or self.collection is None:
+                self.fallback_memory[:] = [m for m in self.fallback_memory if m.get("id") != fact_id]
+                return
 
-        try:
-            self.collection.delete(ids=[fact_id])
-        except Exception as e:
-            print(f"ERROR: delete_fact error: {e}")
+            try:
+                self.collection.delete(ids=[fact_id])
+            except Exception as e:
+                print(f"ERROR: delete_fact error: {e}")
+
+    def consolidate(self) -> Dict[str, int]:
+        """Merge near-duplicates already in the store. Keeps the most recently seen copy."""
+        with self._lock:
+            if self.is_fallback or self.collection is None:
+                facts = [{"id": m["id"], "text": m["text"], "metadata": m["metadata"], "embedding": None}
+                         for m in self.fallback_memory]
+            else:
+                got = self.collection.get(include=["documents", "metadatas", "embeddings"])
+                facts = [{"id": fact_id, "text": got["documents"][i], "metadata": got["metadatas"][i] or {},
+                          "embedding": got["embeddings"][i]}
+                         for i, fact_id in enumerate(got.get("ids") or [])]
+            self._rebuild_index()
+            by_id = {f["id"]: f for f in facts}
+
+            # Union-find over LSH candidate pairs that pass the same rules as write time
+            parent = {f["id"]: f["id"] for f in facts}
+
+            def find(x: str) -> str:
+                while parent[x] != x:
+                    parent[x] = parent[parent[x]]
+                    x = parent[x]
+                return x
+
+            for f in facts:
+                sig = self.lsh.signatures[f["id"]]
+                for other in self.lsh.candidates(sig):
+                    if other == f["id"] or other not in by_id or find(other) == find(f["id"]):
+                        continue
+                    if similarity(sig, self.lsh.signatures[other]) < self.DUP_MIN_SIMILARITY:
+                        continue
+                    if f["embedding"] is not None and _cosine_distance(
+                            f["embedding"], by_id[other]["embedding"]) > self.DUP_MAX_DISTANCE:
+                        continue
+                    parent[find(other)] = find(f["id"])
+
+            groups: Dict[str, List[Dict[str, Any]]] = {}
+            for f in facts:
+                groups.setdefault(find(f["id"]), []).append(f)
+
+            merged = removed = 0
+            now = time.time()
+            for members in groups.values():
+                if len(members) < 2:
+                    continue
+                members.sort(key=lambda f: float(f["metadata"].get("last_seen", 0)), reverse=True)
+                keep, drop = members[0], members[1:]
+                extra = sum(int(f["metadata"].get("count", 1)) for f in drop)
+                meta = self._bumped(keep["metadata"], {}, float(keep["metadata"].get("last_seen", now)), extra)
+                meta["created_at"] = min(float(f["metadata"].get("created_at", now)) for f in members)
+                drop_ids = [f["id"] for f in drop]
+                if self.is_fallback or self.collection is None:
+                    next(m for m in self.fallback_memory if m["id"] == keep["id"])["metadata"] = meta
+                    self.fallback_memory[:] = [m for m in self.fallback_memory if m["id"] not in drop_ids]
+                else:
+                    self.collection.update(ids=[keep["id"]], metadatas=[meta])
+                    self.collection.delete(ids=drop_ids)
+                for fact_id in drop_ids:
+                    self.lsh.remove(fact_id)
+                merged += 1
+                removed += len(drop_ids)
+            return {"groups": merged, "removed": removed}
 
     def store_user_fact(self, key: str, value: str) -> str:
         """Store a structured user fact (e.g., key='name', value='Harish')."""
@@ -199,5 +463,37 @@ class SemanticMemory:
             print(f"ERROR: get_all error: {e}")
             return []
 
-# Global instance
+class FactConsolidationJob:
+    """Background loop that periodically merges near-duplicate facts."""
+
+    INTERVAL = 12 * 3600  # seconds
+
+    def __init__(self, memory: SemanticMemory):
+        self.memory = memory
+        self.running = False
+
+    def run_once(self) -> Dict[str, int]:
+        result = self.memory.consolidate()
+        if result["removed"]:
+            print(f"OK: SemanticMemory: merged {result['removed']} duplicate facts into {result['groups']}")
+        return result
+
+    async def start(self):
+        self.running = True
+        while self.running:
+            try:
+                await asyncio.to_thread(self.run_once)
+            except Exception as e:
+                print(f"ERROR: Fact consolidation failed: {e}")
+            for _ in range(self.INTERVAL):
+                if not self.running:
+                    break
+                await asyncio.sleep(1)
+
+    def stop(self):
+        self.running = False
+
+
+# Global instances
 semantic_memory = SemanticMemory()
+consolidation_job = FactConsolidationJob(semantic_memory)
@@ -1,12 +1,117 @@
 """
 EONIX Task Store — CRUD operations for task history.
 """
-from datetime import datetime
-from typing import List, Optional, Dict, Any
+import base64
+from datetime import datetime, timedelta
+from typing import List, Optional, Dict, Any, Iterable, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, or_
-from .db import Task, get_db
+from sqlalchemy import desc, or_, tuple_
+from .db import Task, TaskStat, get_db, db_writer, run_read
+from .tdigest import TDigest
 
+STATS_DAYS = 30     # per-day breakdown window returned by get_task_stats
+STATS_INTENTS = 20  # intents are free text; only the most frequent are returned
+
+TASK_FIELDS = ("id", "created_at", "user_input", "brain_used", "intent",
+               "plan", "actions", "result", "success", "duration_ms")
+# Default projection for listings: everything except the JSON plan/actions blobs
+LIST_FIELDS = ("id", "user_input", "brain_used", "intent", "result", "success", "duration_ms", "created_at")
+
+
+# ── Stats rollup ─────────────────────────────────────────────────
+# task_stats holds one row per (dimension, key). Every write below adjusts
+# the affected rows in the same transaction, so reading stats never scans
+# `tasks`. Latency digests are add-only (sketches can't subtract values).
+
+def _stat_keys(brain_used: Optional[str], intent: Optional[str],
+               created_at: Optional[datetime]) -> List[Tuple[str, str]]:
+    keys = [("all", "*"), ("brain", brain_used or "unknown"), ("intent", intent or "unknown")]
+    if created_at:
+        keys.append(("day", created_at.strftime("%Y-%m-%d")))
+    return keys
+
+
+def _snapshot(task: Task) -> Dict[str, Any]:
+    return {"keys": _stat_keys(task.brain_used, task.intent, task.created_at),
+            "success": task.success, "duration_ms": task.duration_ms}
+
+
+def _stat_row(db: Session, dimension: str, key: str) -> TaskStat:
+    row = db.get(TaskStat, (dimension, key))
+    if row is None:
+        row = TaskStat(dimension=dimension, key=key, total=0, finished=0, succeeded=0)
+        db.add(row)
+        db.flush([row])  # sessions don't autoflush; make it visible to the next get()
+    return row
+
+
+def _apply(db: Session, snap: Dict[str, Any], sign: int) -> None:
+    for dimension, key in snap["keys"]:
+        row = _stat_row(db, dimension, key)
+        row.total += sign
+        row.finished += sign * (snap["success"] is not None)
+        row.succeeded += sign * (snap["success"] is True)
+
+
+def _record_latency(db: Session, keys: Iterable[Tuple[str, str]], duration_ms: int) -> None:
+    for dimension, key in keys:
+        row = _stat_row(db, dimension, key)
+        digest = TDigest.from_dict(row.latency)
+        digest.add(duration_ms)
+        row.latency = digest.to_dict()  # reassign so the JSON column is marked dirty
+
+
+def _track(db: Session, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]) -> None:
+    """Move a task's contribution from its old snapshot to its new one."""
+    if before:
+        _apply(db, before, -1)
+    if after:
+        _apply(db, after, +1)
+        if after["duration_ms"] is not None and (before is None or before["duration_ms"] is None):
+            _record_latency(db, after["keys"], after["duration_ms"])
+
+
+def rebuild_task_stats(db: Session, archived: Iterable[Dict[str, Any]] = ()) -> int:
+    """Recompute task_stats from scratch (hot rows plus any archived rows). Returns tasks counted."""
+    counts: Dict[Tuple[str, str], List[int]] = {}
+    digests: Dict[Tuple[str, str], TDigest] = {}
+    hot = db.query(Task.brain_used, Task.intent, Task.created_at, Task.success, Task.duration_ms)
+    cold = ((r.get("brain_used"), r.get("intent"), r.get("created_at"), r.get("success"), r.get("duration_ms"))
+            for r in archived)
+    counted = 0
+    for rows in (hot.all(), cold):
+        for brain_used, intent, created_at, success, duration_ms in rows:
+            for k in _stat_keys(brain_used, intent, created_at):
+                c = counts.setdefault(k, [0, 0, 0])
+                c[0] += 1
+                c[1] += success is not None
+                c[2] += success is True
+                if duration_ms is not None:
+                    digests.setdefault(k, TDigest()).add(duration_ms)
+            counted += 1
+
+    db.query(TaskStat).delete(synchronize_session=False)
+    db.add_all(
+        TaskStat(dimension=k[0], key=k[1], total=c[0], finished=c[1], succeeded=c[2],
+                 latency=digests[k].to_dict() if k in digests else None)
+        for k, c in counts.items()
+    )
+    db.commit()
+    return counted
+
+
+def _summary(row: TaskStat) -> Dict[str, Any]:
+    digest = TDigest.from_dict(row.latency)
+    p50, p95 = digest.quantile(0.5), digest.quantile(0.95)
+    return {
+        "total": row.total,
+        "success_rate": round(row.succeeded / row.finished * 100, 1) if row.finished else 0.0,
+        "p50_ms": round(p50) if p50 is not None else None,
+        "p95_ms": round(p95) if p95 is not None else None,
+    }
+
+
+# ── CRUD ─────────────────────────────────────────────────────────
 
 def create_task(db: Session, user_input: str, brain_used: str = "local") -> Task:
     task = Task(
@@ -15,6 +120,7 @@ def create_task(db: Session, user_input: str, brain_used: str = "local") -> Task
         created_at=datetime.utcnow()
     )
     db.add(task)
+    _track(db, None, _snapshot(task))
     db.commit()
     db.refresh(task)
     return task
@@ -24,9 +130,11 @@ def update_task(db: Session, task_id: int, **kwargs) -> Optional[Task]:
     task = db.query(Task).filter(Task.id == task_id).first()
     if not task:
         return None
+    before = _snapshot(task)
     for key, value in kwargs.items():
         if hasattr(task, key):
             setattr(task, key, value)
+    _track(db, before, _snapshot(task))
     db.commit()
     db.refresh(task)
     return task
@@ -51,28 +159,169 @@ def delete_task(db: Session, task_id: int) -> bool:
     task = db.query(Task).filter(Task.id == task_id).first()
     if not task:
         return False
+    _track(db, _snapshot(task), None)
     db.delete(task)
     db.commit()
     return True
 
 
 def get_success_rate(db: Session) -> float:
-    total = db.query(Task).filter(Task.success.isnot(None)).count()
-    if total == 0:
+    row = db.get(TaskStat, ("all", "*"))
+    if not row or not row.finished:
         return 0.0
-    successful = db.query(Task).filter(Task.success == True).count()
-    return round((successful / total) * 100, 1)
+    return round((row.succeeded / row.finished) * 100, 1)
 
 
 def get_task_stats(db: Session) -> Dict[str, Any]:
-    total = db.query(Task).count()
-    success_rate = get_success_rate(db)
-    by_brain = {}
-    for brain in ["local", "gemini"]:
-        count = db.query(Task).filter(Task.brain_used == brain).count()
-        by_brain[brain] = count
+    """Totals, success rates and latency percentiles, read from the rollup (no scans of `tasks`)."""
+    since = (datetime.utcnow() - timedelta(days=STATS_DAYS)).strftime("%Y-%m-%d")
+    rows = db.query(TaskStat).filter(
+        or_(TaskStat.dimension.in_(["all", "brain"]),
+            (TaskStat.dimension == "day") & (TaskStat.key >= since))
+    ).all()
+    rows += (db.query(TaskStat).filter(TaskStat.dimension == "intent")
+             .order_by(desc(TaskStat.total)).limit(STATS_INTENTS).all())
+
+    overall = TaskStat(total=0, finished=0, succeeded=0)
+    breakdown: Dict[str, Dict[str, Any]] = {"brain": {}, "intent": {}, "day": {}}
+    by_brain = {"local": 0, "gemini": 0, "claude": 0}
+    for row in rows:
+        if row.dimension == "all":
+            overall = row
+        elif row.total > 0:
+            breakdown[row.dimension][row.key] = _summary(row)
+            if row.dimension == "brain":
+                by_brain[row.key] = row.total
+
+    summary = _summary(overall)
+    digest = TDigest.from_dict(overall.latency)
+    p99 = digest.quantile(0.99)
     return {
-        "total": total,
-        "success_rate": success_rate,
-        "by_brain": by_brain
+        "total": summary["total"],
+        "success_rate": summary["success_rate"],
+        "by_brain": by_brain,
+        "latency_ms": {"p50": summary["p50_ms"], "p95": summary["p95_ms"],
+                       "p99": round(p99) if p99 is not None else None},
+        "brains": breakdown["brain"],
+        "intents": breakdown["intent"],
+        "days": dict(sorted(breakdown["day"].items())),
     }
+
+
+# ── Paged queries ────────────────────────────────────────────────
+# Keyset pagination on (created_at, id), newest first. The cursor is the
+# position of the last row returned, so each page is an index range scan
+# no matter how deep into history it is.
+
+def encode_cursor(created_at: datetime, task_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{task_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Raises ValueError for a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, task_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(task_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"invalid cursor: {cursor}") from e
+
+
+def parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """'id,plan' → ('id', 'plan'); None → LIST_FIELDS. Raises ValueError on unknown names."""
+    if not fields:
+        return LIST_FIELDS
+    names = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [n for n in names if n not in TASK_FIELDS]
+    if unknown:
+        raise ValueError(f"unknown task fields: {', '.join(unknown)}")
+    return names
+
+
+def _serialize(row: Any, fields: Iterable[str]) -> Dict[str, Any]:
+    out = {}
+    for name in fields:
+        value = getattr(row, name)
+        out[name] = value.isoformat() if isinstance(value, datetime) and value else value
+    return out
+
+
+def query_tasks(db: Session, limit: int = 20, cursor: Optional[str] = None,
+                fields: Iterable[str] = LIST_FIELDS, brain: Optional[str] = None,
+                success: Optional[bool] = None, intent: Optional[str] = None,
+                since: Optional[datetime] = None, until: Optional[datetime] = None
+                ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One page of tasks as dicts of the requested fields, plus the cursor for the next page."""
+    fields = tuple(fields)
+    # Only the requested columns are selected, so plan/actions JSON is never
+    # loaded or decoded unless asked for; id/created_at are needed for the cursor.
+    columns = [getattr(Task, name) for name in dict.fromkeys(("id", "created_at") + fields)]
+    q = db.query(*columns)
+    if brain is not None:
+        q = q.filter(Task.brain_used == brain)
+    if success is not None:
+        q = q.filter(Task.success == success)
+    if intent is not None:
+        q = q.filter(Task.intent == intent)
+    if since is not None:
+        q = q.filter(Task.created_at >= since)
+    if until is not None:
+        q = q.filter(Task.created_at < until)
+    if cursor:
+        created_at, task_id = decode_cursor(cursor)
+        q = q.filter(tuple_(Task.created_at, Task.id) < (created_at, task_id))
+
+    rows = q.order_by(desc(Task.created_at), desc(Task.id)).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        if last.created_at is not None:
+            next_cursor = encode_cursor(last.created_at, last.id)
+    return [_serialize(r, fields) for r in rows], next_cursor
+
+
+def get_task_fields(db: Session, task_id: int, fields: Iterable[str] = TASK_FIELDS) -> Optional[Dict[str, Any]]:
+    fields = tuple(fields)
+    row = db.query(*[getattr(Task, name) for name in fields]).filter(Task.id == task_id).first()
+    return _serialize(row, fields) if row else None
+
+
+# ── Async API (for routes / the event loop) ──────────────────────
+# Writes go through the single DB writer, reads through the read pool.
+
+async def acreate_task(user_input: str, brain_used: str = "local") -> Task:
+    return await db_writer.awrite(lambda db: create_task(db, user_input, brain_used))
+
+
+async def aupdate_task(task_id: int, **kwargs) -> Optional[Task]:
+    return await db_writer.awrite(lambda db: update_task(db, task_id, **kwargs))
+
+
+async def adelete_task(task_id: int) -> bool:
+    return await db_writer.awrite(lambda db: delete_task(db, task_id))
+
+
+async def aget_recent_tasks(limit: int = 20) -> List[Task]:
+    return await run_read(lambda db: get_recent_tasks(db, limit))
+
+
+async def asearch_tasks(query_text: str, limit: int = 10) -> List[Task]:
+    return await run_read(lambda db: search_tasks(db, query_text, limit))
+
+
+async def aget_task_by_id(task_id: int) -> Optional[Task]:
+    return await run_read(lambda db: get_task_by_id(db, task_id))
+
+
+async def aget_task_stats() -> Dict[str, Any]:
+    return await run_read(get_task_stats)
+
+
+async def aquery_tasks(**kwargs) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    return await run_read(lambda db: query_tasks(db, **kwargs))
+
+
+async def aget_task_fields(task_id: int, fields: Iterable[str] = TASK_FIELDS) -> Optional[Dict[str, Any]]:
+    return await run_read(lambda db: get_task_fields(db, task_id, fields))
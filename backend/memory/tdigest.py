@@ -0,0 +1,97 @@
+"""
+EONIX t-digest — Small, mergeable quantile sketch for latency percentiles.
+
+Keeps at most ~`compression` centroids no matter how many values are
+added, so a sketch can be stored in a JSON column and updated in O(1).
+Sketches merge by folding one's centroids into the other.
+"""
+import math
+from typing import Any, Dict, List, Optional
+
+
+class TDigest:
+    """Merging t-digest (Dunning) with the arcsine (k1) scale function."""
+
+    def __init__(self, compression: int = 100):
+        self.compression = compression
+        self.centroids: List[List[float]] = []  # [mean, weight], sorted by mean
+        self._buffer: List[List[float]] = []
+        self.count = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def add(self, value: float, weight: float = 1.0) -> None:
+        self._buffer.append([float(value), float(weight)])
+        self.count += weight
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if len(self._buffer) >= self.compression * 4:
+            self._compress()
+
+    def merge(self, other: "TDigest") -> None:
+        other._compress()
+        if not other.count:
+            return
+        self._buffer.extend([m, w] for m, w in other.centroids)
+        self.count += other.count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self._compress()
+
+    def _k(self, q: float) -> float:
+        return self.compression / (2 * math.pi) * math.asin(2 * min(max(q, 0.0), 1.0) - 1)
+
+    def _compress(self) -> None:
+        if not self._buffer:
+            return
+        points = sorted(self.centroids + self._buffer)
+        self._buffer = []
+        merged: List[List[float]] = []
+        before = 0.0  # weight of every centroid ahead of merged[-1]
+        for mean, weight in points:
+            if merged:
+                m, w = merged[-1]
+                # A centroid may span at most one unit of k-space
+                if self._k((before + w + weight) / self.count) - self._k(before / self.count) <= 1:
+                    merged[-1] = [m + (mean - m) * weight / (w + weight), w + weight]
+                    continue
+                before += w
+            merged.append([mean, weight])
+        self.centroids = merged
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated value at quantile q (0..1), or None if empty."""
+        self._compress()
+        if not self.centroids:
+            return None
+        if len(self.centroids) == 1:
+            return self.centroids[0][0]
+        target = q * self.count
+        prev_mean, prev_pos = self.min, 0.0
+        seen = 0.0
+        for mean, weight in self.centroids:
+            pos = seen + weight / 2
+            if target <= pos:
+                span = pos - prev_pos
+                frac = (target - prev_pos) / span if span else 0.0
+                return prev_mean + (mean - prev_mean) * frac
+            prev_mean, prev_pos = mean, pos
+            seen += weight
+        span = self.count - prev_pos
+        frac = (target - prev_pos) / span if span else 1.0
+        return prev_mean + (self.max - prev_mean) * frac
+
+    # ── Serialization ───────────────────────────────────────────
+    def to_dict(self) -> Dict[str, Any]:
+        self._compress()
+        return {"c": [[round(m, 3), w] for m, w in self.centroids],
+                "min": self.min, "max": self.max, "n": self.count}
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]], compression: int = 100) -> "TDigest":
+        digest = cls(compression)
+        if data:
+            digest.centroids = [list(c) for c in data.get("c", [])]
+            digest.min, digest.max = data.get("min"), data.get("max")
+            digest.count = data.get("n") or sum(w for _, w in digest.centroids)
+        return digest
@@ -1,8 +1,19 @@
 import pytest
 import sys
 import os
+import tempfile
 from unittest.mock import MagicMock
 
+# Point the app at a scratch database before anything imports config, so API
+# tests that reach the task/memory stores never write to memory/eonix.db
+_SCRATCH = tempfile.mkdtemp(prefix="eonix_test_")
+os.environ.setdefault("EONIX_DB_PATH", os.path.join(_SCRATCH, "eonix.db"))
+os.environ.setdefault("FILE_INDEX_PATH", os.path.join(_SCRATCH, "file_index.db"))
+os.environ.setdefault("CONTENT_INDEX_PATH", os.path.join(_SCRATCH, "content_index.db"))
+os.environ.setdefault("ORGANIZE_JOURNAL_PATH", os.path.join(_SCRATCH, "organize_journal.jsonl"))
+os.environ.setdefault("HASH_CACHE_PATH", os.path.join(_SCRATCH, "hash_cache.db"))
+os.environ.setdefault("DISK_USAGE_PATH", os.path.join(_SCRATCH, "disk_usage.db"))
+
 # Mock heavy dependencies to avoid installation requirement for tests
 sys.modules["chromadb"] = MagicMock()
 sys.modules["chromadb.PersistentClient"] = MagicMock()
@@ -21,6 +32,13 @@ sys.modules["google.generativeai"] = MagicMock()
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+@pytest.fixture(scope="session", autouse=True)
+def test_database():
+    """Create the scratch database's schema once per run."""
+    from memory.migrations import migrate
+    migrate()
+
+
 @pytest.fixture
 def client():
     from main import app
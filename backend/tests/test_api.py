@@ -52,3 +52,50 @@ def test_health_check(client):
             return  # At least one health endpoint works
     # If none return 200, that's still OK for now — just check the app starts
     assert True
+
+
+def test_file_stream_endpoint(client, tmp_path, monkeypatch):
+    """GET /api/files/stream should stream a file region as SSE chunk events."""
+    import json
+    from api import routes_files
+    monkeypatch.setattr(routes_files, "FILES_API_ROOTS", [str(tmp_path)])
+    log = tmp_path / "app.log"
+    log.write_text("".join(f"entry {i} é\n" for i in range(20000)), encoding="utf-8")
+
+    response = client.get("/api/files/stream", params={"path": str(log), "chunk": 1024})
+    assert response.status_code == 200
+    events = [json.loads(line[len("data: "):]) for line in response.text.splitlines() if line.startswith("data: ")]
+    assert events[0]["type"] == "start" and events[-1] == {"type": "done", "end": log.stat().st_size}
+    chunks = [e for e in events if e["type"] == "chunk"]
+    assert len(chunks) > 100 and "".join(e["text"] for e in chunks) == log.read_text(encoding="utf-8")
+
+    tail = client.get("/api/files/stream", params={"path": str(log), "tail": 2}).text
+    texts = [json.loads(line[len("data: "):]).get("text", "") for line in tail.splitlines() if line.startswith("data: ")]
+    assert "".join(texts) == "entry 19998 é\nentry 19999 é\n"
+    assert client.get("/api/files/stream", params={"path": str(tmp_path / "missing.log")}).status_code == 404
+
+    # Only allowed folders, and only for the app itself
+    outside = tmp_path.parent / "secret.txt"
+    outside.write_text("key")
+    assert client.get("/api/files/stream", params={"path": str(outside)}).status_code == 403
+    assert client.get("/api/files/stream", params={"path": str(tmp_path / "sub" / ".." / ".." / "secret.txt")}).status_code == 403
+    assert client.get("/api/files/stream", params={"path": str(log)},
+                      headers={"Origin": "https://evil.example"}).status_code == 403
+    assert client.get("/api/files/stream", params={"path": str(log)},
+                      headers={"Sec-Fetch-Site": "cross-site"}).status_code == 403
+    assert client.get("/api/files/stream", params={"path": str(log), "tail": 1},
+                      headers={"Origin": "http://localhost:5173"}).status_code == 200
+
+
+def test_disk_usage_endpoint(client, tmp_path):
+    """GET /api/files/usage should return a folder's subfolders by size and drill into a scanned one."""
+    (tmp_path / "big").mkdir()
+    (tmp_path / "big" / "a.bin").write_bytes(b"x" * 4000)
+    (tmp_path / "small").mkdir()
+    (tmp_path / "small" / "b.bin").write_bytes(b"x" * 100)
+
+    data = client.get("/api/files/usage", params={"path": str(tmp_path)}).json()
+    assert data["bytes"] == 4100 and [c["name"] for c in data["children"]] == ["big", "small"]
+    drill = client.get("/api/files/usage", params={"path": str(tmp_path / "big"), "rescan": False}).json()
+    assert drill["stats"] is None and drill["largest_files"][0]["name"] == "a.bin"
+    assert client.get("/api/files/usage", params={"path": str(tmp_path / "nope")}).status_code == 404
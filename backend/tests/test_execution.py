@@ -23,3 +23,655 @@ def test_app_launch(mocker):
     
     assert result is True
     mock_subprocess.assert_called_once()
+
+def test_tool_registry_builds_tools_on_first_use(tmp_path):
+    import sys
+    from tools import ToolRegistry
+    registry = ToolRegistry()
+    assert registry.loaded() == {}
+    assert "tools.screen_vision" not in sys.modules  # nothing heavy imported up front
+
+    target = tmp_path / "note.txt"
+    assert registry.execute("create_file", {"path": str(target), "content": "hi"}).success
+    assert list(registry.loaded()) == ["file_ops"]
+    assert registry.file_ops is registry.file_ops  # built once, then cached
+
+    assert registry.warm_up(["get_system_info"]) == {}
+    assert set(registry.loaded()) == {"file_ops", "system_info"}
+    assert not registry.execute("no_such_tool", {}).success
+
+def test_tool_result_cache_hits_and_invalidation(tmp_path, mocker):
+    from tools import ToolRegistry
+    registry = ToolRegistry()
+    spy = mocker.spy(registry.file_ops, "list_directory")
+    (tmp_path / "a.txt").write_text("one")
+
+    first = registry.execute("list_directory", {"path": str(tmp_path)})
+    again = registry.execute("list_directory", {"path": str(tmp_path)})
+    assert first.success and not first.cached
+    assert again.cached and again.message == first.message
+    assert spy.call_count == 1
+
+    # Creating a file in the folder drops the cached listing
+    assert registry.execute("create_file", {"path": str(tmp_path / "b.txt"), "content": "two"}).success
+    fresh = registry.execute("list_directory", {"path": str(tmp_path)})
+    assert not fresh.cached and "b.txt" in str(fresh.data)
+    assert spy.call_count == 2
+
+    read = registry.execute("read_file", {"path": str(tmp_path / "b.txt")})
+    assert registry.execute("read_file", {"path": str(tmp_path / "b.txt")}).cached
+    registry.execute("create_file", {"path": str(tmp_path / "b.txt"), "content": "changed"})
+    assert registry.execute("read_file", {"path": str(tmp_path / "b.txt")}).data["content"] == "changed"
+    assert read.success and not registry.execute("run_command", {}).success  # bad args, still invalidates
+    assert registry.cache.stats()["hits"] == 2
+
+def test_web_reader_streams_caches_and_revalidates(tmp_path):
+    import httpx
+    from tools.web_reader import WebReader, PageCache
+
+    requests, served = [], []
+    page = ("<html><head><title>Caf\xe9</title><script>var x = 1;</script></head><body>"
+            "<p>Bonjour caf\xe9 cr\xe8me, a readable paragraph of text.</p>"
+            + "".join(f"<p>Filler paragraph number {i} with some words.</p>" for i in range(2000))
+            + "</body></html>").encode("latin-1")
+
+    async def body():
+        for i in range(0, len(page), 1024):
+            served.append(i)
+            yield page[i:i + 1024]
+
+    def handler(request):
+        requests.append(dict(request.headers))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"cache-control": "max-age=0"})
+        return httpx.Response(200, content=body(), headers={
+            "content-type": "text/html; charset=ISO-8859-1", "etag": '"v1"', "cache-control": "max-age=0"})
+
+    reader = WebReader(cache=PageCache(str(tmp_path)))
+    reader._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    first = reader.execute("https://example.com/a", max_chars=500)
+    assert first.success and "Bonjour café crème" in first.message
+    assert "var x" not in first.message and first.data["title"] == "Café"
+    assert first.data["truncated"] and len(served) < len(page) // 1024 / 2  # stopped reading early
+
+    again = reader.execute("https://example.com/a", max_chars=500)
+    assert again.data["from_cache"] and again.message == first.message
+    assert requests[-1]["if-none-match"] == '"v1"'  # stale entry was revalidated, not refetched
+    assert len(requests) == 2
+
+def test_read_webpages_fetches_concurrently_with_host_limit_and_deadline(tmp_path):
+    import asyncio
+    import time
+    import httpx
+    from tools.web_reader import WebReader, PageCache
+
+    active, peak = {}, {}
+    nav = "<p>Home | About | Contact us today</p>"
+
+    async def handler(request):
+        host = request.url.host
+        active[host] = active.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), active[host])
+        try:
+            await asyncio.sleep(5 if request.url.path == "/slow" else 0.05)
+        finally:
+            active[host] -= 1
+        body = f"<html><title>{request.url.path}</title><body>{nav}" \
+               f"<p>Unique article text for {request.url} that is long enough to keep.</p></body></html>"
+        return httpx.Response(200, text=body, headers={"content-type": "text/html; charset=utf-8"})
+
+    reader = WebReader(cache=PageCache(str(tmp_path)))
+    reader._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    urls = [f"https://a.example/{i}" for i in range(6)] + ["https://b.example/1", "https://b.example/slow"]
+
+    t0 = time.perf_counter()
+    result = reader.execute_many(urls, deadline=1.0)
+    elapsed = time.perf_counter() - t0
+    assert result.success and elapsed < 2.5  # the slow page was cut off at the deadline
+    assert peak["a.example"] <= 4  # WEB_PER_HOST
+    assert len(result.data["pages"]) == 7
+    assert result.data["failed"] == [{"url": "https://b.example/slow", "error": "timed out after 1s"}]
+    digest = result.data["digest"]
+    assert digest.count("Home | About") == 1  # boilerplate shared by every page kept once
+    assert all(f"Unique article text for {u}" in digest for u in urls[:7])
+
+def test_browser_service_runs_sites_concurrently_in_warm_tabs():
+    import asyncio
+    import time
+    from tools.browser_service import BrowserService
+    from tools.browser_controller import BrowserController
+    from tools.tool_result import ToolResult
+
+    class FakePage:
+        def __init__(self):
+            self.url, self.closed, self.crashed = "about:blank", False, False
+        def is_closed(self): return self.closed
+        async def evaluate(self, expr):
+            if self.crashed:
+                raise RuntimeError("Target crashed")
+            return 1 if expr == "1" else None
+        async def close(self): self.closed = True
+        async def bring_to_front(self): pass
+        async def goto(self, url, **_):
+            await asyncio.sleep(0.2)  # a slow page load
+            self.url = url
+
+    class FakeContext:
+        def __init__(self): self.opened = [FakePage()]  # persistent contexts start with a blank tab
+        @property
+        def pages(self): return [p for p in self.opened if not p.closed]
+        async def new_page(self):
+            self.opened.append(FakePage())
+            return self.opened[-1]
+        def on(self, event, callback): pass
+
+    class FakeBrowser(BrowserService):
+        async def open(self):
+            self.ctx = FakeContext()
+            return self.ctx
+
+    service = FakeBrowser("TestBrowser", max_tabs=3)
+    controller = BrowserController(service)
+
+    t0 = time.perf_counter()
+    async def both():
+        return await asyncio.gather(controller.aexecute("open_url", url="example.com"),
+                                    controller.aexecute("youtube_search", query="lofi"))
+    opened, searched = asyncio.run(both())
+    assert opened.success and searched.success
+    assert time.perf_counter() - t0 < 2.0 + 0.35  # youtube_search settles 2s; the loads overlapped
+    ctx = service.ctx
+    assert ctx.opened[0].url == "https://example.com"  # generic adopted the startup tab
+    yt = ctx.opened[1]
+
+    # Same site: the warm tab is reused, and a crashed one is replaced
+    done = lambda page: asyncio.sleep(0, ToolResult(success=True, message="ok"))
+    service.run(service.submit("youtube", done))
+    assert len(ctx.opened) == 2 and service.tabs.hits == 1
+    yt.crashed = True
+    service.run(service.submit("youtube", done))
+    assert yt.closed and len(ctx.opened) == 3
+
+    # Per-action timeout, and the action shows as pending while it runs
+    async def hang(page):
+        await asyncio.sleep(5)
+    future = service.runner.submit(service.submit("gmail", hang, label="gmail_send", timeout=0.3))
+    time.sleep(0.1)
+    assert [(p["action"], p["state"]) for p in service.pending()] == [("gmail_send", "running")]
+    result = future.result(2)
+    assert not result.success and "timed out after 0.3s" in result.message
+    assert service.pending() == []
+    assert service.tabs.keys() == ["generic", "youtube", "gmail"]
+
+    # A 4th site evicts the least recently used idle tab
+    service.run(service.submit("whatsapp", done))
+    assert ctx.opened[0].closed and service.tabs.keys() == ["youtube", "gmail", "whatsapp"]
+    service.runner.stop()
+
+def test_whatsapp_batch_reuses_one_session_and_reports_each_message():
+    import asyncio
+    from tools import _message_pairs
+    from tools.browser_service import BrowserService
+    from tools.whatsapp_tool import WhatsAppTool, JS_FOCUS_COMPOSE, WHATSAPP_URL
+
+    class FakeKeyboard:
+        def __init__(self, page): self.page = page
+        async def type(self, text, delay=0): self.page.typed.append(text)
+        async def press(self, key): self.page.keys.append(key)
+
+    class FakeLocator:
+        async def click(self, timeout=None): raise RuntimeError("not found")
+
+    class FakePage:
+        def __init__(self):
+            self.url, self.typed, self.keys, self.gotos = "about:blank", [], [], 0
+            self.keyboard = FakeKeyboard(self)
+        def is_closed(self): return False
+        async def evaluate(self, expr, arg=None):
+            if expr == JS_FOCUS_COMPOSE:  # the compose box never shows up in Nobody's chat
+                return "Nobody" not in self.typed[-1:]
+            return 1 if expr == "1" else True
+        async def wait_for_function(self, expr, arg=None, timeout=None): return True
+        async def goto(self, url, **_):
+            self.gotos += 1
+            self.url = url + "/"
+        async def bring_to_front(self): pass
+        def locator(self, selector): return FakeLocator()
+        def get_by_placeholder(self, text): return FakeLocator()
+
+    class FakeContext:
+        def __init__(self): self.pages = [FakePage()]
+        def on(self, event, callback): pass
+
+    class FakeSession(BrowserService):
+        opens = 0
+        async def open(self):
+            FakeSession.opens += 1
+            self.ctx = FakeContext()
+            return self.ctx
+
+    session = FakeSession("TestWhatsApp", homes={"whatsapp": WHATSAPP_URL})
+    tool = WhatsAppTool(session)
+    pairs = _message_pairs([{"contact": "Mom", "message": "home by 7"}, ["Nobody", "hi"], ("Raj", "ok")])
+    assert pairs == [("Mom", "home by 7"), ("Nobody", "hi"), ("Raj", "ok")]
+    assert _message_pairs(contacts="Mom, Raj", message="hi") == [("Mom", "hi"), ("Raj", "hi")]
+
+    result = tool.send_batch(pairs)
+    single = asyncio.run(tool.asend_message("Mom", "again"))
+    page = session.ctx.pages[0]
+    assert FakeSession.opens == 1 and page.gotos == 1  # one connection, one app load for 4 messages
+    assert single.success and result.success and result.data["sent"] == 2 and result.data["failed"] == 1
+    rows = result.data["results"]
+    assert [(r["contact"], r["status"]) for r in rows] == [("Mom", "sent"), ("Nobody", "failed"), ("Raj", "sent")]
+    assert {"search_ms", "send_ms", "total_ms"} <= rows[0].keys()
+    assert "message input" in rows[1]["error"] and "Escape" in page.keys
+    assert page.typed == ["Mom", "home by 7", "Nobody", "Raj", "ok", "Mom", "again"]
+    session.runner.stop()
+
+def test_whatsapp_never_sends_to_a_chat_that_is_not_the_contact():
+    from tools.browser_service import BrowserService
+    from tools.whatsapp_tool import WhatsAppTool, JS_RESULT_SHOWN, JS_CLICK_RESULT, JS_CHAT_IS, JS_CHAT_TITLE, WHATSAPP_URL
+
+    class FakeKeyboard:
+        def __init__(self, page): self.page = page
+        async def type(self, text, delay=0): self.page.typed.append(text)
+        async def press(self, key): self.page.keys.append(key)
+
+    class FakePage:
+        """Search finds Mom and Mommy, but clicking Mommy doesn't switch chats; Stranger isn't found."""
+        def __init__(self):
+            self.url, self.typed, self.keys = WHATSAPP_URL + "/", [], []
+            self.open_chat = ""
+            self.keyboard = FakeKeyboard(self)
+        def is_closed(self): return False
+        async def evaluate(self, expr, arg=None):
+            if expr == JS_CLICK_RESULT:
+                if arg not in ("Mom", "Mommy"):
+                    return False
+                if arg == "Mom":
+                    self.open_chat = "Mom"
+                return True
+            if expr == JS_CHAT_TITLE:
+                return self.open_chat
+            return True
+        async def wait_for_function(self, expr, arg=None, timeout=None):
+            if expr == JS_RESULT_SHOWN and arg not in ("Mom", "Mommy"):
+                raise TimeoutError("no result")
+            if expr == JS_CHAT_IS and arg.lower() not in self.open_chat.lower():
+                raise TimeoutError("other chat")
+            return True
+        async def goto(self, url, **_): self.url = url + "/"
+        async def bring_to_front(self): pass
+
+    class FakeContext:
+        def __init__(self): self.pages = [FakePage()]
+        def on(self, event, callback): pass
+
+    class FakeSession(BrowserService):
+        async def open(self):
+            self.ctx = FakeContext()
+            return self.ctx
+
+    session = FakeSession("TestWhatsAppGuard", homes={"whatsapp": WHATSAPP_URL})
+    tool = WhatsAppTool(session)
+    result = tool.send_batch([("Mom", "home by 7"), ("Stranger", "secret plan"), ("Mommy", "hi")])
+    page = session.ctx.pages[0]
+    rows = result.data["results"]
+    assert [(r["contact"], r["status"]) for r in rows] == [("Mom", "sent"), ("Stranger", "failed"), ("Mommy", "failed")]
+    assert "No WhatsApp chat found" in rows[1]["error"]
+    assert "open chat is 'Mom', not 'Mommy'" in rows[2]["error"]
+    # Mom's chat was still open: neither message went into it
+    assert "secret plan" not in page.typed and "hi" not in page.typed
+    assert page.keys.count("Enter") == 1  # only Mom's message was sent
+    session.runner.stop()
+
+def test_file_index_crawls_searches_and_refreshes(tmp_path):
+    import shutil
+    from tools.file_index import FileIndex
+    from tools.file_ops import FileOps
+    import tools.file_ops as file_ops_module
+
+    root = tmp_path / "home"
+    for i in range(5):
+        docs = root / f"proj{i}" / "docs"
+        docs.mkdir(parents=True)
+        (docs / f"Invoice 2023-{i}.pdf").write_text("x" * i)
+        (docs / f"report_{i}.txt").write_text("r")
+    (root / "node_modules" / "pkg").mkdir(parents=True)
+    (root / "node_modules" / "pkg" / "invoice.pdf").write_text("skip me")
+
+    index = FileIndex(str(tmp_path / "index.db"), workers=4)
+    first = index.crawl(str(root))
+    assert first["indexed"] == 5 * 4 + 1  # projN, docs and two files each; node_modules listed, not descended
+    assert index.crawl(str(root))["listed"] == 0  # nothing changed: no directory re-listed
+
+    pdfs = index.search("*.pdf", root=str(root), limit=100)
+    assert sorted(h["name"] for h in pdfs) == [f"Invoice 2023-{i}.pdf" for i in range(5)]  # node_modules skipped
+    assert [h["name"] for h in index.search("REPORT_3")] == ["report_3.txt"]  # case-insensitive substring
+    assert index.search("invoce 2023-4", mode="fuzzy", limit=1)[0]["name"] == "Invoice 2023-4.pdf"
+    assert {h["type"] for h in index.search("docs", kind="folder")} == {"folder"}
+
+    shutil.rmtree(root / "proj0")
+    (root / "inbox" / "deep").mkdir(parents=True)
+    (root / "inbox" / "deep" / "fresh.md").write_text("new")
+    index.refresh_dir(str(root))
+    assert [h["name"] for h in index.search("fresh")] == ["fresh.md"]  # new subtree crawled
+    assert index.search("2023-0", mode="substring") == [] and index.search("proj0", mode="substring") == []
+
+    ops = FileOps()
+    file_ops_module.file_index, saved = index, file_ops_module.file_index
+    try:
+        result = ops.search_files(str(root), "*.txt")
+        assert result.data["indexed"] and len(result.data["matches"]) == 4
+        outside = ops.search_files(str(tmp_path), "index.db")  # not under a crawled root: glob walk
+        assert not outside.data["indexed"] and outside.data["matches"] == [str(tmp_path / "index.db")]
+        index.watching.add(str(root))
+        listed = ops.list_directory(str(root / "proj1" / "docs"))
+        assert sorted(i["name"] for i in listed.data["items"]) == ["Invoice 2023-1.pdf", "report_1.txt"]
+        # Skipped folders still show up in their parent's listing from the index
+        assert [e["name"] for e in index.listing(str(root)) if e["name"] == "node_modules"] == ["node_modules"]
+    finally:
+        file_ops_module.file_index = saved
+
+
+def test_content_index_updates_incrementally_and_ranks_snippets(tmp_path, monkeypatch):
+    import tools.content_index as content_module
+    from tools.content_index import ContentIndex, ContentSearch
+    from tools.file_index import FileIndex
+
+    root = tmp_path / "home"
+    for i in range(6):
+        folder = root / f"proj{i}"
+        folder.mkdir(parents=True)
+        (folder / "notes.md").write_text("intro\n" * 400 + f"budget review for project {i}\n")
+        (folder / "photo.jpg").write_bytes(b"budget")  # not a text extension
+    (root / "proj0" / "plan.txt").write_text("budget budget budget review\n")
+    (root / "proj1" / "blob.txt").write_bytes(b"budget\0\0\0")  # binary content
+    (root / ".git").mkdir()
+    (root / ".git" / "HEAD.txt").write_text("budget")
+
+    monkeypatch.setattr(content_module, "POOL_MIN", 1)  # exercise the extractor processes
+    files = FileIndex(str(tmp_path / "files.db"))
+    index = ContentIndex(str(tmp_path / "content.db"), workers=2, files=files)
+    first = index.update(str(root))
+    assert first["files"] == 8 and first["changed"] == 8  # 6 notes, plan, blob; .git and jpg skipped
+    assert index.update(str(root))["changed"] == 0
+
+    hits = index.search("budget reviews")  # porter stemming
+    assert len(hits) == 7 and hits[0]["path"].endswith("plan.txt")
+    deep = next(h for h in hits if h["path"].endswith(os.path.join("proj3", "notes.md")))
+    assert deep["line"] > 1 and "[budget] [review]" in deep["snippet"]  # chunk holding the match
+    assert [h["path"] for h in index.search("budget", root=str(root / "proj2"))] == [str(root / "proj2" / "notes.md")]
+    assert index.search("review project 4 nonexistentword")[0]["path"].endswith(os.path.join("proj4", "notes.md"))
+
+    (root / "proj0" / "plan.txt").write_text("travel itinerary\n")
+    (root / "proj5" / "notes.md").unlink()
+    update = index.update(str(root))
+    assert update["changed"] == 1 and update["removed"] == 1
+    assert index.search("itinerary")[0]["path"].endswith("plan.txt")
+    assert not any(h["path"].endswith(os.path.join("proj5", "notes.md")) for h in index.search("budget"))
+
+    files.crawl(str(root))
+    files.watching.add(str(root))  # live filename index: candidates come from it
+    assert sorted(index.candidates(str(root))) == sorted(content_module._walk(str(root)))
+
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / "todo.txt").write_text("call the plumber\n")
+    result = ContentSearch(index).execute("plumber", path=str(other))  # indexed on first search
+    assert result.success and result.data["results"][0]["path"] == str(other / "todo.txt")
+
+
+def test_read_file_regions_of_a_large_log(tmp_path):
+    from tools import ToolRegistry
+    from tools import file_reader
+
+    log = tmp_path / "big.log"
+    with open(log, "w", encoding="utf-8") as f:
+        for i in range(1, 200001):
+            f.write(f"line {i} {'x' * (i % 40)}\n")
+    registry = ToolRegistry()
+
+    last = registry.execute("read_file", {"path": str(log), "tail": 3})
+    assert last.data["content"].splitlines() == [f"line {i} {'x' * (i % 40)}" for i in range(199998, 200001)]
+    middle = registry.execute("read_file", {"path": str(log), "start_line": 150000, "end_line": 150001})
+    assert middle.data["content"].splitlines() == ["line 150000 ", "line 150001 x"]
+    assert middle.data["lines"] == 200000
+    assert registry.execute("read_file", {"path": str(log), "offset": -13}).data["content"] == "line 200000 \n"
+    assert not registry.execute("read_file", {"path": str(log)}).data["content"].startswith("line 199")  # head
+    assert registry.execute("read_file", {"path": str(log), "tail": 100000}).data["truncated"]
+
+    with open(log, "a", encoding="utf-8") as f:
+        f.write("appended\nno newline")
+    grown = registry.execute("read_file", {"path": str(log), "start_line": 200001})  # file changed: cache miss
+    assert grown.data["content"] == "appended\nno newline" and grown.data["lines"] == 200002
+
+    log.write_text("rewritten\n" * 3)  # smaller rewrite: index rebuilt, not extended
+    assert file_reader.read_lines(str(log), 2, 2)["content"] == "rewritten\n"
+    assert file_reader.tail(str(log), 1)["content"] == "rewritten\n"
+
+
+def test_organizer_plans_by_rules_and_parallel_brain_chunks(tmp_path, monkeypatch):
+    import re
+    import json
+    import asyncio
+    import tools.file_organizer as organizer_module
+    from tools.file_organizer import FileOrganizer
+
+    root = tmp_path / "Downloads"
+    (root / "nested" / "deeper").mkdir(parents=True)
+    (root / "Images").mkdir()
+    (root / "Images" / "done.png").write_bytes(b"")  # already in place
+    for i in range(12):
+        (root / f"photo{i}.JPG").write_bytes(b"")
+        (root / f"invoice {i}.pdf").write_bytes(b"")
+        (root / "nested" / f"song{i}.mp3").write_bytes(b"")
+    (root / "nested" / "deeper" / "cover.pdf").write_bytes(b"")
+    (root / "notes.txt").write_text("Trip to Chennai: flights and hotel")
+    (root / "mystery.blob").write_bytes(b"")
+    (root / ".hidden.pdf").write_bytes(b"")
+
+    class FakeBrain:
+        calls = running = peak = 0
+
+        async def chat(self, prompt):
+            FakeBrain.calls += 1
+            FakeBrain.running += 1
+            FakeBrain.peak = max(FakeBrain.peak, FakeBrain.running)
+            await asyncio.sleep(0.05)
+            FakeBrain.running -= 1
+            names = re.findall(r'"filename": "(.*?)"', prompt)
+            if "mystery.blob" in names:
+                return "Sorry, I can't help with that."  # unparsable: these files fall back to rules
+            folder = "Travel" if "Chennai" in prompt else ("Finance" if FakeBrain.calls % 2 else "finance")
+            return "```json\n" + json.dumps([{"filename": n, "target_folder": folder, "reason": "r"}
+                                             for n in names[:-1]]) + "\n```"  # last one left out
+
+    monkeypatch.setattr(organizer_module, "ORGANIZE_CHUNK", 3)
+    organizer = FileOrganizer()
+    scan = organizer.scan_directory(str(root))
+    files = scan["files"]
+    assert len(files) == 12 * 2 + 2 and scan["folders"] == []  # top level only, hidden file skipped
+    result = organizer.plan(str(root), [dict(f) for f in files], FakeBrain())
+    plan = {item["filename"]: item for item in result["plan"]}
+
+    assert plan["photo3.JPG"]["target_folder"] == "Images" and plan["photo3.JPG"]["source"] == "rule"
+    assert not any(i["filename"].startswith(("nested", "Images")) for i in result["plan"])
+    ai = [i for i in result["plan"] if i["source"] == "ai"]
+    assert ai and {i["target_folder"] for i in ai} <= {"Finance", "finance", "Travel"}
+    assert len({i["target_folder"] for i in ai if i["target_folder"].lower() == "finance"}) == 1  # one spelling
+    assert plan["mystery.blob"]["target_folder"] == "Other"
+    assert result["stats"]["ai_chunks"] == FakeBrain.calls == 5 and result["stats"]["failed_chunks"] == 1
+    assert 1 < FakeBrain.peak <= organizer_module.ORGANIZE_PARALLEL
+    assert len(result["plan"]) == len(files)
+
+    no_brain = organizer.plan(str(root), [dict(f) for f in files])
+    assert {i["source"] for i in no_brain["plan"]} == {"rule"}
+    assert any(i["target_folder"] == "Documents" and i["filename"].endswith(".pdf") for i in no_brain["plan"])
+
+    # Recursive: a user subfolder moves whole by its main content; its tree is never split up
+    folders = organizer.scan_directory(str(root), recursive=True)["folders"]
+    assert folders == [{"name": "nested", "path": "nested", "category": "Audio", "files": 13, "size": 0}]
+    assert organizer.plan(str(root), [], None, folders)["plan"] == [
+        {"filename": "nested", "target_folder": "Audio", "reason": "folder of 13 files, mostly audio",
+         "source": "folder"}]
+
+
+def test_recursive_organize_keeps_nested_trees_and_is_stable(tmp_path, monkeypatch):
+    from tools.file_organizer import FileOrganizer
+
+    root = tmp_path / "Desktop"
+    for rel in ("myapp/src/main.py", "myapp/README.md", "Images/2019/trip.jpg", "Documents/Invoices/inv1.pdf",
+                "loose.png", "Finance/tax.pdf"):
+        (root / rel).parent.mkdir(parents=True, exist_ok=True)
+        (root / rel).write_text(rel)
+    organizer = FileOrganizer()
+    monkeypatch.setattr(FileOrganizer, "_brain", staticmethod(lambda: None))
+
+    result = organizer.organize(str(root), recursive=True)
+    assert sorted((i["filename"], i["target_folder"]) for i in result.data["plan"]) == [
+        ("Finance", "Documents"), ("loose.png", "Images"), ("myapp", "Code")]
+
+    moved = organizer.organize(str(root), auto_confirm=True, recursive=True)
+    assert moved.data["moved"] == 3
+    assert (root / "Code" / "myapp" / "src" / "main.py").exists()
+    assert (root / "Images" / "2019" / "trip.jpg").exists() and (root / "Images" / "loose.png").exists()
+    assert (root / "Documents" / "Invoices" / "inv1.pdf").exists()
+    assert (root / "Documents" / "Finance" / "tax.pdf").exists()
+    assert not organizer.organize(str(root), recursive=True).data.get("plan")  # a second run moves nothing
+
+
+def test_journaled_moves_can_be_undone(tmp_path, monkeypatch):
+    import json
+    from tools.file_mover import FileMover, MoveJournal
+
+    root = tmp_path / "Downloads"
+    (root / "Images").mkdir(parents=True)
+    (root / "Images" / "a.png").write_text("already there")
+    for name in ("a.png", "b.png", "c.pdf", "d.pdf"):
+        (root / name).write_text(name)
+    (root / "sub").mkdir()
+    (root / "sub" / "e.pdf").write_text("e")
+    plan = [{"filename": "a.png", "target_folder": "Images"}, {"filename": "b.png", "target_folder": "Images"},
+            {"filename": "c.pdf", "target_folder": "Documents/Work"},
+            {"filename": os.path.join("sub", "e.pdf"), "target_folder": "Documents/Work"},
+            {"filename": "missing.pdf", "target_folder": "Documents/Work"},
+            {"filename": "d.pdf", "target_folder": "Documents"}]
+
+    journal = MoveJournal(str(tmp_path / "journal.jsonl"))
+    mover = FileMover(journal, workers=2)
+    events = []
+    mover.on_progress(events.append)
+    # Documents/ counts as another device: those moves go through the copy pool
+    monkeypatch.setattr(FileMover, "_same_device",
+                        staticmethod(lambda a, b, cache: "Documents" not in b))
+    result = mover.move(str(root), plan)
+
+    assert result["moved"] == 5 and result["cross_device"] == 4 and len(result["errors"]) == 1
+    assert (root / "Images" / "a.png").read_text() == "already there"
+    renamed = [p.name for p in (root / "Images").iterdir() if p.name.startswith("a_")]
+    assert len(renamed) == 1 and (root / "Images" / renamed[0]).read_text() == "a.png"
+    assert (root / "Documents" / "Work" / "e.pdf").read_text() == "e" and not (root / "sub" / "e.pdf").exists()
+    assert events[-1]["finished"] and events[-1]["done"] == 5 and events[-1]["total"] == 6
+
+    ops = [json.loads(line)["op"] for line in open(journal.path)]
+    assert ops[0] == "begin" and ops[-1] == "end" and ops.count("move") == 5 and ops.count("mkdir") == 2
+
+    undo = mover.undo_last()
+    assert undo["moved"] == 5 and not undo["errors"] and undo["folders_removed"] == 2
+    assert sorted(p.name for p in root.iterdir()) == ["Images", "a.png", "b.png", "c.pdf", "d.pdf", "sub"]
+    assert (root / "sub" / "e.pdf").read_text() == "e"
+    assert [p.name for p in (root / "Images").iterdir()] == ["a.png"]
+    assert mover.undo_last() is None  # the only run is already undone
+
+
+def test_duplicates_found_by_size_partial_then_full_hash(tmp_path):
+    from tools.duplicate_finder import DuplicateScan, DuplicateFinder, HashCache, PARTIAL_BLOCK
+    from tools.file_index import FileIndex
+
+    root = tmp_path / "Downloads"
+    (root / "old").mkdir(parents=True)
+    big = os.urandom(4 * PARTIAL_BLOCK)
+    (root / "movie.mp4").write_bytes(big)
+    (root / "old" / "movie (1).mp4").write_bytes(big)
+    # Same size, same first and last blocks, different middle: only the full hash tells them apart
+    (root / "movie_cut.mp4").write_bytes(big[:2 * PARTIAL_BLOCK] + b"x" * PARTIAL_BLOCK + big[-PARTIAL_BLOCK:])
+    (root / "notes.txt").write_text("same notes")
+    (root / "old" / "notes copy.txt").write_text("same notes")
+    (root / "other.txt").write_text("diff notes")
+    os.link(root / "notes.txt", root / "notes_link.txt")  # a hard link is not a copy
+    (root / "empty1").write_bytes(b"")
+    (root / "empty2").write_bytes(b"")
+    (root / "photo.jpg").write_bytes(b"p" * 100)
+    (root / "photo (1).jpg").write_bytes(b"p" * 100)
+    (root / "old" / "photo.jpg").write_bytes(b"p" * 100)
+    os.utime(root / "old" / "movie (1).mp4", (1, 1))  # oldest copy is the one kept
+    os.utime(root / "old" / "notes copy.txt", (1, 1))
+    os.utime(root / "old" / "photo.jpg", (1, 1))
+    os.utime(root / "photo.jpg", (2, 2))
+
+    cache = HashCache(str(tmp_path / "hashes.db"))
+    scan = DuplicateScan(str(root), cache=cache, workers=1)
+    groups = sorted(scan, key=lambda g: (-g["size"], g["keep"]))
+    assert [(g["size"], os.path.relpath(g["keep"], root), len(g["duplicates"])) for g in groups] == [
+        (4 * PARTIAL_BLOCK, os.path.join("old", "movie (1).mp4"), 1), (100, os.path.join("old", "photo.jpg"), 1),
+        (100, "photo.jpg", 1), (10, os.path.join("old", "notes copy.txt"), 1)]
+    # A copy in the duplicate's own folder is kept over an older one elsewhere
+    assert [os.path.basename(p) for p in groups[2]["duplicates"]] == ["photo (1).jpg"]
+    assert scan.stats["full_hashed"] == 3 and scan.stats["wasted"] == 4 * PARTIAL_BLOCK + 200 + 10
+
+    again = DuplicateScan(str(root), cache=cache, workers=1)
+    assert len(list(again)) == 4 and again.stats["partial_hashed"] == again.stats["full_hashed"] == 0
+
+    # Candidates from a live filename index drop extra hard links too
+    index = FileIndex(str(tmp_path / "index.db"), workers=1)
+    index.crawl(str(root))
+    index.watching.add(str(root))
+    indexed = DuplicateScan(str(root), cache=cache, workers=1, files=index)
+    list(indexed)
+    assert indexed.stats["duplicates"] == scan.stats["duplicates"] == 4
+
+    plan = DuplicateFinder().execute(str(root), action="move")
+    assert plan.success and len(plan.data["plan"]) == 4 and "auto_confirm" in plan.message
+    assert not (root / "Duplicates").exists()  # nothing moves until confirmed
+
+    result = DuplicateFinder().execute(str(root), action="move", auto_confirm=True)
+    assert result.success and result.data["move"]["moved"] == 4
+    assert sorted(p.name for p in (root / "Duplicates").iterdir())[0] == "movie.mp4"
+    assert (root / "old" / "notes copy.txt").exists() and len(list((root / "Duplicates").iterdir())) == 4
+    # Set-aside copies aren't reported again; the hard link left behind still is
+    assert DuplicateFinder().execute(str(root)).data["stats"]["duplicates"] == 1
+
+
+def test_disk_usage_rescans_only_changed_directories(tmp_path):
+    import shutil
+    from tools.disk_usage import DiskUsageIndex, DiskUsage
+
+    root = tmp_path / "home"
+    for d in ("Videos/2023", "Videos/2024", "Documents", "node_modules/pkg"):
+        (root / d).mkdir(parents=True)
+    (root / "Videos" / "2023" / "trip.mp4").write_bytes(b"v" * 5000)
+    (root / "Videos" / "2024" / "party.mp4").write_bytes(b"v" * 3000)
+    (root / "Documents" / "cv.pdf").write_bytes(b"d" * 200)
+    (root / "node_modules" / "pkg" / "index.js").write_bytes(b"j" * 700)  # counted: it uses space too
+    (root / "notes.txt").write_bytes(b"n" * 10)
+
+    index = DiskUsageIndex(str(tmp_path / "usage.db"), workers=4)
+    first = index.scan(str(root))
+    assert first["dirs"] == first["listed"] == 7 and first["bytes"] == 8910 and first["files"] == 5
+
+    view = index.drill(str(root))
+    assert [c["name"] for c in view["children"]] == ["Videos", "node_modules", "Documents"]
+    assert view["children"][0]["bytes"] == 8000 and view["dirs"] == 6 and view["own_bytes"] == 10
+    assert [os.path.basename(f["path"]) for f in index.top_files(str(root), 2)] == ["trip.mp4", "party.mp4"]
+
+    (root / "Videos" / "2024" / "clip.mp4").write_bytes(b"c" * 1000)
+    shutil.rmtree(root / "node_modules" / "pkg")
+    again = index.scan(str(root))
+    assert again["dirs"] == 6 and again["listed"] == 2 and again["removed"] == 1 and again["bytes"] == 9210
+    assert index.drill(str(root / "Videos"))["bytes"] == 9000
+
+    result = DiskUsage(index).execute(str(root), top=3)
+    assert result.success and result.data["top_files"][0]["bytes"] == 5000
+    assert "Videos" in result.message.split("Folders here")[1].splitlines()[1]
@@ -1,48 +1,86 @@
 """
 EONIX Tool Registry — Central registry for all available tools.
 """
+import os
+import time
+import asyncio
+import threading
+from concurrent.futures import Executor
+from importlib import import_module
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
 from .tool_result import ToolResult
-from .app_launcher import AppLauncher
-from .typer import Typer
-from .browser import BrowserTool
-from .system_info import SystemInfo
-from .file_ops import FileOps
-from .commander import Commander
-from .screenshot import Screenshot
-from .whatsapp_tool import WhatsAppTool
-from .browser_controller import BrowserController
-from .memory_tool import MemoryTool
-from .screen_vision import ScreenVision
-from .weather import WeatherTool
-from .spotify import SpotifyTool
-from .reminder import ReminderTool
-from .power_control import PowerControl
-from .web_reader import WebReader
-from .file_organizer import FileOrganizer
+from .result_cache import CachePolicy, ToolResultCache
+
+# Tool instances are built on first use: attribute → (module, class).
+# Importing a module here would pull in pyautogui / PIL / playwright / brains.
+TOOL_FACTORIES: Dict[str, Tuple[str, str]] = {
+    "app_launcher":   (".app_launcher", "AppLauncher"),
+    "typer":          (".typer", "Typer"),
+    "browser":        (".browser", "BrowserTool"),
+    "system_info":    (".system_info", "SystemInfo"),
+    "file_ops":       (".file_ops", "FileOps"),
+    "commander":      (".commander", "Commander"),
+    "screenshot":     (".screenshot", "Screenshot"),
+    "whatsapp":       (".whatsapp_tool", "WhatsAppTool"),
+    "browser_ctrl":   (".browser_controller", "BrowserController"),
+    "memory":         (".memory_tool", "MemoryTool"),
+    "vision":         (".screen_vision", "ScreenVision"),
+    "weather":        (".weather", "WeatherTool"),
+    "spotify":        (".spotify", "SpotifyTool"),
+    "reminder":       (".reminder", "ReminderTool"),
+    "power":          (".power_control", "PowerControl"),
+    "web_reader":     (".web_reader", "WebReader"),
+    "file_organizer": (".file_organizer", "FileOrganizer"),
+    "content_search": (".content_index", "ContentSearch"),
+    "duplicate_finder": (".duplicate_finder", "DuplicateFinder"),
+    "disk_usage":     (".disk_usage", "DiskUsage"),
+}
+
+# Tools worth constructing in the background right after startup
+WARMUP_TOOLS = ("open_application", "type_text", "get_system_info", "list_directory",
+                "remember_fact", "search_google", "check_weather")
+
+
+def _url_list(urls: Any) -> List[str]:
+    """Planners send URL lists as JSON arrays or as comma/space separated strings."""
+    if not urls:
+        return []
+    if isinstance(urls, str):
+        urls = urls.replace(",", " ").split()
+    return [str(u).strip() for u in urls if str(u).strip()]
+
+
+def _message_pairs(messages: Any = None, contacts: Any = None, message: str = "") -> List[Tuple[str, str]]:
+    """
+    (contact, message) pairs from what planners send: a list of
+    {"contact", "message"} objects or [contact, message] pairs, or one
+    `message` for a list of `contacts`.
+    """
+    pairs: List[Tuple[str, str]] = []
+    for item in messages or []:
+        if isinstance(item, dict):
+            pairs.append((str(item.get("contact", "")), str(item.get("message", message))))
+        else:
+            contact, text = item
+            pairs.append((str(contact), str(text)))
+    if isinstance(contacts, str):
+        contacts = contacts.split(",")
+    pairs += [(str(c), message) for c in contacts or []]
+    return [(c.strip(), m) for c, m in pairs if c.strip() and m]
 
 
 class ToolRegistry:
-    """Central registry that maps tool names to tool instances."""
+    """Central registry that maps tool names to tool instances.
+
+    Instances are created lazily: `self.typer` and friends resolve through
+    TOOL_FACTORIES the first time a handler touches them.
+    """
 
     def __init__(self):
-        self.app_launcher = AppLauncher()
-        self.typer = Typer()
-        self.browser = BrowserTool()
-        self.system_info = SystemInfo()
-        self.file_ops = FileOps()
-        self.commander = Commander()
-        self.screenshot = Screenshot()
-        self.whatsapp = WhatsAppTool()
-        self.browser_ctrl = BrowserController()
-        self.memory = MemoryTool()
-        self.vision = ScreenVision()
-        self.weather = WeatherTool()
-        self.spotify = SpotifyTool()
-        self.reminder = ReminderTool()
-        self.power = PowerControl()
-        self.power = PowerControl()
-        self.web_reader = WebReader()
-        self.file_organizer = FileOrganizer()
+        self._instances: Dict[str, Any] = {}
+        self._load_lock = threading.RLock()
+        self.load_times: Dict[str, float] = {}  # attribute → ms spent importing + constructing
 
         self._tools = {
             "open_application": self._open_app,
@@ -59,6 +97,8 @@ class ToolRegistry:
             "create_file": self._create_file,
             "read_file": self._read_file,
             "list_directory": self._list_directory,
+            "search_files": self._search_files,
+            "search_file_contents": self._search_file_contents,
             "open_file": self._open_file,
             "create_folder": self._create_folder,
             "take_screenshot": self._take_screenshot,
@@ -66,6 +106,7 @@ class ToolRegistry:
             "save_file": self._save_file,
             # WhatsApp tools
             "send_whatsapp_message": self._send_whatsapp,
+            "send_whatsapp_batch": self._send_whatsapp_batch,
             "open_whatsapp_web": self._open_whatsapp,
             # Full browser controller
             "browser_action": self._browser_action,
@@ -91,13 +132,133 @@ class ToolRegistry:
             "list_reminders": self._list_reminders,
             "power_action": self._power_action,
             "read_webpage": self._read_webpage,
+            "read_webpages": self._read_webpages,
             "create_note": self._create_note,
             "read_notes": self._read_notes,
-            "read_notes": self._read_notes,
             "describe_screen": self._describe_screen,
             "organize_folder": self._organize_folder,
+            "undo_last_organize": self._undo_last_organize,
+            "find_duplicates": self._find_duplicates,
+            "analyze_disk_usage": self._analyze_disk_usage,
+        }
+
+        # tool name → instances its handler uses (for warm-up and introspection)
+        self._requires: Dict[str, Tuple[str, ...]] = {
+            "open_application": ("app_launcher",), "close_application": ("app_launcher",),
+            "type_text": ("typer",), "press_keys": ("typer",), "save_file": ("typer",),
+            "open_application_then_type": ("app_launcher", "typer"),
+            "search_google": ("browser",), "open_url": ("browser",), "search_youtube": ("browser",),
+            "open_gmail": ("browser",), "open_maps": ("browser",),
+            "get_system_info": ("system_info",), "run_command": ("commander",),
+            "create_file": ("file_ops",), "read_file": ("file_ops",), "list_directory": ("file_ops",),
+            "open_file": ("file_ops",), "create_folder": ("file_ops",), "search_files": ("file_ops",),
+            "search_file_contents": ("content_search",),
+            "take_screenshot": ("screenshot",),
+            "send_whatsapp_message": ("whatsapp",), "send_whatsapp_batch": ("whatsapp",),
+            "open_whatsapp_web": ("whatsapp",),
+            "browser_action": ("browser_ctrl",), "gmail_send": ("browser_ctrl",),
+            "google_search": ("browser_ctrl",), "youtube_search": ("browser_ctrl",),
+            "remember_fact": ("memory",),
+            "read_screen": ("vision",), "ocr_screen": ("vision",), "find_on_screen": ("vision",),
+            "click_element": ("vision",), "describe_screen": ("vision",),
+            "check_weather": ("weather",), "spotify_control": ("spotify",),
+            "set_reminder": ("reminder",), "list_reminders": ("reminder",),
+            "power_action": ("power",), "read_webpage": ("web_reader", "memory"),
+            "read_webpages": ("web_reader", "memory"),
+            "create_note": ("memory",), "organize_folder": ("file_organizer",),
+            "undo_last_organize": ("file_organizer",), "find_duplicates": ("duplicate_finder",),
+            "analyze_disk_usage": ("disk_usage",),
         }
 
+        # Awaitable twins of tools whose work runs on its own event loop thread,
+        # so aexecute() doesn't park a tool-thread worker on a page load
+        self._async_tools: Dict[str, Callable[..., Awaitable[ToolResult]]] = {
+            "send_whatsapp_message": self._asend_whatsapp,
+            "send_whatsapp_batch": self._asend_whatsapp_batch,
+            "browser_action": self._abrowser_action,
+            "gmail_send": self._agmail_send,
+            "google_search": self._agoogle_search_ctrl,
+            "youtube_search": self._ayoutube_search_ctrl,
+        }
+
+        self.cache = ToolResultCache()
+        # Idempotent tools opt in with a TTL and a key over their args. File keys
+        # carry mtime/size, so edits made outside Eonix also miss the cache.
+        self._cache_policies: Dict[str, CachePolicy] = {
+            "get_system_info": CachePolicy(5, lambda a: (str(a.get("info_type", "all")).lower(),)),
+            "check_weather":   CachePolicy(600, lambda a: (str(a.get("city", "auto")).strip().lower(),)),
+            "read_webpage":    CachePolicy(300, lambda a: (a["url"],) if a.get("url") else None),
+            "read_webpages":   CachePolicy(300, lambda a: (tuple(_url_list(a.get("urls"))), a.get("query", ""))),
+            "list_directory":  CachePolicy(30, lambda a: self._path_key(a.get("path", "."))),
+            "read_file":       CachePolicy(30, lambda a: self._region_key(a)),
+            "git_action":      CachePolicy(10, lambda a: (os.getcwd(),) if a.get("action") == "status" else None),
+        }
+        # Mutating tools → cached (tool, resource) entries they make stale; None = every resource
+        self._invalidates: Dict[str, Callable[[Dict[str, Any]], List[Tuple[str, Any]]]] = {
+            "create_file":     lambda a: self._touches(a.get("path")),
+            "create_folder":   lambda a: self._touches(a.get("path")),
+            "save_file":       lambda a: [("read_file", None), ("list_directory", None)],
+            "organize_folder": lambda a: [("read_file", None), ("list_directory", None)],
+            "undo_last_organize": lambda a: [("read_file", None), ("list_directory", None)],
+            "find_duplicates": lambda a: ([("read_file", None), ("list_directory", None)]
+                                          if str(a.get("action") or "report").lower() != "report"
+                                          and a.get("auto_confirm") else []),
+            "run_command":     lambda a: [("read_file", None), ("list_directory", None), ("git_action", None)],
+            "git_action":      lambda a: [] if a.get("action") == "status" else [("git_action", None)],
+        }
+
+    # ── Lazy instances ─────────────────────────────────────────
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached when normal lookup fails, i.e. for not-yet-built tool instances
+        if name.startswith("_") or name not in TOOL_FACTORIES:
+            raise AttributeError(name)
+        return self._load(name)
+
+    def _load(self, name: str) -> Any:
+        with self._load_lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                module_name, class_name = TOOL_FACTORIES[name]
+                t0 = time.perf_counter()
+                cls = getattr(import_module(module_name, __name__), class_name)
+                instance = cls()
+                self.load_times[name] = (time.perf_counter() - t0) * 1000
+                self._instances[name] = instance
+                self.__dict__[name] = instance  # later lookups skip __getattr__
+            return instance
+
+    def loaded(self) -> Dict[str, float]:
+        """Instances built so far, with their load time in ms."""
+        return dict(self.load_times)
+
+    def warm_up(self, tool_names: Iterable[str] = WARMUP_TOOLS) -> Dict[str, Any]:
+        """Build the instances behind `tool_names` now; failures are reported, not raised."""
+        errors: Dict[str, Any] = {}
+        for tool in tool_names:
+            for name in self._requires.get(tool, ()):
+                try:
+                    self._load(name)
+                except Exception as e:
+                    errors[name] = str(e)
+        return errors
+
+    def start_warmup(self, tool_names: Iterable[str] = WARMUP_TOOLS,
+                     delay: float = 0.0) -> threading.Thread:
+        """Warm up in a daemon thread so startup isn't held up by slow imports."""
+        def _run():
+            if delay:
+                time.sleep(delay)
+            t0 = time.perf_counter()
+            errors = self.warm_up(tool_names)
+            for name, err in errors.items():
+                print(f"WARNING: Tool warm-up: {name} failed ({err})")
+            print(f"OK: Tools warmed up ({len(self.load_times)} loaded in "
+                  f"{(time.perf_counter() - t0) * 1000:.0f} ms)")
+        thread = threading.Thread(target=_run, daemon=True, name="ToolWarmup")
+        thread.start()
+        return thread
+
     def _git_action(self, **kwargs) -> ToolResult:
         from .git_tool import GitTool
         return GitTool().execute(**kwargs)
@@ -107,12 +268,97 @@ class ToolRegistry:
         handler = self._tools.get(tool_name)
         if not handler:
             return ToolResult(success=False, message=f"Unknown tool: {tool_name}")
+
+        key, hit = self._cached(tool_name, args)
+        if hit is not None:
+            return hit
+
         try:
-            return handler(**args)
+            result = handler(**args)
         except TypeError as e:
-            return ToolResult(success=False, message=f"Tool argument error for {tool_name}: {str(e)}")
+            result = ToolResult(success=False, message=f"Tool argument error for {tool_name}: {str(e)}")
         except Exception as e:
-            return ToolResult(success=False, message=f"Tool {tool_name} failed: {str(e)}")
+            result = ToolResult(success=False, message=f"Tool {tool_name} failed: {str(e)}")
+        return self._settle(tool_name, args, key, result)
+
+    async def aexecute(self, tool_name: str, args: dict, executor: Optional[Executor] = None) -> ToolResult:
+        """
+        Awaitable execute. Tools with an async handler are awaited on the
+        caller's loop (their work runs on a loop thread of their own); the
+        rest run on `executor` as before.
+        """
+        handler = self._async_tools.get(tool_name)
+        if handler is None:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, self.execute, tool_name, args)
+
+        key, hit = self._cached(tool_name, args)
+        if hit is not None:
+            return hit
+
+        try:
+            result = await handler(**args)
+        except TypeError as e:
+            result = ToolResult(success=False, message=f"Tool argument error for {tool_name}: {str(e)}")
+        except Exception as e:
+            result = ToolResult(success=False, message=f"Tool {tool_name} failed: {str(e)}")
+        return self._settle(tool_name, args, key, result)
+
+    def _cached(self, tool_name: str, args: dict) -> Tuple[Optional[Tuple[Any, ...]], Optional[ToolResult]]:
+        key = self._cache_key(tool_name, args)
+        return key, (self.cache.get(tool_name, key) if key is not None else None)
+
+    def _settle(self, tool_name: str, args: dict, key: Optional[Tuple[Any, ...]],
+                result: ToolResult) -> ToolResult:
+        # Invalidate even on failure: a mutating tool may have half-applied
+        stale = self._invalidates.get(tool_name)
+        if stale:
+            try:
+                for tool, resource in stale(args):
+                    self.cache.invalidate(tool, resource)
+            except Exception:
+                self.cache.clear()
+        if key is not None and result.success:
+            self.cache.put(tool_name, key, result, self._cache_policies[tool_name].ttl)
+        return result
+
+    # ── Result cache keys ──────────────────────────────────────
+
+    def _cache_key(self, tool_name: str, args: dict) -> Optional[Tuple[Any, ...]]:
+        policy = self._cache_policies.get(tool_name)
+        if policy is None:
+            return None
+        try:
+            return policy.key(args)
+        except Exception:
+            return None  # unusual args: just run the tool
+
+    def _resolve(self, path: str) -> str:
+        return os.path.normcase(self.file_ops._expand(path))
+
+    def _path_key(self, path: Optional[str]) -> Optional[Tuple[Any, ...]]:
+        if not path:
+            return None
+        resolved = self._resolve(path)
+        try:
+            st = os.stat(resolved)
+        except OSError:
+            return None
+        return (resolved, st.st_mtime_ns, st.st_size)
+
+    def _region_key(self, args: Dict[str, Any]) -> Optional[Tuple[Any, ...]]:
+        """read_file key: the file's path key plus the region asked for."""
+        key = self._path_key(args.get("path"))
+        if key is None:
+            return None
+        return key + tuple(args.get(k) for k in ("offset", "length", "tail", "start_line", "end_line"))
+
+    def _touches(self, path: Optional[str]) -> List[Tuple[str, Any]]:
+        if not path:
+            return []
+        resolved = self._resolve(path)
+        return [("read_file", resolved), ("list_directory", resolved),
+                ("list_directory", os.path.dirname(resolved))]
 
     def get_tool_names(self) -> list:
         return list(self._tools.keys())
@@ -155,12 +401,20 @@ class ToolRegistry:
     def _create_file(self, path: str, content: str = "", **_) -> ToolResult:
         return self.file_ops.create_file(path, content)
 
-    def _read_file(self, path: str, **_) -> ToolResult:
-        return self.file_ops.read_file(path)
+    def _read_file(self, path: str, offset: Optional[int] = None, length: Optional[int] = None,
+                   tail: Optional[int] = None, start_line: Optional[int] = None,
+                   end_line: Optional[int] = None, **_) -> ToolResult:
+        return self.file_ops.read_file(path, offset, length, tail, start_line, end_line)
 
     def _list_directory(self, path: str = ".", **_) -> ToolResult:
         return self.file_ops.list_directory(path)
 
+    def _search_files(self, pattern: str, path: Optional[str] = None, mode: str = "auto", **_) -> ToolResult:
+        return self.file_ops.search_files(path, pattern, mode)
+
+    def _search_file_contents(self, query: str, path: Optional[str] = None, limit: int = 10, **_) -> ToolResult:
+        return self.content_search.execute(query, path, limit)
+
     def _open_file(self, path: str, **_) -> ToolResult:
         return self.file_ops.open_file(path)
 
@@ -185,6 +439,17 @@ class ToolRegistry:
     def _send_whatsapp(self, contact: str, message: str, wait_for_qr: int = 30, **_) -> ToolResult:
         return self.whatsapp.send_message(contact, message, wait_for_qr)
 
+    def _send_whatsapp_batch(self, messages: Any = None, contacts: Any = None, message: str = "",
+                             wait_for_qr: int = 30, **_) -> ToolResult:
+        return self.whatsapp.send_batch(_message_pairs(messages, contacts, message), wait_for_qr)
+
+    async def _asend_whatsapp(self, contact: str, message: str, wait_for_qr: int = 30, **_) -> ToolResult:
+        return await self.whatsapp.asend_message(contact, message, wait_for_qr)
+
+    async def _asend_whatsapp_batch(self, messages: Any = None, contacts: Any = None, message: str = "",
+                                    wait_for_qr: int = 30, **_) -> ToolResult:
+        return await self.whatsapp.asend_batch(_message_pairs(messages, contacts, message), wait_for_qr)
+
     def _open_whatsapp(self, **_) -> ToolResult:
         return self.whatsapp.open_whatsapp_web()
 
@@ -200,6 +465,18 @@ class ToolRegistry:
     def _youtube_search_ctrl(self, query: str, **_) -> ToolResult:
         return self.browser_ctrl.execute("youtube_search", query=query)
 
+    async def _abrowser_action(self, action: str, **kwargs) -> ToolResult:
+        return await self.browser_ctrl.aexecute(action, **kwargs)
+
+    async def _agmail_send(self, to: str, subject: str = "No Subject", body: str = "", **_) -> ToolResult:
+        return await self.browser_ctrl.aexecute("gmail_send", to=to, subject=subject, body=body)
+
+    async def _agoogle_search_ctrl(self, query: str, **_) -> ToolResult:
+        return await self.browser_ctrl.aexecute("google_search", query=query)
+
+    async def _ayoutube_search_ctrl(self, query: str, **_) -> ToolResult:
+        return await self.browser_ctrl.aexecute("youtube_search", query=query)
+
     def _remember_fact(self, fact: str, **_) -> ToolResult:
         return self.memory.store_fact(fact)
 
@@ -241,7 +518,17 @@ class ToolRegistry:
         return self.power.execute(action)
 
     def _read_webpage(self, url: str = "", **_) -> ToolResult:
-        return self.web_reader.execute(url)
+        result = self.web_reader.execute(url)
+        if result.success:
+            self.memory.index_document("web", f"url:{url}", result.message, url=url)
+        return result
+
+    def _read_webpages(self, urls: Any = None, query: str = "", search_url: str = "",
+                       limit: int = 8, **_) -> ToolResult:
+        result = self.web_reader.execute_many(_url_list(urls), query, search_url, int(limit))
+        for page in result.data.get("pages", []) if result.success else []:
+            self.memory.index_document("web", f"url:{page['url']}", page["text"], url=page["url"])
+        return result
 
     def _create_note(self, title: str = "note", content: str = "", **_) -> ToolResult:
         import os
@@ -251,6 +538,8 @@ class ToolRegistry:
         path = os.path.join(notes_dir, f"{safe_title}.txt")
         with open(path, "a", encoding="utf-8") as f:
             f.write(content + "\n")
+        with open(path, "r", encoding="utf-8") as f:
+            self.memory.index_document("notes", f"note:{safe_title}", f"{title}\n{f.read()}", title=title)
         return ToolResult(success=True, message=f"📝 Note '{title}' saved.")
 
     def _read_notes(self, title: str = "", **_) -> ToolResult:
@@ -274,8 +563,19 @@ class ToolRegistry:
     def _describe_screen(self, question: str = "Describe what you see on screen", **_) -> ToolResult:
         return ToolResult(success=True, message=self.vision.read_screen(question))
 
-    def _organize_folder(self, path: str, auto_confirm: bool = False, **_) -> ToolResult:
-        return self.file_organizer.organize(path, auto_confirm)
+    def _organize_folder(self, path: str, auto_confirm: bool = False, recursive: bool = False, **_) -> ToolResult:
+        return self.file_organizer.organize(path, auto_confirm, recursive)
+
+    def _undo_last_organize(self, **_) -> ToolResult:
+        return self.file_organizer.undo_last_organize()
+
+    def _find_duplicates(self, path: str, min_size: int = 1, action: str = "report", limit: int = 10,
+                         auto_confirm: bool = False, **_) -> ToolResult:
+        return self.duplicate_finder.execute(path, min_size, action, limit, auto_confirm)
+
+    def _analyze_disk_usage(self, path: Optional[str] = None, top: int = 10, refresh: bool = False,
+                            **_) -> ToolResult:
+        return self.disk_usage.execute(path, top, refresh)
 
 
 __all__ = ["ToolRegistry", "ToolResult"]
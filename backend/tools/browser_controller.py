@@ -3,80 +3,71 @@ EONIX Full Browser Controller using Playwright.
 Handles WhatsApp Web, Gmail, YouTube, Google, and any website.
 Session is saved so logins (WhatsApp, Gmail) persist across runs.
 
+Actions run on the async browser service (see browser_service.py): each in
+the warm tab of its site, on the service's own loop thread, with a timeout.
+
 Install:
     pip install playwright
     playwright install chromium
 """
 
 import os
-import time
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
 from tools.tool_result import ToolResult
+from tools.browser_service import BrowserService
+from config import BROWSER_ACTION_TIMEOUT
 
 SESSION_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "browser_session"))
 
-_executor = ThreadPoolExecutor(max_workers=2)
-
-
-class BrowserController:
-    name = "browser_action"
-    description = (
-        "Controls the browser to interact with any website. "
-        "Send WhatsApp messages, send Gmail emails, search Google, "
-        "open YouTube, click buttons, fill forms on any site."
-    )
-
-    def _get_browser_exe(self):
-        """Find Chrome or Brave executable."""
-        username = os.getenv("USERNAME", "")
-        paths = [
-            r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe",
-            r"C:\Program Files (x86)\BraveSoftware\Brave-Browser\Application\brave.exe",
-            r"C:\Program Files\Google\Chrome\Application\chrome.exe",
-            r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
-            os.path.join("C:\\Users", username, "AppData", "Local", "BraveSoftware", "Brave-Browser", "Application", "brave.exe"),
-            os.path.join("C:\\Users", username, "AppData", "Local", "Google", "Chrome", "Application", "chrome.exe"),
-        ]
-        for p in paths:
-            if os.path.exists(p):
-                return p
-        return None
-
-    # ── SINGLETON STATE ───────────────────────────────────────────────────────
-    _playwright = None
-    _browser_context = None
-
-    def execute(self, action: str, **kwargs) -> ToolResult:
-        """Synchronous entry point that reuses the browser window."""
-        try:
-            return self._run_sync(action, **kwargs)
-        except Exception as e:
-            return ToolResult(success=False, message=f"Browser controller error: {str(e)}")
-
-    def _get_persistent_context(self):
-        """Get or create the global persistent browser context."""
-        from playwright.sync_api import sync_playwright
-
-        if BrowserController._browser_context and BrowserController._browser_context.pages:
-            try:
-                # Check if it's still alive
-                BrowserController._browser_context.pages[0].title()
-                return BrowserController._browser_context
-            except Exception:
-                print("[EONIX Browser] Existing context seems dead, recreating...")
-                BrowserController._browser_context = None
-                if BrowserController._playwright:
-                    BrowserController._playwright.stop()
-                    BrowserController._playwright = None
-
-        if not BrowserController._playwright:
-            BrowserController._playwright = sync_playwright().start()
+# Which warm tab each action runs in; anything not listed shares "generic"
+ACTION_SITES = {
+    "whatsapp_send": "whatsapp",
+    "gmail_send": "gmail",
+    "youtube_search": "youtube",
+}
+
+# Actions that may sit waiting for a QR scan or a login get longer than the default
+ACTION_TIMEOUTS = {
+    "whatsapp_send": 240,
+    "gmail_send": 240,
+}
+
+
+def _get_browser_exe():
+    """Find Chrome or Brave executable."""
+    username = os.getenv("USERNAME", "")
+    paths = [
+        r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe",
+        r"C:\Program Files (x86)\BraveSoftware\Brave-Browser\Application\brave.exe",
+        r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+        r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+        os.path.join("C:\\Users", username, "AppData", "Local", "BraveSoftware", "Brave-Browser", "Application", "brave.exe"),
+        os.path.join("C:\\Users", username, "AppData", "Local", "Google", "Chrome", "Application", "chrome.exe"),
+    ]
+    for p in paths:
+        if os.path.exists(p):
+            return p
+    return None
+
+
+class PersistentBrowser(BrowserService):
+    """Brave/Chrome on the EONIX profile in SESSION_DIR, so logins persist."""
+
+    def __init__(self):
+        super().__init__("Browser")
+        self._playwright = None
+
+    async def open(self):
+        from playwright.async_api import async_playwright
+
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
 
         os.makedirs(SESSION_DIR, exist_ok=True)
-        exe_path = self._get_browser_exe()
-        
+        exe_path = _get_browser_exe()
+
         launch_args = {
             "user_data_dir": SESSION_DIR,
             "headless": False,
@@ -89,71 +80,96 @@ class BrowserController:
             ],
             "viewport": None, # Full window size
         }
-        
+
         if exe_path:
             launch_args["executable_path"] = exe_path
             print(f"[EONIX Browser] Launching persistent browser: {exe_path}")
 
         try:
-            BrowserController._browser_context = BrowserController._playwright.chromium.launch_persistent_context(**launch_args)
-            return BrowserController._browser_context
+            return await self._playwright.chromium.launch_persistent_context(**launch_args)
         except Exception as e:
             print(f"[EONIX Browser] Failed to launch persistent context: {e}")
             raise e
 
-    def _run_sync(self, action: str, **kwargs) -> ToolResult:
-        context = self._get_persistent_context()
-        # Reuse existing page or open new one if none exist
-        pages = context.pages
-        page = pages[0] if pages else context.new_page()
-        page.bring_to_front()
+    async def shutdown(self, context) -> None:
+        try:
+            await context.close()
+        finally:
+            if self._playwright:
+                await self._playwright.stop()
+                self._playwright = None
+
+
+class BrowserController:
+    name = "browser_action"
+    description = (
+        "Controls the browser to interact with any website. "
+        "Send WhatsApp messages, send Gmail emails, search Google, "
+        "open YouTube, click buttons, fill forms on any site."
+    )
+
+    def __init__(self, service: Optional[BrowserService] = None):
+        self.service = service or browser_service
+
+    def execute(self, action: str, **kwargs) -> ToolResult:
+        """Blocking entry point for the tool thread."""
+        try:
+            return self.service.run(self.perform(action, **kwargs))
+        except Exception as e:
+            return ToolResult(success=False, message=f"Browser controller error: {str(e)}")
 
+    async def aexecute(self, action: str, **kwargs) -> ToolResult:
+        """Awaitable entry point; the calling loop is free while the page works."""
         try:
-            if action == "whatsapp_send":
-                return self._whatsapp_send(
-                    page, kwargs.get("contact", ""), kwargs.get("message", "hi")
-                )
-            elif action == "gmail_send":
-                return self._gmail_send(
-                    page,
-                    kwargs.get("to", ""),
-                    kwargs.get("subject", "No Subject"),
-                    kwargs.get("body", ""),
-                )
-            elif action == "google_search":
-                return self._google_search(page, kwargs.get("query", ""))
-            elif action == "youtube_search":
-                return self._youtube_search(page, kwargs.get("query", ""))
-            elif action == "open_url":
-                return self._open_url(page, kwargs.get("url", ""))
-            elif action == "click_element":
-                return self._click_element(
-                    page, kwargs.get("url", ""), kwargs.get("selector", "")
-                )
-            elif action == "fill_form":
-                return self._fill_form(
-                    page, kwargs.get("url", ""), kwargs.get("fields", {})
-                )
-            elif action == "close_browser":
-                context.close()
-                BrowserController._browser_context = None
-                if BrowserController._playwright:
-                    BrowserController._playwright.stop()
-                    BrowserController._playwright = None
-                return ToolResult(success=True, message="Browser closed.")
-            else:
-                return ToolResult(success=False, message=f"Unknown browser action: {action}")
+            return await self.service.arun(self.perform(action, **kwargs))
         except Exception as e:
-            # Don't close context on error, let user see what happened
-            return ToolResult(success=False, message=f"Browser error in {action}: {str(e)}")
+            return ToolResult(success=False, message=f"Browser controller error: {str(e)}")
+
+    async def perform(self, action: str, **kwargs) -> ToolResult:
+        """Queue `action` on the browser service. Runs on the service loop."""
+        if action == "close_browser":
+            await self.service.close()
+            return ToolResult(success=True, message="Browser closed.")
+
+        if action == "whatsapp_send":
+            run = lambda page: self._whatsapp_send(
+                page, kwargs.get("contact", ""), kwargs.get("message", "hi")
+            )
+        elif action == "gmail_send":
+            run = lambda page: self._gmail_send(
+                page,
+                kwargs.get("to", ""),
+                kwargs.get("subject", "No Subject"),
+                kwargs.get("body", ""),
+            )
+        elif action == "google_search":
+            run = lambda page: self._google_search(page, kwargs.get("query", ""))
+        elif action == "youtube_search":
+            run = lambda page: self._youtube_search(page, kwargs.get("query", ""))
+        elif action == "open_url":
+            run = lambda page: self._open_url(page, kwargs.get("url", ""))
+        elif action == "click_element":
+            run = lambda page: self._click_element(
+                page, kwargs.get("url", ""), kwargs.get("selector", "")
+            )
+        elif action == "fill_form":
+            run = lambda page: self._fill_form(
+                page, kwargs.get("url", ""), kwargs.get("fields", {})
+            )
+        else:
+            return ToolResult(success=False, message=f"Unknown browser action: {action}")
+
+        # Errors come back as a failed ToolResult; the tab is left as-is so the user can see what happened
+        return await self.service.submit(ACTION_SITES.get(action, "generic"), run, label=action,
+                                         timeout=ACTION_TIMEOUTS.get(action, BROWSER_ACTION_TIMEOUT))
 
     # ── WHATSAPP ──────────────────────────────────────────────────────────────
-    def _whatsapp_send(self, page, contact: str, message: str) -> ToolResult:
+    async def _whatsapp_send(self, page, contact: str, message: str) -> ToolResult:
         """Robust WhatsApp message sending with fallbacks."""
         print(f"[EONIX Browser] Navigating to WhatsApp Web...")
         # Only goto if not already there to save time
         if "web.whatsapp.com" not in page.url:
-            page.goto("https://web.whatsapp.com", wait_until="domcontentloaded")
+            await page.goto("https://web.whatsapp.com", wait_until="domcontentloaded")
         else:
             print("[EONIX Browser] Already on WhatsApp Web")
 
@@ -163,28 +179,28 @@ class BrowserController:
         search_sel = 'div[contenteditable="true"][data-tab="3"], [placeholder*="Search"], [aria-label*="Search"]'
         
         try:
-            page.wait_for_selector(f"{qr_sel}, {search_sel}", timeout=60000)
+            await page.wait_for_selector(f"{qr_sel}, {search_sel}", timeout=60000)
         except Exception:
             return ToolResult(success=False, message="WhatsApp Web did not load. Check your connection or QR status.")
 
-        if page.is_visible(qr_sel):
+        if await page.is_visible(qr_sel):
             print("[EONIX Browser] QR Scan required. Waiting...")
             try:
-                page.wait_for_selector(search_sel, timeout=120000)
+                await page.wait_for_selector(search_sel, timeout=120000)
             except Exception:
                 return ToolResult(success=False, message="QR not scanned in time.")
 
-        time.sleep(1.5) # Give it time to settle
+        await asyncio.sleep(1.5) # Give it time to settle
 
         # 1. Find and click search box
         print(f"[EONIX Browser] Searching for contact: {contact}")
         search_box = page.locator(search_sel).first
-        search_box.click()
-        page.keyboard.press("Control+a")
-        page.keyboard.press("Backspace")
-        time.sleep(0.5)
-        search_box.type(contact, delay=100)
-        time.sleep(2.0)
+        await search_box.click()
+        await page.keyboard.press("Control+a")
+        await page.keyboard.press("Backspace")
+        await asyncio.sleep(0.5)
+        await search_box.type(contact, delay=100)
+        await asyncio.sleep(2.0)
 
         # 2. Click contact
         clicked = False
@@ -198,8 +214,8 @@ class BrowserController:
         ]:
             try:
                 el = page.locator(selector).first
-                if el.is_visible(timeout=2000):
-                    el.click()
+                if await el.is_visible(timeout=2000):
+                    await el.click()
                     clicked = True
                     break
             except Exception:
@@ -207,9 +223,9 @@ class BrowserController:
 
         if not clicked:
             print("[EONIX Browser] Contact selector failed, trying Enter key fallback...")
-            page.keyboard.press("Enter")
+            await page.keyboard.press("Enter")
         
-        time.sleep(2.0)
+        await asyncio.sleep(2.0)
 
         # 3. Find and fill message box
         print(f"[EONIX Browser] Focusing message box...")
@@ -224,7 +240,7 @@ class BrowserController:
         for sel in compose_selectors:
             try:
                 loc = page.locator(sel).first
-                loc.wait_for(state="visible", timeout=3000)
+                await loc.wait_for(state="visible", timeout=3000)
                 msg_box = loc
                 break
             except Exception:
@@ -233,26 +249,26 @@ class BrowserController:
         if not msg_box:
             return ToolResult(success=False, message=f"Could not find message input for {contact}.")
 
-        msg_box.click()
-        msg_box.fill("")
-        msg_box.type(message, delay=80)
-        time.sleep(0.5)
+        await msg_box.click()
+        await msg_box.fill("")
+        await msg_box.type(message, delay=80)
+        await asyncio.sleep(0.5)
 
         # 4. Final Send - Try Enter then fallback to Send button icon
         print(f"[EONIX Browser] Sending message...")
-        page.keyboard.press("Enter")
-        time.sleep(1.0)
+        await page.keyboard.press("Enter")
+        await asyncio.sleep(1.0)
 
         # Fallback: Click the 'Send' SVG icon if still in message box or if we want to be sure
         try:
             send_btn = page.locator('[data-testid="send"], [aria-label="Send"]').first
-            if send_btn.is_visible(timeout=1000):
-                send_btn.click()
+            if await send_btn.is_visible(timeout=1000):
+                await send_btn.click()
                 print("[EONIX Browser] Clicked Send button icon fallback.")
         except Exception:
             pass
 
-        time.sleep(3.0)
+        await asyncio.sleep(3.0)
         return ToolResult(
             success=True,
             message=f"✅ Sent message to {contact}",
@@ -260,49 +276,51 @@ class BrowserController:
         )
 
     # ── GMAIL ─────────────────────────────────────────────────────────────────
-    def _gmail_send(self, page, to: str, subject: str, body: str) -> ToolResult:
-        page.goto("https://mail.google.com", wait_until="domcontentloaded")
+    async def _gmail_send(self, page, to: str, subject: str, body: str) -> ToolResult:
+        # The warm Gmail tab is usually still on the inbox
+        if "mail.google.com" not in page.url:
+            await page.goto("https://mail.google.com", wait_until="domcontentloaded")
 
         compose_btn = 'div[gh="cm"]'
         try:
-            page.wait_for_selector(compose_btn, timeout=30000)
+            await page.wait_for_selector(compose_btn, timeout=30000)
         except Exception:
             print("[EONIX Browser] Please log into Gmail in the browser window...")
             try:
-                page.wait_for_selector(compose_btn, timeout=120000)
+                await page.wait_for_selector(compose_btn, timeout=120000)
             except Exception:
                 return ToolResult(success=False, message="Gmail did not load. Please log in first.")
 
-        time.sleep(1.0)
-        page.click(compose_btn)
-        time.sleep(1.5)
+        await asyncio.sleep(1.0)
+        await page.click(compose_btn)
+        await asyncio.sleep(1.5)
 
         # To field
         to_field = page.locator('input[name="to"], textarea[name="to"]').first
-        to_field.click()
-        to_field.type(to, delay=50)
-        page.keyboard.press("Tab")
-        time.sleep(0.5)
+        await to_field.click()
+        await to_field.type(to, delay=50)
+        await page.keyboard.press("Tab")
+        await asyncio.sleep(0.5)
 
         # Subject
         subject_field = page.locator('input[name="subjectbox"]').first
-        subject_field.click()
-        subject_field.type(subject, delay=50)
-        time.sleep(0.3)
+        await subject_field.click()
+        await subject_field.type(subject, delay=50)
+        await asyncio.sleep(0.3)
 
         # Body
         body_field = page.locator('div[aria-label="Message Body"]').first
-        body_field.click()
-        body_field.type(body, delay=40)
-        time.sleep(0.5)
+        await body_field.click()
+        await body_field.type(body, delay=40)
+        await asyncio.sleep(0.5)
 
         # Send
         send_btn = page.locator(
             'div[aria-label="Send ‪(Ctrl-Enter)‬"], div[aria-label="Send (Ctrl-Enter)"], '
             'div[data-tooltip*="Send"]'
         ).first
-        send_btn.click()
-        time.sleep(2.0)
+        await send_btn.click()
+        await asyncio.sleep(2.0)
 
         return ToolResult(
             success=True,
@@ -311,25 +329,25 @@ class BrowserController:
         )
 
     # ── GOOGLE SEARCH ─────────────────────────────────────────────────────────
-    def _google_search(self, page, query: str) -> ToolResult:
+    async def _google_search(self, page, query: str) -> ToolResult:
         import urllib.parse
         url = f"https://www.google.com/search?q={urllib.parse.quote(query)}"
-        page.goto(url, wait_until="domcontentloaded")
-        time.sleep(1.0)
+        await page.goto(url, wait_until="domcontentloaded")
+        await asyncio.sleep(1.0)
         
         # Keep window open for user to see
         print(f"[EONIX Browser] Searched Google: {query}")
         return ToolResult(success=True, message=f"✅ Searched Google for: {query}", data={"query": query})
 
     # ── YOUTUBE SEARCH ────────────────────────────────────────────────────────
-    def _youtube_search(self, page, query: str) -> ToolResult:
+    async def _youtube_search(self, page, query: str) -> ToolResult:
         import urllib.parse
         url = f"https://www.youtube.com/results?search_query={urllib.parse.quote(query)}"
-        page.goto(url, wait_until="domcontentloaded")
-        time.sleep(2.0)
+        await page.goto(url, wait_until="domcontentloaded")
+        await asyncio.sleep(2.0)
         
         # Try to extract the first video link and title
-        video_data = page.evaluate("""
+        video_data = await page.evaluate("""
             () => {
                 const video = document.querySelector('ytd-video-renderer a#video-title');
                 if (video) {
@@ -351,27 +369,31 @@ class BrowserController:
         return ToolResult(success=True, message=msg, data={"query": query})
 
     # ── OPEN URL ──────────────────────────────────────────────────────────────
-    def _open_url(self, page, url: str) -> ToolResult:
+    async def _open_url(self, page, url: str) -> ToolResult:
         if not url.startswith("http"):
             url = "https://" + url
-        page.goto(url, wait_until="domcontentloaded")
-        time.sleep(1.0)
+        await page.goto(url, wait_until="domcontentloaded")
+        await asyncio.sleep(1.0)
         return ToolResult(success=True, message=f"✅ Opened: {url}", data={"url": url})
 
     # ── CLICK ELEMENT ─────────────────────────────────────────────────────────
-    def _click_element(self, page, url: str, selector: str) -> ToolResult:
+    async def _click_element(self, page, url: str, selector: str) -> ToolResult:
         if url:
-            page.goto(url, wait_until="domcontentloaded")
-            time.sleep(1.0)
-        page.click(selector)
+            await page.goto(url, wait_until="domcontentloaded")
+            await asyncio.sleep(1.0)
+        await page.click(selector)
         return ToolResult(success=True, message=f"✅ Clicked '{selector}' on {url}")
 
     # ── FILL FORM ─────────────────────────────────────────────────────────────
-    def _fill_form(self, page, url: str, fields: dict) -> ToolResult:
+    async def _fill_form(self, page, url: str, fields: dict) -> ToolResult:
         """fields = {"css_selector": "value", ...}"""
         if url:
-            page.goto(url, wait_until="domcontentloaded")
-            time.sleep(1.0)
+            await page.goto(url, wait_until="domcontentloaded")
+            await asyncio.sleep(1.0)
         for selector, value in fields.items():
-            page.fill(selector, str(value))
+            await page.fill(selector, str(value))
         return ToolResult(success=True, message=f"✅ Filled form on {url}")
+
+
+# Global instance
+browser_service = PersistentBrowser()
@@ -0,0 +1,262 @@
+"""
+EONIX Browser Service — Async Playwright on its own event loop thread.
+
+Browser work is queued as commands and run on the service's loop thread, so
+callers (a tool worker thread, or the orchestrator's event loop) never hold
+a thread while a page loads. Each command runs in the warm tab of its site:
+commands for different sites run concurrently, commands for the same tab
+queue behind each other. Every command has a timeout, and `pending()` lists
+what is queued or running.
+
+Subclasses say how the browser context is obtained (`open`) and released
+(`shutdown`); see PersistentBrowser in browser_controller.py.
+"""
+import time
+import asyncio
+import itertools
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from tools.tool_result import ToolResult
+from utils.loop_thread import LoopThread
+from config import BROWSER_MAX_TABS, BROWSER_ACTION_TIMEOUT
+
+PageAction = Callable[[Any], Awaitable[ToolResult]]
+
+HEALTH_TIMEOUT = 2.0  # seconds a tab gets to answer the health probe
+
+_services: List["BrowserService"] = []
+
+
+class TabPool:
+    """
+    One long-lived tab per site key inside a browser context.
+
+    Heavy web apps (WhatsApp Web, Gmail) stay loaded in their own tab between
+    actions, so only the first action on a site pays for the app boot. Tabs
+    that crashed or were closed by the user are replaced on next use; beyond
+    `max_tabs` the least recently used idle tab is closed. A tab that is
+    already on a site's home URL (e.g. one the user opened) is adopted.
+    """
+
+    def __init__(self, max_tabs: int = BROWSER_MAX_TABS, homes: Optional[Dict[str, str]] = None):
+        self.max_tabs = max(1, max_tabs)
+        self.homes = homes or {}
+        self._tabs: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock: Optional[asyncio.Lock] = None
+        self.hits = self.misses = 0
+
+    async def get(self, context, key: str, busy: Iterable[str] = ()):
+        """The warm tab for `key`. Tabs of `busy` sites are never evicted."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            page = self._tabs.get(key)
+            if page is not None and await self._healthy(page):
+                self._tabs.move_to_end(key)
+                self.hits += 1
+                return page
+            if page is not None:
+                print(f"[EONIX Browser] '{key}' tab is dead, reopening...")
+                await self._close(self._tabs.pop(key))
+
+            self.misses += 1
+            page = await self._unclaimed(context, key) or await context.new_page()
+            self._tabs[key] = page
+            busy = set(busy) | {key}
+            for old_key in [k for k in self._tabs if k not in busy][:max(0, len(self._tabs) - self.max_tabs)]:
+                print(f"[EONIX Browser] Closing idle '{old_key}' tab")
+                await self._close(self._tabs.pop(old_key))
+            return page
+
+    def keys(self) -> List[str]:
+        return list(self._tabs)
+
+    def reset(self) -> None:
+        """Forget every tab (the context they lived in is gone)."""
+        self._tabs.clear()
+
+    async def _unclaimed(self, context, key: str):
+        """A tab nobody owns yet: one already on `key`'s site, else a blank startup tab."""
+        owned = set(map(id, self._tabs.values()))
+        free = [page for page in context.pages if id(page) not in owned]
+        home = self.homes.get(key)
+        on_site = [page for page in free if home and page.url.startswith(home)]
+        for page in on_site + [page for page in free if page.url in ("about:blank", "")]:
+            if await self._healthy(page):
+                return page
+        return None
+
+    @staticmethod
+    async def _healthy(page) -> bool:
+        try:
+            return not page.is_closed() and await asyncio.wait_for(page.evaluate("1"), HEALTH_TIMEOUT) == 1
+        except Exception:
+            return False
+
+    @staticmethod
+    async def _close(page) -> None:
+        try:
+            await page.close()
+        except Exception:
+            pass
+
+
+@dataclass
+class Command:
+    id: int
+    label: str
+    site: str
+    action: PageAction
+    timeout: float
+    future: "asyncio.Future[ToolResult]"
+    state: str = "queued"
+    queued_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+    task: Optional["asyncio.Task"] = None
+
+    def info(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "id": self.id,
+            "action": self.label,
+            "site": self.site,
+            "state": self.state,
+            "waited_s": round((self.started_at or now) - self.queued_at, 2),
+            "running_s": round(now - self.started_at, 2) if self.started_at else 0.0,
+            "timeout_s": self.timeout,
+        }
+
+
+class BrowserService:
+    """Command queue, warm tabs and lifecycle of one Playwright browser context."""
+
+    def __init__(self, name: str, max_tabs: int = BROWSER_MAX_TABS,
+                 homes: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.runner = LoopThread(name)
+        self.tabs = TabPool(max_tabs, homes)
+        self._context = None
+        self._ids = itertools.count(1)
+        self._commands: Dict[int, Command] = {}
+        self._site_locks: Dict[str, asyncio.Lock] = {}
+        # Created on the loop thread by _start()
+        self._queue: Optional[asyncio.Queue] = None
+        self._context_lock: Optional[asyncio.Lock] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        _services.append(self)
+
+    # ── Subclass hooks ─────────────────────────────────────────
+
+    async def open(self):
+        """Return a live browser context."""
+        raise NotImplementedError
+
+    async def shutdown(self, context) -> None:
+        """Release `context` and whatever open() started for it."""
+        await context.close()
+
+    # ── Commands ───────────────────────────────────────────────
+
+    async def submit(self, site: str, action: PageAction, label: Optional[str] = None,
+                     timeout: float = BROWSER_ACTION_TIMEOUT) -> ToolResult:
+        """
+        Queue `action(page)` for the `site` tab and wait for its result.
+        Must be awaited on the service loop; other threads and loops use
+        run() / arun().
+        """
+        self._start()
+        cmd = Command(next(self._ids), label or site, site, action, timeout,
+                      asyncio.get_running_loop().create_future())
+        self._commands[cmd.id] = cmd
+        await self._queue.put(cmd)
+        try:
+            return await asyncio.shield(cmd.future)
+        except asyncio.CancelledError:
+            # The caller gave up (e.g. the request was dropped): don't leave the tab busy
+            if cmd.task is not None:
+                cmd.task.cancel()
+            else:
+                self._commands.pop(cmd.id, None)
+                cmd.state = "cancelled"
+            raise
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Blocking entry point for tool worker threads."""
+        return self.runner.run(coro, timeout)
+
+    async def arun(self, coro: Awaitable[Any]) -> Any:
+        """Entry point for other event loops (the orchestrator's)."""
+        return await self.runner.arun(coro)
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Queued and running commands, oldest first."""
+        return [cmd.info() for cmd in sorted(list(self._commands.values()), key=lambda c: c.id)]
+
+    async def context(self):
+        if self._context_lock is None:
+            self._context_lock = asyncio.Lock()
+        async with self._context_lock:
+            if self._context is None:
+                context = await self.open()
+                context.on("close", lambda *_: self._forget(context))
+                self._context = context
+            return self._context
+
+    async def close(self) -> None:
+        """Close the browser; running commands fail, queued ones reopen it."""
+        context, self._context = self._context, None
+        self.tabs.reset()
+        if context is not None:
+            await self.shutdown(context)
+
+    def _forget(self, context) -> None:
+        if self._context is context:
+            print(f"[EONIX Browser] {self.name} context closed")
+            self._context = None
+            self.tabs.reset()
+
+    def _start(self) -> None:
+        if self._dispatcher is None or self._dispatcher.done():
+            self._queue = self._queue or asyncio.Queue()
+            self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch())
+
+    async def _dispatch(self) -> None:
+        while True:
+            cmd = await self._queue.get()
+            if cmd.state == "queued":
+                cmd.task = asyncio.get_running_loop().create_task(self._run(cmd))
+
+    async def _run(self, cmd: Command) -> None:
+        lock = self._site_locks.setdefault(cmd.site, asyncio.Lock())
+        try:
+            async with lock:
+                cmd.state, cmd.started_at = "running", time.monotonic()
+                result = await asyncio.wait_for(self._in_tab(cmd), cmd.timeout)
+        except asyncio.TimeoutError:
+            result = ToolResult(success=False,
+                                message=f"Browser action '{cmd.label}' timed out after {cmd.timeout:g}s")
+        except asyncio.CancelledError:
+            result = ToolResult(success=False, message=f"Browser action '{cmd.label}' was cancelled")
+        except ImportError:
+            result = ToolResult(success=False,
+                                message="Playwright not installed. Run: pip install playwright && playwright install chromium")
+        except Exception as e:
+            result = ToolResult(success=False, message=f"Browser error in {cmd.label}: {str(e)}")
+        finally:
+            self._commands.pop(cmd.id, None)
+        if not cmd.future.done():
+            cmd.future.set_result(result)
+
+    async def _in_tab(self, cmd: Command) -> ToolResult:
+        context = await self.context()
+        busy = [site for site, lock in self._site_locks.items() if lock.locked()]
+        page = await self.tabs.get(context, cmd.site, busy)
+        await page.bring_to_front()
+        return await cmd.action(page)
+
+
+def pending_actions() -> Dict[str, List[Dict[str, Any]]]:
+    """Pending commands of every browser service, by service name."""
+    return {service.name: service.pending() for service in _services}
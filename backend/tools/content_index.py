@@ -0,0 +1,358 @@
+"""
+EONIX Content Index — Full-text search over the contents of local files.
+
+Text files under the indexed roots are split into line-aligned chunks and
+stored in an SQLite FTS5 table (data/content_index.db), so a query returns
+ranked snippets with the line they start on. Updates are incremental: only
+files whose size or mtime changed are re-read, by a pool of extractor
+processes, and files that disappeared are dropped. Candidate files come
+from the filename index when it is live for a root, else from a walk.
+
+    content_index.update("~/Documents")
+    content_index.search("quarterly revenue", root="~/Documents")
+"""
+import os
+import re
+import time
+import sqlite3
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import (FILE_INDEX_ROOTS, CONTENT_INDEX_ENABLED, CONTENT_INDEX_PATH,
+                    CONTENT_INDEX_WORKERS, CONTENT_INDEX_INTERVAL, CONTENT_INDEX_MAX_BYTES)
+from .tool_result import ToolResult
+from .file_index import FileIndex, _key, _skip, file_index
+from .file_organizer import TEXT_EXTENSIONS
+
+CHUNK_CHARS = 1500     # target chunk size; chunks break at line ends
+MAX_CHUNKS = 10000     # chunks kept per file; chunk rowid = doc id * MAX_CHUNKS + n
+BATCH = 200            # extracted files per write transaction
+POOL_MIN = 64          # fewer changed files than this are read in-process
+SNIPPET_TOKENS = 12
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id    INTEGER PRIMARY KEY,
+    path  TEXT NOT NULL,
+    key   TEXT NOT NULL UNIQUE,     -- normcased path, for subtree lookups
+    size  INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    chunks INTEGER NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS passages USING fts5(
+    text, line UNINDEXED, tokenize='porter unicode61'
+);
+CREATE TABLE IF NOT EXISTS roots (path TEXT PRIMARY KEY, indexed_at REAL NOT NULL, files INTEGER NOT NULL);
+"""
+
+Extracted = Tuple[str, int, float, List[Tuple[int, str]]]  # path, size, mtime, [(line, text)]
+
+
+def _split(text: str) -> List[Tuple[int, str]]:
+    """(first line number, text) chunks of about CHUNK_CHARS, broken at line ends."""
+    out: List[Tuple[int, str]] = []
+    buf: List[str] = []
+    size, start = 0, 1
+    for n, line in enumerate(text.splitlines(), 1):
+        for i in range(0, max(len(line), 1), CHUNK_CHARS):
+            piece = line[i:i + CHUNK_CHARS]
+            if buf and size + len(piece) > CHUNK_CHARS:
+                out.append((start, "\n".join(buf)))
+                buf, size, start = [], 0, n
+            buf.append(piece)
+            size += len(piece) + 1
+    if buf:
+        out.append((start, "\n".join(buf)))
+    return [c for c in out if c[1].strip()][:MAX_CHUNKS]
+
+
+def _extract(item: Tuple[str, int, float]) -> Extracted:
+    """Chunks of one file (runs in an extractor process). Binary or unreadable → no chunks."""
+    path, size, mtime = item
+    try:
+        with open(path, "rb") as f:
+            data = f.read(CONTENT_INDEX_MAX_BYTES)
+    except OSError:
+        return path, size, mtime, []
+    if b"\0" in data[:8192]:
+        return path, size, mtime, []
+    return path, size, mtime, _split(data.decode("utf-8", errors="replace"))
+
+
+def _walk(root: str) -> List[Tuple[str, int, float]]:
+    """(path, size, mtime) of the text files below `root`, skipping what the file index skips."""
+    out = []
+    for parent, dirs, names in os.walk(root):
+        dirs[:] = [d for d in dirs if not _skip(d)]
+        for name in names:
+            if os.path.splitext(name)[1].lower() not in TEXT_EXTENSIONS:
+                continue
+            path = os.path.join(parent, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            out.append((path, st.st_size, st.st_mtime))
+    return out
+
+
+def _match(query: str, op: str = "AND") -> str:
+    """FTS5 query from free text: "quoted phrases" stay phrases, other words are terms."""
+    terms = []
+    for phrase, word in re.findall(r'"([^"]+)"|(\w+)', query):
+        words = re.findall(r"\w+", phrase) if phrase else [word]
+        if words:
+            terms.append('"' + " ".join(words) + '"')
+    return f" {op} ".join(terms)
+
+
+class ContentIndex:
+    """SQLite FTS5 index over the text of files below a set of roots."""
+
+    def __init__(self, path: str = CONTENT_INDEX_PATH, workers: int = CONTENT_INDEX_WORKERS,
+                 files: FileIndex = file_index):
+        self.path = path
+        self.workers = workers
+        self.files = files
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._update_lock = threading.Lock()
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            with self._lock:
+                if self._db is None:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    db = sqlite3.connect(self.path, check_same_thread=False)
+                    db.execute("PRAGMA journal_mode=WAL")
+                    db.execute("PRAGMA synchronous=NORMAL")
+                    db.executescript(SCHEMA)
+                    self._db = db
+        return self._db
+
+    def roots(self) -> List[str]:
+        if self._db is None and not os.path.exists(self.path):
+            return []
+        with self._lock:
+            return [r[0] for r in self.db.execute("SELECT path FROM roots")]
+
+    def covers(self, path: str) -> bool:
+        key = _key(path)
+        return any(key == r or key.startswith(r.rstrip(os.sep) + os.sep) for r in self.roots())
+
+    # ── Updating ───────────────────────────────────────────────
+
+    def candidates(self, root: str) -> List[Tuple[str, int, float]]:
+        """Text files below `root`: from the filename index when it's live there, else a walk."""
+        if self.files.live(root):
+            return self.files.files(root, TEXT_EXTENSIONS)
+        return _walk(root)
+
+    def update(self, root: str) -> Dict[str, Any]:
+        """
+        Bring `root` up to date: extract new and changed files (by size and
+        mtime) in parallel, drop files that are gone. Returns counts and timings.
+        """
+        root = os.path.abspath(os.path.expanduser(root))
+        root_key = _key(root)
+        t0 = time.perf_counter()
+        with self._update_lock:
+            found = {_key(p): (p, size, mtime) for p, size, mtime in self.candidates(root)}
+            cond, args = FileIndex._under(root_key, "key")
+            with self._lock:
+                known = {key: (doc_id, size, mtime) for doc_id, key, size, mtime in self.db.execute(
+                    f"SELECT id, key, size, mtime FROM docs WHERE {cond}", args)}
+            changed = [item for key, item in found.items()
+                       if key not in known or known[key][1:] != item[1:]]
+            gone = [known[key][0] for key in known.keys() - found.keys()]
+
+            stats = {"files": len(found), "changed": len(changed), "removed": len(gone), "chunks": 0}
+            with self._lock, self.db:
+                for doc_id in gone:
+                    self._forget(doc_id)
+            batch: List[Extracted] = []
+            for extracted in self._extract_all(changed):
+                batch.append(extracted)
+                stats["chunks"] += len(extracted[3])
+                if len(batch) >= BATCH:
+                    self._write(batch)
+                    batch.clear()
+            self._write(batch)
+
+            with self._lock, self.db:
+                self.db.execute("INSERT OR REPLACE INTO roots(path, indexed_at, files) VALUES (?, ?, ?)",
+                                (root_key, time.time(), len(found)))
+        stats["ms"] = round((time.perf_counter() - t0) * 1000)
+        return stats
+
+    def _extract_all(self, items: List[Tuple[str, int, float]]) -> Iterable[Extracted]:
+        if len(items) < POOL_MIN or self.workers <= 1:
+            return map(_extract, items)
+        return self._pooled(items)
+
+    def _pooled(self, items: List[Tuple[str, int, float]]) -> Iterable[Extracted]:
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            yield from pool.map(_extract, items, chunksize=32)
+
+    def _write(self, batch: List[Extracted]) -> None:
+        if not batch:
+            return
+        with self._lock, self.db:
+            for path, size, mtime, chunks in batch:
+                key = _key(path)
+                self.db.execute(
+                    "INSERT INTO docs(path, key, size, mtime, chunks) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET path=excluded.path, size=excluded.size, "
+                    "mtime=excluded.mtime, chunks=excluded.chunks", (path, key, size, mtime, len(chunks)))
+                doc_id = self.db.execute("SELECT id FROM docs WHERE key = ?", (key,)).fetchone()[0]
+                self._forget(doc_id, keep_doc=True)
+                base = doc_id * MAX_CHUNKS
+                self.db.executemany("INSERT INTO passages(rowid, text, line) VALUES (?, ?, ?)",
+                                    [(base + n, text, line) for n, (line, text) in enumerate(chunks)])
+
+    def _forget(self, doc_id: int, keep_doc: bool = False) -> None:
+        base = doc_id * MAX_CHUNKS
+        self.db.execute("DELETE FROM passages WHERE rowid >= ? AND rowid < ?", (base, base + MAX_CHUNKS))
+        if not keep_doc:
+            self.db.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+
+    # ── Queries ────────────────────────────────────────────────
+
+    def search(self, query: str, root: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Files whose text matches `query`, best first, with the best-matching
+        chunk's snippet and starting line. All words must match; when no file
+        has all of them, any word does.
+        """
+        if not self.roots():
+            return []
+        for op in ("AND", "OR"):
+            match = _match(query, op)
+            if not match:
+                return []
+            hits = self._search(match, root, limit)
+            if hits or op == "OR" or " AND " not in match:
+                return hits
+        return []
+
+    def _search(self, match: str, root: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        extra, args = "", []
+        if root:
+            cond, args = FileIndex._under(_key(os.path.expanduser(root)), "d.key")
+            extra = f" AND {cond}"
+        # Rank first, then build snippets for the winners only: snippet() in
+        # the ranking query would run for every matching chunk
+        rank_sql = (f"SELECT passages.rowid, passages.rank FROM passages "
+                    f"JOIN docs d ON d.id = passages.rowid / {MAX_CHUNKS} "
+                    f"WHERE passages MATCH ?{extra} ORDER BY passages.rank LIMIT ?")
+        best: Dict[int, Tuple[int, float]] = {}  # doc id → (best chunk rowid, rank)
+        fetch = limit * 4
+        with self._lock:
+            while True:
+                rows = self.db.execute(rank_sql, [match] + args + [fetch]).fetchall()
+                for rowid, rank in rows:
+                    if len(best) >= limit:
+                        break
+                    best.setdefault(rowid // MAX_CHUNKS, (rowid, rank))
+                if len(best) >= limit or len(rows) < fetch:
+                    break
+                fetch *= 4
+            if not best:
+                return []
+            chosen = [rowid for rowid, _ in best.values()]
+            details = {rowid: (path, line, snippet) for rowid, path, line, snippet in self.db.execute(
+                f"SELECT passages.rowid, d.path, passages.line, "
+                f"snippet(passages, 0, '[', ']', '…', {SNIPPET_TOKENS}) "
+                f"FROM passages JOIN docs d ON d.id = passages.rowid / {MAX_CHUNKS} "
+                f"WHERE passages MATCH ? AND passages.rowid IN ({','.join('?' * len(chosen))})",
+                [match] + chosen)}
+        out = []
+        for rowid, rank in best.values():
+            path, line, snippet = details[rowid]
+            out.append({"path": path, "line": line, "snippet": snippet.replace("\n", " "),
+                        "score": round(-rank, 4)})
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        roots = self.roots()
+        if not roots:
+            return {"files": 0, "chunks": 0, "roots": []}
+        with self._lock:
+            files, chunks = self.db.execute("SELECT COUNT(*), COALESCE(SUM(chunks), 0) FROM docs").fetchone()
+        return {"files": files, "chunks": chunks, "roots": roots}
+
+
+class ContentSearch:
+    """search_file_contents tool: ranked snippets from the content index."""
+
+    def __init__(self, index: Optional[ContentIndex] = None):
+        self.index = index or content_index
+
+    def execute(self, query: str, path: Optional[str] = None, limit: int = 10) -> ToolResult:
+        try:
+            if path:
+                path = os.path.abspath(os.path.expanduser(path))
+                if not os.path.isdir(path):
+                    return ToolResult(success=False, message=f"Folder not found: {path}")
+                if not self.index.covers(path):
+                    self.index.update(path)  # first search of this folder indexes it
+            hits = self.index.search(query, root=path, limit=int(limit))
+            if not hits:
+                where = path or "the indexed folders"
+                return ToolResult(success=True, message=f"No files in {where} mention '{query}'",
+                                  data={"results": []})
+            lines = [f"  • {h['path']} (line {h['line']}): {h['snippet']}" for h in hits]
+            return ToolResult(success=True,
+                              message=f"Found {len(hits)} files mentioning '{query}':\n" + "\n".join(lines),
+                              data={"results": hits})
+        except Exception as e:
+            return ToolResult(success=False, message=f"Content search failed: {str(e)}")
+
+
+class ContentIndexJob:
+    """Periodic incremental update of the content index for the configured roots."""
+
+    STARTUP_DELAY = 60  # seconds; let the filename index finish its first crawl
+
+    def __init__(self, index: ContentIndex, roots: List[str] = FILE_INDEX_ROOTS):
+        self.index = index
+        self.roots = [os.path.abspath(os.path.expanduser(r)) for r in roots]
+        self.running = False
+
+    def run_once(self) -> Dict[str, Any]:
+        results = {}
+        for root in self.roots:
+            if os.path.isdir(root):
+                results[root] = self.index.update(root)
+        changed = sum(r["changed"] for r in results.values())
+        files = sum(r["files"] for r in results.values())
+        ms = sum(r["ms"] for r in results.values())
+        print(f"OK: Content index: {changed} of {files} files re-read ({ms} ms)")
+        return results
+
+    async def _sleep(self, seconds: int) -> None:
+        for _ in range(seconds):
+            if not self.running:
+                break
+            await asyncio.sleep(1)
+
+    async def start(self):
+        self.running = True
+        await self._sleep(self.STARTUP_DELAY)
+        while self.running:
+            try:
+                await asyncio.to_thread(self.run_once)
+            except Exception as e:
+                print(f"ERROR: Content index update failed: {e}")
+            await self._sleep(CONTENT_INDEX_INTERVAL)
+
+    def stop(self):
+        self.running = False
+
+
+# Global instances
+content_index = ContentIndex()
+content_index_job = ContentIndexJob(content_index) if CONTENT_INDEX_ENABLED else None
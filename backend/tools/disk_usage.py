@@ -0,0 +1,268 @@
+"""
+EONIX Disk Usage — What is using the space under a folder.
+
+A scan walks the tree with parallel os.scandir threads and stores, per
+directory, the bytes and count of the files directly in it, its subtree
+totals and its largest files (data/disk_usage.db). A directory whose mtime
+is unchanged since the last scan has the same entries, so a repeat scan only
+stats it and lists just the directories that changed. Only per-directory
+rows are held while scanning, never per-file ones, so trees of millions of
+files scan in bounded memory.
+
+Sizes are apparent sizes. Editing a file in place doesn't touch its
+directory's mtime; pass refresh=True to re-list everything.
+
+    disk_usage_index.scan("~")
+    disk_usage_index.drill("~/Downloads")     # children by size + largest files
+"""
+import os
+import heapq
+import time
+import sqlite3
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import DISK_USAGE_PATH, DISK_USAGE_WORKERS
+from .tool_result import ToolResult
+from .file_index import FileIndex, _key, _scan
+from .duplicate_finder import _human
+
+FILES_PER_DIR = 10   # largest files kept per directory; top-file queries are exact up to this many
+BATCH = 2000         # directories per write transaction during a scan
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    key         TEXT PRIMARY KEY,   -- normcased path
+    path        TEXT NOT NULL,
+    parent      TEXT NOT NULL,
+    mtime       REAL NOT NULL,
+    own_bytes   INTEGER NOT NULL,   -- files directly in the directory
+    own_files   INTEGER NOT NULL,
+    total_bytes INTEGER NOT NULL,   -- whole subtree
+    total_files INTEGER NOT NULL,
+    total_dirs  INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_dirs_parent ON dirs(parent);
+CREATE TABLE IF NOT EXISTS big_files (
+    dir  TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_big_files_dir ON big_files(dir);
+"""
+
+
+Summary = Tuple[float, Optional[Tuple[int, int, List[Tuple[str, int]], List[str]]]]
+
+
+def _summarize(path: str, known_mtime: Optional[float]) -> Optional[Summary]:
+    """
+    (mtime, (own bytes, own files, largest files, subdirectories)) of one
+    directory, reduced in the worker so finished listings waiting for the
+    scan loop hold FILES_PER_DIR files each, not every entry. The second
+    item is None when the mtime is unchanged; None if unreadable.
+    """
+    listing = _scan(path, known_mtime)
+    if listing is None or listing[1] is None:
+        return listing
+    mtime, entries = listing
+    files = [(os.path.join(path, name), size) for name, is_dir, size, _ in entries if not is_dir]
+    return mtime, (sum(size for _, size in files), len(files),
+                   heapq.nlargest(FILES_PER_DIR, files, key=lambda f: f[1]),
+                   [os.path.join(path, name) for name, is_dir, _, _ in entries if is_dir])
+
+
+class DiskUsageIndex:
+    """Directory-size tree of scanned folders, refreshed incrementally by directory mtime."""
+
+    def __init__(self, path: str = DISK_USAGE_PATH, workers: int = DISK_USAGE_WORKERS):
+        self.path = path
+        self.workers = workers
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._scan_lock = threading.Lock()
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            with self._lock:
+                if self._db is None:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    db = sqlite3.connect(self.path, check_same_thread=False)
+                    db.execute("PRAGMA journal_mode=WAL")
+                    db.execute("PRAGMA synchronous=NORMAL")
+                    db.executescript(SCHEMA)
+                    self._db = db
+        return self._db
+
+    # ── Scanning ───────────────────────────────────────────────
+
+    def scan(self, root: str, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Bring the tree under `root` up to date. Directories whose mtime is
+        unchanged are only stat'ed (unless `refresh`); the rest are listed.
+        Returns counts and timings.
+        """
+        root = os.path.abspath(os.path.expanduser(root))
+        root_key = _key(root)
+        t0 = time.perf_counter()
+        with self._scan_lock:
+            cond, args = FileIndex._under(root_key, "key")
+            with self._lock:
+                known = {key: (mtime, own_bytes, own_files) for key, mtime, own_bytes, own_files in
+                         self.db.execute(f"SELECT key, mtime, own_bytes, own_files FROM dirs WHERE {cond}", args)}
+            # key → [path, parent key, mtime, own bytes, own files], in BFS order (parents first)
+            nodes: Dict[str, list] = {}
+            listed: List[Tuple[str, List[Tuple[str, int]]]] = []
+            stats = {"dirs": 0, "listed": 0, "unreadable": 0}
+
+            def flush() -> None:
+                with self._lock, self.db:
+                    for key, files in listed:
+                        self.db.execute("DELETE FROM big_files WHERE dir = ?", (key,))
+                        self.db.executemany("INSERT INTO big_files(dir, path, size) VALUES (?, ?, ?)",
+                                            [(key, p, size) for p, size in files])
+                listed.clear()
+
+            def cached_mtime(key: str) -> Optional[float]:
+                return None if refresh or key not in known else known[key][0]
+
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="DiskUsage") as pool:
+                pending = {pool.submit(_summarize, root, cached_mtime(root_key)): root}
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for fut in done:
+                        parent = pending.pop(fut)
+                        key = _key(parent)
+                        listing = fut.result()
+                        if listing is None:
+                            stats["unreadable"] += 1
+                            if parent == root:
+                                raise FileNotFoundError(f"Can't read {root}")
+                            continue
+                        mtime, summary = listing
+                        stats["dirs"] += 1
+                        if summary is None:
+                            # Same entries as last time: sizes and subdirectories from the cache
+                            _, own_bytes, own_files = known[key]
+                            with self._lock:
+                                subdirs = [r[0] for r in self.db.execute(
+                                    "SELECT path FROM dirs WHERE parent = ?", (key,))]
+                        else:
+                            stats["listed"] += 1
+                            own_bytes, own_files, largest, subdirs = summary
+                            listed.append((key, largest))
+                        nodes[key] = [parent, _key(os.path.dirname(parent)), mtime, own_bytes, own_files]
+                        for child in subdirs:
+                            pending[pool.submit(_summarize, child, cached_mtime(_key(child)))] = child
+                    if len(listed) >= BATCH:
+                        flush()
+            flush()
+
+            # Subtree totals, children before parents
+            totals: Dict[str, List[int]] = {}
+            for key in reversed(list(nodes)):
+                _, parent, _, own_bytes, own_files = nodes[key]
+                total = totals.setdefault(key, [0, 0, 0])
+                total[0] += own_bytes
+                total[1] += own_files
+                if key != root_key and parent in nodes:
+                    up = totals.setdefault(parent, [0, 0, 0])
+                    up[0] += total[0]
+                    up[1] += total[1]
+                    up[2] += total[2] + 1
+            gone = [(key,) for key in known if key not in nodes]
+            with self._lock, self.db:
+                self.db.executemany("DELETE FROM dirs WHERE key = ?", gone)
+                self.db.executemany("DELETE FROM big_files WHERE dir = ?", gone)
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO dirs(key, path, parent, mtime, own_bytes, own_files, "
+                    "total_bytes, total_files, total_dirs) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(key, path, parent, mtime, own_bytes, own_files, *totals[key])
+                     for key, (path, parent, mtime, own_bytes, own_files) in nodes.items()])
+        stats.update(removed=len(gone), bytes=totals[root_key][0], files=totals[root_key][1],
+                     ms=round((time.perf_counter() - t0) * 1000))
+        return stats
+
+    # ── Queries ────────────────────────────────────────────────
+
+    def covers(self, path: str) -> bool:
+        if self._db is None and not os.path.exists(self.path):
+            return False
+        with self._lock:
+            return self.db.execute("SELECT 1 FROM dirs WHERE key = ?", (_key(path),)).fetchone() is not None
+
+    def top_dirs(self, root: str, n: int = 10) -> List[Dict[str, Any]]:
+        """Largest directories below `root` by subtree size."""
+        cond, args = FileIndex._under(_key(root), "key")
+        with self._lock:
+            rows = self.db.execute(
+                f"SELECT path, total_bytes, total_files FROM dirs WHERE {cond} AND key != ? "
+                f"ORDER BY total_bytes DESC LIMIT ?", args + [_key(root), n]).fetchall()
+        return [{"path": p, "bytes": b, "files": f} for p, b, f in rows]
+
+    def top_files(self, root: str, n: int = 10) -> List[Dict[str, Any]]:
+        """Largest files below `root` (exact for n up to FILES_PER_DIR)."""
+        cond, args = FileIndex._under(_key(root), "dir")
+        with self._lock:
+            rows = self.db.execute(f"SELECT path, size FROM big_files WHERE {cond} ORDER BY size DESC LIMIT ?",
+                                   args + [n]).fetchall()
+        return [{"path": p, "bytes": s} for p, s in rows]
+
+    def drill(self, path: str, n: int = 20) -> Optional[Dict[str, Any]]:
+        """One directory as last scanned: its totals, subdirectories by size and largest files. None if not scanned."""
+        key = _key(os.path.abspath(os.path.expanduser(path)))
+        with self._lock:
+            row = self.db.execute("SELECT path, own_bytes, own_files, total_bytes, total_files, total_dirs "
+                                  "FROM dirs WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            children = self.db.execute(
+                "SELECT path, total_bytes, total_files, total_dirs FROM dirs WHERE parent = ? "
+                "ORDER BY total_bytes DESC LIMIT ?", (key, n)).fetchall()
+            files = self.db.execute("SELECT path, size FROM big_files WHERE dir = ? ORDER BY size DESC",
+                                    (key,)).fetchall()
+        return {"path": row[0], "bytes": row[3], "files": row[4], "dirs": row[5],
+                "own_bytes": row[1], "own_files": row[2],
+                "children": [{"path": p, "name": os.path.basename(p), "bytes": b, "files": f, "dirs": d}
+                             for p, b, f, d in children],
+                "largest_files": [{"path": p, "name": os.path.basename(p), "bytes": s} for p, s in files]}
+
+
+class DiskUsage:
+    """analyze_disk_usage tool: scan a folder (incrementally) and report what takes the space."""
+
+    def __init__(self, index: Optional[DiskUsageIndex] = None):
+        self.index = index or disk_usage_index
+
+    def execute(self, path: Optional[str] = None, top: int = 10, refresh: bool = False) -> ToolResult:
+        try:
+            root = os.path.abspath(os.path.expanduser(path or "~"))
+            if not os.path.isdir(root):
+                return ToolResult(success=False, message=f"Folder not found: {root}")
+            top = max(1, int(top))
+            stats = self.index.scan(root, refresh=bool(refresh))
+            view = self.index.drill(root, top)
+            dirs = self.index.top_dirs(root, top)
+            files = self.index.top_files(root, top)
+
+            lines = [f"{root} uses {_human(view['bytes'])} in {view['files']} files "
+                     f"({stats['listed']} of {stats['dirs']} folders re-listed, {stats['ms']} ms)."]
+            if view["children"]:
+                lines.append("Folders here, largest first:")
+                lines += [f"  • {_human(c['bytes'])}  {c['name']}" for c in view["children"][:top]]
+            if dirs:
+                lines.append("Largest folders anywhere below:")
+                lines += [f"  • {_human(d['bytes'])}  {os.path.relpath(d['path'], root)}" for d in dirs]
+            if files:
+                lines.append("Largest files:")
+                lines += [f"  • {_human(f['bytes'])}  {os.path.relpath(f['path'], root)}" for f in files]
+            return ToolResult(success=True, message="\n".join(lines),
+                              data={**view, "top_dirs": dirs, "top_files": files, "stats": stats})
+        except Exception as e:
+            return ToolResult(success=False, message=f"Disk usage scan failed: {str(e)}")
+
+
+# Global instance
+disk_usage_index = DiskUsageIndex()
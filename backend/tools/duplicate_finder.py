@@ -0,0 +1,437 @@
+"""
+EONIX Duplicate Finder — Finds files with identical contents.
+
+Files are narrowed down in three passes, each only over what the previous
+one left in contention:
+
+    1. size            — from the filename index when it is live, else a walk
+    2. partial hash    — first and last 64 KB of same-size files
+    3. full hash       — only files whose size and partial hash both collide
+
+Hashing runs in a pool of processes, and digests are kept in an SQLite
+cache (data/hash_cache.db) keyed by path, size and mtime, so a repeat scan
+only hashes files that changed. Groups are yielded as soon as they are
+confirmed. Every duplicate is paired with a copy kept in its own folder
+when there is one, so one folder is never cleaned out in favour of another
+that merely holds an older copy. The extra copies can be moved aside
+through the organizer's journaled mover (undo_last_organize puts them
+back) or sent to the trash; either needs auto_confirm, otherwise the tool
+returns the plan.
+
+    for group in find_duplicates("~/Downloads"):
+        print(group["keep"], group["duplicates"], group["wasted"])
+"""
+import os
+import stat
+import time
+import sqlite3
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from config import HASH_CACHE_PATH, DUPLICATE_WORKERS
+from .tool_result import ToolResult
+from .file_index import FileIndex, _key, _skip, file_index
+from .file_mover import file_mover
+
+try:
+    import xxhash
+    HAS_XXHASH = True
+except ImportError:
+    HAS_XXHASH = False
+
+try:
+    from send2trash import send2trash
+    HAS_SEND2TRASH = True
+except ImportError:
+    HAS_SEND2TRASH = False
+
+PARTIAL_BLOCK = 64 * 1024   # bytes hashed from each end in the partial pass
+READ_CHUNK = 1 << 20
+POOL_MIN = 64               # fewer files than this are hashed in-process...
+POOL_MIN_BYTES = 64 << 20   # ...unless there are at least this many bytes to read
+DUPLICATES_FOLDER = "Duplicates"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    key     TEXT PRIMARY KEY,       -- normcased path
+    size    INTEGER NOT NULL,
+    mtime   REAL NOT NULL,
+    partial TEXT NOT NULL,
+    full    TEXT                    -- NULL until the full pass needed it
+);
+"""
+
+Candidate = Tuple[str, int, float]  # path, size, mtime
+
+
+def _hasher():
+    return xxhash.xxh3_128() if HAS_XXHASH else hashlib.blake2b(digest_size=16)
+
+
+def _partial_hash(path: str) -> Tuple[str, Optional[str]]:
+    """Digest of the first and last PARTIAL_BLOCK bytes (the whole file when it is no bigger than both)."""
+    h = _hasher()
+    try:
+        with open(path, "rb") as f:
+            head = f.read(2 * PARTIAL_BLOCK)
+            h.update(head)
+            if len(head) == 2 * PARTIAL_BLOCK:
+                f.seek(-PARTIAL_BLOCK, os.SEEK_END)
+                h.update(f.read(PARTIAL_BLOCK))
+    except OSError:
+        return path, None
+    return path, h.hexdigest()
+
+
+def _full_hash(path: str) -> Tuple[str, Optional[str]]:
+    h = _hasher()
+    buf = bytearray(READ_CHUNK)
+    view = memoryview(buf)
+    try:
+        with open(path, "rb", buffering=0) as f:
+            while True:
+                n = f.readinto(buf)
+                if not n:
+                    break
+                h.update(view[:n])
+    except OSError:
+        return path, None
+    return path, h.hexdigest()
+
+
+def _walk(root: str, min_size: int) -> List[Candidate]:
+    """Regular files of at least `min_size` bytes below `root`; extra hard links to a file are left out."""
+    out: List[Candidate] = []
+    inodes = set()
+    for parent, dirs, names in os.walk(root):
+        dirs[:] = [d for d in dirs if not _skip(d)]
+        for name in names:
+            if _skip(name):
+                continue
+            path = os.path.join(parent, name)
+            try:
+                st = os.lstat(path)
+            except OSError:
+                continue
+            if not stat.S_ISREG(st.st_mode) or st.st_size < min_size:
+                continue
+            if st.st_nlink > 1:
+                if (st.st_dev, st.st_ino) in inodes:
+                    continue  # same data, not a copy
+                inodes.add((st.st_dev, st.st_ino))
+            out.append((path, st.st_size, st.st_mtime))
+    return out
+
+
+def _unlinked(items: List[Candidate]) -> List[Candidate]:
+    """
+    `items` without extra hard links to the same file. Only files that share
+    a size can be links of each other, so only those are stat'ed.
+    """
+    sizes: Dict[int, int] = {}
+    for item in items:
+        sizes[item[1]] = sizes.get(item[1], 0) + 1
+    out: List[Candidate] = []
+    inodes: Set[Tuple[int, int]] = set()
+    for item in items:
+        if sizes[item[1]] > 1:
+            try:
+                st = os.lstat(item[0])
+            except OSError:
+                continue
+            if st.st_nlink > 1:
+                if (st.st_dev, st.st_ino) in inodes:
+                    continue
+                inodes.add((st.st_dev, st.st_ino))
+        out.append(item)
+    return out
+
+
+def _collisions(items: Iterable[Candidate], key) -> List[List[Candidate]]:
+    groups: Dict[Any, List[Candidate]] = {}
+    for item in items:
+        groups.setdefault(key(item), []).append(item)
+    return [g for g in groups.values() if len(g) > 1]
+
+
+class HashCache:
+    """Partial and full digests per file, valid while its size and mtime are unchanged."""
+
+    def __init__(self, path: str = HASH_CACHE_PATH):
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            with self._lock:
+                if self._db is None:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    db = sqlite3.connect(self.path, check_same_thread=False)
+                    db.execute("PRAGMA journal_mode=WAL")
+                    db.execute("PRAGMA synchronous=NORMAL")
+                    db.executescript(SCHEMA)
+                    self._db = db
+        return self._db
+
+    def lookup(self, items: List[Candidate]) -> Dict[str, Tuple[str, Optional[str]]]:
+        """path → (partial, full) for the items whose cached entry is still current."""
+        by_key = {_key(p): (p, size, mtime) for p, size, mtime in items}
+        keys = list(by_key)
+        out = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                rows = self.db.execute(
+                    f"SELECT key, size, mtime, partial, full FROM hashes WHERE key IN ({','.join('?' * len(batch))})",
+                    batch)
+                for key, size, mtime, partial, full in rows:
+                    path, cur_size, cur_mtime = by_key[key]
+                    if (size, mtime) == (cur_size, cur_mtime):
+                        out[path] = (partial, full)
+        return out
+
+    def store_partial(self, rows: List[Tuple[Candidate, str]]) -> None:
+        """Fresh partial digests; a file small enough to be read whole gets its full digest too."""
+        if not rows:
+            return
+        with self._lock, self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO hashes(key, size, mtime, partial, full) VALUES (?, ?, ?, ?, ?)",
+                [(_key(p), size, mtime, digest, digest if size <= 2 * PARTIAL_BLOCK else None)
+                 for (p, size, mtime), digest in rows])
+
+    def store_full(self, rows: List[Tuple[Candidate, str]]) -> None:
+        if not rows:
+            return
+        with self._lock, self.db:
+            self.db.executemany("UPDATE hashes SET full = ? WHERE key = ? AND size = ? AND mtime = ?",
+                                [(digest, _key(p), size, mtime) for (p, size, mtime), digest in rows])
+
+    def prune(self, root: str, keep: Iterable[str]) -> int:
+        """Drop entries below `root` other than the `keep` paths (files gone, or no longer sharing a size)."""
+        keep_keys = {_key(p) for p in keep}
+        cond, args = FileIndex._under(_key(root), "key")
+        with self._lock:
+            stale = [(k,) for (k,) in self.db.execute(f"SELECT key FROM hashes WHERE {cond}", args)
+                     if k not in keep_keys]
+            if stale:
+                with self.db:
+                    self.db.executemany("DELETE FROM hashes WHERE key = ?", stale)
+        return len(stale)
+
+
+class DuplicateScan:
+    """One duplicate search over a folder; iterate it for groups, then read `stats`."""
+
+    def __init__(self, root: str, min_size: int = 1, cache: Optional["HashCache"] = None,
+                 workers: int = DUPLICATE_WORKERS, files: FileIndex = file_index):
+        self.root = os.path.abspath(os.path.expanduser(root))
+        self.min_size = max(1, int(min_size))  # empty files are all "equal"; not worth reporting
+        self.cache = cache or hash_cache
+        self.workers = workers
+        self.files = files
+        self.stats: Dict[str, Any] = {}
+
+    def candidates(self) -> List[Candidate]:
+        """Files to compare; copies set aside by an earlier "move" are not counted again."""
+        if self.files.live(self.root):
+            found = _unlinked([c for c in self.files.files(self.root) if c[1] >= self.min_size])
+        else:
+            found = _walk(self.root, self.min_size)
+        aside = _key(os.path.join(self.root, DUPLICATES_FOLDER)) + os.sep
+        return [c for c in found if not _key(c[0]).startswith(aside)]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        t0 = time.perf_counter()
+        stats = self.stats
+        stats.update(files=0, same_size=0, partial_hashed=0, full_hashed=0, cached=0,
+                     groups=0, duplicates=0, wasted=0)
+        files = self.candidates()
+        stats["files"] = len(files)
+        same_size = [item for group in _collisions(files, lambda c: c[1]) for item in group]
+        stats["same_size"] = len(same_size)
+
+        # Pass 2: partial hashes of everything that shares a size
+        cached = self.cache.lookup(same_size)
+        partial: Dict[str, str] = {p: d[0] for p, d in cached.items()}
+        full: Dict[str, str] = {p: d[1] for p, d in cached.items() if d[1]}
+        todo = [c for c in same_size if c[0] not in partial]
+        fresh = []
+        for item, digest in self._hash(_partial_hash, todo):
+            if digest is not None:
+                partial[item[0]] = digest
+                fresh.append((item, digest))
+                if item[1] <= 2 * PARTIAL_BLOCK:
+                    full[item[0]] = digest
+        self.cache.store_partial(fresh)
+        stats["partial_hashed"] = len(fresh)
+        contending = _collisions((c for c in same_size if c[0] in partial), lambda c: (c[1], partial[c[0]]))
+        self.cache.prune(self.root, partial)
+
+        # Groups already settled by cached or whole-file digests go out first
+        pending: List[List[Candidate]] = []
+        for group in contending:
+            if all(c[0] in full for c in group):
+                yield from self._confirm(group, full)
+            else:
+                pending.append(group)
+
+        # Pass 3: full hashes, biggest files first; a group is yielded once all its files are in
+        waiting = {c[0]: i for i, group in enumerate(pending) for c in group if c[0] not in full}
+        left = [sum(1 for c in group if c[0] not in full) for group in pending]
+        todo = sorted((c for group in pending for c in group if c[0] not in full), key=lambda c: -c[1])
+        fresh = []
+        for item, digest in self._hash(_full_hash, todo):
+            if digest is not None:
+                full[item[0]] = digest
+                fresh.append((item, digest))
+            i = waiting[item[0]]
+            left[i] -= 1
+            if not left[i]:
+                yield from self._confirm(pending[i], full)
+        self.cache.store_full(fresh)
+        stats["full_hashed"] = len(fresh)
+        stats["cached"] = len(cached)
+        stats["ms"] = round((time.perf_counter() - t0) * 1000)
+
+    def _confirm(self, group: List[Candidate], full: Dict[str, str]) -> Iterator[Dict[str, Any]]:
+        """
+        Groups of identical files within a (size, partial hash) group. Copies
+        sharing a folder are grouped first, keeping the oldest there; the one
+        copy left per folder then forms a last group, again keeping the oldest.
+        """
+        for same in _collisions((c for c in group if c[0] in full), lambda c: full[c[0]]):
+            same.sort(key=lambda c: (c[2], len(c[0]), c[0]))
+            by_folder: Dict[str, List[Candidate]] = {}
+            for c in same:
+                by_folder.setdefault(os.path.dirname(c[0]), []).append(c)
+            sets = [copies for copies in by_folder.values() if len(copies) > 1]
+            survivors = sorted((copies[0] for copies in by_folder.values()), key=lambda c: (c[2], len(c[0]), c[0]))
+            if len(survivors) > 1:
+                sets.append(survivors)
+            for copies in sets:
+                size = copies[0][1]
+                self.stats["groups"] += 1
+                self.stats["duplicates"] += len(copies) - 1
+                self.stats["wasted"] += size * (len(copies) - 1)
+                yield {"size": size, "hash": full[copies[0][0]], "keep": copies[0][0],
+                       "duplicates": [c[0] for c in copies[1:]], "wasted": size * (len(copies) - 1)}
+
+    def _hash(self, fn, items: List[Candidate]) -> Iterator[Tuple[Candidate, Optional[str]]]:
+        """(item, digest) pairs as they finish; a process pool when there's enough to read."""
+        if not items:
+            return
+        nbytes = sum(min(c[1], 2 * PARTIAL_BLOCK) if fn is _partial_hash else c[1] for c in items)
+        if self.workers <= 1 or (len(items) < POOL_MIN and nbytes < POOL_MIN_BYTES):
+            for item in items:
+                yield item, fn(item[0])[1]
+            return
+        by_path = {c[0]: c for c in items}
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            if fn is _partial_hash:
+                for path, digest in pool.map(fn, list(by_path), chunksize=64):
+                    yield by_path[path], digest
+            else:
+                for fut in as_completed([pool.submit(fn, p) for p in by_path]):
+                    path, digest = fut.result()
+                    yield by_path[path], digest
+
+
+def find_duplicates(root: str, min_size: int = 1) -> DuplicateScan:
+    """
+    Iterable of duplicate groups below `root`: {"size", "hash", "keep",
+    "duplicates", "wasted"}. Identical files spread over several folders can
+    come out as more than one group; each file is a duplicate in at most one.
+    """
+    return DuplicateScan(root, min_size)
+
+
+def _human(n: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TB"
+
+
+class DuplicateFinder:
+    """find_duplicates tool: report duplicate files, or move / trash the extra copies once confirmed."""
+
+    ACTIONS = ("report", "move", "trash")
+
+    def execute(self, path: str, min_size: int = 1, action: str = "report", limit: int = 10,
+                auto_confirm: bool = False) -> ToolResult:
+        try:
+            root = os.path.abspath(os.path.expanduser(path))
+            if not os.path.isdir(root):
+                return ToolResult(success=False, message=f"Folder not found: {root}")
+            action = (action or "report").lower()
+            if action not in self.ACTIONS:
+                return ToolResult(success=False, message=f"Unknown action '{action}'. Use one of: {', '.join(self.ACTIONS)}")
+            if action == "trash" and not HAS_SEND2TRASH:
+                return ToolResult(success=False, message="Trash isn't available (pip install send2trash). "
+                                                         "Use action 'move' to set the copies aside instead.")
+
+            scan = find_duplicates(root, min_size)
+            groups = sorted(scan, key=lambda g: -g["wasted"])
+            stats = scan.stats
+            if not groups:
+                return ToolResult(success=True, message=f"No duplicate files in {root}.",
+                                  data={"groups": [], "stats": stats})
+            if action != "report" and auto_confirm:
+                return self._move(root, groups, stats) if action == "move" else self._trash(groups, stats)
+
+            lines = [f"  • {_human(g['wasted'])}: {os.path.relpath(g['keep'], root)} "
+                     f"+ {len(g['duplicates'])} cop{'y' if len(g['duplicates']) == 1 else 'ies'}"
+                     for g in groups[:int(limit)]]
+            msg = (f"Found {stats['duplicates']} duplicate files in {stats['groups']} groups, "
+                   f"wasting {_human(stats['wasted'])}:\n" + "\n".join(lines))
+            if len(groups) > int(limit):
+                msg += f"\n  …and {len(groups) - int(limit)} more groups"
+            data = {"groups": groups, "stats": stats}
+            if action != "report":
+                # Nothing is touched until the plan is confirmed
+                data["plan"] = [{"path": p, "keep": g["keep"], "action": action}
+                                for g in groups for p in g["duplicates"]]
+                where = f"move them to {DUPLICATES_FOLDER}" if action == "move" else "send them to the trash"
+                msg += f"\nReview required: call again with auto_confirm=true to {where}."
+            return ToolResult(success=True, message=msg, data=data)
+        except Exception as e:
+            return ToolResult(success=False, message=f"Duplicate search failed: {str(e)}")
+
+    def _move(self, root: str, groups: List[Dict[str, Any]], stats: Dict[str, Any]) -> ToolResult:
+        """Extra copies go to <root>/Duplicates through the journaled mover, so undo_last_organize reverts it."""
+        plan = [{"filename": os.path.relpath(p, root), "target_folder": DUPLICATES_FOLDER}
+                for g in groups for p in g["duplicates"]]
+        result = file_mover.move(root, plan)
+        msg = (f"Moved {result['moved']} duplicate files ({_human(stats['wasted'])}) to "
+               f"{os.path.join(root, DUPLICATES_FOLDER)}. Say 'undo' to put them back.")
+        if result["errors"]:
+            msg += f" Errors: {'; '.join(result['errors'][:3])}"
+        return ToolResult(success=result["moved"] > 0 or not result["errors"], message=msg,
+                          data={"groups": groups, "stats": stats, "move": result})
+
+    def _trash(self, groups: List[Dict[str, Any]], stats: Dict[str, Any]) -> ToolResult:
+        trashed, errors = 0, []
+        freed = 0
+        for g in groups:
+            for p in g["duplicates"]:
+                try:
+                    send2trash(p)
+                    trashed += 1
+                    freed += g["size"]
+                except Exception as e:
+                    errors.append(f"{os.path.basename(p)}: {e}")
+        msg = f"Sent {trashed} duplicate files to the trash, freeing {_human(freed)}."
+        if errors:
+            msg += f" Errors: {'; '.join(errors[:3])}"
+        return ToolResult(success=trashed > 0 or not errors, message=msg,
+                          data={"groups": groups, "stats": stats, "trashed": trashed})
+
+
+# Global instance
+hash_cache = HashCache()
@@ -0,0 +1,525 @@
+"""
+EONIX File Index — Persistent filename index for instant file search.
+
+The configured roots are crawled with parallel os.scandir workers into
+SQLite (data/file_index.db). Names also go into an FTS5 trigram index, so
+substring and glob queries only touch candidate rows, and fuzzy queries rank
+by shared trigrams. The index is kept fresh by watchdog events when watchdog
+is installed (only the changed directories are rescanned), otherwise by a
+periodic recrawl that skips directories whose mtime hasn't moved.
+
+    file_index.search("*.pdf", root="~/Downloads")
+    file_index.search("invoice")                     # substring
+    file_index.search("invoce 2023", mode="fuzzy")
+"""
+import os
+import time
+import fnmatch
+import sqlite3
+import asyncio
+import difflib
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from config import (FILE_INDEX_ROOTS, FILE_INDEX_ENABLED, FILE_INDEX_PATH,
+                    FILE_INDEX_WORKERS, FILE_INDEX_RESCAN)
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    HAS_WATCHDOG = True
+except ImportError:
+    HAS_WATCHDOG = False
+    FileSystemEventHandler = object
+
+# Directories never worth indexing (caches, VCS internals, system folders)
+SKIP_DIRS = {
+    "node_modules", "__pycache__", ".git", ".hg", ".svn", ".venv", "venv",
+    ".cache", ".tox", ".mypy_cache", ".pytest_cache", "$recycle.bin",
+    "system volume information",
+}
+BATCH = 2000            # rows per write transaction during a crawl
+FUZZY_CANDIDATES = 400  # trigram hits rescored for a fuzzy query
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id     INTEGER PRIMARY KEY,
+    path   TEXT NOT NULL UNIQUE,
+    dir    TEXT NOT NULL,            -- normcased parent, for directory and subtree lookups
+    name   TEXT NOT NULL,
+    is_dir INTEGER NOT NULL,
+    size   INTEGER NOT NULL,
+    mtime  REAL NOT NULL,
+    gen    INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_dir ON files(dir);
+CREATE VIRTUAL TABLE IF NOT EXISTS names USING fts5(
+    name, content='files', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS files_ai AFTER INSERT ON files BEGIN
+    INSERT INTO names(rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS files_ad AFTER DELETE ON files BEGIN
+    INSERT INTO names(names, rowid, name) VALUES ('delete', old.id, old.name);
+END;
+CREATE TRIGGER IF NOT EXISTS files_au AFTER UPDATE OF name ON files BEGIN
+    INSERT INTO names(names, rowid, name) VALUES ('delete', old.id, old.name);
+    INSERT INTO names(rowid, name) VALUES (new.id, new.name);
+END;
+-- mtime of each directory when its entries were last written
+CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, mtime REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS roots (path TEXT PRIMARY KEY, crawled_at REAL NOT NULL, files INTEGER NOT NULL);
+"""
+
+Entry = Tuple[str, bool, int, float]  # name, is_dir, size, mtime
+
+
+def _key(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _skip(name: str) -> bool:
+    return name.startswith(".") or name.lower() in SKIP_DIRS
+
+
+def _scan(path: str, known_mtime: Optional[float] = None) -> Optional[Tuple[float, Optional[List[Entry]]]]:
+    """
+    (dir mtime, entries) for one directory; entries is None when the mtime
+    still equals `known_mtime` (nothing added, removed or renamed). None if
+    the directory can't be read.
+    """
+    try:
+        mtime = os.stat(path).st_mtime
+        if known_mtime is not None and mtime == known_mtime:
+            return mtime, None
+        entries: List[Entry] = []
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                entries.append((entry.name, is_dir, 0 if is_dir else st.st_size, st.st_mtime))
+        return mtime, entries
+    except OSError:
+        return None
+
+
+def _like(text: str) -> str:
+    """Literal text → LIKE pattern matching a superset of it: '%' and '_' become
+    single-character wildcards (an ESCAPE clause would bypass the trigram index)."""
+    return text.replace("%", "_")
+
+
+def _glob_to_like(pattern: str) -> str:
+    """fnmatch pattern → LIKE pattern that matches a superset of it."""
+    out = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "*":
+            out.append("%")
+        elif c == "?":
+            out.append("_")
+        elif c == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                out.append("[")
+            else:
+                out.append("_")  # one character of the class; fnmatch checks which
+                i = end
+        elif c == "%":
+            out.append("_")
+        else:
+            out.append(c)
+        i += 1
+    return "".join(out)
+
+
+def _trigrams(text: str) -> List[str]:
+    text = text.lower()
+    return list(dict.fromkeys(text[i:i + 3] for i in range(len(text) - 2) if text[i:i + 3].strip()))
+
+
+class FileIndex:
+    """SQLite filename index over a set of root folders."""
+
+    def __init__(self, path: str = FILE_INDEX_PATH, workers: int = FILE_INDEX_WORKERS):
+        self.path = path
+        self.workers = workers
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._roots: Optional[Dict[str, float]] = None  # normcased root → crawled_at
+        self.watching: Set[str] = set()                 # roots with live watchdog events
+
+    # ── Storage ────────────────────────────────────────────────
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            with self._lock:
+                if self._db is None:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    db = sqlite3.connect(self.path, check_same_thread=False)
+                    db.execute("PRAGMA journal_mode=WAL")
+                    db.execute("PRAGMA synchronous=NORMAL")
+                    db.executescript(SCHEMA)
+                    if db.execute("PRAGMA user_version").fetchone()[0] < 1:
+                        # Version 0 left skipped folders (.git, node_modules, ...) out of their
+                        # parent's entries: forget directory mtimes so the next crawl relists all
+                        with db:
+                            db.execute("DELETE FROM dirs")
+                        db.execute("PRAGMA user_version = 1")
+                    self._db = db
+        return self._db
+
+    def roots(self) -> Dict[str, float]:
+        if self._roots is None:
+            if self._db is None and not os.path.exists(self.path):
+                return {}  # never crawled; don't create the file just to say so
+            with self._lock:
+                self._roots = dict(self.db.execute("SELECT path, crawled_at FROM roots"))
+        return self._roots
+
+    def covers(self, path: str) -> bool:
+        """True when `path` lies inside a crawled root."""
+        key = _key(path)
+        return any(key == r or key.startswith(r.rstrip(os.sep) + os.sep) for r in self.roots())
+
+    def indexable(self, path: str) -> bool:
+        """Inside a crawled root and not inside a skipped folder (.git, node_modules, ...)."""
+        key = _key(path)
+        for root in self.roots():
+            if key == root:
+                return True
+            if key.startswith(root.rstrip(os.sep) + os.sep):
+                return not any(_skip(part) for part in key[len(root):].split(os.sep) if part)
+        return False
+
+    @staticmethod
+    def _under(root: str, col: str = "dir") -> Tuple[str, List[str]]:
+        """SQL condition + args selecting rows whose `col` is at or below the (normcased) root."""
+        prefix = root.rstrip(os.sep) + os.sep
+        return (f"({col} = ? OR ({col} >= ? AND {col} < ?))",
+                [root, prefix, prefix[:-1] + chr(ord(os.sep) + 1)])
+
+    def _write(self, parent: str, entries: Iterable[Entry], gen: int) -> None:
+        d = _key(parent)
+        self.db.executemany(
+            "INSERT INTO files(path, dir, name, is_dir, size, mtime, gen) VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET is_dir=excluded.is_dir, size=excluded.size, "
+            "mtime=excluded.mtime, gen=excluded.gen",
+            [(os.path.join(parent, name), d, name, int(is_dir), size, mtime, gen)
+             for name, is_dir, size, mtime in entries])
+
+    def _drop(self, path: str) -> None:
+        """Forget `path` and everything below it."""
+        key = _key(path)
+        cond, args = self._under(key)
+        self.db.execute(f"DELETE FROM files WHERE path = ? OR {cond}", [path] + args)
+        cond, args = self._under(key, "path")
+        self.db.execute(f"DELETE FROM dirs WHERE {cond}", args)
+
+    # ── Crawling ───────────────────────────────────────────────
+
+    def crawl(self, root: str, register: bool = True) -> Dict[str, Any]:
+        """
+        (Re)index everything under `root` with parallel scandir workers.
+        Directories whose mtime matches the index are not re-listed; rows
+        not seen by this crawl are removed at the end. `register` records
+        `root` as an indexed root (off for subtrees found by refresh_dir).
+        """
+        root = os.path.abspath(root)
+        root_key = _key(root)
+        t0 = time.perf_counter()
+        gen = int(time.time() * 1000)
+        with self._lock:
+            cond, args = self._under(root_key, "path")
+            known = dict(self.db.execute(f"SELECT path, mtime FROM dirs WHERE {cond}", args))
+            cond, args = self._under(root_key)
+        stats = {"dirs": 0, "listed": 0, "files": 0}
+        pending_rows: List[Tuple[str, float, List[Entry]]] = []
+        unchanged: List[str] = []
+
+        def flush():
+            with self._lock, self.db:
+                for parent, mtime, entries in pending_rows:
+                    self._write(parent, entries, gen)
+                    self.db.execute("INSERT OR REPLACE INTO dirs(path, mtime) VALUES (?, ?)", (_key(parent), mtime))
+                self.db.executemany("UPDATE files SET gen = ? WHERE dir = ?", [(gen, _key(d)) for d in unchanged])
+            pending_rows.clear()
+            unchanged.clear()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="FileIndex") as pool:
+            pending = {pool.submit(_scan, root, known.get(root_key)): root}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    parent = pending.pop(fut)
+                    listing = fut.result()
+                    if listing is None:
+                        continue
+                    mtime, entries = listing
+                    stats["dirs"] += 1
+                    if entries is None:
+                        # Same children as last time: take subdirectories from the index
+                        with self._lock:
+                            subdirs = [r[0] for r in self.db.execute(
+                                "SELECT name FROM files WHERE dir = ? AND is_dir = 1", (_key(parent),))
+                                if not _skip(r[0])]
+                        unchanged.append(parent)
+                    else:
+                        stats["listed"] += 1
+                        # Skipped folders are listed (list_directory shows them) but not descended into
+                        subdirs = [e[0] for e in entries if e[1] and not _skip(e[0])]
+                        pending_rows.append((parent, mtime, entries))
+                        stats["files"] += len(entries)
+                    for name in subdirs:
+                        child = os.path.join(parent, name)
+                        pending[pool.submit(_scan, child, known.get(_key(child)))] = child
+                if sum(len(e) for _, _, e in pending_rows) + len(unchanged) >= BATCH:
+                    flush()
+        flush()
+
+        with self._lock, self.db:
+            # Rows below directories that vanished were never visited either
+            gone_dirs = [(_key(p),) for (p,) in self.db.execute(
+                f"SELECT path FROM files WHERE gen < ? AND is_dir = 1 AND {cond}", [gen] + args)]
+            removed = self.db.execute(f"DELETE FROM files WHERE gen < ? AND {cond}", [gen] + args).rowcount
+            self.db.executemany("DELETE FROM dirs WHERE path = ?", gone_dirs)
+            total = self.db.execute(f"SELECT COUNT(*) FROM files WHERE {cond}", args).fetchone()[0]
+            if register:
+                self.db.execute("INSERT OR REPLACE INTO roots(path, crawled_at, files) VALUES (?, ?, ?)",
+                                (root_key, time.time(), total))
+                self._roots = None
+        stats.update(removed=removed, indexed=total, ms=round((time.perf_counter() - t0) * 1000))
+        return stats
+
+    def refresh_dir(self, path: str) -> None:
+        """Rescan one directory after a change event; new subdirectories are crawled."""
+        path = os.path.abspath(path)
+        listing = _scan(path)
+        with self._lock:
+            if listing is None:
+                with self.db:
+                    self._drop(path)
+                return
+            mtime, entries = listing
+            known = dict(self.db.execute("SELECT name, is_dir FROM files WHERE dir = ?", (_key(path),)))
+            current = {e[0]: e[1] for e in entries}
+            with self.db:
+                for name, was_dir in known.items():
+                    if name not in current or bool(was_dir) != current[name]:
+                        self._drop(os.path.join(path, name))
+                self._write(path, entries, int(time.time() * 1000))
+                self.db.execute("INSERT OR REPLACE INTO dirs(path, mtime) VALUES (?, ?)", (_key(path), mtime))
+        for name, is_dir in current.items():
+            if is_dir and not known.get(name) and not _skip(name):
+                # Moved or copied in with contents: index the whole subtree
+                self.crawl(os.path.join(path, name), register=False)
+
+    # ── Queries ────────────────────────────────────────────────
+
+    def search(self, pattern: str, root: Optional[str] = None, mode: str = "auto",
+               limit: int = 50, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Names matching `pattern`, optionally below `root`.
+        mode: "glob" (*.pdf), "substring", "fuzzy", or "auto" — glob when the
+        pattern has wildcards, else substring, falling back to fuzzy.
+        kind: "file" or "folder" to restrict the type.
+        """
+        pattern = pattern.strip()
+        if not pattern:
+            return []
+        if mode == "auto":
+            if any(c in pattern for c in "*?["):
+                return self.search(pattern, root, "glob", limit, kind)
+            return (self.search(pattern, root, "substring", limit, kind)
+                    or self.search(pattern, root, "fuzzy", limit, kind))
+
+        where, args = [], []
+        if root:
+            cond, root_args = self._under(_key(root), "f.dir")
+            where.append(cond)
+            args += root_args
+        if kind in ("file", "folder"):
+            where.append("f.is_dir = ?")
+            args.append(int(kind == "folder"))
+        extra = "".join(f" AND {w}" for w in where)
+        select = "SELECT f.path, f.name, f.is_dir, f.size, f.mtime FROM names JOIN files f ON f.id = names.rowid"
+
+        with self._lock:
+            if mode == "fuzzy":
+                grams = _trigrams(pattern.replace(" ", ""))
+                if not grams:
+                    return self.search(pattern, root, "substring", limit, kind)
+                match = " OR ".join('"' + g.replace('"', '""') + '"' for g in grams)
+                rows = self.db.execute(f"{select} WHERE names MATCH ?{extra} ORDER BY names.rank LIMIT ?",
+                                       [match] + args + [FUZZY_CANDIDATES]).fetchall()
+                want = pattern.lower()
+                scored = [(difflib.SequenceMatcher(None, want, r[1].lower()).ratio(), r) for r in rows]
+                scored.sort(key=lambda s: -s[0])
+                return [self._row(r, score=round(score, 3)) for score, r in scored[:limit]]
+
+            want = pattern.lower()
+            if mode == "glob":
+                like, matches = _glob_to_like(pattern), lambda name: fnmatch.fnmatchcase(name, want)
+            else:
+                like, matches = "%" + _like(pattern) + "%", lambda name: want in name
+            cursor = self.db.execute(f"{select} WHERE names.name LIKE ?{extra}", [like] + args)
+            out = []
+            for r in cursor:
+                if matches(r[1].lower()):
+                    out.append(self._row(r))
+                    if len(out) >= limit:
+                        break
+            return out
+
+    def listing(self, path: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        A directory's entries straight from the index, or None when the index
+        can't vouch for them (not watched, or the directory changed since).
+        """
+        key = _key(path)
+        if not self.live(path):
+            return None
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return None
+        with self._lock:
+            row = self.db.execute("SELECT mtime FROM dirs WHERE path = ?", (key,)).fetchone()
+            if row is None or row[0] != mtime:
+                return None
+            rows = self.db.execute("SELECT path, name, is_dir, size, mtime FROM files WHERE dir = ?", (key,)).fetchall()
+        return [self._row(r) for r in rows]
+
+    def files(self, root: str, extensions: Optional[Set[str]] = None) -> List[Tuple[str, int, float]]:
+        """(path, size, mtime) of the files at or below `root`, optionally only these extensions."""
+        cond, args = self._under(_key(root))
+        with self._lock:
+            rows = self.db.execute(f"SELECT path, name, size, mtime FROM files WHERE is_dir = 0 AND {cond}",
+                                   args).fetchall()
+        return [(path, size, mtime) for path, name, size, mtime in rows
+                if extensions is None or os.path.splitext(name)[1].lower() in extensions]
+
+    def live(self, path: str) -> bool:
+        """True when `path` is inside a root whose changes arrive as watchdog events."""
+        key = _key(path)
+        return any(key == r or key.startswith(r.rstrip(os.sep) + os.sep) for r in self.watching)
+
+    def stats(self) -> Dict[str, Any]:
+        roots = self.roots()
+        with self._lock:
+            files = self.db.execute("SELECT COUNT(*) FROM files").fetchone()[0] if roots else 0
+        return {"files": files, "roots": list(roots), "watching": sorted(self.watching)}
+
+    @staticmethod
+    def _row(r, **extra) -> Dict[str, Any]:
+        path, name, is_dir, size, mtime = r
+        return {"path": path, "name": name, "type": "folder" if is_dir else "file",
+                "size": size, "mtime": mtime, **extra}
+
+
+class _DirtyDirs(FileSystemEventHandler):
+    """Collects the parent directories of watchdog events for a debounced refresh."""
+
+    def __init__(self):
+        self.dirty: Set[str] = set()
+        self._lock = threading.Lock()
+
+    EVENTS = {"created", "deleted", "moved", "modified"}
+
+    def on_any_event(self, event):
+        if event.event_type not in self.EVENTS:
+            return  # opened/closed: nothing about the entry changed
+        with self._lock:
+            for p in (event.src_path, getattr(event, "dest_path", "")):
+                if p:
+                    self.dirty.add(os.path.dirname(p))
+                    if event.is_directory:
+                        self.dirty.add(p)  # a moved-away directory is dropped on refresh
+
+    def take(self) -> Set[str]:
+        with self._lock:
+            dirty, self.dirty = self.dirty, set()
+        return dirty
+
+
+class FileIndexJob:
+    """Initial crawl, then watchdog-driven refreshes (or periodic recrawls)."""
+
+    DEBOUNCE = 1.0  # seconds between flushes of changed directories
+
+    def __init__(self, index: FileIndex, roots: List[str] = FILE_INDEX_ROOTS):
+        self.index = index
+        self.roots = [os.path.abspath(os.path.expanduser(r)) for r in roots]
+        self.running = False
+        self._observer = None
+        self._events = _DirtyDirs()
+
+    def run_once(self) -> Dict[str, Any]:
+        results = {}
+        for root in self.roots:
+            if os.path.isdir(root):
+                results[root] = self.index.crawl(root)
+        indexed = sum(r["indexed"] for r in results.values())
+        ms = sum(r["ms"] for r in results.values())
+        print(f"OK: File index: {indexed} entries under {len(results)} roots ({ms} ms)")
+        return results
+
+    def flush_events(self) -> int:
+        dirty = self._events.take()
+        for path in sorted(dirty):
+            if self.index.indexable(path):
+                try:
+                    self.index.refresh_dir(path)
+                except Exception as e:
+                    print(f"WARNING: File index refresh failed for {path}: {e}")
+        return len(dirty)
+
+    def _watch(self) -> None:
+        if not HAS_WATCHDOG:
+            print("WARNING: watchdog not installed; file index refreshes every "
+                  f"{FILE_INDEX_RESCAN}s instead of live")
+            return
+        self._observer = Observer()
+        for root in self.roots:
+            if os.path.isdir(root):
+                self._observer.schedule(self._events, root, recursive=True)
+                self.index.watching.add(_key(root))
+        self._observer.daemon = True
+        self._observer.start()
+
+    async def start(self):
+        self.running = True
+        try:
+            await asyncio.to_thread(self.run_once)
+            self._watch()
+        except Exception as e:
+            print(f"ERROR: File index crawl failed: {e}")
+        last_crawl = time.monotonic()
+        while self.running:
+            await asyncio.sleep(self.DEBOUNCE)
+            try:
+                if self._observer is not None:
+                    await asyncio.to_thread(self.flush_events)
+                elif time.monotonic() - last_crawl >= FILE_INDEX_RESCAN:
+                    await asyncio.to_thread(self.run_once)
+                    last_crawl = time.monotonic()
+            except Exception as e:
+                print(f"ERROR: File index update failed: {e}")
+
+    def stop(self):
+        self.running = False
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+            self.index.watching.clear()
+
+
+# Global instances
+file_index = FileIndex()
+file_index_job = FileIndexJob(file_index) if FILE_INDEX_ENABLED else None
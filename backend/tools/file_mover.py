@@ -0,0 +1,257 @@
+"""
+EONIX File Mover — Journaled, batched file moves with undo.
+
+Every organize run appends to a JSONL journal (data/organize_journal.jsonl):
+a `begin` record, one `mkdir` per folder it created, one `move` per file
+actually moved (written as soon as the move lands), then `end`. Replaying a
+run's records in reverse undoes it, including runs cut short by an error or
+a crash.
+
+Moves are grouped by target folder: the folder is created and listed once,
+and name clashes are resolved against that listing. Same-device moves are
+renames; cross-device moves (a full copy) run in parallel on a thread pool.
+Progress events go to listeners registered with on_progress().
+"""
+import os
+import json
+import time
+import errno
+import shutil
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import ORGANIZE_JOURNAL_PATH, ORGANIZE_COPY_WORKERS
+
+ProgressListener = Callable[[Dict[str, Any]], None]
+
+PROGRESS_INTERVAL = 0.25  # seconds between progress events
+
+
+def _move_across(src: str, dst: str) -> None:
+    """Copy-then-delete move for a different device (shutil.move does the copy)."""
+    shutil.move(src, dst)
+
+
+class MoveJournal:
+    """Append-only JSONL log of organize runs."""
+
+    def __init__(self, path: str = ORGANIZE_JOURNAL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, records: Iterable[Dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(r) + "\n" for r in records)
+        if not lines:
+            return
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def records(self) -> List[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return []
+        out = []
+        with self._lock, open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    out.append(json.loads(line))
+                except ValueError:
+                    continue  # torn last line after a crash
+        return out
+
+    def last_run(self) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        """(run id, its records) of the newest run that hasn't been undone."""
+        runs: Dict[str, List[Dict[str, Any]]] = {}
+        for record in self.records():
+            runs.setdefault(record["run"], []).append(record)
+        for run_id in reversed(list(runs)):
+            if not any(r["op"] == "undo" for r in runs[run_id]):
+                return run_id, runs[run_id]
+        return None
+
+
+class FileMover:
+    """Moves files into folders, journaling each move so a run can be undone."""
+
+    def __init__(self, journal: Optional[MoveJournal] = None, workers: int = ORGANIZE_COPY_WORKERS):
+        self.journal = journal or MoveJournal()
+        self.workers = workers
+        self._listeners: List[ProgressListener] = []
+        self._lock = threading.Lock()  # one run (or undo) at a time
+
+    def on_progress(self, listener: ProgressListener) -> None:
+        self._listeners.append(listener)
+
+    def _emit(self, event: Dict[str, Any]) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener(event)
+            except Exception as e:
+                print(f"WARNING: Move progress listener failed: {e}")
+
+    # ── Moving ─────────────────────────────────────────────────
+
+    def move(self, base_path: str, plan: List[Dict[str, str]]) -> Dict[str, Any]:
+        """
+        Apply an organizer plan ({"filename", "target_folder"} items, relative
+        to `base_path`). Returns the run id, files moved and per-file errors.
+        """
+        groups: Dict[str, List[str]] = {}
+        for item in plan:
+            filename, folder = item.get("filename"), item.get("target_folder")
+            if filename and folder:
+                groups.setdefault(os.path.normpath(os.path.join(base_path, folder)), []).append(
+                    os.path.normpath(os.path.join(base_path, filename)))
+        pairs = []
+        stamp = int(time.time())
+        for target_dir, sources in groups.items():
+            try:
+                taken = {os.path.normcase(n) for n in os.listdir(target_dir)} if os.path.isdir(target_dir) else set()
+            except OSError:
+                taken = set()
+            for src in sources:
+                name = os.path.basename(src)
+                if os.path.normcase(os.path.dirname(src)) == os.path.normcase(target_dir):
+                    continue  # already there
+                base, ext = os.path.splitext(name)
+                n = 0
+                while os.path.normcase(name) in taken:
+                    n += 1
+                    name = f"{base}_{stamp}{ext}" if n == 1 else f"{base}_{stamp}_{n}{ext}"
+                taken.add(os.path.normcase(name))
+                pairs.append((src, os.path.join(target_dir, name)))
+        return self._run("move", pairs, {"base": base_path})
+
+    def undo_last(self) -> Optional[Dict[str, Any]]:
+        """Move the files of the newest not-yet-undone run back; None if there is none."""
+        last = self.journal.last_run()
+        if last is None:
+            return None
+        run_id, records = last
+        pairs = [(r["dst"], r["src"]) for r in reversed(records) if r["op"] == "move"]
+        result = self._run("undo", pairs)
+        # Folders the run created, deepest first, if they are empty again
+        removed = 0
+        for r in sorted((r for r in records if r["op"] == "mkdir"), key=lambda r: -len(r["path"])):
+            try:
+                os.rmdir(r["path"])
+                removed += 1
+            except OSError:
+                pass
+        self.journal.append([{"run": run_id, "op": "undo", "restored": result["moved"],
+                              "errors": len(result["errors"]), "ts": time.time()}])
+        result.update(undone=run_id, folders_removed=removed)
+        return result
+
+    def _run(self, phase: str, pairs: List[Tuple[str, str]],
+             info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Move each (src, dst) pair; phase "move" journals what it does, "undo" doesn't."""
+        errors: List[str] = []
+        with self._lock:
+            run_id = f"{phase}-{time.time_ns()}"
+            t0 = time.perf_counter()
+            total = len(pairs)
+            if phase == "move":
+                self.journal.append([{"run": run_id, "op": "begin", "total": total, "ts": time.time(),
+                                      **(info or {})}])
+            state = {"done": 0, "last_emit": 0.0}
+            pending: List[Dict[str, Any]] = []
+            pending_lock = threading.Lock()
+
+            def landed(src: str, dst: str) -> None:
+                with pending_lock:
+                    if phase == "move":
+                        pending.append({"run": run_id, "op": "move", "src": src, "dst": dst})
+                    state["done"] += 1
+                    now = time.monotonic()
+                    emit = now - state["last_emit"] >= PROGRESS_INTERVAL
+                    if emit:
+                        state["last_emit"] = now
+                if emit:
+                    self._emit({"type": "organize_progress", "phase": phase, "run": run_id,
+                                "done": state["done"], "total": total, "current": dst})
+
+            def created(folder: str) -> None:
+                if phase == "move":
+                    with pending_lock:
+                        pending.append({"run": run_id, "op": "mkdir", "path": folder})
+
+            def flush() -> None:
+                with pending_lock:
+                    batch, pending[:] = list(pending), []
+                self.journal.append(batch)
+
+            def copied(fut: Future, src: str, dst: str) -> None:
+                if fut.exception() is None:
+                    landed(src, dst)
+                else:
+                    errors.append(f"Error moving {os.path.basename(src)}: {fut.exception()}")
+
+            copies = 0
+            made = set()
+            devices: Dict[str, int] = {}
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="FileMover") as pool:
+                for i, (src, dst) in enumerate(pairs):
+                    target_dir = os.path.dirname(dst)
+                    if i and os.path.dirname(pairs[i - 1][1]) != target_dir:
+                        flush()  # one journal write per target folder
+                    try:
+                        if target_dir not in made:
+                            self._makedirs(target_dir, created)
+                            made.add(target_dir)
+                        if phase == "undo" and os.path.lexists(dst):
+                            errors.append(f"{dst} exists again; left {os.path.basename(src)} in place")
+                            continue
+                        if self._same_device(os.path.dirname(src), target_dir, devices):
+                            try:
+                                os.rename(src, dst)
+                                landed(src, dst)
+                                continue
+                            except OSError as e:
+                                if e.errno != errno.EXDEV:
+                                    raise
+                        copies += 1
+                        pool.submit(_move_across, src, dst).add_done_callback(
+                            lambda fut, src=src, dst=dst: copied(fut, src, dst))
+                    except Exception as e:
+                        errors.append(f"Error moving {os.path.basename(src)}: {e}")
+            flush()
+
+            result = {"run": run_id, "moved": state["done"], "total": total, "errors": errors,
+                      "cross_device": copies, "ms": round((time.perf_counter() - t0) * 1000)}
+            if phase == "move":
+                self.journal.append([{"run": run_id, "op": "end", "moved": state["done"],
+                                      "errors": len(errors), "ts": time.time()}])
+            self._emit({"type": "organize_progress", "phase": phase, "run": run_id, "done": state["done"],
+                        "total": total, "finished": True, "errors": len(errors)})
+            return result
+
+    @staticmethod
+    def _makedirs(path: str, created: Callable[[str], None]) -> None:
+        """makedirs, reporting each folder it had to create (outermost first)."""
+        missing = []
+        while path and not os.path.isdir(path) and os.path.dirname(path) != path:
+            missing.append(path)
+            path = os.path.dirname(path)
+        for folder in reversed(missing):
+            os.makedirs(folder, exist_ok=True)
+            created(folder)
+
+    @staticmethod
+    def _same_device(a: str, b: str, cache: Dict[str, int]) -> bool:
+        def dev(path: str) -> int:
+            if path not in cache:
+                try:
+                    cache[path] = os.stat(path).st_dev
+                except OSError:
+                    cache[path] = -1
+            return cache[path]
+        return dev(a) == dev(b) != -1
+
+
+# Global instance: the organizer and the undo tool share one journal
+file_mover = FileMover()
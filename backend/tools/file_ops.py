@@ -4,8 +4,12 @@ EONIX File Operations — Create, read, move, delete, search files.
 import os
 import shutil
 import glob
+import itertools
 from datetime import datetime
+from typing import Optional
 from .tool_result import ToolResult
+from .file_index import file_index
+from . import file_reader
 
 
 class FileOps:
@@ -22,16 +26,45 @@ class FileOps:
         except Exception as e:
             return ToolResult(success=False, message=f"Failed to create file: {str(e)}")
 
-    def read_file(self, path: str) -> ToolResult:
+    def read_file(self, path: str, offset: Optional[int] = None, length: Optional[int] = None,
+                  tail: Optional[int] = None, start_line: Optional[int] = None,
+                  end_line: Optional[int] = None) -> ToolResult:
+        """
+        Read a text file. By default the first 10,000 characters; for large
+        files, `tail` (last N lines), `start_line`/`end_line` (1-based,
+        inclusive) or `offset`/`length` (bytes, negative offset counts from
+        the end) read just that region through mmap (see file_reader.py).
+        """
         try:
             path = self._expand(path)
-            with open(path, 'r', encoding='utf-8', errors='replace') as f:
-                content = f.read(10000)
-            truncated = len(content) >= 10000
+            if tail is not None:
+                part = file_reader.tail(path, int(tail), file_reader.MAX_CHARS + 1)
+                where = f"last {int(tail)} lines"
+            elif start_line is not None or end_line is not None:
+                first = int(start_line or 1)
+                part = file_reader.read_lines(path, first, None if end_line is None else int(end_line),
+                                              file_reader.MAX_CHARS + 1)
+                where = f"lines {first}-{end_line if end_line is not None else 'end'}"
+            elif offset is not None or length is not None:
+                part = file_reader.read_range(path, int(offset or 0), int(length or file_reader.MAX_CHARS))
+                where = f"bytes {part['start']}-{part['end']}"
+            else:
+                with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                    content = f.read(10000)
+                truncated = len(content) >= 10000
+                return ToolResult(
+                    success=True,
+                    message=f"Read file: {path}" + (" (truncated)" if truncated else ""),
+                    data={"content": content, "path": path, "truncated": truncated}
+                )
+            content = part.pop("content")
+            truncated = len(content) > file_reader.MAX_CHARS
+            if truncated:
+                content = content[-file_reader.MAX_CHARS:] if tail is not None else content[:file_reader.MAX_CHARS]
             return ToolResult(
                 success=True,
-                message=f"Read file: {path}" + (" (truncated)" if truncated else ""),
-                data={"content": content, "path": path, "truncated": truncated}
+                message=f"Read {where} of {path}" + (" (truncated)" if truncated else ""),
+                data={"content": content, "path": path, "truncated": truncated, **part}
             )
         except FileNotFoundError:
             return ToolResult(success=False, message=f"File not found: {path}")
@@ -58,14 +91,25 @@ class FileOps:
             if not os.path.exists(path):
                 return ToolResult(success=False, message=f"Directory not found: {path}")
             items = []
-            for entry in os.scandir(path):
-                stat = entry.stat()
-                items.append({
-                    "name": entry.name,
-                    "type": "folder" if entry.is_dir() else "file",
-                    "size_kb": round(stat.st_size / 1024, 1) if entry.is_file() else 0,
-                    "modified": datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M")
-                })
+            # A watched, unchanged directory comes straight from the file index (no per-entry stat)
+            indexed = file_index.listing(path)
+            if indexed is not None:
+                for entry in indexed:
+                    items.append({
+                        "name": entry["name"],
+                        "type": entry["type"],
+                        "size_kb": round(entry["size"] / 1024, 1) if entry["type"] == "file" else 0,
+                        "modified": datetime.fromtimestamp(entry["mtime"]).strftime("%Y-%m-%d %H:%M")
+                    })
+            else:
+                for entry in os.scandir(path):
+                    stat = entry.stat()
+                    items.append({
+                        "name": entry.name,
+                        "type": "folder" if entry.is_dir() else "file",
+                        "size_kb": round(stat.st_size / 1024, 1) if entry.is_file() else 0,
+                        "modified": datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M")
+                    })
             items.sort(key=lambda x: (x['type'] == 'file', x['name'].lower()))
             return ToolResult(
                 success=True,
@@ -102,14 +146,31 @@ class FileOps:
         except Exception as e:
             return ToolResult(success=False, message=f"Failed to create folder: {str(e)}")
 
-    def search_files(self, directory: str, pattern: str) -> ToolResult:
+    def search_files(self, directory: Optional[str], pattern: str, mode: str = "auto",
+                     limit: int = 50) -> ToolResult:
+        """
+        Find files by name below `directory` (every indexed folder if None).
+        Indexed folders answer from the file index with glob, substring or
+        fuzzy matching (see file_index.py); anything else falls back to a glob walk.
+        """
         try:
-            directory = self._expand(directory)
-            matches = glob.glob(os.path.join(directory, "**", pattern), recursive=True)
+            if directory is None and file_index.roots():
+                root = None
+            else:
+                root = self._expand(directory or "~")
+            if root is None or file_index.covers(root):
+                hits = file_index.search(pattern, root=root, mode=mode, limit=limit)
+                return ToolResult(
+                    success=True,
+                    message=f"Found {len(hits)} files matching '{pattern}'",
+                    data={"matches": [h["path"] for h in hits], "results": hits, "indexed": True}
+                )
+            matches = list(itertools.islice(
+                glob.iglob(os.path.join(root, "**", pattern), recursive=True), limit))
             return ToolResult(
                 success=True,
                 message=f"Found {len(matches)} files matching '{pattern}'",
-                data={"matches": matches[:50]}
+                data={"matches": matches, "indexed": False}
             )
         except Exception as e:
             return ToolResult(success=False, message=f"Search failed: {str(e)}")
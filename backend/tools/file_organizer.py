@@ -1,172 +1,351 @@
 import os
-import shutil
+import re
 import time
 import json
 import asyncio
-from typing import List, Dict, Any, Optional
+import mimetypes
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import List, Dict, Any, Optional, Tuple
 from .tool_result import ToolResult
+from .file_index import file_index, _scan, _skip
+from .file_mover import file_mover
+from .duplicate_finder import DUPLICATES_FOLDER
+from utils.loop_thread import LoopThread
+from config import ORGANIZE_CHUNK, ORGANIZE_PARALLEL, ORGANIZE_WORKERS
+
+# Extensions whose contents are plain text (read for analysis and content search)
+TEXT_EXTENSIONS = {
+    '.txt', '.md', '.py', '.js', '.html', '.css', '.json', '.xml',
+    '.csv', '.log', '.ini', '.cfg', '.yaml', '.yml', '.c', '.cpp',
+    '.h', '.java', '.go', '.rs', '.php', '.rb', '.sh', '.bat'
+}
+
+# Folder for each extension the rules can place without asking a brain
+CATEGORY_EXTENSIONS = {
+    "Images": {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.heic', '.svg', '.tif', '.tiff', '.ico', '.raw'},
+    "Videos": {'.mp4', '.mkv', '.mov', '.avi', '.wmv', '.webm', '.flv', '.m4v'},
+    "Audio": {'.mp3', '.wav', '.flac', '.aac', '.ogg', '.m4a', '.wma'},
+    "Archives": {'.zip', '.rar', '.7z', '.tar', '.gz', '.bz2', '.xz', '.tgz'},
+    "Installers": {'.exe', '.msi', '.dmg', '.pkg', '.deb', '.rpm', '.apk', '.appimage'},
+    "Fonts": {'.ttf', '.otf', '.woff', '.woff2'},
+    "eBooks": {'.epub', '.mobi', '.azw3'},
+    "Code": {'.py', '.js', '.ts', '.html', '.css', '.json', '.xml', '.yaml', '.yml', '.c', '.cpp',
+             '.h', '.java', '.go', '.rs', '.php', '.rb', '.sh', '.bat', '.ipynb', '.sql'},
+    "Documents": {'.pdf', '.doc', '.docx', '.odt', '.rtf', '.txt', '.md'},
+    "Spreadsheets": {'.xls', '.xlsx', '.ods', '.csv'},
+    "Presentations": {'.ppt', '.pptx', '.odp', '.key'},
+}
+EXTENSION_CATEGORY = {ext: cat for cat, exts in CATEGORY_EXTENSIONS.items() for ext in exts}
+MIME_CATEGORY = {"image": "Images", "video": "Videos", "audio": "Audio", "font": "Fonts"}
+# Categories whose files are better grouped by topic or project, which only a brain can tell
+AMBIGUOUS_CATEGORIES = {"Documents", "Spreadsheets", "Presentations", None}
+FALLBACK_FOLDER = "Other"
+PREVIEW_CHARS = 500
+
+
+def categorize(name: str) -> Optional[str]:
+    """Folder for `name` by extension, then by MIME type; None if neither knows it."""
+    ext = os.path.splitext(name)[1].lower()
+    if ext in EXTENSION_CATEGORY:
+        return EXTENSION_CATEGORY[ext]
+    mime = mimetypes.guess_type(name)[0]
+    return MIME_CATEGORY.get(mime.split("/")[0]) if mime else None
+
+
+def _preview(path: str) -> str:
+    try:
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            return f.read(PREVIEW_CHARS).replace('\n', ' ')
+    except Exception:
+        return "[Error reading file]"
+
+
+def _parse_plan(response: str) -> List[Dict[str, str]]:
+    """The JSON array in a brain reply (tolerates code fences and surrounding prose)."""
+    cleaned = response.replace('```json', '').replace('```', '').strip()
+    match = re.search(r"\[.*\]", cleaned, re.S)
+    plan = json.loads(match.group(0) if match else cleaned)
+    return [item for item in plan if isinstance(item, dict)]
+
 
 class FileOrganizer:
     """
     AI-powered file organizer.
-    Scans a directory, analyzes files, and suggestions structure.
+    Scans a directory tree, places the obvious files by extension/MIME rules,
+    and asks a brain to plan only the ambiguous ones, in parallel chunks.
     """
 
     def __init__(self):
         self.last_plan = []
         # Common text extensions to read
-        self.text_extensions = {
-            '.txt', '.md', '.py', '.js', '.html', '.css', '.json', '.xml', 
-            '.csv', '.log', '.ini', '.cfg', '.yaml', '.yml', '.c', '.cpp', 
-            '.h', '.java', '.go', '.rs', '.php', '.rb', '.sh', '.bat'
-        }
-
-    def scan_directory(self, path: str) -> Dict[str, Any]:
-        """Scans directory and returns file list with context."""
+        self.text_extensions = set(TEXT_EXTENSIONS)
+
+    def scan_directory(self, path: str, recursive: bool = False) -> Dict[str, Any]:
+        """
+        Scans directory and returns its top-level files. With `recursive`,
+        each top-level subfolder that isn't a category folder (or one an
+        earlier organize run filled) is listed under "folders" as one unit,
+        with the category most of its files fall in; its contents are never
+        planned file by file. A folder the file index watches comes straight
+        from the index; subfolder trees are listed in parallel.
+        """
         if not os.path.exists(path):
             return {"error": f"Path not found: {path}"}
-        
+
         if not os.path.isdir(path):
             return {"error": f"Not a directory: {path}"}
 
-        files_data = []
         try:
-            # Non-recursive scan for safety
-            with os.scandir(path) as it:
-                for entry in it:
-                    if entry.is_file():
-                        name = entry.name
-                        # Skip hidden files
-                        if name.startswith('.'): continue
-                        
-                        ext = os.path.splitext(name)[1].lower()
-                        context = ""
-                        
-                        # Read snippet for text files
-                        if ext in self.text_extensions:
-                            try:
-                                with open(entry.path, 'r', encoding='utf-8', errors='ignore') as f:
-                                    context = f.read(500).replace('\n', ' ')
-                            except Exception:
-                                context = "[Error reading file]"
-                        
-                        files_data.append({
-                            "name": name,
-                            "extension": ext,
-                            "context": context
-                        })
+            indexed = file_index.listing(path)
+            if indexed is not None:
+                entries = [(e["name"], e["type"] == "folder", e["size"]) for e in indexed]
+            else:
+                listing = _scan(path)
+                entries = [(name, is_dir, size) for name, is_dir, size, _ in (listing[1] if listing else [])]
+            folders_data = []
+            if recursive:
+                organized = self._organized_folders(path)
+                for name, is_dir, _ in entries:
+                    if is_dir and not _skip(name) and name.lower() not in organized:
+                        unit = self._folder_unit(os.path.join(path, name))
+                        if unit is not None:
+                            folders_data.append({"name": name, "path": name, **unit})
         except Exception as e:
             return {"error": str(e)}
 
-        return {"path": path, "files": files_data}
+        files_data = []
+        for name, is_dir, size in entries:
+            # Skip folders and hidden files
+            if is_dir or name.startswith('.'): continue
+            files_data.append({
+                "name": name,
+                "path": name,
+                "extension": os.path.splitext(name)[1].lower(),
+                "size": size,
+            })
+        return {"path": path, "files": files_data, "folders": folders_data}
 
-    def execute_move(self, base_path: str, plan: List[Dict[str, str]]) -> ToolResult:
-        """Executes the specific move plan."""
-        success_count = 0
-        errors = []
+    def _organized_folders(self, path: str) -> set:
+        """Lower-cased names of top-level folders that are already sorted: the
+        category folders, plus every folder an organize run moved files into."""
+        names = {c.lower() for c in CATEGORY_EXTENSIONS} | {FALLBACK_FOLDER.lower(), DUPLICATES_FOLDER.lower()}
+        base = os.path.normcase(os.path.abspath(path))
+        runs = set()
+        for record in file_mover.journal.records():
+            if record["op"] == "begin" and os.path.normcase(os.path.abspath(record.get("base", ""))) == base:
+                runs.add(record["run"])
+            elif record["op"] in ("move", "mkdir") and record["run"] in runs:
+                rel = os.path.relpath(record.get("dst") or record["path"], path)
+                names.add(rel.split(os.sep)[0].lower())
+        return names
 
-        for item in plan:
-            filename = item.get('filename')
-            target_folder = item.get('target_folder')
-            
-            if not filename or not target_folder:
-                continue
+    def _folder_unit(self, folder: str) -> Optional[Dict[str, Any]]:
+        """Size, file count and dominant category of a subfolder's tree; None if it holds no files."""
+        if file_index.live(folder):
+            found = [(os.path.basename(p), size) for p, size, _ in file_index.files(folder)]
+        else:
+            found = [(os.path.basename(rel), size) for rel, size in self._scan_tree(folder)]
+        if not found:
+            return None
+        counts: Dict[Optional[str], int] = {}
+        for name, _ in found:
+            category = categorize(name)
+            counts[category] = counts.get(category, 0) + 1
+        known = {c: n for c, n in counts.items() if c is not None}
+        # On a tie a definite type wins over documents (a project's README doesn't make it paperwork)
+        category = max(known, key=lambda c: (known[c], c not in AMBIGUOUS_CATEGORIES)) if known else None
+        return {"category": category, "files": len(found), "size": sum(size for _, size in found)}
 
-            source = os.path.join(base_path, filename)
-            target_dir = os.path.join(base_path, target_folder)
-            target_file = os.path.join(target_dir, filename)
+    def _scan_tree(self, root: str) -> List[Tuple[str, int]]:
+        """(relative path, size) of every file below `root`, one scandir per folder across a thread pool."""
+        found: List[Tuple[str, int]] = []
+        with ThreadPoolExecutor(max_workers=ORGANIZE_WORKERS, thread_name_prefix="OrganizerScan") as pool:
+            pending = {pool.submit(_scan, root): ""}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    rel_dir = pending.pop(fut)
+                    listing = fut.result()
+                    if listing is None:
+                        continue
+                    for name, is_dir, size, _ in listing[1]:
+                        rel = os.path.join(rel_dir, name)
+                        if not is_dir:
+                            found.append((rel, size))
+                        elif not _skip(name):
+                            pending[pool.submit(_scan, os.path.join(root, rel))] = rel
+        return found
 
-            if not os.path.exists(source):
-                errors.append(f"File not found: {filename}")
-                continue
-
-            try:
-                # Create folder if needed
-                os.makedirs(target_dir, exist_ok=True)
-                
-                # Handle dupe names
-                if os.path.exists(target_file):
-                    base, ext = os.path.splitext(filename)
-                    timestamp = int(time.time())
-                    new_name = f"{base}_{timestamp}{ext}"
-                    target_file = os.path.join(target_dir, new_name)
-
-                shutil.move(source, target_file)
-                success_count += 1
-            except Exception as e:
-                errors.append(f"Error moving {filename}: {str(e)}")
-
-        msg = f"Moved {success_count} files."
+    def execute_move(self, base_path: str, plan: List[Dict[str, str]]) -> ToolResult:
+        """Executes the specific move plan (journaled, so undo_last_organize can revert it)."""
+        result = file_mover.move(base_path, plan)
+        errors = result["errors"]
+        msg = f"Moved {result['moved']} files."
         if errors:
             msg += f" Errors: {'; '.join(errors[:3])}"
-        
-        return ToolResult(success=True, message=msg)
+        if result["moved"]:
+            msg += " Say 'undo' to put them back."
+        return ToolResult(success=True, message=msg, data=result)
 
-    def organize(self, path: str, auto_confirm: bool = False) -> ToolResult:
+    def undo_last_organize(self) -> ToolResult:
+        """Moves the files of the last organize run back where they were."""
+        result = file_mover.undo_last()
+        if result is None:
+            return ToolResult(success=False, message="Nothing to undo: no organize run on record.")
+        msg = f"Put {result['moved']} of {result['total']} files back."
+        if result["errors"]:
+            msg += f" Errors: {'; '.join(result['errors'][:3])}"
+        return ToolResult(success=not result["errors"] or result["moved"] > 0, message=msg, data=result)
+
+    # ── Planning ───────────────────────────────────────────────
+
+    def plan(self, path: str, files: List[Dict[str, Any]], brain: Any = None,
+             units: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
-        Orchestrates the organization. 
+        Move plan for `files`: rules place what they can, the brain (if any)
+        plans the ambiguous rest in chunks, and whatever it leaves out falls
+        back to the rules. Files already in their target folder are left out.
+        Subfolder units (from a recursive scan) move whole into the category
+        most of their files belong to; units with no known category stay.
         """
-        scan_data = self.scan_directory(path)
-        if "error" in scan_data:
-            return ToolResult(success=False, message=scan_data["error"])
+        t0 = time.perf_counter()
+        by_rule: List[Dict[str, str]] = []
+        ambiguous: List[Dict[str, Any]] = []
+        for f in files:
+            category = categorize(f["name"])
+            if brain is not None and category in AMBIGUOUS_CATEGORIES:
+                ambiguous.append(f)
+            else:
+                by_rule.append(self._rule_item(f, category))
 
-        files = scan_data["files"]
-        if not files:
-            return ToolResult(success=True, message=f"No files found in {path} to organize.")
+        by_ai: List[Dict[str, str]] = []
+        failed_chunks = 0
+        if ambiguous:
+            with ThreadPoolExecutor(max_workers=ORGANIZE_WORKERS, thread_name_prefix="OrganizerPreview") as pool:
+                previews = pool.map(lambda f: _preview(os.path.join(path, f["path"]))
+                                    if f["extension"] in self.text_extensions else "", ambiguous)
+                for f, context in zip(ambiguous, previews):
+                    f["context"] = context
+            chunks = [ambiguous[i:i + ORGANIZE_CHUNK] for i in range(0, len(ambiguous), ORGANIZE_CHUNK)]
+            folders = sorted(set(CATEGORY_EXTENSIONS) | {i["target_folder"] for i in by_rule})
+            results = organizer_loop.run(self._plan_chunks(brain, chunks, folders))
+            wanted = {f["path"]: f for f in ambiguous}
+            for result in results:
+                if isinstance(result, Exception):
+                    failed_chunks += 1
+                    continue
+                for item in result:
+                    f = wanted.pop(str(item.get("filename", "")), None)
+                    if f is not None and item.get("target_folder"):
+                        by_ai.append({"filename": f["path"], "target_folder": str(item["target_folder"]).strip("/\\ "),
+                                      "reason": str(item.get("reason", "")), "source": "ai"})
+            by_rule += [self._rule_item(f, categorize(f["name"])) for f in wanted.values()]
+            self._merge_folder_names(by_ai)
 
-        if len(files) > 50:
-            files = files[:50]
-            scan_data["warning"] = "Capped at 50 files for safety."
+        by_folder = [{"filename": f["path"], "target_folder": f["category"],
+                      "reason": f"folder of {f['files']} files, mostly {f['category'].lower()}", "source": "folder"}
+                     for f in units or [] if f.get("category")]
+        plan = [item for item in by_rule + by_ai + by_folder
+                if os.path.normcase(os.path.normpath(os.path.dirname(item["filename"]) or "."))
+                != os.path.normcase(os.path.normpath(item["target_folder"]))]
+        stats = {"scanned": len(files), "by_rule": len(by_rule), "by_ai": len(by_ai), "folders": len(by_folder),
+                 "ai_chunks": -(-len(ambiguous) // ORGANIZE_CHUNK) if ambiguous else 0,
+                 "failed_chunks": failed_chunks, "unchanged": len(files) + len(units or []) - len(plan),
+                 "ms": round((time.perf_counter() - t0) * 1000)}
+        return {"plan": plan, "stats": stats}
 
-        try:
-            from brains.gemini_brain import GeminiBrain
-            from brains.claude_brain import ClaudeBrain
-            
-            brain = None
-            
-            # Prefer Claude
-            try:
-                claude = ClaudeBrain()
-                if claude.is_available():
-                    brain = claude
-            except Exception:
-                pass
-            
-            # Fallback to Gemini
-            if not brain:
-                try:
-                    gemini = GeminiBrain()
-                    if gemini.is_available():
-                        brain = gemini
-                except Exception:
-                    pass
-            
-            if not brain:
-                return ToolResult(success=False, message="No AI brain available (Claude or Gemini) to organize files.")
-
-            prompt = f"""
+    @staticmethod
+    def _rule_item(f: Dict[str, Any], category: Optional[str]) -> Dict[str, str]:
+        folder = category or FALLBACK_FOLDER
+        reason = f"{f['extension'] or 'no extension'} file" if category else "unrecognised type"
+        return {"filename": f["path"], "target_folder": folder, "reason": reason, "source": "rule"}
+
+    @staticmethod
+    def _merge_folder_names(plan: List[Dict[str, str]]) -> None:
+        """Chunks planned separately may spell one folder differently ("invoices" / "Invoices")."""
+        spelling: Dict[str, str] = {}
+        for item in plan:
+            item["target_folder"] = spelling.setdefault(item["target_folder"].lower(), item["target_folder"])
+
+    async def _plan_chunks(self, brain: Any, chunks: List[List[Dict[str, Any]]],
+                           folders: List[str]) -> List[Any]:
+        gate = asyncio.Semaphore(ORGANIZE_PARALLEL)
+
+        async def one(chunk):
+            async with gate:
+                return await self._plan_chunk(brain, chunk, folders)
+        return await asyncio.gather(*(one(c) for c in chunks), return_exceptions=True)
+
+    async def _plan_chunk(self, brain: Any, chunk: List[Dict[str, Any]], folders: List[str]) -> List[Dict[str, str]]:
+        files = [{"filename": f["path"], "extension": f["extension"], "size": f["size"],
+                  "context": f.get("context", "")} for f in chunk]
+        prompt = f"""
             Analyze these files and suggest a folder structure to organize them.
-            Group by extension, content type, or project.
+            Group by content type, topic, or project. Prefer these existing folders
+            (subfolders such as "Documents/Invoices" are fine): {", ".join(folders)}
             Return ONLY a JSON array of objects: {{"filename": "string", "target_folder": "string", "reason": "string"}}
-            
+            Use each filename exactly as given.
+
             Files:
             {json.dumps(files, indent=2)}
             """
-            
-            if isinstance(brain, ClaudeBrain):
-                 # Claude's chat is async, run in event loop
-                 response = asyncio.run(brain.chat([{"role": "user", "content": prompt}]))
-            else:
-                 response = brain.generate(prompt)
-            
-            cleaned = response.replace('```json', '').replace('```', '').strip()
-            plan = json.loads(cleaned)
-            
-            if auto_confirm:
-                return self.execute_move(path, plan)
-            else:
-                self.last_plan = plan 
-                return ToolResult(success=True, message="Plan generated. Review required.", data={"path": path, "plan": plan})
+        from brains.claude_brain import ClaudeBrain
+        if isinstance(brain, ClaudeBrain):
+            response = await brain.chat([{"role": "user", "content": prompt}])
+        else:
+            response = await brain.chat(prompt)
+        return _parse_plan(response)
+
+    @staticmethod
+    def _brain() -> Any:
+        from brains.gemini_brain import GeminiBrain
+        from brains.claude_brain import ClaudeBrain
+        # Prefer Claude, fall back to Gemini
+        for cls in (ClaudeBrain, GeminiBrain):
+            try:
+                brain = cls()
+                if brain.is_available():
+                    return brain
+            except Exception:
+                pass
+        return None
+
+    def organize(self, path: str, auto_confirm: bool = False, recursive: bool = False) -> ToolResult:
+        """
+        Orchestrates the organization: scan, rule-based placement, chunked
+        brain planning for the ambiguous files, then move or return the plan.
+        Subfolders are only touched when `recursive`, and then only as whole units.
+        """
+        scan_data = self.scan_directory(path, recursive)
+        if "error" in scan_data:
+            return ToolResult(success=False, message=scan_data["error"])
+
+        files, folders = scan_data["files"], scan_data["folders"]
+        if not files and not folders:
+            return ToolResult(success=True, message=f"No files found in {path} to organize.")
 
+        try:
+            brain = self._brain() if files else None
+            result = self.plan(path, files, brain, folders)
         except Exception as e:
             return ToolResult(success=False, message=f"Failed to generate organization plan: {str(e)}")
+
+        plan, stats = result["plan"], result["stats"]
+        if not plan:
+            return ToolResult(success=True, message=f"{path} is already organized.", data={"path": path, "stats": stats})
+        if auto_confirm:
+            return self.execute_move(path, plan)
+
+        self.last_plan = plan
+        counts: Dict[str, int] = {}
+        for item in plan:
+            counts[item["target_folder"]] = counts.get(item["target_folder"], 0) + 1
+        summary = ", ".join(f"{folder} ({n})" for folder, n in sorted(counts.items(), key=lambda c: -c[1])[:8])
+        note = "" if brain or not files else " No AI brain available, so documents were grouped by type only."
+        return ToolResult(success=True,
+                          message=f"Plan generated for {len(plan)} files: {summary}. Review required.{note}",
+                          data={"path": path, "plan": plan, "stats": stats})
+
+
+# Global instances: brain calls for every plan run on this loop
+organizer_loop = LoopThread("FileOrganizer")
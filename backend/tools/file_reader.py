@@ -0,0 +1,166 @@
+"""
+EONIX File Reader — Ranged reads of large files through mmap.
+
+Byte ranges, the last N lines and line ranges are served without reading
+the whole file: tails scan backwards from the end of the mapping, and line
+ranges jump through a sparse newline index (newline count per 1 MB block)
+that is cached per file and only extended when a log grows.
+
+    read_range(path, offset=-4096)            # last 4 KB
+    tail(path, 100)                           # last 100 lines
+    read_lines(path, 5000, 5100)              # lines 5000..5100
+"""
+import os
+import mmap
+import codecs
+import bisect
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+BLOCK = 1 << 20        # bytes per newline-index block
+MAX_CHARS = 10000      # text handed back to the planner by default
+STREAM_CHUNK = 64 * 1024
+MAX_STREAM_CHUNK = 1 << 20  # largest slice held in memory at once by iter_range
+INDEX_CACHE = 16       # files whose newline index is kept
+
+
+@contextmanager
+def mapped(path: str) -> Iterator[Any]:
+    """Read-only mmap of `path` (b"" for an empty file, which can't be mapped)."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mm
+        finally:
+            mm.close()
+
+
+def _text(data: bytes) -> str:
+    return data.decode("utf-8", errors="replace")
+
+
+def read_range(path: str, offset: int = 0, length: int = MAX_CHARS) -> Dict[str, Any]:
+    """`length` bytes from `offset` (negative = from the end of the file)."""
+    with mapped(path) as mm:
+        size = len(mm)
+        start = max(0, size + offset if offset < 0 else min(offset, size))
+        end = min(size, start + max(0, length))
+        return {"content": _text(mm[start:end]), "start": start, "end": end, "size": size}
+
+
+def _tail_start(mm, lines: int, floor: int = 0) -> int:
+    """Offset of the last `lines` lines of `mm`, not looking back past `floor`."""
+    size = len(mm)
+    if lines <= 0:
+        return size
+    start = size - 1 if size and mm[size - 1:size] == b"\n" else size
+    for _ in range(lines):
+        start = mm.rfind(b"\n", floor, start)
+        if start < 0:
+            return floor
+    return start + 1
+
+
+def tail(path: str, lines: int = 100, max_chars: int = MAX_CHARS) -> Dict[str, Any]:
+    """The last `lines` lines (at most about `max_chars`), found by scanning backwards for newlines."""
+    with mapped(path) as mm:
+        size = len(mm)
+        # worst-case UTF-8 width, trimmed to max_chars below
+        start = _tail_start(mm, lines, max(0, size - max_chars * 4))
+        return {"content": _text(mm[start:size])[-max_chars:], "start": start, "end": size, "size": size}
+
+
+def tail_offset(path: str, lines: int) -> int:
+    """Byte offset where the last `lines` lines of `path` begin."""
+    with mapped(path) as mm:
+        return _tail_start(mm, lines)
+
+
+@dataclass
+class LineIndex:
+    size: int
+    mtime: float
+    before: List[int]  # newlines before each BLOCK; before[-1] = newlines in the file
+    tail: bytes        # last bytes when indexed, to tell an append from a rewrite
+
+    @property
+    def lines(self) -> int:
+        return self.before[-1] + (1 if self.tail and not self.tail.endswith(b"\n") else 0)
+
+
+_indexes: "OrderedDict[str, LineIndex]" = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def line_index(path: str, mm) -> LineIndex:
+    """Newline index of `path`; a file that only grew since last time is counted from its last full block."""
+    st = os.stat(path)
+    key = os.path.abspath(path)
+    with _indexes_lock:
+        cached = _indexes.get(key)
+    if cached is not None and (cached.size, cached.mtime) == (st.st_size, st.st_mtime):
+        return cached
+    size = len(mm)
+    before = [0]
+    if (cached is not None and size > cached.size
+            and mm[cached.size - len(cached.tail):cached.size] == cached.tail):
+        before = cached.before[:cached.size // BLOCK + 1]  # appended to: whole blocks are unchanged
+    for start in range((len(before) - 1) * BLOCK, size, BLOCK):
+        before.append(before[-1] + mm[start:start + BLOCK].count(b"\n"))
+    index = LineIndex(size, st.st_mtime, before, mm[max(0, size - 64):size])
+    with _indexes_lock:
+        _indexes[key] = index
+        _indexes.move_to_end(key)
+        while len(_indexes) > INDEX_CACHE:
+            _indexes.popitem(last=False)
+    return index
+
+
+def _line_start(mm, index: LineIndex, line: int) -> int:
+    """Byte offset where 1-based `line` starts (file size past the end)."""
+    newlines = line - 1  # newlines before the line
+    if newlines <= 0:
+        return 0
+    if newlines > index.before[-1]:
+        return index.size
+    block = bisect.bisect_left(index.before, newlines) - 1  # block holding that newline
+    pos = block * BLOCK - 1
+    for _ in range(newlines - index.before[block]):
+        pos = mm.find(b"\n", pos + 1)
+    return pos + 1
+
+
+def read_lines(path: str, start: int, end: Optional[int] = None, max_chars: int = MAX_CHARS) -> Dict[str, Any]:
+    """Lines `start`..`end` (1-based, inclusive; to the end of file if None)."""
+    with mapped(path) as mm:
+        if not len(mm):
+            return {"content": "", "start": 0, "end": 0, "size": 0, "lines": 0}
+        index = line_index(path, mm)
+        lo = _line_start(mm, index, max(1, start))
+        hi = index.size if end is None else _line_start(mm, index, end + 1)
+        hi = min(hi, lo + max_chars * 4)  # worst-case UTF-8 width, trimmed to max_chars below
+        return {"content": _text(mm[lo:hi])[:max_chars], "start": lo, "end": hi,
+                "size": index.size, "lines": index.lines}
+
+
+def iter_range(path: str, offset: int = 0, length: Optional[int] = None,
+               chunk: int = STREAM_CHUNK) -> Iterator[Tuple[int, str]]:
+    """(byte offset, text) chunks of a byte range, decoded without splitting characters."""
+    chunk = max(1, min(chunk, MAX_STREAM_CHUNK))
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    with mapped(path) as mm:
+        size = len(mm)
+        pos = max(0, size + offset if offset < 0 else min(offset, size))
+        stop = size if length is None else min(size, pos + length)
+        while pos < stop:
+            data = mm[pos:min(stop, pos + chunk)]
+            text = decoder.decode(data, final=pos + len(data) >= stop)
+            if text:
+                yield pos, text
+            pos += len(data)
@@ -1,17 +1,28 @@
 """
 EONIX Memory Tool — Allows the AI to store long-term memories.
 """
-from memory.semantic import SemanticMemory
+from memory.semantic import semantic_memory
 from tools.tool_result import ToolResult
 
 class MemoryTool:
     def __init__(self):
-        self.memory = SemanticMemory()
+        # Shared instance, so every writer goes through the same duplicate index
+        self.memory = semantic_memory
 
     def store_fact(self, fact: str) -> ToolResult:
         """Store a fact in long-term memory."""
         try:
-            fact_id = self.memory.store_fact(fact)
+            fact_id, duplicate = self.memory.upsert_fact(fact)
+            if duplicate:
+                return ToolResult(success=True, message=f"Already remembered, refreshed: '{fact}'",
+                                  data={"id": fact_id, "duplicate": True})
             return ToolResult(success=True, message=f"Fact stored in memory: '{fact}'", data={"id": fact_id})
         except Exception as e:
             return ToolResult(success=False, message=f"Failed to store fact: {str(e)}")
+
+    def index_document(self, namespace: str, doc_id: str, text: str, **metadata) -> None:
+        """Best-effort: make a note / page / clip searchable in its memory namespace."""
+        try:
+            self.memory.store_document(namespace, doc_id, text, metadata)
+        except Exception as e:
+            print(f"WARNING: Memory indexing failed ({namespace}): {e}")
@@ -0,0 +1,69 @@
+"""
+EONIX Tool Result Cache — Short-lived memo of idempotent tool calls.
+
+A tool opts in with a CachePolicy: a TTL and a key function over its args.
+Keys are tuples whose first element names the resource (a path, a URL, a
+city), so mutating tools can drop every cached entry for that resource
+regardless of the rest of the key.
+"""
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .tool_result import ToolResult
+
+Key = Tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    ttl: float                                         # seconds a result stays fresh
+    key: Callable[[Dict[str, Any]], Optional[Key]]     # None = don't cache this call
+
+
+class ToolResultCache:
+    """LRU of (tool, key) → successful ToolResult, each with its own expiry."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, Key], Tuple[float, ToolResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, tool: str, key: Key) -> Optional[ToolResult]:
+        with self._lock:
+            entry = self._entries.get((tool, key))
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[(tool, key)]
+                self.misses += 1
+                return None
+            self._entries.move_to_end((tool, key))
+            self.hits += 1
+        # A copy, so callers annotating the result don't touch the cached one
+        return replace(entry[1], data=dict(entry[1].data or {}), cached=True)
+
+    def put(self, tool: str, key: Key, result: ToolResult, ttl: float) -> None:
+        with self._lock:
+            self._entries[(tool, key)] = (time.monotonic() + ttl, result)
+            self._entries.move_to_end((tool, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tool: str, resource: Any = None) -> int:
+        """Drop `tool`'s entries for `resource` (all of them if None). Returns entries dropped."""
+        with self._lock:
+            doomed = [k for k in self._entries
+                      if k[0] == tool and (resource is None or k[1][:1] == (resource,))]
+            for k in doomed:
+                del self._entries[k]
+        return len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
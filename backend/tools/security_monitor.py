@@ -16,7 +16,7 @@ try:
 except ImportError:
     HAS_PSUTIL = False
 
-from memory.db import SessionLocal, SecurityLog
+from memory.db import SecurityLog, get_read_db, db_writer
 
 # ── Known/safe processes ──────────────────────────────────────
 DEFAULT_WHITELIST = {
@@ -140,7 +140,7 @@ class SecurityMonitor:
     def get_recent_alerts(self, limit=50) -> List[Dict]:
         """Get recent security alerts from DB."""
         try:
-            db = SessionLocal()
+            db = get_read_db()
             rows = db.query(SecurityLog).order_by(SecurityLog.id.desc()).limit(limit).all()
             db.close()
             return [{
@@ -275,7 +275,6 @@ class SecurityMonitor:
         if len(self._alerts_cache) > 200:
             self._alerts_cache = self._alerts_cache[-100:]
         try:
-            db = SessionLocal()
             row = SecurityLog(
                 severity=threat['severity'],
                 category=threat['type'],
@@ -285,12 +284,15 @@ class SecurityMonitor:
                 pid=threat.get('pid'),
                 date=datetime.now().strftime('%Y-%m-%d'),
             )
-            db.add(row)
-            db.commit()
-            db.close()
+            db_writer.add(row).add_done_callback(self._report_error)
         except Exception as e:
             print(f"[SecurityMonitor] log error: {e}")
 
+    @staticmethod
+    def _report_error(fut):
+        if fut.exception():
+            print(f"[SecurityMonitor] log error: {fut.exception()}")
+
 
 # Singleton
 security_monitor_bg = SecurityMonitor()
@@ -1,6 +1,7 @@
 """
 EONIX System Info — CPU, RAM, disk, battery, process monitoring.
 """
+import time
 import psutil
 import platform
 import socket
@@ -24,11 +25,24 @@ class SystemInfo:
     name = "get_system_info"
     description = "Gets real-time system metrics: CPU, RAM, disk, battery, processes"
 
+    MIN_CPU_SAMPLE = 0.1  # seconds; shortest window cpu_percent is meaningful over
+
+    def __init__(self) -> None:
+        # Non-blocking cpu_percent measures since the previous call: prime it now
+        psutil.cpu_percent(interval=None)
+        self._cpu_sampled_at = time.monotonic()
+
     def get_cpu(self) -> Dict[str, Any]:
         try:
             freq = psutil.cpu_freq()
+            # Instead of blocking a full second, only top up a too-short window
+            wait = self.MIN_CPU_SAMPLE - (time.monotonic() - self._cpu_sampled_at)
+            if wait > 0:
+                time.sleep(wait)
+            percent = psutil.cpu_percent(interval=None)
+            self._cpu_sampled_at = time.monotonic()
             return {
-                "percent": psutil.cpu_percent(interval=1),
+                "percent": percent,
                 "cores": psutil.cpu_count(logical=True),
                 "physical_cores": psutil.cpu_count(logical=False),
                 "freq_mhz": round(freq.current, 0) if freq else 0
@@ -10,6 +10,7 @@ class ToolResult:
     success: bool
     message: str
     data: Dict[str, Any] = field(default_factory=dict)
+    cached: bool = False  # served from the registry's result cache
 
     def __str__(self):
         icon = "✓" if self.success else "✗"
@@ -16,7 +16,7 @@ try:
 except ImportError:
     HAS_WIN32 = False
 
-from memory.db import SessionLocal, AppUsage
+from memory.db import AppUsage, db_writer
 
 # ── Productive app classification ──────────────────────────────
 PRODUCTIVE_APPS = {
@@ -110,6 +110,11 @@ class UsageTracker:
 
             time.sleep(self.INTERVAL)
 
+    @staticmethod
+    def _report_error(fut):
+        if fut.exception():
+            print(f"[UsageTracker] save error: {fut.exception()}")
+
     def _end_session(self):
         """Write the completed session to DB."""
         if not self._current_app or not self._session_start:
@@ -120,7 +125,6 @@ class UsageTracker:
             if duration < 2:
                 return  # skip sub-2-second flickers
 
-            db = SessionLocal()
             row = AppUsage(
                 app_name=self._current_app,
                 window_title=self._current_title or "",
@@ -129,9 +133,7 @@ class UsageTracker:
                 duration_seconds=round(duration, 1),
                 date=self._session_start.strftime("%Y-%m-%d"),
             )
-            db.add(row)
-            db.commit()
-            db.close()
+            db_writer.add(row).add_done_callback(self._report_error)
         except Exception as e:
             print(f"[UsageTracker] save error: {e}")
         finally:
@@ -1,50 +1,502 @@
 """
 EONIX Web Reader Tool — Fetch, clean, and summarize any webpage.
+
+Pages are fetched on a dedicated event loop with one pooled httpx client,
+streamed under a byte budget and decoded incrementally (charset from the
+Content-Type header, else a <meta charset> sniff). Text is extracted in a
+single pass that stops as soon as enough readable text has been collected.
+Results land in an on-disk cache under data/web_cache that honours
+Cache-Control / Expires and revalidates with ETag / Last-Modified.
+
+`read_many` fetches a list of URLs (or the result links of a search page)
+concurrently, capped per host and by an overall deadline, and merges the
+pages into one deduplicated digest.
 """
+import os
 import re
-import html
-import urllib.request
-import urllib.error
+import json
+import time
+import codecs
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import parse_qs, quote_plus, urljoin, urlparse
+
+import httpx
+
 from tools.tool_result import ToolResult
+from utils.loop_thread import LoopThread
+from config import WEB_CACHE_DIR, WEB_MAX_BYTES, WEB_MAX_CHARS, WEB_PER_HOST, WEB_DEADLINE
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) EONIX/1.0"
+DEFAULT_TTL = 300           # seconds a page without caching headers is considered fresh
+MAX_HEURISTIC_TTL = 86400   # cap for Last-Modified based freshness
+SNIFF_BYTES = 2048          # bytes to look through for <meta charset> when the header has none
+FEED_CHARS = 32768          # decoded text handed to the extractor pool per call
+SEARCH_URL = "https://html.duckduckgo.com/html/?q={}"
+
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([\w.:-]+)""", re.I)
+
+
+def _codec(name: Optional[str]) -> Optional[str]:
+    if not name:
+        return None
+    try:
+        return codecs.lookup(name.strip().strip("\"'")).name
+    except LookupError:
+        return None
+
+
+def _header_charset(content_type: str) -> Optional[str]:
+    for part in content_type.split(";")[1:]:
+        key, _, value = part.partition("=")
+        if key.strip().lower() == "charset":
+            return _codec(value)
+    return None
+
+
+# ── Text extraction ──────────────────────────────────────────
+
+class TextExtractor(HTMLParser):
+    """Single-pass HTML → readable text. Feed it chunks; `done` flips once `limit` chars are collected."""
+
+    SKIP = {"script", "style", "noscript", "svg", "template", "iframe", "head"}
+    BLOCK = {"p", "div", "br", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "section", "article",
+             "header", "footer", "ul", "ol", "table", "blockquote", "pre", "hr", "dt", "dd", "main"}
+
+    def __init__(self, limit: int = WEB_MAX_CHARS):
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.lines: List[str] = []
+        self.size = 0
+        self.title = ""
+        self.done = False
+        self._line: List[str] = []
+        self._skip = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "title":
+            self._in_title = True
+        elif tag == "body":
+            self._skip = 0  # a never-closed <head> must not hide the page
+        elif tag in self.SKIP:
+            self._skip += 1
+        elif tag in self.BLOCK:
+            self._newline()
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        elif tag in self.SKIP:
+            self._skip = max(0, self._skip - 1)
+        elif tag in self.BLOCK:
+            self._newline()
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip and not self.done:
+            words = data.split()
+            if words:
+                self._line.append(" ".join(words))
+
+    def _newline(self):
+        if self._line:
+            line = " ".join(self._line)
+            self._line = []
+            self.lines.append(line)
+            self.size += len(line) + 1
+            if self.size >= self.limit:
+                self.done = True
+
+    def text(self) -> str:
+        self._newline()
+        return "\n".join(self.lines)[:self.limit].strip()
+
+
+class _PlainText:
+    """Stand-in for TextExtractor on text/plain and other textual responses."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.parts: List[str] = []
+        self.size = 0
+        self.title = ""
+        self.done = False
+
+    def feed(self, data: str) -> None:
+        self.parts.append(data)
+        self.size += len(data)
+        self.done = self.size >= self.limit
+
+    def close(self) -> None:
+        pass
+
+    def text(self) -> str:
+        return "".join(self.parts)[:self.limit].strip()
+
+
+class LinkExtractor(HTMLParser):
+    """Outbound result links of a search/listing page, in page order."""
+
+    def __init__(self, base_url: str):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.base_host = urlparse(base_url).netloc
+        self.links: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "a":
+            return
+        href = dict(attrs).get("href")
+        if not href:
+            return
+        url = urljoin(self.base_url, href)
+        parsed = urlparse(url)
+        # Search engines wrap results in redirects: /l/?uddg=<target>, /url?q=<target>
+        for param in ("uddg", "q", "url"):
+            target = parse_qs(parsed.query).get(param)
+            if target and target[0].startswith("http"):
+                url, parsed = target[0], urlparse(target[0])
+                break
+        if parsed.scheme in ("http", "https") and parsed.netloc and parsed.netloc != self.base_host:
+            url = url.split("#")[0]
+            if url not in self.links:
+                self.links.append(url)
+
+
+def _norm_line(line: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", "", line.lower()).split())
+
+
+def merge_pages(pages: Sequence[Dict[str, Any]], max_chars: int) -> str:
+    """One digest of several pages: lines already seen on an earlier page are dropped
+    (navigation, cookie banners, syndicated copy) and each page gets a fair share."""
+    seen = set()
+    share = max_chars // max(len(pages), 1)
+    sections = []
+    for page in pages:
+        kept, size = [], 0
+        for line in page["text"].splitlines():
+            key = _norm_line(line)
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            if size + len(line) > share:
+                break
+            kept.append(line)
+            size += len(line) + 1
+        if kept:
+            title = page.get("title") or page["url"]
+            sections.append(f"## {title}\n{page['url']}\n" + "\n".join(kept))
+    return "\n\n".join(sections)
+
+
+# ── On-disk page cache ───────────────────────────────────────
+
+def _expires_at(headers: httpx.Headers, now: float) -> Optional[float]:
+    """When a response stops being fresh; None if it must not be stored."""
+    directives: Dict[str, str] = {}
+    for part in headers.get("cache-control", "").lower().split(","):
+        key, _, value = part.strip().partition("=")
+        if key:
+            directives[key] = value.strip('"')
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return now  # store, but revalidate on every read
+    if directives.get("max-age", "").isdigit():
+        return now + int(directives["max-age"])
+    for name in ("expires", "last-modified"):
+        if name in headers:
+            try:
+                stamp = parsedate_to_datetime(headers[name]).timestamp()
+            except (TypeError, ValueError):
+                continue
+            if name == "expires":
+                return stamp
+            return now + min(max(now - stamp, 0) * 0.1, MAX_HEURISTIC_TTL)
+    return now + DEFAULT_TTL
+
 
+class PageCache:
+    """Extracted pages plus their validators, one JSON file per URL."""
+
+    MAX_ENTRIES = 2000
+
+    def __init__(self, root: str = WEB_CACHE_DIR):
+        self.root = root
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.root, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(url), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url: str, entry: Dict[str, Any]) -> None:
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(url)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp, path)
+        with self._lock:
+            self._writes += 1
+            if self._writes % 50 == 0:
+                self.prune()
+
+    def prune(self, max_entries: Optional[int] = None) -> int:
+        """Drop the least recently written entries beyond max_entries."""
+        limit = self.MAX_ENTRIES if max_entries is None else max_entries
+        try:
+            entries = [e for e in os.scandir(self.root) if e.name.endswith(".json")]
+        except OSError:
+            return 0
+        if len(entries) <= limit:
+            return 0
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for e in entries[:len(entries) - limit]:
+            try:
+                os.remove(e.path)
+            except OSError:
+                pass
+        return len(entries) - limit
+
+
+# ── Fetcher ──────────────────────────────────────────────────
 
 class WebReader:
     name = "read_webpage"
     description = "Fetch and extract readable text from any URL"
 
-    def execute(self, url: str = "", **_) -> ToolResult:
-        """Fetch a URL and return cleaned text content (first ~3000 chars)."""
-        if not url:
-            return ToolResult(success=False, message="No URL provided.")
+    def __init__(self, cache: Optional[PageCache] = None, max_bytes: int = WEB_MAX_BYTES,
+                 runner: Optional[LoopThread] = None):
+        self.cache = cache or PageCache()
+        self.max_bytes = max_bytes
+        self.runner = runner or web_loop
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def client(self) -> httpx.AsyncClient:
+        """The pooled client; created on, and only used from, the reader's loop."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                follow_redirects=True,
+                timeout=httpx.Timeout(12.0, connect=5.0),
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+                headers={"User-Agent": USER_AGENT},
+            )
+        return self._client
+
+    async def fetch(self, url: str, max_chars: int = WEB_MAX_CHARS) -> Dict[str, Any]:
+        """Readable text of `url` as {url, title, text, truncated, from_cache, ...}. Raises on HTTP errors."""
+        now = time.time()
+        entry = self.cache.get(url)
+        usable = entry is not None and (not entry.get("truncated") or len(entry["text"]) >= max_chars)
+        if usable and entry["expires_at"] > now:
+            return {**entry, "text": entry["text"][:max_chars], "from_cache": True}
+
+        headers = {}
+        if usable:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        async with self.client().stream("GET", url, headers=headers) as resp:
+            if resp.status_code == 304 and usable:
+                expires = _expires_at(resp.headers, now)
+                entry["expires_at"] = expires if expires is not None else now
+                self.cache.put(url, entry)
+                return {**entry, "text": entry["text"][:max_chars], "from_cache": True}
+            resp.raise_for_status()
+            page = await self._read(resp, max_chars)
+
+        expires = _expires_at(resp.headers, now)
+        if expires is not None:
+            self.cache.put(url, {**page, "expires_at": expires, "fetched_at": now,
+                                 "etag": resp.headers.get("etag"),
+                                 "last_modified": resp.headers.get("last-modified")})
+        return {**page, "from_cache": False}
+
+    async def _read(self, resp: httpx.Response, max_chars: int) -> Dict[str, Any]:
+        content_type = resp.headers.get("content-type", "text/html")
+        mime = content_type.split(";")[0].strip().lower()
+        if mime.startswith(("image/", "audio/", "video/", "font/")) or mime in (
+                "application/pdf", "application/zip", "application/octet-stream"):
+            raise ValueError(f"Unsupported content type: {mime}")
+        is_html = "html" in mime or "xml" in mime
+        extractor = TextExtractor(max_chars) if is_html else _PlainText(max_chars)
+
+        # Parsing runs on the extractor pool in FEED_CHARS slices so the loop
+        # stays free for other downloads; `done` is checked between slices.
+        loop = asyncio.get_running_loop()
+        pending: List[str] = []
+        pending_chars = 0
+
+        async def feed(text: str, flush: bool = False) -> None:
+            nonlocal pending_chars
+            if text:
+                pending.append(text)
+                pending_chars += len(text)
+            if pending and (flush or pending_chars >= FEED_CHARS):
+                batch = "".join(pending)
+                pending.clear()
+                pending_chars = 0
+                await loop.run_in_executor(_extract_pool, extractor.feed, batch)
+
+        charset = _header_charset(content_type)
+        decoder = codecs.getincrementaldecoder(charset)("replace") if charset else None
+        head = b""
+        received = 0
+        stopped = False
+        async for chunk in resp.aiter_bytes():
+            received += len(chunk)
+            if decoder is None:
+                head += chunk
+                if len(head) < SNIFF_BYTES and received < self.max_bytes:
+                    continue
+                found = _META_CHARSET.search(head[:SNIFF_BYTES]) if is_html else None
+                charset = _codec(found.group(1).decode("ascii", "ignore")) if found else None
+                charset = charset or "utf-8"
+                decoder = codecs.getincrementaldecoder(charset)("replace")
+                chunk, head = head, b""
+            await feed(decoder.decode(chunk))
+            if extractor.done or received >= self.max_bytes:
+                stopped = True
+                break
+        if decoder is None:  # body shorter than the sniff window
+            found = _META_CHARSET.search(head) if is_html else None
+            charset = (_codec(found.group(1).decode("ascii", "ignore")) if found else None) or "utf-8"
+            decoder = codecs.getincrementaldecoder(charset)("replace")
+            await feed(decoder.decode(head))
+        await feed(decoder.decode(b"", final=True), flush=True)
+        extractor.close()
+        stopped = stopped or extractor.done
+
+        return {"url": str(resp.request.url), "final_url": str(resp.url), "title": extractor.title.strip(),
+                "text": extractor.text(), "truncated": stopped, "charset": charset, "bytes": received}
+
+    async def search_links(self, page_url: str, limit: int) -> List[str]:
+        """Result links from a search or listing page (fetched within the byte budget, not cached)."""
+        resp = await self.client().get(page_url)
+        resp.raise_for_status()
+        parser = LinkExtractor(str(resp.url))
+        await asyncio.get_running_loop().run_in_executor(
+            _extract_pool, parser.feed, resp.content[:self.max_bytes].decode(resp.encoding or "utf-8", "replace"))
+        return parser.links[:limit]
+
+    async def fetch_many(self, urls: Sequence[str], max_chars: int = WEB_MAX_CHARS,
+                         per_host: int = WEB_PER_HOST, deadline: float = WEB_DEADLINE) -> List[Dict[str, Any]]:
+        """Fetch every URL concurrently (at most `per_host` at a time per host).
+
+        Whatever hasn't finished by `deadline` is cancelled and reported as
+        timed out; results come back in input order, failures included.
+        """
+        hosts: Dict[str, asyncio.Semaphore] = {}
+
+        async def one(url: str) -> Dict[str, Any]:
+            sem = hosts.setdefault(urlparse(url).netloc, asyncio.Semaphore(per_host))
+            t0 = time.perf_counter()
+            try:
+                async with sem:
+                    page = await self.fetch(url, max_chars)
+                return {**page, "url": url, "ok": True, "ms": round((time.perf_counter() - t0) * 1000)}
+            except httpx.HTTPStatusError as e:
+                return {"url": url, "ok": False, "error": f"HTTP {e.response.status_code}"}
+            except Exception as e:
+                return {"url": url, "ok": False, "error": str(e) or type(e).__name__}
+
+        tasks = [asyncio.ensure_future(one(u)) for u in urls]
+        if not tasks:
+            return []
+        _, late = await asyncio.wait(tasks, timeout=deadline)
+        for task in late:
+            task.cancel()
+        return [t.result() if t not in late else {"url": u, "ok": False, "error": f"timed out after {deadline:g}s"}
+                for u, t in zip(urls, tasks)]
+
+    async def read_many(self, urls: Sequence[str] = (), query: str = "", search_url: str = "",
+                        limit: int = 8, max_chars: int = WEB_MAX_CHARS * 4,
+                        deadline: float = WEB_DEADLINE) -> ToolResult:
+        started = time.monotonic()
+        targets = list(dict.fromkeys(u.strip() for u in urls if u and u.strip()))
         try:
-            req = urllib.request.Request(url, headers={
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) EONIX/1.0"
-            })
-            with urllib.request.urlopen(req, timeout=12) as resp:
-                raw = resp.read().decode("utf-8", errors="ignore")
+            if query and not search_url:
+                search_url = SEARCH_URL.format(quote_plus(query))
+            if search_url:
+                links = await asyncio.wait_for(self.search_links(search_url, limit), deadline / 2)
+                targets += [u for u in links if u not in targets]
+        except Exception as e:
+            if not targets:
+                return ToolResult(success=False, message=f"Failed to read search results: {e}")
+        targets = targets[:limit]
+        if not targets:
+            return ToolResult(success=False, message="No URLs to read.")
 
-            text = self._html_to_text(raw)
-            text = text[:3000]
+        remaining = max(1.0, deadline - (time.monotonic() - started))
+        per_page = max(500, max_chars // len(targets) * 2)  # headroom for lines dropped as duplicates
+        results = await self.fetch_many(targets, per_page, deadline=remaining)
+        pages = [r for r in results if r["ok"] and len(r.get("text", "")) >= 50]
+        failed = [r for r in results if not r["ok"]]
+        if not pages:
+            reasons = "; ".join(f"{r['url']}: {r.get('error', 'no readable content')}" for r in results)
+            return ToolResult(success=False, message=f"Could not read any of the pages ({reasons})")
 
-            if len(text) < 50:
-                return ToolResult(success=False, message="Page had no readable content.")
+        digest = merge_pages(pages, max_chars)
+        message = f"📚 Read {len(pages)}/{len(targets)} pages:\n\n{digest}"
+        if failed:
+            message += "\n\n⚠️ Not read: " + ", ".join(f"{r['url']} ({r['error']})" for r in failed)
+        return ToolResult(success=True, message=message, data={
+            "digest": digest,
+            "pages": [{"url": p["url"], "title": p.get("title", ""), "chars": len(p["text"]),
+                       "from_cache": p.get("from_cache", False), "ms": p.get("ms"), "text": p["text"]}
+                      for p in pages],
+            "failed": [{"url": r["url"], "error": r["error"]} for r in failed],
+        })
 
-            return ToolResult(success=True, message=f"📄 Content from {url}:\n\n{text}")
-        except urllib.error.URLError as e:
+    async def aexecute(self, url: str = "", max_chars: int = WEB_MAX_CHARS) -> ToolResult:
+        if not url:
+            return ToolResult(success=False, message="No URL provided.")
+        try:
+            if self.runner.in_loop():
+                page = await self.fetch(url, max_chars)
+            else:
+                page = await self.runner.arun(self.fetch(url, max_chars))
+        except httpx.HTTPStatusError as e:
+            return ToolResult(success=False, message=f"Failed to fetch URL (HTTP {e.response.status_code}): {url}")
+        except httpx.HTTPError as e:
             return ToolResult(success=False, message=f"Failed to fetch URL (network): {e}")
         except Exception as e:
             return ToolResult(success=False, message=f"Failed to fetch URL: {e}")
 
-    @staticmethod
-    def _html_to_text(raw_html: str) -> str:
-        """Strip HTML tags and return plain text."""
-        # Remove script/style blocks
-        text = re.sub(r"<(script|style|noscript)[^>]*>.*?</\1>", "", raw_html, flags=re.S | re.I)
-        text = re.sub(r"<br\s*/?>", "\n", text, flags=re.I)
-        text = re.sub(r"</(p|div|li|h[1-6]|tr)>", "\n", text, flags=re.I)
-        text = re.sub(r"<[^>]+>", " ", text)
-        text = html.unescape(text)
-        lines = [line.strip() for line in text.splitlines()]
-        text = "\n".join(line for line in lines if line)
-        text = re.sub(r"\n{3,}", "\n\n", text)
-        return text.strip()
+        text = page["text"]
+        if len(text) < 50:
+            return ToolResult(success=False, message="Page had no readable content.")
+        data = {k: page.get(k) for k in ("url", "final_url", "title", "truncated", "from_cache", "charset")}
+        return ToolResult(success=True, message=f"📄 Content from {url}:\n\n{text}", data=data)
+
+    def execute(self, url: str = "", max_chars: int = WEB_MAX_CHARS, **_) -> ToolResult:
+        """Fetch a URL and return cleaned text content (first ~3000 chars)."""
+        return self.runner.run(self.aexecute(url, max_chars))
+
+    def execute_many(self, urls: Sequence[str] = (), query: str = "", search_url: str = "",
+                     limit: int = 8, deadline: float = WEB_DEADLINE) -> ToolResult:
+        """Read several pages (or a search's results) at once into one digest."""
+        return self.runner.run(self.read_many(urls, query, search_url, limit, deadline=deadline),
+                               timeout=deadline + 5)
+
+
+# Global instances: every WebReader shares this loop (and so can share one client)
+web_loop = LoopThread("WebReader")
+_extract_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="WebExtract")
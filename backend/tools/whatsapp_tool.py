@@ -2,19 +2,191 @@
 EONIX WhatsApp Tool — Playwright with CDP remote debugging.
 Launches Chrome with remote debugging port so Playwright can connect
 to the existing Chrome session (keeping WhatsApp Web logged in).
+
+The CDP connection and the WhatsApp Web tab are kept open between messages
+by a WhatsAppSession (a BrowserService, see browser_service.py), so only the
+first message pays for connecting and booting the web app.
 """
 import os
 import time
+import asyncio
 import subprocess
 import webbrowser
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 try:
     # Prefer absolute import when used as a package
     from tools.tool_result import ToolResult
+    from tools.browser_service import BrowserService
 except ImportError:  # Fallback when running as a module
     from .tool_result import ToolResult
+    from .browser_service import BrowserService
 
 CDP_PORT = 9222
+WHATSAPP_URL = "https://web.whatsapp.com"
+MESSAGE_TIMEOUT = 45     # seconds for one search + send inside a batch
+SEARCH_SETTLE_MS = 3000  # how long search results get to show the contact by name
+SEND_CONFIRM_MS = 5000   # how long WhatsApp gets to take a message out of the compose box
+
+# ── WhatsApp Web DOM probes ───────────────────────────────────
+
+JS_READY = """
+() => {
+    // Check for chat list (logged in)
+    const chatList = document.querySelector('[data-testid="chat-list"]');
+    // Check for any contenteditable (search or compose)
+    const editable = document.querySelector('[contenteditable="true"]');
+    // Check for side panel
+    const side = document.querySelector('#side');
+    return !!(chatList || editable || side);
+}
+"""
+
+JS_FOCUS_SEARCH = """
+() => {
+    // Try multiple strategies to find the search box
+    const strategies = [
+        // data-testid
+        () => document.querySelector('[data-testid="search-input"]'),
+        // "Search or start a new chat" text (common in newer WA Web)
+        () => {
+            const els = document.querySelectorAll('div[contenteditable="true"]');
+            for (const el of els) {
+                if (el.innerText.includes("Search") || el.getAttribute("aria-label")?.includes("Search")) return el;
+            }
+            return null;
+        },
+        // data-tab="3" (WhatsApp uses tab 3 for search, tab 10 for compose)
+        () => document.querySelector('[contenteditable="true"][data-tab="3"]'),
+        // First contenteditable in the left panel (#side)
+        () => {
+            const side = document.querySelector('#side');
+            if (side) return side.querySelector('[contenteditable="true"]');
+            return null;
+        },
+    ];
+    for (const strategy of strategies) {
+        try {
+            const el = strategy();
+            if (el) {
+                el.click();
+                el.focus();
+                return true;
+            }
+        } catch(e) {}
+    }
+    return false;
+}
+"""
+
+# Truthy once the search results show a chat titled like `name`
+JS_RESULT_SHOWN = """
+(name) => {
+    const want = name.toLowerCase();
+    const panel = document.querySelector('#pane-side') || document.querySelector('#side') || document;
+    return [...panel.querySelectorAll('span[title]')].some(
+        el => (el.getAttribute('title') || '').toLowerCase().includes(want));
+}
+"""
+
+# Click the search result titled like `name` (exact title first); false if there is none
+JS_CLICK_RESULT = """
+(name) => {
+    const want = name.toLowerCase();
+    const panel = document.querySelector('#pane-side') || document.querySelector('#side');
+    if (!panel) return false;
+    const spans = [...panel.querySelectorAll('span[title]')];
+    const span = spans.find(el => (el.getAttribute('title') || '').toLowerCase() === want)
+              || spans.find(el => (el.getAttribute('title') || '').toLowerCase().includes(want));
+    if (!span) return false;
+    (span.closest('[role="listitem"]') || span).click();
+    return true;
+}
+"""
+
+# Title in the header of the open conversation ('' when no chat is open)
+JS_CHAT_TITLE = """
+() => {
+    const header = document.querySelector('#main header');
+    if (!header) return '';
+    const el = header.querySelector('[data-testid="conversation-info-header-chat-title"]')
+            || header.querySelector('span[title]')
+            || header.querySelector('span[dir="auto"]');
+    return el ? (el.getAttribute('title') || el.innerText || '').trim() : '';
+}
+"""
+
+# Truthy once the open conversation's header is titled like `name`
+JS_CHAT_IS = "(name) => (" + JS_CHAT_TITLE.strip() + ")().toLowerCase().includes(name.toLowerCase())"
+
+JS_COMPOSE_SHOWN = """
+() => {
+    // The compose box appears when a chat is open
+    const footer = document.querySelector('footer');
+    if (footer) {
+        const editable = footer.querySelector('[contenteditable="true"]');
+        if (editable) return true;
+    }
+    // Also check for data-testid
+    if (document.querySelector('[data-testid="conversation-compose-box-input"]')) return true;
+    // Check for data-tab=10 (compose box)
+    if (document.querySelector('[contenteditable="true"][data-tab="10"]')) return true;
+    // Check for any editable with message-related label
+    const els = document.querySelectorAll('[contenteditable="true"]');
+    for (const el of els) {
+        const label = (el.getAttribute('aria-label') || '').toLowerCase();
+        const title = (el.getAttribute('title') || '').toLowerCase();
+        if (label.includes('message') || title.includes('message') ||
+            label.includes('type') || title.includes('type')) return true;
+    }
+    return false;
+}
+"""
+
+JS_FOCUS_COMPOSE = """
+() => {
+    const strategies = [
+        () => document.querySelector('[data-testid="conversation-compose-box-input"]'),
+        () => {
+            // Only inside the open conversation (#main), never the search box
+            const els = document.querySelectorAll('#main [contenteditable="true"]');
+            for (const el of els) {
+                const label = (el.getAttribute('aria-label') || '').toLowerCase();
+                const title = (el.getAttribute('title') || '').toLowerCase();
+                if (label.includes('message') || title.includes('message') ||
+                    label.includes('type') || title.includes('type')) return el;
+            }
+            return null;
+        },
+        () => document.querySelector('#main [contenteditable="true"][data-tab="10"]'),
+        () => {
+            const footer = document.querySelector('#main footer');
+            if (footer) return footer.querySelector('[contenteditable="true"]');
+            return null;
+        },
+    ];
+    for (const strategy of strategies) {
+        try {
+            const el = strategy();
+            if (el) {
+                el.click();
+                el.focus();
+                return true;
+            }
+        } catch(e) {}
+    }
+    return false;
+}
+"""
+
+# Truthy once the message has left the compose box, i.e. WhatsApp queued it
+JS_COMPOSE_EMPTY = """
+() => {
+    const box = document.querySelector('footer [contenteditable="true"]')
+             || document.querySelector('[contenteditable="true"][data-tab="10"]');
+    return !box || box.innerText.trim() === '';
+}
+"""
 
 
 def _get_chrome_exe():
@@ -70,7 +242,7 @@ def _launch_chrome_with_cdp():
         f"--user-data-dir={profile_dir}",
         "--no-first-run",
         "--no-default-browser-check",
-        "https://web.whatsapp.com"
+        WHATSAPP_URL
     ]
 
     try:
@@ -81,94 +253,66 @@ def _launch_chrome_with_cdp():
         return False
 
 
-class WhatsAppTool:
-    name = "whatsapp"
-    description = "Send WhatsApp messages via WhatsApp Web"
-
-    def send_message(self, contact: str, message: str, wait_for_load: int = 30) -> ToolResult:
-        """
-        Open WhatsApp Web in a dedicated Chrome window with remote debugging,
-        search for a contact, and send a message.
-        
-        First time: User needs to scan QR code. After that, stays logged in.
-        """
-        try:
-            from playwright.sync_api import sync_playwright, TimeoutError as PWTimeout
-        except ImportError:
-            return ToolResult(success=False,
-                              message="Playwright not installed. Run: pip install playwright && playwright install chromium")
-
-        def log(msg: str) -> None:
-            print(f"[WhatsApp] {msg}")
-
+def log(msg: str) -> None:
+    print(f"[WhatsApp] {msg}")
+
+
+class WhatsAppSession(BrowserService):
+    """
+    The CDP connection to the EONIX Chrome, kept open across messages.
+
+    Connects to a Chrome already listening on CDP_PORT, else launches one on
+    the EONIX profile; if Chrome can't be launched, falls back to Playwright's
+    own Chromium on the same profile. A closed Chrome is reconnected on the
+    next message.
+    """
+
+    def __init__(self):
+        super().__init__("WhatsApp", max_tabs=2, homes={"whatsapp": WHATSAPP_URL})
+        self._playwright = None
+        self._browser = None
+
+    async def open(self):
+        from playwright.async_api import async_playwright
+
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+
+        if not await asyncio.to_thread(_is_cdp_running):
+            log("No existing CDP browser, launching Chrome with CDP...")
+            if not _launch_chrome_with_cdp():
+                # Last resort: use Playwright's built-in Chromium with persistent profile
+                log("Failed to launch Chrome with CDP, falling back to Playwright persistent context")
+                return await self._playwright.chromium.launch_persistent_context(
+                    user_data_dir=_get_eonix_profile_dir(),
+                    headless=False,
+                    args=["--no-first-run", "--no-default-browser-check"]
+                )
+            # Give Chrome a small grace period to open the port
+            await asyncio.sleep(2)
+
+        self._browser = await self._connect_cdp_with_retry(self._playwright)
+        log("Connected to Chrome via CDP")
+        context = self._browser.contexts[0] if self._browser.contexts else await self._browser.new_context()
+        # Chrome closing shows up as a disconnect, not as the context closing
+        self._browser.on("disconnected", lambda *_: self._forget(context))
+        return context
+
+    async def shutdown(self, context) -> None:
+        # Leave the user's Chrome running; just drop our connection to it
         try:
-            log(f"Requested send_message(contact={contact!r}, message={message!r})")
-            with sync_playwright() as p:
-                # Try to connect to existing Chrome CDP session first
-                browser = None
-                if _is_cdp_running():
-                    try:
-                        log("Existing CDP endpoint detected, attempting connect...")
-                        browser = self._connect_cdp_with_retry(p, log)
-                        log("Connected to existing Chrome via CDP")
-                    except Exception as e:
-                        log(f"CDP connect to existing Chrome failed: {e}")
-                        browser = None
-
-                if browser is None:
-                    # Launch new Chrome with CDP and dedicated EONIX profile
-                    log("No existing CDP browser, launching Chrome with CDP...")
-                    launched = _launch_chrome_with_cdp()
-                    if not launched:
-                        # Last resort: use Playwright's built-in Chromium with persistent profile
-                        log("Failed to launch Chrome with CDP, falling back to Playwright persistent context")
-                        profile_dir = _get_eonix_profile_dir()
-                        context = p.chromium.launch_persistent_context(
-                            user_data_dir=profile_dir,
-                            headless=False,
-                            args=["--no-first-run", "--no-default-browser-check"]
-                        )
-                        page = context.new_page()
-                        page.goto("https://web.whatsapp.com", timeout=30000)
-                        return self._do_whatsapp_actions(page, contact, message, wait_for_load, context=context)
-
-                    try:
-                        # Give Chrome a small grace period to open the port, then retry a few times
-                        log("Waiting briefly for Chrome CDP port to become available...")
-                        time.sleep(2)
-                        browser = self._connect_cdp_with_retry(p, log)
-                        log("Connected to newly launched Chrome via CDP")
-                    except Exception as e:
-                        log(f"Could not connect to Chrome via CDP after retries: {e}")
-                        return ToolResult(success=False, message=f"Could not connect to Chrome: {e}")
-
-                # Get or create WhatsApp Web page
-                context = browser.contexts[0] if browser.contexts else browser.new_context()
-                pages = context.pages
-
-                # Find existing WhatsApp tab or open new one
-                wa_page = None
-                for pg in pages:
-                    if "web.whatsapp.com" in pg.url:
-                        wa_page = pg
-                        break
-
-                if wa_page is None:
-                    log("No existing WhatsApp tab, opening new tab...")
-                    wa_page = context.new_page()
-                    wa_page.goto("https://web.whatsapp.com", timeout=30000)
-
-                wa_page.bring_to_front()
-                log("WhatsApp tab brought to front, starting actions...")
-                return self._do_whatsapp_actions(wa_page, contact, message, wait_for_load)
-
-        except Exception as e:
-            # Catch-all so the agent returns a clean ToolResult instead of crashing
-            print(f"[WhatsApp] Unexpected error in send_message: {e}")
-            return ToolResult(success=False, message=f"WhatsApp error: {str(e)}")
+            if self._browser is not None:
+                await self._browser.close()
+            else:
+                await context.close()
+        finally:
+            self._browser = None
+            if self._playwright:
+                await self._playwright.stop()
+                self._playwright = None
 
     @staticmethod
-    def _connect_cdp_with_retry(p, log, attempts: int = 5, delay: float = 2.0):
+    async def _connect_cdp_with_retry(p, attempts: int = 5, delay: float = 2.0):
         """
         Try to connect to the Chrome CDP endpoint several times before giving up.
         This makes failures much more visible and resilient.
@@ -178,288 +322,216 @@ class WhatsAppTool:
         for i in range(1, attempts + 1):
             try:
                 log(f"CDP connect attempt {i}/{attempts} to {url}")
-                return p.chromium.connect_over_cdp(url)
+                return await p.chromium.connect_over_cdp(url)
             except Exception as e:  # pragma: no cover - best-effort logging
                 last_err = e
                 log(f"CDP attempt {i} failed: {e}")
                 if i < attempts:
-                    time.sleep(delay)
+                    await asyncio.sleep(delay)
         # If we exhausted attempts, raise the last error so caller can wrap in ToolResult
         assert last_err is not None
         raise last_err
 
-    def _do_whatsapp_actions(self, page, contact: str, message: str,
-                              wait_for_load: int = 30, context=None) -> ToolResult:
-        """Perform the actual WhatsApp search + send actions on the page."""
-        from playwright.sync_api import TimeoutError as PWTimeout
 
-        def log(msg):
-            print(f"[WhatsApp] {msg}")
+class WhatsAppTool:
+    name = "whatsapp"
+    description = "Send WhatsApp messages via WhatsApp Web"
+
+    def __init__(self, session: Optional[BrowserService] = None):
+        self.session = session or whatsapp_session
+
+    def send_message(self, contact: str, message: str, wait_for_load: int = 30) -> ToolResult:
+        """
+        Search for a contact in the EONIX Chrome's WhatsApp Web tab and send a message.
+
+        First time: User needs to scan QR code. After that, stays logged in.
+        """
+        return self._blocking(self._perform_send(contact, message, wait_for_load))
+
+    async def asend_message(self, contact: str, message: str, wait_for_load: int = 30) -> ToolResult:
+        return await self._awaiting(self._perform_send(contact, message, wait_for_load))
+
+    def send_batch(self, messages: Sequence[Tuple[str, str]], wait_for_load: int = 30) -> ToolResult:
+        """
+        Send each (contact, message) pair in turn through the one warm WhatsApp tab.
+        A failed message doesn't stop the batch; per-message status and timings
+        are in data["results"].
+        """
+        return self._blocking(self._perform_batch(messages, wait_for_load))
+
+    async def asend_batch(self, messages: Sequence[Tuple[str, str]], wait_for_load: int = 30) -> ToolResult:
+        return await self._awaiting(self._perform_batch(messages, wait_for_load))
 
+    def _blocking(self, coro) -> ToolResult:
         try:
-            # ── Wait for WhatsApp to fully load ───────────────────────
-            log(f"Waiting up to {wait_for_load}s for WhatsApp to load...")
-            try:
-                # Wait for ANY of these to appear — indicates WA is ready
-                page.wait_for_function("""
-                    () => {
-                        // Check for chat list (logged in)
-                        const chatList = document.querySelector('[data-testid="chat-list"]');
-                        // Check for any contenteditable (search or compose)
-                        const editable = document.querySelector('[contenteditable="true"]');
-                        // Check for side panel
-                        const side = document.querySelector('#side');
-                        return !!(chatList || editable || side);
-                    }
-                """, timeout=wait_for_load * 1000)
-                log("WhatsApp loaded!")
-            except PWTimeout:
-                if context is not None:
-                    try:
-                        context.close()
-                    except Exception:
-                        pass
-                return ToolResult(success=False,
-                                  message=f"WhatsApp Web did not load in {wait_for_load}s. "
-                                          "Please scan the QR code in the Chrome window, then try again.")
-
-            time.sleep(2)  # Extra settle time
-
-            # ── Find and click search box using JavaScript ─────────────
-            log("Finding search box via JavaScript...")
-            search_clicked = page.evaluate("""
-                () => {
-                    // Try multiple strategies to find the search box
-                    const strategies = [
-                        // data-testid
-                        () => document.querySelector('[data-testid="search-input"]'),
-                        // "Search or start a new chat" text (common in newer WA Web)
-                        () => {
-                            const els = document.querySelectorAll('div[contenteditable="true"]');
-                            for (const el of els) {
-                                if (el.innerText.includes("Search") || el.getAttribute("aria-label")?.includes("Search")) return el;
-                            }
-                            return null;
-                        },
-                        // data-tab="3" (WhatsApp uses tab 3 for search, tab 10 for compose)
-                        () => document.querySelector('[contenteditable="true"][data-tab="3"]'),
-                        // First contenteditable in the left panel (#side)
-                        () => {
-                            const side = document.querySelector('#side');
-                            if (side) return side.querySelector('[contenteditable="true"]');
-                            return null;
-                        },
-                    ];
-                    for (const strategy of strategies) {
-                        try {
-                            const el = strategy();
-                            if (el) {
-                                el.click();
-                                el.focus();
-                                return true;
-                            }
-                        } catch(e) {}
-                    }
-                    return false;
-                }
-            """)
-
-            if not search_clicked:
-                log("JS search click failed, trying keyboard shortcut Ctrl+Alt+/")
-                # WhatsApp Web keyboard shortcut to focus search
-                page.keyboard.press("Control+Alt+/")
-                time.sleep(0.5)
-                search_clicked = True  # Assume it worked
-
-            log(f"Search box clicked: {search_clicked}")
-            time.sleep(0.5)
-
-            # ── Type contact name ─────────────────────────────────────
-            # Clear any existing text first
-            page.keyboard.press("Control+a")
-            time.sleep(0.2)
-            page.keyboard.type(contact, delay=120)
-            log(f"Typed contact name: {contact}")
-            time.sleep(3)  # Wait for search results to appear
-
-            # ── Click first search result using JavaScript ─────────────
-            log("Clicking first search result...")
-            clicked = page.evaluate("""
-                () => {
-                    const strategies = [
-                        () => document.querySelector('[data-testid="cell-frame-container"]'),
-                        () => document.querySelector('[data-testid="chat-list-item"]'),
-                        () => {
-                            // Find any div containing the contact name text in the side panel
-                            const side = document.querySelector('#side');
-                            if (!side) return null;
-                            const els = side.querySelectorAll('span, div');
-                            // We look for the contact name specifically if possible, but JS doesn't have the string easily here
-                            // So we just take the first result-like thing
-                            return side.querySelector('[role="listitem"]') || side.querySelector('[data-testid="list-item"]');
-                        },
-                        () => {
-                            // Find list items in search results
-                            const items = document.querySelectorAll('[role="listitem"]');
-                            if (items.length > 0) return items[0];
-                            return null;
-                        },
-                    ];
-                    for (const strategy of strategies) {
-                        try {
-                            const el = strategy();
-                            if (el) { el.click(); return true; }
-                        } catch(e) {}
-                    }
-                    return false;
-                }
-            """)
-
-            if not clicked:
-                log("JS click failed, pressing Enter to open first result")
-                page.keyboard.press("Enter")
-
-            log("Opened contact chat")
-
-            # ── Wait for the compose/message box to appear ────────────
-            log("Waiting for message compose box to appear...")
-            try:
-                page.wait_for_function("""
-                    () => {
-                        // The compose box appears when a chat is open
-                        const footer = document.querySelector('footer');
-                        if (footer) {
-                            const editable = footer.querySelector('[contenteditable="true"]');
-                            if (editable) return true;
-                        }
-                        // Also check for data-testid
-                        if (document.querySelector('[data-testid="conversation-compose-box-input"]')) return true;
-                        // Check for data-tab=10 (compose box)
-                        if (document.querySelector('[contenteditable="true"][data-tab="10"]')) return true;
-                        // Check for any editable with message-related label
-                        const els = document.querySelectorAll('[contenteditable="true"]');
-                        for (const el of els) {
-                            const label = (el.getAttribute('aria-label') || '').toLowerCase();
-                            const title = (el.getAttribute('title') || '').toLowerCase();
-                            if (label.includes('message') || title.includes('message') ||
-                                label.includes('type') || title.includes('type')) return true;
-                        }
-                        return false;
-                    }
-                """, timeout=8000)
-                log("Compose box appeared!")
-            except Exception:
-                log("Compose box wait timed out, trying anyway...")
-
-            time.sleep(0.5)
-
-            # ── Find and click message input using JavaScript ──────────
-            log("Finding message input box...")
-            msg_clicked = page.evaluate("""
-                () => {
-                    const strategies = [
-                        () => document.querySelector('[data-testid="conversation-compose-box-input"]'),
-                        () => {
-                            const els = document.querySelectorAll('[contenteditable="true"]');
-                            for (const el of els) {
-                                const label = (el.getAttribute('aria-label') || '').toLowerCase();
-                                const title = (el.getAttribute('title') || '').toLowerCase();
-                                if (label.includes('message') || title.includes('message') ||
-                                    label.includes('type') || title.includes('type')) return el;
-                            }
-                            return null;
-                        },
-                        () => document.querySelector('[contenteditable="true"][data-tab="10"]'),
-                        () => {
-                            const footer = document.querySelector('footer');
-                            if (footer) return footer.querySelector('[contenteditable="true"]');
-                            return null;
-                        },
-                        () => {
-                            // Last contenteditable on page (compose box is usually last)
-                            const els = document.querySelectorAll('[contenteditable="true"]');
-                            if (els.length > 0) return els[els.length - 1];
-                            return null;
-                        },
-                    ];
-                    for (const strategy of strategies) {
-                        try {
-                            const el = strategy();
-                            if (el) {
-                                el.click();
-                                el.focus();
-                                return true;
-                            }
-                        } catch(e) {}
-                    }
-                    return false;
-                }
-            """)
-
-            if not msg_clicked:
-                # Last resort: try Playwright's built-in locators
-                log("JS failed, trying Playwright locators...")
-                try:
-                    page.locator('[data-testid="conversation-compose-box-input"]').click(timeout=3000)
-                    msg_clicked = True
-                except Exception:
-                    pass
-                if not msg_clicked:
-                    try:
-                        page.locator('footer [contenteditable="true"]').click(timeout=3000)
-                        msg_clicked = True
-                    except Exception:
-                        pass
-                if not msg_clicked:
-                    try:
-                        page.get_by_placeholder("Type a message").click(timeout=3000)
-                        msg_clicked = True
-                    except Exception:
-                        pass
-
-            if not msg_clicked:
-                log("Could not find message box")
-                if context is not None:
-                    try:
-                        context.close()
-                    except Exception:
-                        pass
-                return ToolResult(success=False,
-                                  message=f"Opened {contact}'s chat but couldn't click the message input. "
-                                          "The chat may not have fully loaded.")
-
-            log("Message box focused")
-            time.sleep(0.5)
-
-            # ── Type message and send ─────────────────────────────────
-            page.keyboard.type(message, delay=80)
-            log(f"Typed message: {message}")
-            time.sleep(0.5)
-            page.keyboard.press("Enter")
-            time.sleep(1)
-            log("Message sent!")
-            time.sleep(5)  # Let user see the sent message before closing browser
+            return self.session.run(coro)
+        except Exception as e:
+            # Catch-all so the agent returns a clean ToolResult instead of crashing
+            log(f"Unexpected error: {e}")
+            return ToolResult(success=False, message=f"WhatsApp error: {str(e)}")
 
-            if context is not None:
-                try:
-                    context.close()
-                except Exception:
-                    pass
+    async def _awaiting(self, coro) -> ToolResult:
+        try:
+            return await self.session.arun(coro)
+        except Exception as e:
+            log(f"Unexpected error: {e}")
+            return ToolResult(success=False, message=f"WhatsApp error: {str(e)}")
+
+    # ── Commands (run on the session loop) ────────────────────
+
+    async def _perform_send(self, contact: str, message: str, wait_for_load: int) -> ToolResult:
+        log(f"Requested send_message(contact={contact!r}, message={message!r})")
 
+        async def run(page) -> ToolResult:
+            failure = await self._ready(page, wait_for_load)
+            if failure:
+                return failure
+            try:
+                await self._open_chat(page, contact)
+                status = await self._send_text(page, message)
+            except Exception as e:
+                log(f"Error: {e}")
+                return ToolResult(success=False, message=f"WhatsApp action failed: {str(e)}")
             return ToolResult(
                 success=True,
                 message=f"✅ Sent '{message}' to {contact} on WhatsApp",
-                data={"contact": contact, "message": message}
+                data={"contact": contact, "message": message, "status": status}
             )
 
+        return await self.session.submit("whatsapp", run, label="send_whatsapp_message",
+                                         timeout=wait_for_load + MESSAGE_TIMEOUT)
+
+    async def _perform_batch(self, messages: Sequence[Tuple[str, str]], wait_for_load: int) -> ToolResult:
+        if not messages:
+            return ToolResult(success=False, message="No messages to send")
+        log(f"Requested send_batch of {len(messages)} messages")
+
+        async def run(page) -> ToolResult:
+            t_batch = time.perf_counter()
+            failure = await self._ready(page, wait_for_load)
+            if failure:
+                return failure
+            results: List[Dict[str, Any]] = []
+            for contact, message in messages:
+                results.append(await self._send_one(page, contact, message))
+            sent = [r for r in results if r["success"]]
+            summary = f"Sent {len(sent)}/{len(results)} WhatsApp messages"
+            failed = [r["contact"] for r in results if not r["success"]]
+            if failed:
+                summary += f" (failed: {', '.join(failed)})"
+            return ToolResult(
+                success=bool(sent),
+                message=("✅ " if not failed else "") + summary,
+                data={"results": results, "sent": len(sent), "failed": len(failed),
+                      "total_ms": round((time.perf_counter() - t_batch) * 1000)}
+            )
+
+        return await self.session.submit("whatsapp", run, label=f"send_whatsapp_batch({len(messages)})",
+                                         timeout=wait_for_load + MESSAGE_TIMEOUT * len(messages))
+
+    async def _send_one(self, page, contact: str, message: str) -> Dict[str, Any]:
+        """One batch entry: search + send with its own timeout, never raising."""
+        entry: Dict[str, Any] = {"contact": contact, "message": message}
+        t0 = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._open_chat(page, contact), MESSAGE_TIMEOUT)
+            t1 = time.perf_counter()
+            entry["search_ms"] = round((t1 - t0) * 1000)
+            entry["status"] = await asyncio.wait_for(self._send_text(page, message), MESSAGE_TIMEOUT)
+            entry["send_ms"] = round((time.perf_counter() - t1) * 1000)
+            entry["success"] = True
         except Exception as e:
-            log(f"Error: {e}")
-            if context is not None:
+            error = f"timed out after {MESSAGE_TIMEOUT}s" if isinstance(e, asyncio.TimeoutError) else str(e)
+            log(f"Sending to {contact} failed: {error}")
+            entry.update(success=False, status="failed", error=error)
+            try:
+                await page.keyboard.press("Escape")  # leave the search/chat state for the next one
+            except Exception:
+                pass
+        entry["total_ms"] = round((time.perf_counter() - t0) * 1000)
+        return entry
+
+    # ── WhatsApp Web steps ────────────────────────────────────
+
+    async def _ready(self, page, wait_for_load: int) -> Optional[ToolResult]:
+        """Make sure the tab is on a loaded WhatsApp Web; a failed ToolResult if it isn't."""
+        if not page.url.startswith(WHATSAPP_URL):
+            log("No existing WhatsApp tab, opening WhatsApp Web...")
+            await page.goto(WHATSAPP_URL, timeout=30000)
+        log(f"Waiting up to {wait_for_load}s for WhatsApp to load...")
+        try:
+            # Wait for ANY of these to appear — indicates WA is ready (instant on a warm tab)
+            await page.wait_for_function(JS_READY, timeout=wait_for_load * 1000)
+        except Exception:
+            return ToolResult(success=False,
+                              message=f"WhatsApp Web did not load in {wait_for_load}s. "
+                                      "Please scan the QR code in the Chrome window, then try again.")
+        return None
+
+    async def _open_chat(self, page, contact: str) -> None:
+        """Search for `contact` and open their chat; raises unless the open chat is theirs."""
+        if not await page.evaluate(JS_FOCUS_SEARCH):
+            log("JS search click failed, trying keyboard shortcut Ctrl+Alt+/")
+            # WhatsApp Web keyboard shortcut to focus search
+            await page.keyboard.press("Control+Alt+/")
+            await asyncio.sleep(0.3)
+
+        # Replace whatever the previous search left behind
+        await page.keyboard.press("Control+a")
+        await page.keyboard.type(contact, delay=60)
+        log(f"Typed contact name: {contact}")
+        try:
+            await page.wait_for_function(JS_RESULT_SHOWN, arg=contact, timeout=SEARCH_SETTLE_MS)
+        except Exception:
+            raise RuntimeError(f"No WhatsApp chat found for '{contact}'; nothing was sent.")
+        if not await page.evaluate(JS_CLICK_RESULT, contact):
+            raise RuntimeError(f"Couldn't open the WhatsApp chat for '{contact}'; nothing was sent.")
+
+        # The compose box belongs to whichever chat is open: make sure it's this contact's
+        try:
+            await page.wait_for_function(JS_CHAT_IS, arg=contact, timeout=8000)
+        except Exception:
+            title = await page.evaluate(JS_CHAT_TITLE)
+            raise RuntimeError(f"The open chat is '{title or 'none'}', not '{contact}'; nothing was sent.")
+
+        try:
+            await page.wait_for_function(JS_COMPOSE_SHOWN, timeout=8000)
+        except Exception:
+            log("Compose box wait timed out, trying anyway...")
+        log(f"Opened {contact}'s chat")
+
+    async def _send_text(self, page, message: str) -> str:
+        """
+        Type and send `message` in the open chat. Returns "sent" once WhatsApp
+        has taken it out of the compose box; delivery continues in the
+        background, so a batch moves on to the next contact search meanwhile.
+        """
+        focused = await page.evaluate(JS_FOCUS_COMPOSE)
+        if not focused:
+            # Last resort: try Playwright's built-in locators
+            log("JS failed, trying Playwright locators...")
+            for locator in (page.locator('[data-testid="conversation-compose-box-input"]'),
+                            page.locator('footer [contenteditable="true"]'),
+                            page.get_by_placeholder("Type a message")):
                 try:
-                    context.close()
+                    await locator.click(timeout=3000)
+                    focused = True
+                    break
                 except Exception:
-                    pass
-            return ToolResult(success=False, message=f"WhatsApp action failed: {str(e)}")
+                    continue
+        if not focused:
+            raise RuntimeError("Opened the chat but couldn't click the message input. "
+                               "The chat may not have fully loaded.")
+
+        await page.keyboard.type(message, delay=30)
+        await page.keyboard.press("Enter")
+        try:
+            await page.wait_for_function(JS_COMPOSE_EMPTY, timeout=SEND_CONFIRM_MS)
+            log("Message sent!")
+            return "sent"
+        except Exception:
+            log("Message still in the compose box after Enter")
+            return "unconfirmed"
 
     def open_whatsapp_web(self) -> ToolResult:
         """Open WhatsApp Web with CDP-enabled Chrome."""
@@ -468,5 +540,9 @@ class WhatsAppTool:
             return ToolResult(success=True,
                               message="Opened WhatsApp Web in Chrome. "
                                       "If this is your first time, scan the QR code to log in.")
-        webbrowser.open("https://web.whatsapp.com")
+        webbrowser.open(WHATSAPP_URL)
         return ToolResult(success=True, message="Opened WhatsApp Web")
+
+
+# Global instance
+whatsapp_session = WhatsAppSession()
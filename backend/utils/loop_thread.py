@@ -0,0 +1,51 @@
+"""
+Eonix Loop Thread — An asyncio event loop running on its own daemon thread.
+
+Lets synchronous code (tools run in worker threads) share long-lived async
+resources such as pooled HTTP clients, which are bound to the loop that
+created them.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Optional
+
+
+class LoopThread:
+    def __init__(self, name: str):
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    self._thread = threading.Thread(target=loop.run_forever, name=self.name, daemon=True)
+                    self._thread.start()
+                    self._loop = loop
+        return self._loop
+
+    def in_loop(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def submit(self, coro: Awaitable[Any]) -> Future:
+        """Schedule a coroutine on the loop thread; returns a concurrent Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Block the calling (non-loop) thread until the coroutine finishes."""
+        if self.in_loop():
+            raise RuntimeError(f"{self.name}: run() called from its own loop thread")
+        return self.submit(coro).result(timeout)
+
+    async def arun(self, coro: Awaitable[Any]) -> Any:
+        """Await a coroutine that must run on this loop from another event loop."""
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def stop(self) -> None:
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)